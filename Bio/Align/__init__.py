@@ -16,11 +16,15 @@ class, used in the Bio.AlignIO module.
 import copy
 import importlib
 import numbers
+import os
 import sys
 import types
 import warnings
 from abc import ABC
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from itertools import product
 from itertools import zip_longest
 
 try:
@@ -39,6 +43,7 @@ from Bio.Align import _pairwisealigner  # type: ignore
 from Bio.Align import _alignmentcounts  # type: ignore
 from Bio.Align import substitution_matrices
 from Bio.Data import CodonTable
+from Bio.Seq import _dna_complement_table
 from Bio.Seq import MutableSeq
 from Bio.Seq import reverse_complement
 from Bio.Seq import Seq
@@ -996,6 +1001,45 @@ class MultipleSeqAlignment:
         return alignment
 
 
+def _gapped_bytes(sequence, coordinates, steps, gaps, out=None):
+    """Return an aligned sequence, including gaps, as a uint8 array (PRIVATE).
+
+    The sequence, its coordinates, and its steps should already be on the
+    strand shown in the printed alignment, while gaps is the number of columns
+    spanned by each step. The gap columns are found from the steps in one
+    pass, and the letters are copied as one block into the other columns of
+    out, or of a new array if out is None.
+
+    Return None if the letters cannot be copied as a block; this is the case
+    for sequences other than ASCII strings or Seq objects, for
+    undefined sequence contents, and for rows that skip or go back in the
+    sequence. The caller should then create the aligned sequence step by step.
+    """
+    if not ((steps == 0) | (steps == gaps)).all() or (gaps < 0).any():
+        return None
+    start = coordinates[0]
+    end = coordinates[-1]
+    if isinstance(sequence, str):
+        letters = sequence[start:end]
+        if not letters.isascii():
+            return None
+        letters = letters.encode()
+    elif isinstance(sequence, Seq):
+        try:
+            letters = bytes(sequence[start:end])
+        except UndefinedSequenceError:
+            return None
+    else:
+        return None
+    if len(letters) != end - start:
+        return None
+    if out is None:
+        out = np.empty(gaps.sum(), np.uint8)
+    out[:] = ord("-")
+    out[np.repeat(steps > 0, gaps)] = np.frombuffer(letters, np.uint8)
+    return out
+
+
 class Alignment:
     """Represents a sequence alignment.
 
@@ -1291,7 +1335,7 @@ class Alignment:
         coordinates = self.coordinates.copy()
         sequences = list(self.sequences)
         steps = np.diff(self.coordinates, 1)
-        aligned = sum(steps != 0, 0) > 1
+        aligned = (steps != 0).sum(0) > 1
         # True for steps in which at least two sequences align, False if a gap
         for i, sequence in enumerate(sequences):
             row = steps[i, aligned]
@@ -1307,29 +1351,31 @@ class Alignment:
         if not ((steps == gaps) | (steps <= 0)).all():
             raise ValueError("Unequal step sizes in alignment")
         n = len(steps)
-        m = sum(gaps)
-        data = np.empty((n, m), "S1")
+        m = gaps.sum()
+        data = np.full((n, m), b"-", "S1")
+        columns = np.cumsum(gaps) - gaps
+        # the first column of each step in the printed alignment
         for i in range(n):
             sequence = sequences[i]
-            k = coordinates[i, 0]
-            m = 0
-            for step, gap in zip(steps[i], gaps):
-                if step > 0:
-                    j = k + step
-                    n = m + step
-                    try:
-                        subsequence = bytes(sequence[k:j])
-                    except TypeError:  # str
-                        subsequence = bytes(sequence[k:j], "UTF8")
-                    data[i, :].data.cast("B")[m:n] = subsequence
-                    k = j
-                    m = n
-                elif step < 0:
-                    k += step
-                else:  # step == 0
-                    n = m + gap
-                    data[i, m:n] = b"-"
-                    m = n
+            mask = steps[i] > 0
+            lengths = steps[i, mask]
+            if len(lengths) == 0:
+                continue
+            starts = coordinates[i, :-1][mask]
+            start = starts.min()
+            end = (starts + lengths).max()
+            try:
+                letters = bytes(sequence[start:end])
+            except TypeError:  # str
+                letters = bytes(sequence[start:end], "UTF8")
+            letters = np.frombuffer(letters, np.uint8)
+            total = lengths.sum()
+            offsets = np.arange(total) - np.repeat(
+                np.cumsum(lengths) - lengths, lengths
+            )
+            source = np.repeat(starts - start, lengths) + offsets
+            target = np.repeat(columns[mask], lengths) + offsets
+            data[i].view(np.uint8)[target] = letters[source]
         if dtype is not None:
             data = np.array(data, dtype)
         return data
@@ -1492,64 +1538,30 @@ class Alignment:
         >>> alignment.frequencies
         {'G': array([2., 0., 0., 0.]), 'A': array([0., 2., 0., 0.]), 'C': array([0., 0., 1., 2.]), 'T': array([0., 0., 1., 0.])}
         """
-        coordinates = self.coordinates.copy()
-        sequences = list(self.sequences)
-        steps = np.diff(self.coordinates, 1)
-        aligned = sum(steps != 0, 0) > 1
-        # True for steps in which at least two sequences align, False if a gap
-        for i, sequence in enumerate(sequences):
-            row = steps[i, aligned]
-            if (row >= 0).all():
-                pass
-            elif (row <= 0).all():
-                sequences[i] = reverse_complement(sequence)
-                coordinates[i, :] = len(sequence) - coordinates[i, :]
-                steps[i, :] = -steps[i, :]
-            else:
-                raise ValueError(f"Inconsistent steps in row {i}")
-        gaps = steps.max(0)
-        if not ((steps == gaps) | (steps <= 0)).all():
-            raise ValueError("Unequal step sizes in alignment")
-        n = len(steps)
-        length = sum(gaps)
-        counts = {}
-        for i in range(n):
-            sequence = sequences[i]
+        data = np.array(self).view(np.uint8)
+        weights = []
+        for sequence in self.sequences:
             try:
-                weight = sequence.annotations.get("weight", 1.0)
+                weights.append(sequence.annotations.get("weight", 1.0))
             except AttributeError:
-                weight = 1.0
-            k = coordinates[i, 0]
-            m = 0
-            for step, gap in zip(steps[i], gaps):
-                if step > 0:
-                    j = k + step
-                    n = m + step
-                    try:
-                        subsequence = bytes(sequence[k:j])
-                    except TypeError:  # str
-                        subsequence = bytes(sequence[k:j], "UTF8")
-                    for index, letter in zip(range(m, n), subsequence):
-                        character = chr(letter)
-                        row = counts.get(character)
-                        if row is None:
-                            row = np.zeros(length)
-                            counts[character] = row
-                        row[index] += weight
-                    k = j
-                    m = n
-                elif step < 0:
-                    k += step
-                else:  # step == 0
-                    n = m + gap
-                    character = "-"
-                    row = counts.get(character)
-                    if row is None:
-                        row = np.zeros(length)
-                        counts[character] = row
-                    row[m:n] += weight
-                    m = n
-        return counts
+                weights.append(1.0)
+        if all(weight == 1.0 for weight in weights):
+            weights = None
+        counts = _column_counts(data, weights)
+        # Report the letters in the order in which they appear in the alignment
+        letters = []
+        seen = np.zeros(256, bool)
+        for row in data:
+            codes = row[~seen[row]]
+            if len(codes) > 0:
+                codes, indices = np.unique(codes, return_index=True)
+                codes = codes[np.argsort(indices)]
+                letters.extend(codes)
+                seen[codes] = True
+        if not seen[ord("-")] and (np.diff(self.coordinates, 1) == 0).any():
+            # include gaps of zero length
+            letters.append(ord("-"))
+        return {chr(code): counts[code] for code in letters}
 
     @property
     def target(self):
@@ -1738,7 +1750,7 @@ class Alignment:
         Return value is a string if the aligned sequences are string, Seq,
         or SeqRecord objects, otherwise the return value is a list.
         """
-        steps = np.diff(self.coordinates, 1)
+        steps, gaps, strands = self._get_row_steps()
         n = len(steps)
         if index < 0:
             index += n
@@ -1746,23 +1758,42 @@ class Alignment:
                 raise IndexError("row index out of range")
         elif index >= n:
             raise IndexError("row index out of range")
-        aligned = sum(steps != 0, 0) > 1
+        return self._get_row_line(index, steps, gaps, strands)
+
+    def _get_row_steps(self):
+        """Return the steps, the column widths, and the strand of each row (PRIVATE).
+
+        Helper for _get_row and __iter__. Steps of rows aligned mostly in the
+        reverse direction are negated, and the strand of these rows is True.
+        """
+        steps = np.diff(self.coordinates, 1)
+        aligned = (steps != 0).sum(0) > 1
         # True for steps in which at least two sequences align, False if a gap
+        forward = ((steps > 0) & aligned).sum(1)
+        reverse = ((steps < 0) & aligned).sum(1)
+        strands = forward < reverse
+        steps[strands] = -steps[strands]
+        gaps = steps.max(0, initial=0)
+        return steps, gaps, strands
+
+    def _get_row_line(self, index, steps, gaps, strands):
+        """Return the aligned sequence, including gaps, of one row (PRIVATE).
+
+        Helper for _get_row and __iter__.
+        """
         coordinates = self.coordinates[index, :]
         sequence = self.sequences[index]
-        for i in range(n):
-            aligned_steps = steps[i, aligned]
-            if sum(aligned_steps > 0) < sum(aligned_steps < 0):
-                steps[i, :] = -steps[i, :]
-                if i == index:
-                    sequence = reverse_complement(sequence)
-                    coordinates = len(sequence) - coordinates
-        gaps = steps.max(0)
+        if strands[index]:
+            sequence = reverse_complement(sequence)
+            coordinates = len(sequence) - coordinates
         try:
             sequence = sequence.seq  # SeqRecord confusion
         except AttributeError:
             pass
         steps = steps[index]
+        data = _gapped_bytes(sequence, coordinates, steps, gaps)
+        if data is not None:
+            return data.tobytes().decode()
         k = coordinates[0]
         if isinstance(sequence, (str, Seq)):
             line = ""
@@ -1940,14 +1971,18 @@ class Alignment:
         except AttributeError:
             pass
         if isinstance(sequence, (str, Seq)):
-            line = ""
-            start = coordinate[0]
-            for end, gap in zip(coordinate[1:], gaps):
-                if start < end:
-                    line += str(sequence[start:end])
-                else:
-                    line += "-" * gap
-                start = end
+            data = _gapped_bytes(sequence, coordinate, np.diff(coordinate), gaps)
+            if data is not None:
+                line = data.tobytes().decode()
+            else:
+                line = ""
+                start = coordinate[0]
+                for end, gap in zip(coordinate[1:], gaps):
+                    if start < end:
+                        line += str(sequence[start:end])
+                    else:
+                        line += "-" * gap
+                    start = end
             try:
                 line = "".join(line[col] for col in cols)
             except IndexError:
@@ -2058,21 +2093,32 @@ class Alignment:
         object. Return value is an Alignment object.
         """
         indices = tuple(col)
+        if all(isinstance(index, numbers.Integral) for index in indices):
+            columns = np.array(indices, np.intp)
+        else:
+            columns = None
         lines = []
         for i, sequence in enumerate(sequences):
             try:
                 s = sequence.seq  # stupid SeqRecord
             except AttributeError:
                 s = sequence
-            line = ""
-            k = coordinates[i, 0]
-            for step, gap in zip(steps[i], gaps):
-                if step:
-                    j = k + step
-                    line += str(s[k:j])
-                    k = j
-                else:
-                    line += "-" * gap
+            data = _gapped_bytes(s, coordinates[i], steps[i], gaps)
+            if data is not None and columns is not None:
+                lines.append(data[columns].tobytes())
+                continue
+            if data is not None:
+                line = data.tobytes().decode()
+            else:
+                line = ""
+                k = coordinates[i, 0]
+                for step, gap in zip(steps[i], gaps):
+                    if step:
+                        j = k + step
+                        line += str(s[k:j])
+                        k = j
+                    else:
+                        line += "-" * gap
             try:
                 line = "".join(line[index] for index in indices)
             except IndexError:
@@ -2407,7 +2453,7 @@ class Alignment:
         else:
             write_pattern = False
         steps = np.diff(self.coordinates, 1)
-        aligned = sum(steps != 0, 0) > 1
+        aligned = (steps != 0).sum(0) > 1
         # True for steps in which at least two sequences align, False if a gap
         name_width = 10
         names = []
@@ -2436,19 +2482,17 @@ class Alignment:
                 seq = seq.seq  # SeqRecord confusion
             except AttributeError:
                 pass
-            start = min(positions)
-            end = max(positions)
+            start = positions.min()
+            end = positions.max()
             seq = seq[start:end]
             aligned_steps = steps[i, aligned]
             if len(aligned_steps) == 0:
                 aligned_steps = steps[i]
-            if sum(aligned_steps > 0) >= sum(aligned_steps < 0):
-                start = min(positions)
+            if (aligned_steps > 0).sum() >= (aligned_steps < 0).sum():
                 row[:] = positions - start
             else:
                 steps[i, :] = -steps[i, :]
                 seq = reverse_complement(seq)
-                end = max(positions)
                 row[:] = end - positions
             if isinstance(seq, str):
                 if not seq.isascii():
@@ -2489,59 +2533,97 @@ class Alignment:
         minstep = steps.min(0)
         maxstep = steps.max(0)
         steps = np.where(-minstep > maxstep, minstep, maxstep)
-        for name, seq, positions, row in zip(names, seqs, self.coordinates, indices):
-            start = positions[0]
-            column = line_width
-            start_index = row[0]
-            for step, end, end_index in zip(steps, positions[1:], row[1:]):
-                if step < 0:
-                    if prefix_width + position_width < column:
+        data = None
+        if len(steps) > 0 and (steps > 0).all():
+            # store the letters and gaps of all rows in one array
+            data = np.empty((n, steps.sum()), np.uint8)
+            for seq, row, line in zip(seqs, indices, data):
+                if " " in seq:
+                    data = None
+                    break
+                if _gapped_bytes(seq, row, np.diff(row), steps, line) is None:
+                    data = None
+                    break
+        if data is None:
+            for name, seq, positions, row in zip(
+                names, seqs, self.coordinates, indices
+            ):
+                start = positions[0]
+                column = line_width
+                start_index = row[0]
+                for step, end, end_index in zip(steps, positions[1:], row[1:]):
+                    if step < 0:
+                        if prefix_width + position_width < column:
+                            position_text = str(start)
+                            offset = position_width - len(position_text) - 1
+                            if offset < 0:
+                                lines[-1] += " .." + position_text[-offset + 3 :]
+                            else:
+                                lines[-1] += " " + position_text
+                        column = line_width
+                        start = end
+                        start_index = end_index
+                        continue
+                    elif end_index == start_index:
+                        s = "-" * step
+                    else:
+                        s = seq[start_index:end_index]
+                    while column + len(s) >= line_width:
+                        rest = line_width - column
+                        if rest > 0:
+                            lines[-1] += s[:rest]
+                            s = s[rest:]
+                            if start != end:
+                                if (end_index - start_index) == abs(end - start):
+                                    step = rest
+                                else:
+                                    # protein to dna alignment;
+                                    # integer division, but round up:
+                                    step = -(rest // -3)
+                                if start < end:
+                                    start += step
+                                else:
+                                    start -= step
+                            start_index += rest
+                        line = name
                         position_text = str(start)
                         offset = position_width - len(position_text) - 1
                         if offset < 0:
-                            lines[-1] += " .." + position_text[-offset + 3 :]
+                            line += " .." + position_text[-offset + 3 :]
                         else:
-                            lines[-1] += " " + position_text
-                    column = line_width
-                    start = end
-                    start_index = end_index
-                    continue
-                elif end_index == start_index:
-                    s = "-" * step
+                            line += " " * offset + position_text
+                        line += " "
+                        lines.append(line)
+                        column = name_width + position_width
+                    lines[-1] += s
+                    if start_index != end_index:
+                        start_index = end_index
+                        start = end
+                    column += len(s)
+        else:
+            length = data.shape[1]
+            width = line_width - name_width - position_width
+            column = name_width + position_width + length % width
+            for name, line, positions, row in zip(
+                names, data, self.coordinates, indices
+            ):
+                # number of letters before the first column of each line
+                counts = np.repeat(np.diff(row) > 0, steps).cumsum()
+                counts = np.concatenate(([0], counts))[::width]
+                if positions[-1] < positions[0]:
+                    starts = positions[0] - counts
                 else:
-                    s = seq[start_index:end_index]
-                while column + len(s) >= line_width:
-                    rest = line_width - column
-                    if rest > 0:
-                        lines[-1] += s[:rest]
-                        s = s[rest:]
-                        if start != end:
-                            if (end_index - start_index) == abs(end - start):
-                                step = rest
-                            else:
-                                # protein to dna alignment;
-                                # integer division, but round up:
-                                step = -(rest // -3)
-                            if start < end:
-                                start += step
-                            else:
-                                start -= step
-                        start_index += rest
-                    line = name
+                    starts = positions[0] + counts
+                text = line.tobytes().decode()
+                for start_index, start in zip(range(0, length + 1, width), starts):
                     position_text = str(start)
                     offset = position_width - len(position_text) - 1
                     if offset < 0:
-                        line += " .." + position_text[-offset + 3 :]
+                        prefix = " .." + position_text[-offset + 3 :]
                     else:
-                        line += " " * offset + position_text
-                    line += " "
-                    lines.append(line)
-                    column = name_width + position_width
-                lines[-1] += s
-                if start_index != end_index:
-                    start_index = end_index
-                    start = end
-                column += len(s)
+                        prefix = " " * offset + position_text
+                    chunk = text[start_index : start_index + width]
+                    lines.append(f"{name}{prefix} {chunk}")
         if write_pattern is True:
             dash = "-"
             position = 0
@@ -2549,27 +2631,48 @@ class Alignment:
             lines1 = lines[:m]
             lines2 = lines[m:]
             pattern_lines = []
-            for line1, line2 in zip(lines1, lines2):
-                aligned_seq1 = line1[name_width + position_width :]
-                aligned_seq2 = line2[name_width + position_width :]
-                pattern = ""
-                for c1, c2 in zip(aligned_seq1, aligned_seq2):
-                    if c1 == c2:
-                        if c1 == " ":
-                            break
-                        c = "|"
-                    elif c1 == dash or c2 == dash:
-                        c = "-"
-                    else:
-                        c = "."
-                        if matrix is not None and c1 != " " and c2 != " ":
-                            c1u, c2u = c1.upper(), c2.upper()
-                            if matrix[c1u, c2u] > 0:
-                                c = ":"
-                    pattern += c
-                pattern_line = "          %9d %s" % (position, pattern)
-                pattern_lines.append(pattern_line)
-                position += len(pattern)
+            if data is not None:
+                seq1, seq2 = data
+                gap = ord(dash)
+                pattern = np.full(length, ord("."), np.uint8)
+                pattern[(seq1 == gap) | (seq2 == gap)] = gap
+                pattern[seq1 == seq2] = ord("|")
+                if matrix is not None:
+                    mismatches = pattern == ord(".")
+                    pairs = seq1[mismatches].astype(np.intp) * 256 + seq2[mismatches]
+                    positives = np.zeros(256 * 256, bool)
+                    for pair in np.unique(pairs):
+                        c1u, c2u = chr(pair >> 8).upper(), chr(pair & 255).upper()
+                        positives[pair] = matrix[c1u, c2u] > 0
+                    pattern[mismatches] = np.where(positives[pairs], ord(":"), ord("."))
+                pattern = pattern.tobytes().decode()
+                for position in range(0, length + 1, width):
+                    chunk = pattern[position : position + width]
+                    pattern_line = "          %9d %s" % (position, chunk)
+                    pattern_lines.append(pattern_line)
+                position = length
+            else:
+                for line1, line2 in zip(lines1, lines2):
+                    aligned_seq1 = line1[name_width + position_width :]
+                    aligned_seq2 = line2[name_width + position_width :]
+                    pattern = ""
+                    for c1, c2 in zip(aligned_seq1, aligned_seq2):
+                        if c1 == c2:
+                            if c1 == " ":
+                                break
+                            c = "|"
+                        elif c1 == dash or c2 == dash:
+                            c = "-"
+                        else:
+                            c = "."
+                            if matrix is not None and c1 != " " and c2 != " ":
+                                c1u, c2u = c1.upper(), c2.upper()
+                                if matrix[c1u, c2u] > 0:
+                                    c = ":"
+                        pattern += c
+                    pattern_line = "          %9d %s" % (position, pattern)
+                    pattern_lines.append(pattern_line)
+                    position += len(pattern)
             final_position_width = len(str(max(max(self.coordinates[:, -1]), position)))
             if column + final_position_width <= line_width:
                 if prefix_width + position_width < column:
@@ -2885,6 +2988,26 @@ class Alignment:
             id(self),
         )
 
+    def __iter__(self):
+        """Iterate over the aligned sequences, including gaps.
+
+        This yields the same values as alignment[0], alignment[1], ..., but
+        the gaps are found only once for all rows of the alignment:
+
+        >>> from Bio.Align import PairwiseAligner
+        >>> aligner = PairwiseAligner()
+        >>> alignments = aligner.align("ACCGGTTT", "ACGGGTT")
+        >>> alignment = alignments[0]
+        >>> for line in alignment:
+        ...     print(line)
+        ...
+        ACCGGTTT
+        ACGGGTT-
+        """
+        steps, gaps, strands = self._get_row_steps()
+        for index in range(len(steps)):
+            yield self._get_row_line(index, steps, gaps, strands)
+
     def __len__(self):
         """Return the number of sequences in the alignment."""
         return len(self.sequences)
@@ -3574,7 +3697,7 @@ class Alignment:
                 qStart2 += size
                 tStart2 += size
             tStart2, qStart2 = tEnd2, qEnd2
-        coordinates = np.array(path, dtype=np.intp).transpose()
+        coordinates = np.array(path, dtype=np.intp).reshape(-1, 2).transpose()
         if strand1 != strand2:
             coordinates[1, :] = n2 - coordinates[1, :]
         sequences = [target, query]
@@ -3899,55 +4022,48 @@ class Alignment:
          - internal_gaps              - the total gap length in the interior of the
                                         alignment.
         """
-        aligner = None
-        wildcard = None
-        substitution_matrix = None
-        if isinstance(scoring, PairwiseAligner):
-            aligner = scoring
-            substitution_matrix = aligner.substitution_matrix
-        elif isinstance(scoring, str):
-            wildcard = scoring
-        elif isinstance(scoring, (np.ndarray, substitution_matrices.Array)):
-            substitution_matrix = scoring
-        elif scoring is not None:
-            raise ValueError(f"unexpected argument {scoring!r}")
-        if substitution_matrix is None:
-            alphabet = []
-        codec = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+        argument, substitution_matrix = _parse_scoring(scoring)
+        sequences, coordinates, strands = self._prepare_counts(substitution_matrix)
+        if argument is None:
+            return _alignmentcounts.AlignmentCounts(sequences, coordinates, strands)
+        return _alignmentcounts.AlignmentCounts(
+            sequences, coordinates, strands, argument
+        )
+
+    def _prepare_counts(self, substitution_matrix=None, letters=False):
+        """Return the sequences, coordinates, and strands for counting (PRIVATE).
+
+        Sequences aligned to the reverse strand are reverse-complemented, and
+        their coordinates are adjusted accordingly. The sequence contents are
+        converted to a bytes object or an array of int32 values for use by the
+        C code in ``_alignmentcounts``.  If letters is True, a ValueError is
+        raised if the sequence contents cannot be represented by their letter
+        codes.
+        """
         n = len(self.sequences)
         sequences = [None] * n
         strands = np.zeros(n, bool)
         coordinates = self.coordinates.copy()
-        steps = np.diff(coordinates, 1)
-        aligned_flags = sum(steps != 0, 0) > 1
+        steps = coordinates[:, 1:] - coordinates[:, :-1]
+        aligned_flags = (steps != 0).sum(0) > 1
         # True for steps in which at least two sequences align, False if a gap
+        reverse = np.sign(steps[:, aligned_flags]).sum(1) < 0
+        # True for sequences with more negative than positive aligned steps
+        alphabet = []
         for i, sequence in enumerate(self.sequences):
-            aligned_steps = steps[i, aligned_flags]
-            if sum(aligned_steps > 0) < sum(aligned_steps < 0):
+            sequence = getattr(sequence, "seq", sequence)  # stupid SeqRecord
+            if reverse[i]:
                 sequence = reverse_complement(sequence)
                 coordinates[i, :] = len(sequence) - coordinates[i, :]
                 strands[i] = True
             try:
-                sequence = sequence.seq  # stupid SeqRecord
-            except AttributeError:
-                pass
-            try:
-                data = sequence._data
-            except AttributeError:
-                data = sequence
-            if isinstance(data, (bytes, bytearray)):
-                sequences[i] = data
-            elif isinstance(data, str):
-                sequences[i] = np.frombuffer(bytearray(data, codec), dtype="i")
-            elif isinstance(data, SequenceDataAbstractBaseClass):
-                sequences[i] = data
-            elif isinstance(data, np.ndarray):
-                # data is a numpy array of int32
-                # (to be checked in the C code)
-                sequences[i] = data
-            elif data is None:
-                sequences[i] = data
-            else:
+                sequences[i] = self._counts_data(sequence)
+            except TypeError:
+                data = getattr(sequence, "_data", sequence)
+                if letters:
+                    raise ValueError(
+                        f"unable to count substitutions for sequence of type {type(data)}"
+                    ) from None
                 if substitution_matrix is None:
                     for item in data:
                         if not any(item == letter for letter in alphabet):
@@ -3957,20 +4073,33 @@ class Alignment:
                 sequences[i] = np.fromiter(
                     map(alphabet.index, data), dtype="i", count=len(data)
                 )
-        if aligner is not None:
-            return _alignmentcounts.AlignmentCounts(
-                sequences, coordinates, strands, aligner
-            )
-        elif wildcard is not None:
-            return _alignmentcounts.AlignmentCounts(
-                sequences, coordinates, strands, wildcard
-            )
-        elif substitution_matrix is not None:
-            return _alignmentcounts.AlignmentCounts(
-                sequences, coordinates, strands, substitution_matrix
-            )
-        else:
-            return _alignmentcounts.AlignmentCounts(sequences, coordinates, strands)
+        return sequences, coordinates, strands
+
+    @staticmethod
+    def _counts_data(sequence):
+        """Return the sequence contents in the form used for counting (PRIVATE).
+
+        The contents are returned as a bytes object, an array of int32 values,
+        the sequence data object of a Seq with partially defined or lazy
+        contents, or None if the sequence contents are undefined. A TypeError
+        is raised for other sequence types, such as lists of arbitrary
+        objects, which are mapped to integers by _prepare_counts.
+        """
+        data = getattr(sequence, "_data", sequence)
+        if isinstance(data, (bytes, bytearray)):
+            return data
+        if isinstance(data, str):
+            codec = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+            return np.frombuffer(bytearray(data, codec), dtype="i")
+        if isinstance(data, SequenceDataAbstractBaseClass):
+            return data
+        if isinstance(data, np.ndarray):
+            # data is a numpy array of int32
+            # (to be checked in the C code)
+            return data
+        if data is None:
+            return data
+        raise TypeError(f"unexpected sequence type {type(data)}")
 
     def reverse_complement(self):
         """Reverse-complement the alignment and return it.
@@ -4022,6 +4151,729 @@ class Alignment:
         return alignment
 
 
+def _column_counts(data, weights=None):
+    """Count how often each character code appears in each column (PRIVATE).
+
+    Here, data is a two-dimensional array of uint8 character codes, and weights
+    is None or an array with the weight of each row. Returns an array of 256
+    rows, one for each character code, and one column for each column in data.
+    """
+    n, m = data.shape
+    counts = np.zeros((m, 256))
+    if n == 0:
+        return counts.transpose()
+    step = max(1, 4194304 // n)
+    # process blocks of columns to limit the size of the index array
+    offsets = 256 * np.arange(min(step, m), dtype=np.intp)
+    if weights is not None:
+        weights = np.asarray(weights, float)
+    for start in range(0, m, step):
+        block = data[:, start : start + step]
+        k = block.shape[1]
+        indices = (block + offsets[:k]).ravel()
+        if weights is None:
+            values = np.bincount(indices, minlength=256 * k)
+        else:
+            values = np.bincount(indices, np.repeat(weights, k), minlength=256 * k)
+        counts[start : start + k] = values.reshape(k, 256)
+    return counts.transpose()
+
+
+def _henikoff_weights(data):
+    """Calculate position-based sequence weights (PRIVATE).
+
+    Here, data is a two-dimensional array of uint8 character codes. In each
+    column, a sequence receives a weight 1 / (r * s), where r is the number
+    of different characters in the column, and s is the number of sequences
+    with the same character as this sequence; gaps are treated as a separate
+    character. The weights are summed over all columns, and scaled such that
+    they add up to the number of sequences.
+    """
+    n, m = data.shape
+    weights = np.zeros(n)
+    if n == 0:
+        return weights
+    step = max(1, 4194304 // n)
+    for start in range(0, m, step):
+        block = data[:, start : start + step]
+        k = block.shape[1]
+        counts = _column_counts(block)
+        types = np.count_nonzero(counts, 0)
+        with np.errstate(divide="ignore"):
+            values = 1.0 / (counts * types)
+        weights += values[block, np.arange(k)].sum(1)
+    total = weights.sum()
+    if total == 0:
+        return np.ones(n)
+    return weights * (n / total)
+
+
+class ArrayAlignment:
+    """Multiple sequence alignment stored as a two-dimensional array of letters.
+
+    A ``MultipleSeqAlignment`` stores a list of ``SeqRecord`` objects, and an
+    ``Alignment`` stores the sequences and their coordinates, so that column
+    access and summary statistics loop over the sequences in Python. An
+    ``ArrayAlignment`` instead stores the aligned letters, including gaps, in
+    a single two-dimensional NumPy array of ``uint8`` character codes, with
+    one row for each sequence. The metadata of each sequence (its id, name,
+    description, and annotations) are stored separately in the ``records``
+    list as a ``SeqRecord`` object without a sequence, or as None if the
+    sequence has no metadata.
+
+    >>> from Bio.Align import ArrayAlignment
+    >>> alignment = ArrayAlignment(["ACG-TA", "ACGGTA", "A-GGCA"])
+    >>> alignment  # doctest:+ELLIPSIS
+    <ArrayAlignment object (3 rows x 6 columns) at 0x...>
+    >>> alignment.data.dtype
+    dtype('uint8')
+    >>> alignment.data.tolist()
+    [[65, 67, 71, 45, 84, 65], [65, 67, 71, 71, 84, 65], [65, 45, 71, 71, 67, 65]]
+
+    Indexing a row or a column returns a string, as for an ``Alignment``:
+
+    >>> alignment[0]
+    'ACG-TA'
+    >>> alignment[:, 4]
+    'TTC'
+
+    Slicing returns a new ``ArrayAlignment`` that shares its data with the
+    original alignment, without copying:
+
+    >>> sub_alignment = alignment[1:, 2:]
+    >>> sub_alignment.data.tolist()
+    [[71, 71, 84, 65], [71, 71, 67, 65]]
+    >>> np.shares_memory(sub_alignment.data, alignment.data)
+    True
+
+    Column statistics are calculated with NumPy for all columns at once:
+
+    >>> alignment.consensus()
+    Seq('ACGGTA')
+    >>> alignment.gap_fraction.round(3).tolist()
+    [0.0, 0.333, 0.0, 0.333, 0.0, 0.0]
+    >>> alignment.conservation.round(3).tolist()
+    [1.0, 0.667, 1.0, 0.667, 0.667, 1.0]
+
+    Use ``from_alignment`` and ``to_alignment`` to convert between an
+    ``ArrayAlignment`` and an ``Alignment``.
+    """
+
+    _gap = ord("-")
+
+    def __init__(self, data, records=None, weights=None):
+        """Initialize a new ArrayAlignment object.
+
+        Arguments:
+         - data    - A two-dimensional NumPy array of ``uint8`` character
+                     codes, which is stored without making a copy, or of
+                     ``S1`` characters; or a list of aligned sequences (str,
+                     bytes, Seq, or SeqRecord objects) of equal length,
+                     with gaps shown by a dash ("-") character.
+         - records - A list with the metadata of each sequence as a
+                     SeqRecord object, of which the sequence is ignored,
+                     or None. If None (the default value), the metadata are
+                     taken from the SeqRecord objects in data, if any.
+         - weights - The weight of each sequence, used when calculating the
+                     column statistics. If None (the default value), the
+                     weights are taken from the "weight" annotation of the
+                     records, if present; otherwise, all sequences have
+                     weight 1.
+
+        """
+        if isinstance(data, np.ndarray):
+            if data.dtype == "S1":
+                data = data.view(np.uint8)
+            elif data.dtype != np.uint8:
+                raise ValueError("data must be an array of uint8 character codes")
+            if data.ndim != 2:
+                raise ValueError("data must be a two-dimensional array")
+        else:
+            sequences = list(data)
+            if records is None:
+                records = [self._get_metadata(sequence) for sequence in sequences]
+            rows = []
+            for sequence in sequences:
+                if isinstance(sequence, SeqRecord):
+                    sequence = sequence.seq
+                if isinstance(sequence, str):
+                    sequence = sequence.encode("latin-1")
+                rows.append(bytes(sequence))
+            lengths = {len(row) for row in rows}
+            if len(lengths) > 1:
+                raise ValueError("aligned sequences must have the same length")
+            length = lengths.pop() if lengths else 0
+            data = np.frombuffer(b"".join(rows), np.uint8)
+            data = data.reshape(len(rows), length).copy()
+        if records is None:
+            records = [None] * len(data)
+        elif len(records) != len(data):
+            raise ValueError("number of records must equal the number of rows")
+        if weights is None:
+            weights = [
+                1.0 if record is None else record.annotations.get("weight", 1.0)
+                for record in records
+            ]
+            if all(weight == 1.0 for weight in weights):
+                weights = None
+        self.data = data
+        self.records = list(records)
+        self.weights = weights
+
+    @property
+    def weights(self):
+        """Weight of each sequence as a NumPy array, or None if unweighted."""
+        return self._weights
+
+    @weights.setter
+    def weights(self, value):
+        if value is not None:
+            value = np.array(value, float)
+            if value.shape != (len(self.data),):
+                raise ValueError("number of weights must equal the number of rows")
+        self._weights = value
+
+    @staticmethod
+    def _get_metadata(sequence):
+        """Return a SeqRecord without a sequence with the metadata (PRIVATE)."""
+        if not isinstance(sequence, SeqRecord):
+            return None
+        return SeqRecord(
+            None,
+            id=sequence.id,
+            name=sequence.name,
+            description=sequence.description,
+            dbxrefs=sequence.dbxrefs[:],
+            annotations=sequence.annotations.copy(),
+        )
+
+    @classmethod
+    def from_alignment(cls, alignment):
+        """Create an ArrayAlignment from an Alignment object.
+
+        Sequences aligned to the reverse strand are stored reverse-complemented.
+        The sequences must be fully defined.
+        """
+        data = np.array(alignment).view(np.uint8)
+        records = [cls._get_metadata(sequence) for sequence in alignment.sequences]
+        return cls(data, records)
+
+    def to_alignment(self):
+        """Return an Alignment object with the same sequences and metadata.
+
+        >>> from Bio.Align import ArrayAlignment
+        >>> alignment = ArrayAlignment(["ACG-TA", "ACGGTA", "A-GGCA"])
+        >>> print(alignment.to_alignment())
+                          0 ACG-TA 5
+                          0 ACGGTA 6
+                          0 A-GGCA 5
+        <BLANKLINE>
+        """
+        data = self.data
+        n, m = data.shape
+        letters = data != self._gap
+        if m == 0:
+            coordinates = np.zeros((n, 1), np.intp)
+        else:
+            changes = (letters[:, 1:] != letters[:, :-1]).any(0)
+            breaks = np.concatenate(([0], np.flatnonzero(changes) + 1))
+            # the gap pattern is constant from each break to the next one
+            widths = np.diff(breaks, append=m)
+            steps = letters[:, breaks] * widths
+            coordinates = np.zeros((n, len(breaks) + 1), np.intp)
+            np.cumsum(steps, axis=1, out=coordinates[:, 1:])
+        sequences = []
+        for row, mask, record in zip(data, letters, self.records):
+            seq = Seq(row[mask].tobytes())
+            if record is None:
+                sequences.append(seq)
+                continue
+            sequences.append(
+                SeqRecord(
+                    seq,
+                    id=record.id,
+                    name=record.name,
+                    description=record.description,
+                    dbxrefs=record.dbxrefs[:],
+                    annotations=record.annotations.copy(),
+                )
+            )
+        return Alignment(sequences, coordinates)
+
+    def __array__(self, dtype=None, copy=None):
+        data = self.data.view("S1")
+        if dtype is not None:
+            return np.array(data, dtype)
+        if copy:
+            return data.copy()
+        return data
+
+    def __repr__(self):
+        """Return a representation of the alignment, including its shape."""
+        n, m = self.data.shape
+        return "<%s object (%i rows x %i columns) at 0x%x>" % (
+            self.__class__.__name__,
+            n,
+            m,
+            id(self),
+        )
+
+    def __len__(self):
+        """Return the number of sequences in the alignment."""
+        return len(self.data)
+
+    @property
+    def length(self):
+        """Return the alignment length, i.e. the number of columns."""
+        return self.data.shape[1]
+
+    @property
+    def shape(self):
+        """Return the shape of the alignment as a tuple of two integer values."""
+        return self.data.shape
+
+    def __getitem__(self, key):
+        """Return a row, column, or letter as a string, or a sub-alignment.
+
+        Indexing a single row and/or a single column returns a string.
+        Any other index returns a new ArrayAlignment object; basic slices
+        return a view of the data array without copying, while index arrays
+        follow the NumPy rules for advanced indexing.
+        """
+        if isinstance(key, tuple):
+            try:
+                row, col = key
+            except ValueError:
+                raise IndexError(
+                    "only tuples of length 2 can be alignment indices"
+                ) from None
+        else:
+            row, col = key, slice(None)
+        data = self.data[row, col]
+        if data.ndim < 2:
+            return data.tobytes().decode("latin-1")
+        if isinstance(row, slice):
+            records = self.records[row]
+        else:
+            indices = np.arange(len(self.records))[row]
+            records = [self.records[index] for index in indices]
+        alignment = ArrayAlignment(data, records)
+        if self._weights is None:
+            alignment.weights = None
+        else:
+            alignment.weights = self._weights[row]
+        return alignment
+
+    def reverse_complement(self):
+        """Reverse-complement the alignment and return it.
+
+        The columns are stored in reverse order, and each letter is replaced
+        by its complement; the records and weights of the sequences are kept.
+
+        >>> from Bio.Align import ArrayAlignment
+        >>> alignment = ArrayAlignment(["ACG-TA", "ACGGTA", "A-GGCA"])
+        >>> rc_alignment = alignment.reverse_complement()
+        >>> rc_alignment[0]
+        'TA-CGT'
+        >>> rc_alignment[:, 1]
+        'AAG'
+        """
+        complement = np.frombuffer(_dna_complement_table, np.uint8)
+        alignment = ArrayAlignment(complement[self.data[:, ::-1]], self.records)
+        alignment.weights = self._weights
+        return alignment
+
+    def _column_counts(self):
+        """Return the weighted number of each character code in each column (PRIVATE)."""
+        return _column_counts(self.data, self._weights)
+
+    def sequence_weights(self):
+        """Calculate position-based sequence weights (Henikoff and Henikoff, 1994).
+
+        In each column, a sequence receives a weight 1 / (r * s), where r is
+        the number of different letters in the column, and s is the number of
+        sequences with the same letter as this sequence. Gaps are treated as a
+        separate letter. The weights are summed over all columns, and scaled
+        such that they add up to the number of sequences, so that redundant
+        sequences are down-weighted. Assign the returned array to the
+        ``weights`` attribute to use them for the column statistics:
+
+        >>> from Bio.Align import ArrayAlignment
+        >>> alignment = ArrayAlignment(["ACGT", "ACGT", "ACGA", "TGCA"])
+        >>> weights = alignment.sequence_weights()
+        >>> weights.round(3).tolist()
+        [0.75, 0.75, 0.75, 1.75]
+        >>> alignment.weights = weights
+        >>> alignment.frequencies["T"].round(3).tolist()
+        [1.75, 0.0, 0.0, 1.5]
+
+        For Henikoff weighting see:
+        Steven Henikoff, Jorja G. Henikoff: "Position-based sequence weights."
+        Journal of Molecular Biology 243(4): 574-578 (1994).
+        https://doi.org/10.1016/0022-2836(94)90032-9
+        """
+        return _henikoff_weights(self.data)
+
+    @property
+    def frequencies(self):
+        """Return the frequency of each letter in each column of the alignment.
+
+        Gaps are represented by a dash ("-") character.  The frequencies are
+        weighted by the "weight" annotation of each sequence, if present.
+
+        >>> from Bio.Align import ArrayAlignment
+        >>> alignment = ArrayAlignment(["ACG-TA", "ACGGTA", "A-GGCA"])
+        >>> for letter, values in alignment.frequencies.items():
+        ...     print(letter, values.tolist())
+        ...
+        - [0.0, 1.0, 0.0, 1.0, 0.0, 0.0]
+        A [3.0, 0.0, 0.0, 0.0, 0.0, 3.0]
+        C [0.0, 2.0, 0.0, 0.0, 1.0, 0.0]
+        G [0.0, 0.0, 3.0, 2.0, 0.0, 0.0]
+        T [0.0, 0.0, 0.0, 0.0, 2.0, 0.0]
+        """
+        counts = self._column_counts()
+        codes = np.flatnonzero(counts.any(1))
+        return {chr(code): counts[code] for code in codes}
+
+    @property
+    def gap_fraction(self):
+        """Return the fraction of gaps in each column of the alignment."""
+        counts = self._column_counts()
+        return counts[self._gap] / counts.sum(0)
+
+    def _most_common(self):
+        """Return the most common letter in each column, and its count (PRIVATE)."""
+        counts = self._column_counts()
+        totals = counts.sum(0)
+        counts[self._gap] = 0
+        letters = counts.argmax(0)
+        best = counts[letters, np.arange(counts.shape[1])]
+        return letters, best, counts.sum(0), totals
+
+    def consensus(self, threshold=0.0, ambiguous="X"):
+        """Return the consensus sequence of the alignment as a Seq object.
+
+        The consensus letter of each column is the most common letter in the
+        column, ignoring gaps. If the fraction of non-gap letters in the column
+        that are equal to the consensus letter is less than threshold, then
+        the ambiguous character is used instead. Columns consisting of gaps
+        only are shown as a gap in the consensus sequence.
+
+        >>> from Bio.Align import ArrayAlignment
+        >>> alignment = ArrayAlignment(["ACG-TA", "ACGGTA", "A-GGCA"])
+        >>> alignment.consensus()
+        Seq('ACGGTA')
+        >>> alignment.consensus(threshold=0.7, ambiguous="N")
+        Seq('ACGGNA')
+        """
+        letters, best, letter_totals, _ = self._most_common()
+        letters = letters.astype(np.uint8)
+        letters[best < threshold * letter_totals] = ord(ambiguous)
+        letters[letter_totals == 0] = self._gap
+        return Seq(letters.tobytes())
+
+    @property
+    def conservation(self):
+        """Return the fraction of sequences with the consensus letter in each column.
+
+        Gaps are included in the number of sequences, so that columns with many
+        gaps have a low conservation.
+        """
+        _, best, _, totals = self._most_common()
+        return best / totals
+
+
+def _parse_scoring(scoring):
+    """Return the argument and substitution matrix for counting (PRIVATE)."""
+    if scoring is None:
+        return None, None
+    if isinstance(scoring, PairwiseAligner):
+        return scoring, scoring.substitution_matrix
+    if isinstance(scoring, str):
+        return scoring, None
+    if isinstance(scoring, (np.ndarray, substitution_matrices.Array)):
+        return scoring, scoring
+    raise ValueError(f"unexpected argument {scoring!r}")
+
+
+class AlignmentCounter:
+    """Collect the counts of many alignments in NumPy arrays.
+
+    Calling ``alignment.counts()`` for each alignment creates an
+    ``AlignmentCounts`` object for each of them. For a large number of
+    alignments, for example read alignments parsed from a SAM file, it is
+    faster to use an ``AlignmentCounter``, which collects the counts of many
+    alignments in columns of NumPy arrays:
+
+    >>> from Bio.Align import Alignment, AlignmentCounter, PairwiseAligner
+    >>> aligner = PairwiseAligner(match_score=2, mismatch_score=-1, gap_score=-3)
+    >>> alignments = [
+    ...     aligner.align("ACGTTGCA", "ACGTGCA")[0],
+    ...     aligner.align("ACGTTGCA", "ACGATGCA")[0],
+    ...     aligner.align("ACGTTGCA", "CGTTGC")[0],
+    ... ]
+    >>> counter = AlignmentCounter(aligner, substitutions=True)
+    >>> counter.update(alignments)
+    >>> len(counter)
+    3
+    >>> table = counter.table
+    >>> table["identities"]
+    array([7, 7, 6])
+    >>> table["mismatches"]
+    array([0, 1, 0])
+    >>> table["score"]
+    array([11., 13.,  6.])
+
+    The argument to ``AlignmentCounter`` has the same meaning as the argument
+    to the ``counts`` method of an ``Alignment``. The ``update`` method
+    accepts any iterable of alignments, including the alignment iterators
+    returned by ``Bio.Align.parse``, and can be called repeatedly. The
+    alignments are processed in batches of ``chunksize`` alignments, with
+    the counts of each batch calculated in a single call to the C code; no
+    ``AlignmentCounts`` objects are created.
+
+    The ``table`` property returns a dictionary of NumPy arrays with one
+    element per alignment. It contains the number of aligned letters,
+    identities, and mismatches; the number of positives (if a substitution
+    matrix is available); the number of gap openings and extensions on the
+    left side, the interior, and the right side of the alignment for
+    insertions and deletions separately; and the gap score, substitution
+    score, and alignment score (if they can be calculated). The dictionary
+    can be passed directly to ``pandas.DataFrame``.
+
+    If ``substitutions`` is True, the number of substitutions of each pair of
+    letters is summed over all alignments, and is available as the
+    ``substitutions`` property, in the same format as the ``substitutions``
+    property of an ``Alignment``:
+
+    >>> print(counter.substitutions)
+        A   C   G   T
+    A 4.0 0.0 0.0 0.0
+    C 0.0 6.0 0.0 0.0
+    G 0.0 0.0 6.0 0.0
+    T 1.0 0.0 0.0 4.0
+    <BLANKLINE>
+
+    Substitutions can only be counted for letters with a code below 256.
+    """
+
+    _fields = (
+        "aligned",
+        "identities",
+        "mismatches",
+        "positives",
+        "open_left_insertions",
+        "extend_left_insertions",
+        "open_left_deletions",
+        "extend_left_deletions",
+        "open_internal_insertions",
+        "extend_internal_insertions",
+        "open_internal_deletions",
+        "extend_internal_deletions",
+        "open_right_insertions",
+        "extend_right_insertions",
+        "open_right_deletions",
+        "extend_right_deletions",
+    )
+
+    def __init__(self, scoring=None, substitutions=False, chunksize=4096):
+        """Initialize the counter.
+
+        Arguments:
+         - scoring       - None (default), a substitution matrix, a wildcard
+                           character, or a pairwise aligner object, as for
+                           the ``counts`` method of an ``Alignment``.
+         - substitutions - If True, sum the substitution counts over all
+                           alignments (default: False).
+         - chunksize     - Number of alignments passed to the C code in a
+                           single call (default: 4096).
+
+        """
+        argument, substitution_matrix = _parse_scoring(scoring)
+        if chunksize < 1:
+            raise ValueError("chunksize must be positive")
+        self._argument = argument
+        self._substitution_matrix = substitution_matrix
+        self._chunksize = chunksize
+        self._length = 0
+        self._counts = np.zeros((0, len(self._fields)), np.intp)
+        self._scores = np.zeros((0, 2))
+        if substitutions:
+            self._substitutions = np.zeros((256, 256), np.intp)
+        else:
+            self._substitutions = None
+
+    def __len__(self):
+        """Return the number of alignments counted so far."""
+        return self._length
+
+    def update(self, alignments):
+        """Add the counts of the alignments to the counter.
+
+        The alignments are counted in chunks of ``chunksize`` alignments. If
+        counting fails for an alignment, for example because it contains a
+        letter that is not in the substitution matrix, an exception is raised
+        and none of the alignments in its chunk are added to the counter; the
+        alignments in the preceding chunks remain counted.
+        """
+        alignments = iter(alignments)
+        while True:
+            records = self._prepare(list(islice(alignments, self._chunksize)))
+            if not records:
+                break
+            start = self._length
+            end = start + len(records)
+            capacity = len(self._counts)
+            if end > capacity:
+                capacity = max(end, 2 * capacity)
+                counts = np.zeros((capacity, len(self._fields)), np.intp)
+                counts[:start] = self._counts[:start]
+                self._counts = counts
+                scores = np.zeros((capacity, 2))
+                scores[:start] = self._scores[:start]
+                self._scores = scores
+            if self._substitutions is None:
+                substitutions = None
+            else:
+                # count into a separate array, so that the totals are not
+                # changed if an exception is raised halfway through the chunk
+                substitutions = np.zeros_like(self._substitutions)
+            _alignmentcounts.calculate(
+                records,
+                self._argument,
+                self._counts[start:end],
+                self._scores[start:end],
+                substitutions,
+            )
+            if substitutions is not None:
+                self._substitutions += substitutions
+            self._length = end
+
+    def _prepare(self, alignments):
+        """Return the sequences, coordinates, and strands of the alignments (PRIVATE).
+
+        This returns the same as calling _prepare_counts for each alignment,
+        but the strands and coordinates of alignments with the same number of
+        sequences are calculated together, and the contents of each sequence
+        object are converted (and reverse-complemented) only once, as many
+        alignments typically share the same target sequence.
+        """
+        substitution_matrix = self._substitution_matrix
+        letters = self._substitutions is not None
+        records = [None] * len(alignments)
+        groups = {}
+        for index, alignment in enumerate(alignments):
+            if alignment.coordinates.shape[1] == 0:
+                records[index] = alignment._prepare_counts(substitution_matrix, letters)
+            else:
+                groups.setdefault(len(alignment.sequences), []).append(index)
+        # Sequence contents and lengths, by id of the sequence object and strand
+        contents = {}
+        for n, indices in groups.items():
+            sizes = np.array(
+                [alignments[index].coordinates.shape[1] for index in indices]
+            )
+            coordinates = np.concatenate(
+                [alignments[index].coordinates for index in indices], axis=1
+            ).astype(np.intp)
+            ends = np.cumsum(sizes)
+            starts = ends - sizes
+            steps = np.sign(np.diff(coordinates, axis=1))
+            # True for steps in which at least two sequences align, False if
+            # a gap or if the step is between two alignments
+            aligned_flags = (steps != 0).sum(0) > 1
+            aligned_flags[ends[:-1] - 1] = False
+            signs = np.zeros(coordinates.shape, np.intp)
+            signs[:, :-1] = steps * aligned_flags
+            # True for sequences with more negative than positive aligned steps
+            reverse = np.ascontiguousarray(np.add.reduceat(signs, starts, axis=1).T < 0)
+            lengths = []
+            sequences = []
+            for index, strands in zip(indices, reverse.tolist()):
+                row = []
+                row_lengths = []
+                for sequence, strand in zip(alignments[index].sequences, strands):
+                    sequence = getattr(sequence, "seq", sequence)  # SeqRecord
+                    key = (id(sequence), strand)
+                    item = contents.get(key)
+                    if item is None:
+                        original = sequence
+                        if strand:
+                            data = getattr(sequence, "_data", None)
+                            if isinstance(data, (bytes, bytearray)):
+                                # same as reverse_complement, without
+                                # creating a new Seq object
+                                data = data.translate(_dna_complement_table)
+                                sequence = data[::-1]
+                            else:
+                                sequence = reverse_complement(sequence)
+                        try:
+                            data = Alignment._counts_data(sequence)
+                        except TypeError:
+                            row = None
+                            break
+                        # keep a reference to the sequence object, as its id
+                        # may otherwise be reused
+                        item = contents[key] = (original, data, len(original))
+                    row.append(item[1])
+                    row_lengths.append(item[2])
+                else:
+                    lengths.append(row_lengths)
+                if row is None:
+                    lengths.append([0] * n)
+                sequences.append(row)
+            lengths = np.array(lengths, np.intp)
+            flipped = np.repeat(reverse.T, sizes, axis=1)
+            coordinates[flipped] = (
+                np.repeat(lengths.T, sizes, axis=1)[flipped] - coordinates[flipped]
+            )
+            for index, row, start, end, strands in zip(
+                indices, sequences, starts.tolist(), ends.tolist(), reverse
+            ):
+                if row is None:
+                    # sequence contents of an unusual type
+                    records[index] = alignments[index]._prepare_counts(
+                        substitution_matrix, letters
+                    )
+                else:
+                    records[index] = (row, coordinates[:, start:end], strands)
+        return records
+
+    @property
+    def table(self):
+        """Return a dictionary of NumPy arrays with the counts of each alignment."""
+        n = self._length
+        counts = self._counts[:n]
+        scores = self._scores[:n]
+        table = {}
+        for i, field in enumerate(self._fields):
+            if field == "positives" and self._substitution_matrix is None:
+                continue
+            table[field] = counts[:, i].copy()
+        if isinstance(self._argument, PairwiseAligner):
+            table["gap_score"] = scores[:, 0].copy()
+            table["substitution_score"] = scores[:, 1].copy()
+            table["score"] = scores[:, 0] + scores[:, 1]
+        elif self._substitution_matrix is not None:
+            table["substitution_score"] = scores[:, 1].copy()
+        return table
+
+    @property
+    def substitutions(self):
+        """Return an Array with the number of substitutions summed over all alignments."""
+        if self._substitutions is None:
+            raise AttributeError(
+                "substitutions were not counted; use substitutions=True"
+            )
+        counts = self._substitutions
+        indices = np.flatnonzero(counts.any(0) | counts.any(1))
+        letters = "".join(chr(index) for index in indices)
+        m = substitution_matrices.Array(letters, dims=2)
+        m[:, :] = counts[np.ix_(indices, indices)]
+        return m
+
+
 class AlignmentsAbstractBaseClass(ABC):
     """Abstract base class for sequence alignments.
 
@@ -4155,6 +5007,34 @@ class PairwiseAlignments(AlignmentsAbstractBaseClass):
         self._index = -1
 
 
+class _PathList:
+    """Iterate over a list of paths returned by the C code (PRIVATE).
+
+    This provides the same interface to PairwiseAlignments as the path
+    generator returned by the C code for a full dynamic programming matrix.
+    """
+
+    def __init__(self, paths):
+        self._paths = paths
+        self._index = 0
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        index = self._index
+        if index == len(self._paths):
+            raise StopIteration
+        self._index = index + 1
+        return self._paths[index]
+
+    def reset(self):
+        self._index = 0
+
+
 class PairwiseAligner(_pairwisealigner.PairwiseAligner):
     """Performs pairwise sequence alignment using dynamic programming.
 
@@ -4181,6 +5061,25 @@ class PairwiseAligner(_pairwisealigner.PairwiseAligner):
     the mismatch score or any gap score or if any gap score is greater than the
     mismatch score.
 
+    For long and similar sequences, the dynamic programming matrix can be
+    restricted to a band of diagonals by setting the "band" attribute.  If
+    band is an integer, only cells within that many diagonals from the
+    diagonals through the start and end of the alignment are considered. If
+    band is "adaptive", the band is doubled until the score found is provably
+    optimal (for global alignments only).  Banded alignment is available for
+    the Needleman-Wunsch, Smith-Waterman, and Gotoh algorithms, and returns a
+    single optimal alignment only. Use None (the default) to search the full
+    dynamic programming matrix.
+
+    Storing the traceback matrix of two long sequences may need more memory
+    than is available.  If the "traceback" attribute is set to "linear"
+    instead of "full" (the default), the "align" method uses the
+    divide-and-conquer algorithm of Myers and Miller, which needs memory
+    proportional to the sum of the sequence lengths only, at the cost of
+    about twice the computation time.  This returns a single optimal
+    alignment, and is available for the Needleman-Wunsch, Smith-Waterman,
+    and Gotoh algorithms.
+
     Calling the "score" method on the aligner with two sequences as arguments
     will calculate the alignment score between the two sequences.
     Calling the "align" method on the aligner with two sequences as arguments
@@ -4499,6 +5398,9 @@ AlignmentCounts object returned by the .counts method of an Alignment object."""
             else:
                 sB = seqB  # C code will test the dtype
         score, paths = super().align(sA, sB, strand)
+        if isinstance(paths, list):
+            # banded or linear-memory alignment
+            paths = _PathList(paths)
         alignments = PairwiseAlignments(seqA, seqB, score, paths)
         return alignments
 
@@ -4552,6 +5454,126 @@ AlignmentCounts object returned by the .counts method of an Alignment object."""
                 )
         return super().score(seqA, seqB, strand)
 
+    def score_many(self, seqA, seqsB, strand="+", threads=None):
+        """Return the alignment scores of one sequence to many sequences.
+
+        Arguments:
+         - seqA    - the target sequence.
+         - seqsB   - an iterable of query sequences.
+         - strand  - the strand of the query sequences ('+' or '-').
+         - threads - the number of threads to use; if None (default), use
+                     the number of processors on the machine.
+
+        Returns a NumPy array with the score of each query sequence in seqsB,
+        as calculated by the score method. The scores are calculated in a
+        pool of threads; the dynamic programming code of the Needleman-Wunsch,
+        Smith-Waterman, and Gotoh algorithms runs without holding the global
+        interpreter lock, such that the threads run in parallel.
+        """
+        seqsB = list(seqsB)
+        scores = np.empty(len(seqsB))
+
+        def calculate(indices):
+            for i in indices:
+                scores[i] = self.score(seqA, seqsB[i], strand)
+
+        self._run_threads(calculate, len(seqsB), threads)
+        return scores
+
+    def score_all(self, seqsA, seqsB=None, strand="+", threads=None):
+        """Return the alignment scores of all pairs of sequences.
+
+        Arguments:
+         - seqsA   - an iterable of target sequences.
+         - seqsB   - an iterable of query sequences. If None (default), the
+                     sequences in seqsA are also used as the query sequences.
+         - strand  - the strand of the query sequences ('+' or '-').
+         - threads - the number of threads to use; if None (default), use
+                     the number of processors on the machine.
+
+        Returns a NumPy array of shape (len(seqsA), len(seqsB)) with the
+        score of each pair of sequences, calculated in a pool of threads as
+        for the score_many method. If seqsB is None and the scoring scheme is
+        symmetric, only one score is calculated for each pair of sequences.
+
+        >>> from Bio import Align
+        >>> aligner = Align.PairwiseAligner(mismatch_score=-1, gap_score=-1)
+        >>> print(aligner.score_all(["ACGT", "ACT", "CGT"], threads=2))
+        [[4. 2. 2.]
+         [2. 3. 0.]
+         [2. 0. 3.]]
+
+        """
+        seqsA = list(seqsA)
+        if seqsB is None:
+            seqsB = seqsA
+            symmetric = strand == "+" and self._is_symmetric()
+        else:
+            seqsB = list(seqsB)
+            symmetric = False
+        n = len(seqsB)
+        scores = np.empty((len(seqsA), n))
+
+        def calculate(rows):
+            for i in rows:
+                seqA = seqsA[i]
+                start = i if symmetric else 0
+                for j in range(start, n):
+                    scores[i, j] = self.score(seqA, seqsB[j], strand)
+
+        self._run_threads(calculate, len(seqsA), threads)
+        if symmetric:
+            lower = np.tril_indices(n, -1)
+            scores[lower] = scores.T[lower]
+        return scores
+
+    def _is_symmetric(self):
+        """Check if the score is symmetric in the two sequences (PRIVATE)."""
+        if self.algorithm.startswith("Waterman-Smith-Beyer"):
+            # gap score functions may depend on the sequence position; the
+            # open and extend gap scores are not defined in this case
+            return False
+        for region in ("internal", "left", "right"):
+            for kind in ("open", "extend"):
+                insertion_score = getattr(self, f"{kind}_{region}_insertion_score")
+                deletion_score = getattr(self, f"{kind}_{region}_deletion_score")
+                if insertion_score != deletion_score:
+                    return False
+        substitution_matrix = self.substitution_matrix
+        if substitution_matrix is None:
+            return True
+        substitution_matrix = np.asarray(substitution_matrix)
+        return bool((substitution_matrix == substitution_matrix.T).all())
+
+    @staticmethod
+    def _run_threads(function, n, threads):
+        """Call function on interleaved slices of range(n) in threads (PRIVATE)."""
+        if threads is None:
+            threads = os.cpu_count() or 1
+        elif threads < 1:
+            raise ValueError("threads must be positive")
+        threads = min(threads, n)
+        if threads <= 1:
+            function(range(n))
+            return
+        # Interleave the indices, as later rows in score_all are shorter.
+        with ThreadPoolExecutor(threads) as executor:
+            futures = [
+                executor.submit(function, range(i, n, threads)) for i in range(threads)
+            ]
+            for future in futures:
+                future.result()
+
+    def profile(self, query):
+        """Return a QueryProfile to score many targets against the query.
+
+        The query profile stores the substitution scores of each letter
+        against the query sequence, which can then be reused to calculate the
+        local alignment scores of a stream of target sequences against the
+        query. See the QueryProfile class for details.
+        """
+        return QueryProfile(self, query)
+
     def __getstate__(self):
         state = {
             "wildcard": self.wildcard,
@@ -4570,6 +5592,10 @@ AlignmentCounts object returned by the .counts method of an Alignment object."""
             "mode": self.mode,
             "epsilon": self.epsilon,
         }
+        if self.band is not None:
+            state["band"] = self.band
+        if self.traceback != "full":
+            state["traceback"] = self.traceback
         if self.substitution_matrix is None:
             state["match_score"] = self.match_score
             state["mismatch_score"] = self.mismatch_score
@@ -4593,6 +5619,8 @@ AlignmentCounts object returned by the .counts method of an Alignment object."""
         self.extend_right_deletion_score = state["extend_right_deletion_score"]
         self.mode = state["mode"]
         self.epsilon = state["epsilon"]
+        self.band = state.get("band")
+        self.traceback = state.get("traceback", "full")
         substitution_matrix = state.get("substitution_matrix")
         if substitution_matrix is None:
             self.match_score = state["match_score"]
@@ -4601,6 +5629,722 @@ AlignmentCounts object returned by the .counts method of an Alignment object."""
             self.substitution_matrix = substitution_matrix
 
 
+class QueryProfile(_pairwisealigner.QueryProfile):
+    """Calculates local alignment scores of many targets against one query.
+
+    A QueryProfile stores the substitution scores of each letter against the
+    query sequence, in the striped layout of Farrar (Bioinformatics 23: 156,
+    2007), such that the local alignment score of a target is calculated for
+    several query positions at once. This is typically several times faster
+    than calling the score method of the aligner, in particular for protein
+    database searches. The scores are identical to those calculated by the
+    aligner; the profile uses the scores that the aligner had at the time the
+    profile was created.
+
+    The aligner should be in local mode, and use the Smith-Waterman or Gotoh
+    algorithm. The striped algorithm is used if all scores are integers,
+    gap scores are not positive, and opening a gap does not score higher than
+    extending it; otherwise, the profile falls back to the scalar
+    Smith-Waterman recursion.
+
+    >>> from Bio import Align
+    >>> from Bio.Align import substitution_matrices
+    >>> aligner = Align.PairwiseAligner(mode="local")
+    >>> aligner.substitution_matrix = substitution_matrices.load("BLOSUM62")
+    >>> aligner.open_gap_score = -11
+    >>> aligner.extend_gap_score = -1
+    >>> profile = aligner.profile("HEAGAWGHEE")
+    >>> profile.score("PAWHEAE")
+    17.0
+    >>> targets = ["PAWHEAE", "MKTAYIAKQR", "HGAWGHEEDK"]
+    >>> for index, score, target_end, query_end in profile.search(targets, 20):
+    ...     print(index, score, target_end, query_end)
+    ...
+    2 45.0 8 10
+
+    The end coordinates allow the alignment to be calculated for the hits
+    only:
+
+    >>> alignments = aligner.align(targets[2][:8], "HEAGAWGHEE"[:10])
+    >>> print(alignments[0])
+    target            1 GAWGHEE  8
+                      0 |||||||  7
+    query             3 GAWGHEE 10
+    <BLANKLINE>
+    """
+
+    def __init__(self, aligner, query):
+        """Create a query profile for the query, using the aligner's scores.
+
+        Arguments:
+         - aligner - a PairwiseAligner object in local mode.
+         - query   - the query sequence.
+        """
+        self.query = query
+        self.codec = aligner.codec
+        substitution_matrix = aligner.substitution_matrix
+        if substitution_matrix is None:
+            # For sequences of arbitrary objects, use the query letters as
+            # the alphabet; any other letter cannot match the query, and is
+            # mapped to the index after the query letters.
+            alphabet = []
+            if not isinstance(query, (str, bytes, Seq, MutableSeq, SeqRecord)):
+                try:
+                    memoryview(query)
+                except TypeError:
+                    for item in query:
+                        if not any(item == letter for letter in alphabet):
+                            alphabet.append(item)
+            self._alphabet = alphabet
+            self._missing = len(alphabet)
+        else:
+            self._alphabet = substitution_matrix.alphabet
+            self._missing = None
+        super().__init__(aligner, self._as_indices(query))
+
+    def _as_indices(self, sequence):
+        """Convert the sequence to an array of integers for the C code (PRIVATE)."""
+        if isinstance(sequence, (bytes, Seq, MutableSeq, SeqRecord)):
+            sequence = bytes(sequence)
+            return np.frombuffer(sequence, dtype=np.uint8).astype(np.int32)
+        if isinstance(sequence, str):
+            return np.frombuffer(bytearray(sequence, self.codec), dtype=np.int32)
+        try:
+            memoryview(sequence)
+        except TypeError:
+            pass
+        else:
+            return sequence  # C code will check the dtype
+        alphabet = self._alphabet
+        indices = np.empty(len(sequence), np.int32)
+        for i, item in enumerate(sequence):
+            for j, letter in enumerate(alphabet):
+                if item == letter:
+                    indices[i] = j
+                    break
+            else:
+                if self._missing is None:
+                    raise ValueError(f"{item!r} is not in the alphabet")
+                indices[i] = self._missing
+        return indices
+
+    def locate(self, target):
+        """Return the local alignment score and the end of the alignment.
+
+        This method returns a tuple (score, target_end, query_end), where
+        score is the best local alignment score of the target against the
+        query, and target_end and query_end are the end coordinates of the
+        first best-scoring alignment in the target and in the query.
+        """
+        return super().locate(self._as_indices(target))
+
+    def score(self, target):
+        """Return the best local alignment score of the target against the query."""
+        return self.locate(target)[0]
+
+    def search(self, targets, threshold=None):
+        """Score each target sequence against the query.
+
+        Arguments:
+         - targets   - an iterable of target sequences.
+         - threshold - the minimum score of the targets to be reported, or
+                       None (default) to report all targets.
+
+        This method yields a tuple (index, score, target_end, query_end) for
+        each target with a score at least equal to the threshold, with index
+        the index of the target in targets, and score, target_end, and
+        query_end as returned by the locate method.
+        """
+        for index, target in enumerate(targets):
+            score, target_end, query_end = self.locate(target)
+            if threshold is None or score >= threshold:
+                yield index, score, target_end, query_end
+
+
+class SeedAligner:
+    """Finds local alignments of long sequences by seed-and-extend.
+
+    A full Smith-Waterman alignment of two long sequences, such as two
+    bacterial genomes, takes time proportional to the product of their
+    lengths. The SeedAligner instead follows the heuristic approach of BLAST:
+
+     1. The positions of all seeds (short words) in the target sequence are
+        stored in an index, and looked up for each seed in the query
+        sequence. A seed is either a contiguous word of a given length, or a
+        spaced seed such as "111010010100110111", where only the positions
+        marked "1" have to match (Ma et al., Bioinformatics 18: 440, 2002).
+     2. Each seed hit is extended along its diagonal without gaps, until the
+        score drops by more than xdrop below the best score seen so far.
+     3. Ungapped alignments with a score of at least ungapped_threshold are
+        extended with gaps in both directions by dynamic programming,
+        starting from their highest-scoring segment, using the X-drop algorithm
+        (Zhang et al., J. Comput. Biol. 5: 197, 1998): cells of the dynamic
+        programming matrix scoring more than gapped_xdrop below the best
+        score seen so far are pruned, and the extension stops once all
+        cells in a row are pruned.
+
+    The scores are taken from the PairwiseAligner object stored in the
+    aligner attribute, which should be in local mode and use the
+    Smith-Waterman or Gotoh algorithm; by default, an aligner with the BLASTN
+    nucleotide scores (match 2, mismatch -3, gap open -7, gap extension -2) is
+    used.
+
+    >>> from Bio import Align
+    >>> target = "GGCACTGAACTAGCATCGAGTCTTACGGATCAGCTAGCCTAGGACTTACGTTAGCAGT"
+    >>> query = "TTTTCAGCATCGAGTCTTACGGATCGCTAGCCTAGGACTTACGTTTTT"
+    >>> seed_aligner = Align.SeedAligner(seed=8, threshold=30)
+    >>> alignments = seed_aligner.align(target, query)
+    >>> len(alignments)
+    1
+    >>> alignment = alignments[0]
+    >>> alignment.score
+    73.0
+    >>> print(alignment)
+    target           11 AGCATCGAGTCTTACGGATCAGCTAGCCTAGGACTTACGTT 52
+                      0 ||||||||||||||||||||-|||||||||||||||||||| 41
+    query             5 AGCATCGAGTCTTACGGATC-GCTAGCCTAGGACTTACGTT 45
+    <BLANKLINE>
+
+    The alignments are standard Alignment objects, and can be written by
+    the alignment writers in Bio.Align, for example in the PSL or SAM format.
+    Use the chain method to combine co-linear alignments into chains.
+    """
+
+    def __init__(
+        self,
+        aligner=None,
+        seed=16,
+        xdrop=20,
+        gapped_xdrop=30,
+        ungapped_threshold=None,
+        threshold=0,
+        max_occurrences=None,
+    ):
+        """Initialize a new SeedAligner object.
+
+        Arguments:
+         - aligner            - a PairwiseAligner object in local mode
+                                providing the scores. If None (default), the
+                                BLASTN nucleotide scores are used.
+         - seed               - the length of a contiguous seed (default 16),
+                                or a spaced seed as a string of "1" (match
+                                required) and "0" (match not required).
+         - xdrop              - the drop in score that ends the ungapped
+                                extension of a seed hit (default 20).
+         - gapped_xdrop       - the drop in score that ends the gapped
+                                extension (default 30).
+         - ungapped_threshold - the minimum score of an ungapped alignment
+                                to be extended with gaps. If None (default),
+                                use threshold.
+         - threshold          - the minimum score of the alignments that are
+                                reported (default 0).
+         - max_occurrences    - seeds occurring more often than this in the
+                                target are ignored, which avoids extending
+                                the many hits in repetitive regions. If None
+                                (default), all seeds are used.
+        """
+        if aligner is None:
+            aligner = PairwiseAligner(
+                mode="local",
+                match_score=2,
+                mismatch_score=-3,
+                open_gap_score=-7,
+                extend_gap_score=-2,
+            )
+        elif aligner.mode != "local":
+            raise ValueError("the aligner should be in local mode")
+        self.aligner = aligner
+        self.seed = seed
+        self.xdrop = xdrop
+        self.gapped_xdrop = gapped_xdrop
+        self.ungapped_threshold = ungapped_threshold
+        self.threshold = threshold
+        self.max_occurrences = max_occurrences
+
+    @property
+    def seed(self):
+        """Seed pattern, as a string of "1" and "0"."""
+        return self._seed
+
+    @seed.setter
+    def seed(self, value):
+        if isinstance(value, numbers.Integral):
+            if value < 1:
+                raise ValueError("seed length must be positive")
+            value = "1" * value
+        elif not isinstance(value, str):
+            raise TypeError("seed should be an integer or a string")
+        if value.strip("01") or not value.startswith("1") or not value.endswith("1"):
+            raise ValueError(
+                "seed should consist of '1' and '0', and start and end with '1'"
+            )
+        self._seed = value
+
+    def align(self, target, query, strand="+"):
+        """Return the local alignments of the query to the target.
+
+        Arguments:
+         - target - the target sequence.
+         - query  - the query sequence.
+         - strand - the strand of the query sequence ('+' or '-'). For the
+                    '-' strand, the reverse complement of the query is
+                    aligned to the target.
+
+        Returns an Alignments object with the alignments scoring at least
+        threshold, sorted by decreasing score; the score of each alignment
+        is stored in its score attribute.
+        """
+        sA = self._as_bytes(target)
+        sB = self._as_bytes(query)
+        if strand == "-":
+            sB = bytes(reverse_complement(Seq(sB)))
+        elif strand != "+":
+            raise ValueError("strand must be '+' or '-'")
+        table = self._substitution_table(sA, sB)
+        tA = np.frombuffer(sA, np.uint8)
+        tB = np.frombuffer(sB, np.uint8)
+        hsps = self._ungapped(tA, tB, table)
+        nB = len(sB)
+        alignments = []
+        for score, coordinates in self._gapped(tA, tB, table, hsps):
+            if strand == "-":
+                coordinates[1, :] = nB - coordinates[1, :]
+            alignment = Alignment([target, query], coordinates)
+            alignment.score = score
+            alignments.append(alignment)
+        alignments.sort(key=lambda alignment: alignment.score, reverse=True)
+        return Alignments(alignments)
+
+    def chain(self, alignments, gap_score=None):
+        """Combine co-linear alignments into chains.
+
+        Arguments:
+         - alignments - an iterable of alignments of a query to a target, as
+                        returned by the align method.
+         - gap_score  - a function returning the score of the unaligned
+                        segments between two consecutive alignments in a
+                        chain, given the lengths of the segments in the
+                        target and in the query as NumPy arrays. If None
+                        (default), the internal gap scores of the aligner
+                        are used.
+
+        Each chain consists of alignments that appear in the same order in
+        the target and the query, without overlapping; alignments of the
+        query on different strands are chained separately. The score of a
+        chain is the sum of the scores of its alignments and of the gap
+        scores between them. The chain with the highest score is found
+        first; the remaining alignments are then chained again, until each
+        alignment belongs to a chain.
+
+        Returns an Alignments object with one Alignment for each chain with
+        a score of at least threshold, sorted by decreasing score.
+        """
+        if gap_score is None:
+            aligner = self.aligner
+            open_A = aligner.open_internal_insertion_score
+            extend_A = aligner.extend_internal_insertion_score
+            open_B = aligner.open_internal_deletion_score
+            extend_B = aligner.extend_internal_deletion_score
+
+            def gap_score(gaps_B, gaps_A):
+                scores = np.where(gaps_B > 0, open_B + extend_B * (gaps_B - 1), 0)
+                scores += np.where(gaps_A > 0, open_A + extend_A * (gaps_A - 1), 0)
+                return scores
+
+        strands = {}
+        for alignment in alignments:
+            coordinates = alignment.coordinates
+            strand = "-" if coordinates[1, 0] > coordinates[1, -1] else "+"
+            strands.setdefault(strand, []).append(alignment)
+        chains = []
+        for strand, members in strands.items():
+            members.sort(key=lambda alignment: alignment.coordinates[0, 0])
+            n = len(members)
+            starts = np.empty((2, n), int)
+            ends = np.empty((2, n), int)
+            for i, alignment in enumerate(members):
+                coordinates = alignment.coordinates
+                starts[:, i] = coordinates[:, 0]
+                ends[:, i] = coordinates[:, -1]
+            if strand == "-":
+                starts[1, :], ends[1, :] = -starts[1, :], -ends[1, :]
+            scores = np.array([alignment.score for alignment in members], float)
+            remaining = np.ones(n, bool)
+            while remaining.any():
+                best = np.full(n, -np.inf)
+                previous = np.full(n, -1)
+                for i in np.flatnonzero(remaining):
+                    best[i] = scores[i]
+                    candidates = (
+                        remaining[:i]
+                        & (ends[0, :i] <= starts[0, i])
+                        & (ends[1, :i] <= starts[1, i])
+                    )
+                    indices = np.flatnonzero(candidates)
+                    if len(indices) == 0:
+                        continue
+                    gaps_B = starts[0, i] - ends[0, indices]
+                    gaps_A = starts[1, i] - ends[1, indices]
+                    totals = best[indices] + scores[i] + gap_score(gaps_B, gaps_A)
+                    k = np.argmax(totals)
+                    if totals[k] > best[i]:
+                        best[i] = totals[k]
+                        previous[i] = indices[k]
+                i = np.argmax(best)
+                score = best[i]
+                path = []
+                while i >= 0:
+                    path.append(members[i])
+                    remaining[i] = False
+                    i = previous[i]
+                if score < self.threshold:
+                    continue
+                path.reverse()
+                coordinates = [path[0].coordinates]
+                for alignment in path[1:]:
+                    end = coordinates[-1][:, -1]
+                    start = alignment.coordinates[:, 0]
+                    if end[0] == start[0] and end[1] == start[1]:
+                        coordinates.append(alignment.coordinates[:, 1:])
+                        continue
+                    if end[0] < start[0] and end[1] != start[1]:
+                        # unaligned segments in both sequences
+                        coordinates.append([[start[0]], [end[1]]])
+                    coordinates.append(alignment.coordinates)
+                coordinates = np.concatenate(coordinates, axis=1)
+                alignment = Alignment(path[0].sequences, coordinates)
+                alignment.score = score
+                chains.append(alignment)
+        chains.sort(key=lambda alignment: alignment.score, reverse=True)
+        return Alignments(chains)
+
+    @staticmethod
+    def _as_bytes(sequence):
+        """Return the sequence contents as a bytes object (PRIVATE)."""
+        if isinstance(sequence, str):
+            return sequence.encode("ASCII")
+        return bytes(sequence)
+
+    def _substitution_table(self, sA, sB):
+        """Return the substitution scores as a 256 x 256 array (PRIVATE)."""
+        present = np.zeros(256, bool)
+        present[np.frombuffer(sA, np.uint8)] = True
+        present[np.frombuffer(sB, np.uint8)] = True
+        letters = np.flatnonzero(present)
+        aligner = self.aligner
+        table = np.zeros((256, 256))
+        substitution_matrix = aligner.substitution_matrix
+        if substitution_matrix is None:
+            table[np.ix_(letters, letters)] = aligner.mismatch_score
+            table[letters, letters] = aligner.match_score
+            wildcard = aligner.wildcard
+            if wildcard is not None:
+                table[ord(wildcard), :] = 0
+                table[:, ord(wildcard)] = 0
+        else:
+            alphabet = substitution_matrix.alphabet
+            try:
+                indices = [alphabet.index(chr(letter)) for letter in letters]
+            except ValueError:
+                raise ValueError(
+                    "sequence contains letters not in the alphabet of the "
+                    "substitution matrix"
+                ) from None
+            matrix = np.asarray(substitution_matrix)
+            table[np.ix_(letters, letters)] = matrix[np.ix_(indices, indices)]
+        return table
+
+    def _seeds(self, s, codes, base):
+        """Return the seed keys of a sequence and their positions (PRIVATE)."""
+        pattern = self._seed
+        offsets = [i for i, c in enumerate(pattern) if c == "1"]
+        n = len(s) - len(pattern) + 1
+        if n <= 0:
+            return np.empty(0, np.int64), np.empty(0, np.intp)
+        keys = np.zeros(n, np.int64)
+        valid = np.ones(n, bool)
+        for offset in offsets:
+            letters = codes[s[offset : offset + n]]
+            valid &= letters >= 0
+            keys *= base
+            keys += letters
+        positions = np.flatnonzero(valid)
+        return keys[positions], positions
+
+    def _hits(self, tA, tB, table):
+        """Return the target and query positions of the seed hits (PRIVATE)."""
+        # Only letters scoring positive against themselves can be part of a
+        # seed; this excludes, for example, runs of the wildcard character.
+        letters = np.flatnonzero(np.diagonal(table) > 0)
+        base = max(len(letters), 1)
+        weight = self._seed.count("1")
+        if weight * np.log2(base) >= 63:
+            raise ValueError(
+                "seed has too many matching positions for the alphabet size"
+            )
+        codes = np.full(256, -1, np.int64)
+        codes[letters] = np.arange(len(letters))
+        keysA, positionsA = self._seeds(tA, codes, base)
+        keysB, positionsB = self._seeds(tB, codes, base)
+        order = np.argsort(keysA, kind="stable")
+        keysA = keysA[order]
+        positionsA = positionsA[order]
+        # searching sorted keys is faster, as the memory access is sequential
+        order = np.argsort(keysB)
+        keysB = keysB[order]
+        positionsB = positionsB[order]
+        left = np.searchsorted(keysA, keysB, "left")
+        right = np.searchsorted(keysA, keysB, "right")
+        counts = right - left
+        if self.max_occurrences is not None:
+            counts[counts > self.max_occurrences] = 0
+        indices = self._ranges(left, left + counts)
+        return positionsA[indices], np.repeat(positionsB, counts)
+
+    @staticmethod
+    def _ranges(starts, stops):
+        """Return the concatenated ranges from starts to stops (PRIVATE)."""
+        counts = stops - starts
+        ends = np.cumsum(counts)
+        total = ends[-1] if len(ends) else 0
+        return np.arange(total) + np.repeat(starts - ends + counts, counts)
+
+    def _extend(self, tA, tB, table, i, j, step):
+        """Extend ungapped alignments until the score drops by xdrop (PRIVATE).
+
+        The alignments are extended from target position i and query position
+        j in the direction given by step (1 or -1). Returns the best score of
+        the extension (at least 0) and its length.
+        """
+        xdrop = self.xdrop
+        n = len(i)
+        best = np.zeros(n)
+        lengths = np.zeros(n, np.intp)
+        current = np.zeros(n)
+        offset = 0
+        width = 32
+        active = np.arange(n)
+        if step < 0:
+            i = i - 1
+            j = j - 1
+        while len(active) > 0:
+            steps = offset + np.arange(width)
+            positionsA = i[active, None] + step * steps
+            positionsB = j[active, None] + step * steps
+            valid = (
+                (positionsA >= 0)
+                & (positionsA < len(tA))
+                & (positionsB >= 0)
+                & (positionsB < len(tB))
+            )
+            np.clip(positionsA, 0, len(tA) - 1, out=positionsA)
+            np.clip(positionsB, 0, len(tB) - 1, out=positionsB)
+            scores = table[tA[positionsA], tB[positionsB]]
+            scores = current[active, None] + np.cumsum(scores, axis=1)
+            maxima = np.maximum.accumulate(
+                np.maximum(scores, best[active, None]), axis=1
+            )
+            stop = ~valid | (maxima - scores > xdrop)
+            stopped = stop.any(axis=1)
+            stops = np.where(stopped, stop.argmax(axis=1), width)
+            scores[np.arange(width) >= stops[:, None]] = -np.inf
+            k = scores.argmax(axis=1)
+            maxima = scores[np.arange(len(active)), k]
+            improved = maxima > best[active]
+            best[active[improved]] = maxima[improved]
+            lengths[active[improved]] = offset + k[improved] + 1
+            current[active] = scores[:, -1]
+            active = active[~stopped]
+            offset += width
+            # limit the size of the arrays if many alignments remain active
+            width = max(min(2 * width, 4194304 // max(len(active), 1)), 32)
+        return best, lengths
+
+    def _ungapped(self, tA, tB, table):
+        """Return the ungapped alignments found by extending seed hits (PRIVATE).
+
+        Returns the scores, target start positions, query start positions,
+        and lengths of the ungapped alignments, sorted by decreasing score.
+        """
+        positionsA, positionsB = self._hits(tA, tB, table)
+        if len(positionsA) == 0:
+            return np.empty(0), positionsA, positionsB, positionsA
+        span = len(self._seed)
+        diagonals = positionsA - positionsB
+        order = np.lexsort((positionsA, diagonals))
+        positionsA = positionsA[order]
+        positionsB = positionsB[order]
+        diagonals = diagonals[order]
+        # merge overlapping hits on the same diagonal
+        first = np.ones(len(order), bool)
+        first[1:] = (diagonals[1:] != diagonals[:-1]) | (
+            positionsA[1:] > positionsA[:-1] + span
+        )
+        starts = np.flatnonzero(first)
+        last = np.append(starts[1:], len(order)) - 1
+        diagonals = diagonals[starts]
+        startsA = positionsA[starts]
+        startsB = positionsB[starts]
+        lengths = positionsA[last] + span - startsA
+        n = len(starts)
+        keys = (diagonals + len(tB)) * (len(tA) + 1) + startsA
+        # score the merged seed regions
+        runs = np.repeat(np.arange(n), lengths)
+        indicesA = self._ranges(startsA, startsA + lengths)
+        indicesB = self._ranges(startsB, startsB + lengths)
+        scores = np.bincount(runs, table[tA[indicesA], tB[indicesB]], minlength=n)
+        # Extend the first seed region on each diagonal in both directions,
+        # and skip the seed regions on the same diagonal that are covered by
+        # the extended alignment; repeat for the remaining seed regions.
+        pending = np.ones(n, bool)
+        extended = np.zeros(n, bool)
+        while pending.any():
+            indices = np.flatnonzero(pending)
+            first = np.ones(len(indices), bool)
+            first[1:] = diagonals[indices[1:]] != diagonals[indices[:-1]]
+            indices = indices[first]
+            for k in range(0, len(indices), 65536):
+                batch = indices[k : k + 65536]
+                iA = startsA[batch]
+                iB = startsB[batch]
+                length = lengths[batch]
+                right, extension = self._extend(
+                    tA, tB, table, iA + length, iB + length, 1
+                )
+                scores[batch] += right
+                lengths[batch] += extension
+                left, extension = self._extend(tA, tB, table, iA, iB, -1)
+                scores[batch] += left
+                startsA[batch] -= extension
+                startsB[batch] -= extension
+                lengths[batch] += extension
+            extended[indices] = True
+            ends = (diagonals[indices] + len(tB)) * (len(tA) + 1)
+            ends += startsA[indices] + lengths[indices]
+            pending[self._ranges(indices, np.searchsorted(keys, ends))] = False
+        order = np.flatnonzero(extended)
+        startsA = startsA[order]
+        startsB = startsB[order]
+        lengths = lengths[order]
+        scores = scores[order]
+        n = len(order)
+        # remove alignments contained in another alignment on the same diagonal
+        diagonals = startsA - startsB
+        order = np.lexsort((-lengths, startsA, diagonals))
+        diagonals = diagonals[order]
+        groups = np.cumsum(np.append(True, diagonals[1:] != diagonals[:-1]))
+        ends = groups * (len(tA) + 1) + startsA[order] + lengths[order]
+        contained = np.zeros(n, bool)
+        contained[1:] = ends[1:] <= np.maximum.accumulate(ends)[:-1]
+        order = order[~contained]
+        threshold = self.ungapped_threshold
+        if threshold is None:
+            threshold = self.threshold
+        order = order[scores[order] >= threshold]
+        order = order[np.argsort(-scores[order], kind="stable")]
+        return scores[order], startsA[order], startsB[order], lengths[order]
+
+    def _gapped(self, tA, tB, table, hsps):
+        """Extend ungapped alignments with gaps (PRIVATE).
+
+        Yields the score and coordinates of each gapped alignment with a
+        score of at least threshold.
+        """
+        aligner = self.aligner
+        xdrop = self.gapped_xdrop
+        tolerance = len(self._seed)
+        # The gapped alignments found so far are stored in a grid of cells
+        # of diagonal_size diagonals by position_size target positions; each
+        # alignment is stored in every cell that it overlaps, widened by the
+        # tolerance along the diagonal, so only the alignments in the cell of
+        # an ungapped alignment need to be checked.
+        diagonal_size = 64
+        position_size = 1024
+        cells = {}
+        seen = set()
+        for score, startA, startB, length in zip(*hsps):
+            # skip ungapped alignments already covered by a gapped alignment
+            middleA = startA + length // 2
+            middleB = startB + length // 2
+            cell = ((middleA - middleB) // diagonal_size, middleA // position_size)
+            for coordinates in cells.get(cell, ()):
+                if coordinates[0, 0] <= middleA < coordinates[0, -1]:
+                    middle = np.interp(middleA, coordinates[0], coordinates[1])
+                    if abs(middle - middleB) <= tolerance:
+                        break
+            else:
+                # As in BLAST, anchor the gapped alignment at the middle of the
+                # highest-scoring segment of 11 letters in the ungapped
+                # alignment; this segment likely lies on the optimal path.
+                width = min(length, 11)
+                scores = table[
+                    tA[startA : startA + length], tB[startB : startB + length]
+                ]
+                scores = np.cumsum(np.append(0, scores))
+                offset = np.argmax(scores[width:] - scores[:-width]) + width // 2
+                middleA = startA + offset
+                middleB = startB + offset
+                # Extend in both directions from the anchor; the extension is
+                # calculated on a window of the sequences, which is enlarged
+                # if the extension reaches its end.
+                score = 0
+                paths = []
+                for step in (1, -1):
+                    size = max(2 * length, 256)
+                    while True:
+                        if step == 1:
+                            windowA = tA[middleA : middleA + size]
+                            windowB = tB[middleB : middleB + size]
+                        else:
+                            windowA = tA[max(middleA - size, 0) : middleA][::-1]
+                            windowB = tB[max(middleB - size, 0) : middleB][::-1]
+                        if len(windowA) == 0 or len(windowB) == 0:
+                            extension, path = 0, ((0,), (0,))
+                            break
+                        # the copies are needed, as the C code may replace
+                        # the letters by their indices in the substitution
+                        # matrix in place
+                        extension, path, truncated = aligner._xdrop_extend(
+                            windowA.astype(np.int32), windowB.astype(np.int32), xdrop
+                        )
+                        if not truncated:
+                            break
+                        if len(windowA) < size and len(windowB) < size:
+                            break
+                        size *= 2
+                    path = np.array(path)
+                    score += extension
+                    paths.append(path * step)
+                if score <= 0:
+                    continue
+                right, left = paths
+                coordinates = np.concatenate([left[:, :0:-1], right], axis=1)
+                # remove the point joining the two extensions if the path
+                # continues in the same direction
+                steps = np.diff(coordinates, axis=1) > 0
+                changes = (steps[:, 1:] != steps[:, :-1]).any(axis=0)
+                coordinates = coordinates[:, np.concatenate([[True], changes, [True]])]
+                coordinates[0, :] += middleA
+                coordinates[1, :] += middleB
+                key = coordinates.tobytes()
+                if key in seen:
+                    continue
+                seen.add(key)
+                diagonals = coordinates[0] - coordinates[1]
+                diagonals = range(
+                    (diagonals.min() - tolerance) // diagonal_size,
+                    (diagonals.max() + tolerance) // diagonal_size + 1,
+                )
+                positions = range(
+                    coordinates[0, 0] // position_size,
+                    (coordinates[0, -1] - 1) // position_size + 1,
+                )
+                for cell in product(diagonals, positions):
+                    cells.setdefault(cell, []).append(coordinates)
+                if score >= self.threshold:
+                    yield score, coordinates.copy()
+
+
 class CodonAligner(_codonaligner.CodonAligner):
     """Aligns a nucleotide sequence to an amino acid sequence.
 
@@ -4811,6 +6555,7 @@ class CodonAligner(_codonaligner.CodonAligner):
 # fmt: off
 formats = (
     "a2m",        # A2M files created by align2model or hmmscore
+    "bam",        # Binary Alignment/Map (BAM) format
     "bed",        # BED (Browser Extensible Data) files
     "bigbed",     # bigBed format
     "bigmaf",     # MAF file saved as a bigBed file
@@ -4960,6 +6705,132 @@ def read(handle, fmt):
     return alignment
 
 
+def index(filename, fmt, key_function=None):
+    """Index an alignment file and return a dictionary-like object.
+
+    Arguments:
+     - filename     - Name of the file to be indexed, as a string.
+     - fmt          - String describing the file format (case-insensitive).
+     - key_function - Optional callback function which when given the
+                      identifier of an alignment should return a unique key
+                      for the dictionary.
+
+    Index returns a pseudo-dictionary object with Alignment objects as its
+    values and identifier strings as its keys. As only the file offset of each
+    alignment is kept in memory, an alignment can be retrieved from a large
+    file containing many alignments without parsing the file from the start.
+    The alignment is parsed when it is requested.
+
+    Supported formats and the identifiers used as keys are:
+
+     - stockholm - the identifier in the ``#=GF ID`` line of each alignment;
+     - maf       - the name of the reference (first) sequence in the alignment
+                   block, followed by its start and end position on the
+                   forward strand, e.g. ``mm9.chr10:3009319-3009481``;
+     - psl       - the name of the query, followed by the name of the target
+                   and the start and end position on the target, e.g.
+                   ``hg18_dna:chr13:54017130-54017186``;
+     - chain     - the chain ID.
+
+    For example,
+
+    >>> from Bio import Align
+    >>> alignments = Align.index("MAF/ucsc_mm9_chr10.maf", "maf")
+    >>> len(alignments)
+    48
+    >>> alignment = alignments["mm9.chr10:3014742-3014778"]
+    >>> print(alignment)
+    mm9.chr10   3014742 AAGTTCCCTCCATAATTCCTTCCTCCCACCCCCACA 3014778
+    calJac1.C      6283 AAATGTA-----TGATCTCCCCATCCTGCCCTG---    6311
+    otoGar1.s    175262 AGATTTC-----TGATGCCCTCACCCCCTCCGTGCA  175231
+    loxAfr1.s      9317 AGGCTTA-----TG----CCACCCCCCACCCCCACA    9290
+    <BLANKLINE>
+    >>> alignments.close()
+
+    If the file is BGZF compressed, this is detected automatically. Ordinary
+    GZIP files are not supported.
+
+    Use Bio.Align.index_db to store the index in an SQLite database, for
+    example if the file contains too many alignments to keep the index in
+    memory, or to index several files together.
+    """
+    from Bio.File import _IndexedSeqFileDict
+
+    from ._index import _FormatToRandomAccess  # Lazy import
+
+    fmt = fmt.lower()
+    try:
+        proxy_class = _FormatToRandomAccess[fmt]
+    except KeyError:
+        raise ValueError(f"Indexing is not supported for the {fmt} format") from None
+    repr = f"Align.index({filename!r}, {fmt!r}, key_function={key_function!r})"
+    try:
+        random_access_proxy = proxy_class(filename, fmt)
+    except TypeError:
+        raise TypeError(
+            "Need a string or path-like object for the filename (not a handle)"
+        ) from None
+    return _IndexedSeqFileDict(random_access_proxy, key_function, repr, "Alignment")
+
+
+def index_db(index_filename, filenames=None, fmt=None, key_function=None):
+    """Index several alignment files into an SQLite database.
+
+    Arguments:
+     - index_filename - The SQLite filename.
+     - filenames      - List of strings specifying the file(s) to be indexed,
+                        or when indexing a single file this can be given as a
+                        string (optional if reloading an existing index, but
+                        must match).
+     - fmt            - String describing the file format (optional if
+                        reloading an existing index, but must match).
+     - key_function   - Optional callback function which when given the
+                        identifier of an alignment should return a unique key
+                        for the dictionary.
+
+    This function is similar to Bio.Align.index, but stores the keys and file
+    offsets in an SQLite database instead of in memory. The database can be
+    reused in a later Python session without indexing the files again:
+
+    >>> from Bio import Align
+    >>> filenames = ["Stockholm/pfam1.seed.txt", "Stockholm/pfam2.seed.txt"]
+    >>> alignments = Align.index_db(":memory:", filenames, "stockholm")
+    >>> sorted(alignments)
+    ['120_Rick_ant', '7kD_DNA_binding']
+    >>> alignment = alignments["7kD_DNA_binding"]
+    >>> alignment.annotations["accession"]
+    'PF02294.20'
+    >>> alignments.close()
+
+    Note that ':memory:' rather than an index filename tells SQLite to hold
+    the index database in memory. This is useful for quick tests, but using
+    Bio.Align.index instead would use less memory.
+
+    BGZF compressed files are supported, and detected automatically. Ordinary
+    GZIP compressed files are not supported.
+    """
+    from Bio.File import _SQLiteManySeqFilesDict
+
+    from ._index import _FormatToRandomAccess  # Lazy import
+
+    if isinstance(filenames, (str, os.PathLike)):
+        filenames = [filenames]
+    if fmt is not None:
+        fmt = fmt.lower()
+    repr = f"Align.index_db({index_filename!r}, filenames={filenames!r}, {fmt!r}, key_function={key_function!r})"
+
+    def proxy_factory(fmt, filename=None):
+        """Given a filename returns proxy object, else boolean if format OK."""
+        if filename:
+            return _FormatToRandomAccess[fmt](filename, fmt)
+        else:
+            return fmt in _FormatToRandomAccess
+
+    return _SQLiteManySeqFilesDict(
+        index_filename, filenames, proxy_factory, fmt, key_function, repr
+    )
+
+
 if __name__ == "__main__":
     from Bio._utils import run_doctest
 
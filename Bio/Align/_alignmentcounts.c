@@ -23,6 +23,9 @@ static PyTypeObject* Array_Type = NULL;
 static PyTypeObject AlignmentCounts_Type;
 /* defined in this module */
 
+#define SUBSTITUTIONS_SIZE 256
+/* substitutions are counted for letters with a code between 0 and 255 */
+
 
 typedef struct {
     PyObject_HEAD
@@ -1140,21 +1143,46 @@ static inline Py_buffer* get_buffer(Py_buffer *sequence, int** i, char** b)
     return sequence;
 }
 
-static PyObject* 
-AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
+static inline bool
+add_substitutions(Py_ssize_t* substitutions,
+                  const int* iA, const char* bA,
+                  Py_ssize_t startA, Py_ssize_t endA,
+                  const int* iB, const char* bB,
+                  Py_ssize_t startB, Py_ssize_t endB)
+{
+    int cA, cB;
+    Py_ssize_t lA, lB;
+    if ((iA == NULL && bA == NULL) || (iB == NULL && bB == NULL)) return true;
+    for (lA = startA, lB = startB; lA < endA && lB < endB; lA++, lB++) {
+        cA = iA ? iA[lA] : (unsigned char) bA[lA];
+        cB = iB ? iB[lB] : (unsigned char) bB[lB];
+        if (cA < 0 || cA >= SUBSTITUTIONS_SIZE
+         || cB < 0 || cB >= SUBSTITUTIONS_SIZE) {
+            PyErr_Format(PyExc_ValueError,
+                "unable to count substitutions of letters with code %d and %d",
+                cA, cB);
+            return false;
+        }
+        substitutions[cA * SUBSTITUTIONS_SIZE + cB]++;
+    }
+    return true;
+}
+
+static bool
+count_alignment(PyObject* sequences,
+                Py_buffer* coordinates,
+                Py_buffer* strands,
+                Aligner* aligner,
+                int wildcard,
+                Py_buffer* substitution_matrix,
+                Py_ssize_t* substitutions,
+                AlignmentCounts* counts)
 {
     Py_ssize_t jA, jB;
     Py_ssize_t n = 0;
     PyObject* sequence;
-    Aligner* aligner = NULL;
-    PyObject* sequences;
     Py_buffer* sequence_buffers = NULL;
-    Py_buffer coordinates = {0};
-    Py_buffer strands = {0};
-    AlignmentCounts* counts = NULL;
-    int wildcard = -1;
-    Py_buffer substitution_matrix = {0};
-    PyObject* argument = NULL;
+    bool success = false;
 
     Py_ssize_t k, lA, lB;
     int cA, cB;
@@ -1204,57 +1232,20 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
     PyObject* oA = NULL;
     PyObject* oB = NULL;
 
-    static char *kwlist[] = {"sequences", "coordinates", "strands", "argument", NULL};
-
-    if (!PyArg_ParseTupleAndKeywords(args, keywords, "O!O&O&|O", kwlist,
-                                     &PyList_Type, &sequences,
-                                     coordinates_converter, &coordinates,
-                                     strands_converter , &strands,
-                                     &argument))
-        return 0;
-
-    if (argument == NULL) {
-    }
-    else if (PyObject_TypeCheck(argument, Aligner_Type)) {
-        aligner = (Aligner*)argument;
-        if (aligner->substitution_matrix.obj) {
-            substitution_matrix = aligner->substitution_matrix;
-            Py_INCREF(substitution_matrix.obj);
-        }
-        wildcard = aligner->wildcard;
-    }
-    else if (PyUnicode_Check(argument)) {
-        if (PyUnicode_READY(argument) == -1) goto exit;
-        if (PyUnicode_GET_LENGTH(argument) != 1) {
-            PyErr_SetString(PyExc_ValueError,
-                            "wildcard should be a single character, or None");
-            goto exit;
-        }
-        wildcard = PyUnicode_READ_CHAR(argument, 0);
-    }
-    else {
-        if (!substitution_matrix_converter(argument,
-                                           &substitution_matrix)) {
-            if (!Aligner_Type) 
-                PyErr_SetString(PyExc_RuntimeError, "Aligner_Type is NULL");
-            goto exit;
-        }
-    }
-
-    n_columns = coordinates.shape[1];
-    row_stride = coordinates.strides[0] / sizeof(Py_ssize_t);
-    column_stride = coordinates.strides[1] / sizeof(Py_ssize_t);
-    buffer = coordinates.buf;
+    n_columns = coordinates->shape[1];
+    row_stride = coordinates->strides[0] / sizeof(Py_ssize_t);
+    column_stride = coordinates->strides[1] / sizeof(Py_ssize_t);
+    buffer = coordinates->buf;
 
-    if (substitution_matrix.obj) positives = 0;
+    if (substitution_matrix->obj) positives = 0;
 
     n = PyList_GET_SIZE(sequences);
-    if (n != coordinates.shape[0]) {
+    if (n != coordinates->shape[0]) {
         PyErr_SetString(PyExc_ValueError,
             "number of rows in coordinates must equal the number of sequences");
         goto exit;
     }
-    if (n != strands.shape[0]) {
+    if (n != strands->shape[0]) {
         PyErr_SetString(PyExc_ValueError,
             "size of strands must equal the number of sequences");
         goto exit;
@@ -1276,15 +1267,12 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
         deletion_score_function = aligner->deletion_score_function;
     }
 
-    counts = (AlignmentCounts*)PyType_GenericAlloc(&AlignmentCounts_Type, 0);
-    if (!counts) goto exit;
-
-    if (substitution_matrix.obj) {
-        m = substitution_matrix.shape[0];
-        if (PyObject_IsInstance(substitution_matrix.obj,
+    if (substitution_matrix->obj) {
+        m = substitution_matrix->shape[0];
+        if (PyObject_IsInstance(substitution_matrix->obj,
                                (PyObject*)Array_Type)) {
             PyTypeObject* basetype = Array_Type->tp_base;
-            Fields* fields = (Fields*)((intptr_t)substitution_matrix.obj + basetype->tp_basicsize);
+            Fields* fields = (Fields*)((intptr_t)substitution_matrix->obj + basetype->tp_basicsize);
             Py_buffer* mapping_buffer = &fields->mapping;
             mapping = mapping_buffer->buf;
             if (mapping) m = mapping_buffer->len / mapping_buffer->itemsize;
@@ -1294,11 +1282,11 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
     for (jA = 0; jA < n; jA++) {
         oA = NULL;
         sequenceA = get_buffer(&sequence_buffers[jA], &iA, &bA);
-        strandA = ((bool*)(strands.buf))[jA];
+        strandA = ((bool*)(strands->buf))[jA];
         for (jB = jA + 1; jB < n; jB++) {
             oB = NULL;
             sequenceB = get_buffer(&sequence_buffers[jB], &iB, &bB);
-            strandB = ((bool*)(strands.buf))[jB];
+            strandB = ((bool*)(strands->buf))[jB];
             leftA = buffer[jA * row_stride + 0];
             leftB = buffer[jB * row_stride + 0];
             rightA = buffer[jA * row_stride + (n_columns - 1) * column_stride];
@@ -1349,7 +1337,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                         oB = get_lazy_data(sequenceB->obj, startB, endB, jB, &bB);
                         if (!oB) goto error;
                     }
-                    if (substitution_matrix.obj == NULL) {
+                    if (substitution_matrix->obj == NULL) {
                         if (iA && iB) {
                             for (lA = startA, lB = startB;
                                  lA < endA && lB < endB;
@@ -1406,7 +1394,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                                 if (!check_indices(cB, jB, lB, m)) goto error;
                                 add_identities_mismatches_score(cA, cB,
                                     wildcard,
-                                    &substitution_matrix,
+                                    substitution_matrix,
                                     &identities,
                                     &mismatches,
                                     &positives,
@@ -1422,7 +1410,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                                 if (!check_indices(cB, jB, lB, m)) goto error;
                                 add_identities_mismatches_score(cA, cB,
                                     wildcard,
-                                    &substitution_matrix,
+                                    substitution_matrix,
                                     &identities,
                                     &mismatches,
                                     &positives,
@@ -1438,7 +1426,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                                 if (!check_indices(cB, jB, lB, m)) goto error;
                                 add_identities_mismatches_score(cA, cB,
                                     wildcard,
-                                    &substitution_matrix,
+                                    substitution_matrix,
                                     &identities,
                                     &mismatches,
                                     &positives,
@@ -1455,7 +1443,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                                 if (!check_indices(cB, jB, lB, m)) goto error;
                                 add_identities_mismatches_score(cA, cB,
                                     wildcard,
-                                    &substitution_matrix,
+                                    substitution_matrix,
                                     &identities,
                                     &mismatches,
                                     &positives,
@@ -1475,7 +1463,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                                 if (!map_indices(&cA, &cB, mapping)) goto error;
                                 add_identities_mismatches_score(cA, cB,
                                     wildcard,
-                                    &substitution_matrix,
+                                    substitution_matrix,
                                     &identities,
                                     &mismatches,
                                     &positives,
@@ -1492,7 +1480,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                                 if (!map_indices(&cA, &cB, mapping)) goto error;
                                 add_identities_mismatches_score(cA, cB,
                                     wildcard,
-                                    &substitution_matrix,
+                                    substitution_matrix,
                                     &identities,
                                     &mismatches,
                                     &positives,
@@ -1509,7 +1497,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                                 if (!map_indices(&cA, &cB, mapping)) goto error;
                                 add_identities_mismatches_score(cA, cB,
                                     wildcard,
-                                    &substitution_matrix,
+                                    substitution_matrix,
                                     &identities,
                                     &mismatches,
                                     &positives,
@@ -1527,7 +1515,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                                 if (!map_indices(&cA, &cB, mapping)) goto error;
                                 add_identities_mismatches_score(cA, cB,
                                     wildcard,
-                                    &substitution_matrix,
+                                    substitution_matrix,
                                     &identities,
                                     &mismatches,
                                     &positives,
@@ -1535,6 +1523,10 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
                             }
                         }
                     }
+                    if (substitutions
+                     && !add_substitutions(substitutions,
+                                           iA, bA, startA, endA,
+                                           iB, bB, startB, endB)) goto error;
                     reset_lazy_data(oA, &bA);
                     reset_lazy_data(oB, &bB);
                 }
@@ -1561,7 +1553,7 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
     counts->mismatches = mismatches;
     counts->positives = positives;
 
-    if (substitution_matrix.obj == NULL) {
+    if (substitution_matrix->obj == NULL) {
         if (aligner) {
             substitution_score = aligner->match * counts->identities
                                + aligner->mismatch * counts->mismatches;
@@ -1603,13 +1595,12 @@ AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
     else gap_score = Py_NAN;
     counts->gap_score = gap_score;
 
+    success = true;
     goto exit;
 
 error:
     Py_XDECREF(oA);
     Py_XDECREF(oB);
-    Py_DECREF(counts);
-    counts = NULL;
 
 exit:
     if (sequence_buffers) {
@@ -1617,6 +1608,81 @@ exit:
             if (sequence_buffers[k].buf) PyBuffer_Release(&sequence_buffers[k]);
         PyMem_Free(sequence_buffers);
     }
+    return success;
+}
+
+static bool
+scoring_converter(PyObject* argument,
+                  Aligner** aligner,
+                  int* wildcard,
+                  Py_buffer* substitution_matrix)
+{
+    *aligner = NULL;
+    *wildcard = -1;
+    if (argument == NULL || argument == Py_None) {
+    }
+    else if (PyObject_TypeCheck(argument, Aligner_Type)) {
+        *aligner = (Aligner*)argument;
+        if ((*aligner)->substitution_matrix.obj) {
+            *substitution_matrix = (*aligner)->substitution_matrix;
+            Py_INCREF(substitution_matrix->obj);
+        }
+        *wildcard = (*aligner)->wildcard;
+    }
+    else if (PyUnicode_Check(argument)) {
+        if (PyUnicode_READY(argument) == -1) return false;
+        if (PyUnicode_GET_LENGTH(argument) != 1) {
+            PyErr_SetString(PyExc_ValueError,
+                            "wildcard should be a single character, or None");
+            return false;
+        }
+        *wildcard = PyUnicode_READ_CHAR(argument, 0);
+    }
+    else {
+        if (!substitution_matrix_converter(argument, substitution_matrix)) {
+            if (!Aligner_Type) 
+                PyErr_SetString(PyExc_RuntimeError, "Aligner_Type is NULL");
+            return false;
+        }
+    }
+    return true;
+}
+
+static PyObject* 
+AlignmentCounts_new(PyTypeObject *type, PyObject *args, PyObject *keywords)
+{
+    Aligner* aligner = NULL;
+    PyObject* sequences;
+    Py_buffer coordinates = {0};
+    Py_buffer strands = {0};
+    AlignmentCounts* counts = NULL;
+    int wildcard = -1;
+    Py_buffer substitution_matrix = {0};
+    PyObject* argument = NULL;
+
+    static char *kwlist[] = {"sequences", "coordinates", "strands", "argument", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, keywords, "O!O&O&|O", kwlist,
+                                     &PyList_Type, &sequences,
+                                     coordinates_converter, &coordinates,
+                                     strands_converter , &strands,
+                                     &argument))
+        return 0;
+
+    if (!scoring_converter(argument, &aligner, &wildcard, &substitution_matrix))
+        goto exit;
+
+    counts = (AlignmentCounts*)PyType_GenericAlloc(&AlignmentCounts_Type, 0);
+    if (!counts) goto exit;
+
+    if (!count_alignment(sequences, &coordinates, &strands,
+                         aligner, wildcard, &substitution_matrix, NULL,
+                         counts)) {
+        Py_DECREF(counts);
+        counts = NULL;
+    }
+
+exit:
     coordinates_converter(NULL, &coordinates);
     strands_converter(NULL, &strands);
     substitution_matrix_converter(NULL, &substitution_matrix);
@@ -1637,8 +1703,160 @@ static PyTypeObject AlignmentCounts_Type = {
 };
 
 
+static int
+table_converter(PyObject* argument, void* pointer)
+{
+    const int flag = PyBUF_WRITABLE | PyBUF_FORMAT | PyBUF_C_CONTIGUOUS;
+    Py_buffer* view = pointer;
+    if (argument == NULL) {
+        PyBuffer_Release(view);
+        return 1;
+    }
+    if (argument == Py_None) {
+        view->obj = NULL;
+        view->buf = NULL;
+        return 1;
+    }
+    if (PyObject_GetBuffer(argument, view, flag) != 0) return 0;
+    if (view->ndim != 2) {
+        PyErr_SetString(PyExc_ValueError, "expected a two-dimensional array");
+        PyBuffer_Release(view);
+        return 0;
+    }
+    return Py_CLEANUP_SUPPORTED;
+}
+
+static char _alignmentcounts_calculate__doc__[] =
+"calculate(records, argument, counts, scores, substitutions)\n"
+"\n"
+"Calculate the alignment counts for each record in the list records.\n"
+"Each record is a tuple (sequences, coordinates, strands), with the same\n"
+"meaning as the arguments to AlignmentCounts. The optional argument is the\n"
+"aligner, wildcard, or substitution matrix, or None. The counts are stored\n"
+"in the rows of the Py_ssize_t array counts, and the gap and substitution\n"
+"scores in the rows of the double array scores. If substitutions is not\n"
+"None, the number of substitutions of each pair of letters is added to\n"
+"this 256 x 256 Py_ssize_t array.\n";
+
+static PyObject*
+_alignmentcounts_calculate(PyObject* module, PyObject* args)
+{
+    PyObject* records;
+    PyObject* record;
+    PyObject* argument;
+    PyObject* sequences;
+    Py_buffer coordinates = {0};
+    Py_buffer strands = {0};
+    Py_buffer counts = {0};
+    Py_buffer scores = {0};
+    Py_buffer substitutions = {0};
+    Py_buffer substitution_matrix = {0};
+    Aligner* aligner = NULL;
+    int wildcard = -1;
+    AlignmentCounts item;
+    Py_ssize_t i, n;
+    Py_ssize_t* row;
+    double* values;
+    PyObject* result = NULL;
+
+    if (!PyArg_ParseTuple(args, "O!OO&O&O&:calculate",
+                          &PyList_Type, &records,
+                          &argument,
+                          table_converter, &counts,
+                          table_converter, &scores,
+                          table_converter, &substitutions))
+        return NULL;
+
+    n = PyList_GET_SIZE(records);
+    if (counts.obj == NULL
+     || counts.itemsize != sizeof(Py_ssize_t)
+     || counts.shape[0] != n
+     || counts.shape[1] != 16) {
+        PyErr_Format(PyExc_ValueError,
+            "counts must be a %zd x 16 array of Py_ssize_t integers", n);
+        goto exit;
+    }
+    if (scores.obj == NULL
+     || strcmp(scores.format, "d") != 0
+     || scores.shape[0] != n
+     || scores.shape[1] != 2) {
+        PyErr_Format(PyExc_ValueError,
+            "scores must be a %zd x 2 array of double values", n);
+        goto exit;
+    }
+    if (substitutions.obj
+     && (substitutions.itemsize != sizeof(Py_ssize_t)
+      || substitutions.shape[0] != SUBSTITUTIONS_SIZE
+      || substitutions.shape[1] != SUBSTITUTIONS_SIZE)) {
+        PyErr_Format(PyExc_ValueError,
+            "substitutions must be a %d x %d array of Py_ssize_t integers",
+            SUBSTITUTIONS_SIZE, SUBSTITUTIONS_SIZE);
+        goto exit;
+    }
+
+    if (!scoring_converter(argument, &aligner, &wildcard, &substitution_matrix))
+        goto exit;
+
+    for (i = 0; i < n; i++) {
+        record = PyList_GET_ITEM(records, i);
+        if (!PyArg_ParseTuple(record, "O!O&O&:calculate",
+                              &PyList_Type, &sequences,
+                              coordinates_converter, &coordinates,
+                              strands_converter, &strands)) goto exit;
+        if (!count_alignment(sequences, &coordinates, &strands,
+                             aligner, wildcard, &substitution_matrix,
+                             substitutions.buf, &item)) {
+            coordinates_converter(NULL, &coordinates);
+            strands_converter(NULL, &strands);
+            goto exit;
+        }
+        coordinates_converter(NULL, &coordinates);
+        strands_converter(NULL, &strands);
+        row = (Py_ssize_t*)counts.buf + 16 * i;
+        row[0] = item.aligned;
+        row[1] = item.identities;
+        row[2] = item.mismatches;
+        row[3] = item.positives;
+        row[4] = item.open_left_insertions;
+        row[5] = item.extend_left_insertions;
+        row[6] = item.open_left_deletions;
+        row[7] = item.extend_left_deletions;
+        row[8] = item.open_internal_insertions;
+        row[9] = item.extend_internal_insertions;
+        row[10] = item.open_internal_deletions;
+        row[11] = item.extend_internal_deletions;
+        row[12] = item.open_right_insertions;
+        row[13] = item.extend_right_insertions;
+        row[14] = item.open_right_deletions;
+        row[15] = item.extend_right_deletions;
+        values = (double*)scores.buf + 2 * i;
+        values[0] = item.gap_score;
+        values[1] = item.substitution_score;
+    }
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+exit:
+    table_converter(NULL, &counts);
+    table_converter(NULL, &scores);
+    table_converter(NULL, &substitutions);
+    substitution_matrix_converter(NULL, &substitution_matrix);
+    return result;
+}
+
+static PyMethodDef _alignmentcounts_methods[] = {
+    {"calculate",
+     (PyCFunction)_alignmentcounts_calculate,
+     METH_VARARGS,
+     _alignmentcounts_calculate__doc__},
+    {NULL, NULL, 0, NULL}  /* Sentinel */
+};
+
+
 static char _alignmentcounts__doc__[] =
-"C extension module implementing the AlignmentCounts class";
+"C extension module implementing the AlignmentCounts class and the\n"
+"calculate function to count many alignments in one call";
 
 /* Module definition */
 
@@ -1647,6 +1865,7 @@ static struct PyModuleDef moduledef = {
     .m_name = "_alignmentcounts",
     .m_doc = _alignmentcounts__doc__,
     .m_size = -1,
+    .m_methods = _alignmentcounts_methods,
 };
 
 PyObject *
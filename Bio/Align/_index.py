@@ -0,0 +1,217 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Dictionary like indexing of alignment files (PRIVATE).
+
+You are not expected to access this module, or any of its code, directly. This
+is all handled internally by the Bio.Align.index(...) and index_db(...)
+functions which are the public interface for this functionality.
+
+As in Bio.SeqIO and Bio.SearchIO, we scan over the alignment file looking for
+the first line of each alignment, and extract the identifier of the alignment
+from its raw text without parsing the alignment. The file offset of each
+alignment is then stored against its identifier. To retrieve an alignment, the
+raw text of the alignment is read from the file, preceded by the file header
+(if any), and parsed by the Bio.Align parser for the file format.
+"""
+
+import re
+from io import StringIO
+
+from Bio.Align import _load
+from Bio.File import _IndexedSeqFileProxy
+from Bio.File import _open_for_random_access
+
+
+class AlignmentFileRandomAccess(_IndexedSeqFileProxy):
+    """Base class for random access to alignment files.
+
+    Subclasses should define the regular expression '_marker' matching the
+    first line of each alignment, and the methods '_parse_id', to extract the
+    identifier from a line of the raw alignment text, and 'get_id', to extract
+    the same identifier from a parsed alignment.
+    """
+
+    _marker: re.Pattern
+
+    def __init__(self, filename, format):
+        """Initialize the class."""
+        self._handle = _open_for_random_access(filename)
+        self._format = format
+        # Load the parser class once to avoid the lookup in each get call:
+        self._iterator = _load(format).AlignmentIterator
+        self._header = self._read_header()
+
+    def _read_header(self):
+        """Return the raw file header preceding the first alignment (PRIVATE).
+
+        The file offset of the first alignment is stored as self._start.
+        """
+        marker = self._marker
+        handle = self._handle
+        handle.seek(0)
+        lines = []
+        while True:
+            offset = handle.tell()
+            line = handle.readline()
+            if not line or marker.match(line):
+                break
+            lines.append(line)
+        self._start = offset
+        return b"".join(lines)
+
+    def __iter__(self):
+        """Return (id, offset, length) tuples."""
+        marker = self._marker
+        parse_id = self._parse_id
+        handle = self._handle
+        handle.seek(self._start)
+        start_offset = handle.tell()
+        line = handle.readline()
+        while line:
+            identifier = None
+            # Track the length explicitly as we can't use the difference of
+            # file offsets on BGZF files
+            length = 0
+            while True:
+                if identifier is None:
+                    identifier = parse_id(line)
+                length += len(line)
+                end_offset = handle.tell()
+                line = handle.readline()
+                if not line or marker.match(line):
+                    break
+            if identifier is None:
+                raise ValueError(
+                    f"Failed to find the identifier of the alignment at offset {start_offset}"
+                )
+            yield identifier, start_offset, length
+            start_offset = end_offset
+
+    def get(self, offset):
+        """Return the Alignment starting at this file offset."""
+        data = self._header + self.get_raw(offset)
+        return next(self._iterator(StringIO(data.decode())))
+
+    def get_raw(self, offset):
+        """Return the raw alignment from the file as a bytes string."""
+        marker = self._marker
+        handle = self._handle
+        handle.seek(offset)
+        lines = [handle.readline()]
+        while True:
+            line = handle.readline()
+            if not line or marker.match(line):
+                # End of file, or start of next alignment => end of this one
+                break
+            lines.append(line)
+        return b"".join(lines)
+
+
+class StockholmRandomAccess(AlignmentFileRandomAccess):
+    """Random access to a Stockholm file, using the ID of each alignment."""
+
+    _marker = re.compile(b"# STOCKHOLM 1.0")
+
+    def _parse_id(self, line):
+        if line.startswith(b"#=GF ID "):
+            return line[8:].strip().decode()
+
+    def get_id(self, alignment):
+        """Return the identifier of the alignment, as stored in its #=GF ID line."""
+        return alignment.annotations["identifier"]
+
+
+class MafRandomAccess(AlignmentFileRandomAccess):
+    """Random access to a MAF file, using the region of the reference sequence.
+
+    The identifier of each alignment block is given by the name of the first
+    (reference) sequence in the block and its start and end position on the
+    forward strand, as in "mm9.chr10:3009319-3009481".
+    """
+
+    _marker = re.compile(rb"a(\s|$)")
+
+    def _parse_id(self, line):
+        if line.startswith(b"s "):
+            words = line.split()
+            src = words[1].decode()
+            start = int(words[2])
+            end = start + int(words[3])
+            if words[4] == b"-":
+                size = int(words[5])
+                start, end = size - end, size - start
+            return f"{src}:{start}-{end}"
+
+    def get_id(self, alignment):
+        """Return the region of the reference sequence as the identifier."""
+        row = alignment.coordinates[0]
+        start = min(row[0], row[-1])
+        end = max(row[0], row[-1])
+        return f"{alignment.sequences[0].id}:{start}-{end}"
+
+
+class PslRandomAccess(AlignmentFileRandomAccess):
+    """Random access to a PSL file, using the query name and target region.
+
+    The identifier of each alignment is given by the name of the query,
+    followed by the name of the target and the start and end position of
+    the alignment on the target, as in "hg18_dna:chr13:54017130-54017186".
+    """
+
+    _marker = re.compile(rb"\S")
+
+    def _read_header(self):
+        """Return the psLayout header, if present (PRIVATE)."""
+        handle = self._handle
+        handle.seek(0)
+        line = handle.readline()
+        if line.startswith(b"psLayout "):
+            # The header consists of five lines
+            lines = [line]
+            for i in range(4):
+                lines.append(handle.readline())
+            self._start = handle.tell()
+            return b"".join(lines)
+        self._start = 0
+        return b""
+
+    def _parse_id(self, line):
+        words = line.split()
+        qName = words[9].decode()
+        tName = words[13].decode()
+        tStart = int(words[15])
+        tEnd = int(words[16])
+        return f"{qName}:{tName}:{tStart}-{tEnd}"
+
+    def get_id(self, alignment):
+        """Return the query name and target region as the identifier."""
+        row = alignment.coordinates[0]
+        start = min(row[0], row[-1])
+        end = max(row[0], row[-1])
+        return f"{alignment.query.id}:{alignment.target.id}:{start}-{end}"
+
+
+class ChainRandomAccess(AlignmentFileRandomAccess):
+    """Random access to a UCSC chain file, using the chain ID."""
+
+    _marker = re.compile(b"chain ")
+
+    def _parse_id(self, line):
+        words = line.split()
+        if len(words) == 13:
+            return words[12].decode()
+        raise ValueError(f"chain without an ID:\n{line.decode()}")
+
+    def get_id(self, alignment):
+        """Return the chain ID of the alignment."""
+        return alignment.annotations["id"]
+
+
+_FormatToRandomAccess = {
+    "chain": ChainRandomAccess,
+    "maf": MafRandomAccess,
+    "psl": PslRandomAccess,
+    "stockholm": StockholmRandomAccess,
+}
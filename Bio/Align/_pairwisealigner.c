@@ -25,6 +25,9 @@ static bool warned = false;  // FIXME remove once Biopython 1.87 is out.
 #define DONE 0x3
 #define NONE 0x7
 
+#define BAND_NONE -1
+#define BAND_ADAPTIVE -2
+
 #define OVERFLOW_ERROR -1
 #define MEMORY_ERROR -2
 #define OTHER_ERROR -3
@@ -1800,6 +1803,8 @@ Aligner_init(Aligner *self, PyObject *args, PyObject *kwds)
     self->algorithm = Unknown;
     self->alphabet = NULL;
     self->wildcard = -1;
+    self->band = BAND_NONE;
+    self->traceback = FullTraceback;
     return 0;
 }
 
@@ -1951,13 +1956,20 @@ Aligner_str(Aligner* self)
         PyMem_Free(value);
     }
     switch (self->mode) {
-        case Global: sprintf(p, "  mode: global\n"); break;
-        case Local: sprintf(p, "  mode: local\n"); break;
-        case FOGSAA_Mode: sprintf(p, "  mode: fogsaa\n"); break;
+        case Global: p += sprintf(p, "  mode: global\n"); break;
+        case Local: p += sprintf(p, "  mode: local\n"); break;
+        case FOGSAA_Mode: p += sprintf(p, "  mode: fogsaa\n"); break;
         default:
             ERR_UNEXPECTED_MODE
             return NULL;
     }
+    switch (self->band) {
+        case BAND_NONE: break;
+        case BAND_ADAPTIVE: p += sprintf(p, "  band: adaptive\n"); break;
+        default: p += sprintf(p, "  band: %d\n", self->band); break;
+    }
+    if (self->traceback == LinearTraceback)
+        sprintf(p, "  traceback: linear\n");
     s = PyUnicode_FromFormat(text, args[0], args[1], args[2]);
 
 exit:
@@ -3856,6 +3868,83 @@ Aligner_set_wildcard(Aligner* self, PyObject* value, void* closure)
     return 0;
 }
 
+static char Aligner_band__doc__[] = "width of the diagonal band (None, an integer, or 'adaptive')";
+
+static PyObject*
+Aligner_get_band(Aligner* self, void* closure)
+{
+    switch (self->band) {
+        case BAND_NONE: Py_RETURN_NONE;
+        case BAND_ADAPTIVE: return PyUnicode_FromString("adaptive");
+        default: return PyLong_FromLong(self->band);
+    }
+}
+
+static int
+Aligner_set_band(Aligner* self, PyObject* value, void* closure)
+{
+    long band;
+    if (value == Py_None) {
+        self->band = BAND_NONE;
+        return 0;
+    }
+    if (PyUnicode_Check(value)) {
+        if (PyUnicode_CompareWithASCIIString(value, "adaptive") == 0) {
+            self->band = BAND_ADAPTIVE;
+            return 0;
+        }
+        PyErr_SetString(PyExc_ValueError,
+                        "band should be a non-negative integer, 'adaptive', "
+                        "or None");
+        return -1;
+    }
+    band = PyLong_AsLong(value);
+    if (band == -1 && PyErr_Occurred()) {
+        PyErr_SetString(PyExc_TypeError,
+                        "band should be a non-negative integer, 'adaptive', "
+                        "or None");
+        return -1;
+    }
+    if (band < 0 || band > INT_MAX) {
+        PyErr_SetString(PyExc_ValueError,
+                        "band should be a non-negative integer, 'adaptive', "
+                        "or None");
+        return -1;
+    }
+    self->band = (int)band;
+    return 0;
+}
+
+static char Aligner_traceback__doc__[] = "traceback method ('full' or 'linear')";
+
+static PyObject*
+Aligner_get_traceback(Aligner* self, void* closure)
+{
+    switch (self->traceback) {
+        case LinearTraceback: return PyUnicode_FromString("linear");
+        case FullTraceback:
+        default: return PyUnicode_FromString("full");
+    }
+}
+
+static int
+Aligner_set_traceback(Aligner* self, PyObject* value, void* closure)
+{
+    if (PyUnicode_Check(value)) {
+        if (PyUnicode_CompareWithASCIIString(value, "full") == 0) {
+            self->traceback = FullTraceback;
+            return 0;
+        }
+        if (PyUnicode_CompareWithASCIIString(value, "linear") == 0) {
+            self->traceback = LinearTraceback;
+            return 0;
+        }
+    }
+    PyErr_SetString(PyExc_ValueError,
+                    "traceback should be 'full' or 'linear'");
+    return -1;
+}
+
 static char Aligner_algorithm__doc__[] = "alignment algorithm";
 
 static PyObject*
@@ -4128,6 +4217,14 @@ static PyGetSetDef Aligner_getset[] = {
         (getter)Aligner_get_wildcard,
         (setter)Aligner_set_wildcard,
         Aligner_wildcard__doc__, NULL},
+    {"band",
+        (getter)Aligner_get_band,
+        (setter)Aligner_set_band,
+        Aligner_band__doc__, NULL},
+    {"traceback",
+        (getter)Aligner_get_traceback,
+        (setter)Aligner_set_traceback,
+        Aligner_traceback__doc__, NULL},
     {"algorithm",
         (getter)Aligner_get_algorithm,
         (setter)NULL,
@@ -4592,6 +4689,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
     /* Needleman-Wunsch algorithm */ \
     row = PyMem_Malloc((nB+1)*sizeof(double)); \
     if (!row) return PyErr_NoMemory(); \
+    Py_BEGIN_ALLOW_THREADS \
 \
     /* The top row of the score matrix is a special case, \
      * as there are no previously aligned characters. \
@@ -4632,6 +4730,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
     SELECT_SCORE_GLOBAL(temp + (align_score), \
                         row[nB] + right_gap_extend_B, \
                         row[nB-1] + right_gap_extend_A); \
+    Py_END_ALLOW_THREADS \
     PyMem_Free(row); \
     return PyFloat_FromDouble(score);
 
@@ -4651,6 +4750,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
     /* Smith-Waterman algorithm */ \
     row = PyMem_Malloc((nB+1)*sizeof(double)); \
     if (!row) return PyErr_NoMemory(); \
+    Py_BEGIN_ALLOW_THREADS \
 \
     /* The top row of the score matrix is a special case, \
      * as there are no previously aligned characters. \
@@ -4683,6 +4783,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
     } \
     kB = sB[nB-1]; \
     SELECT_SCORE_LOCAL1(temp + (align_score)); \
+    Py_END_ALLOW_THREADS \
     PyMem_Free(row); \
     return PyFloat_FromDouble(maximum);
 
@@ -4732,6 +4833,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
         return PyErr_NoMemory(); \
     } \
     M = paths->M; \
+    Py_BEGIN_ALLOW_THREADS \
     row[0] = 0; \
     for (j = 1; j <= nB; j++) row[j] = j * left_gap_extend_A; \
     for (i = 1; i < nA; i++) { \
@@ -4754,6 +4856,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
     } \
     kB = sB[j-1]; \
     SELECT_TRACE_NEEDLEMAN_WUNSCH(right_gap_extend_A, right_gap_extend_B, align_score); \
+    Py_END_ALLOW_THREADS \
     PyMem_Free(row); \
     M[nA][nB].path = 0; \
     return Py_BuildValue("fN", score, paths);
@@ -4786,6 +4889,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
         return PyErr_NoMemory(); \
     } \
     M = paths->M; \
+    Py_BEGIN_ALLOW_THREADS \
     for (j = 0; j <= nB; j++) row[j] = 0; \
     for (i = 1; i < nA; i++) { \
         temp = 0; \
@@ -4805,7 +4909,9 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
     } \
     kB = sB[nB-1]; \
     SELECT_TRACE_SMITH_WATERMAN_D(align_score); \
+    Py_END_ALLOW_THREADS \
     PyMem_Free(row); \
+    Py_BEGIN_ALLOW_THREADS \
 \
     /* As we don't allow zero-score extensions to alignments, \
      * we need to remove all traces towards an ENDPOINT. \
@@ -4838,6 +4944,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
             M[i][j].trace = trace; \
         } \
     } \
+    Py_END_ALLOW_THREADS \
     if (maximum == 0) M[0][0].path = NONE; \
     else M[0][0].path = 0; \
     return Py_BuildValue("fN", maximum, paths);
@@ -4901,6 +5008,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
     if (!Ix_row) goto exit; \
     Iy_row = PyMem_Malloc((nB+1)*sizeof(double)); \
     if (!Iy_row) goto exit; \
+    Py_BEGIN_ALLOW_THREADS \
 \
     /* The top row of the score matrix is a special case, \
      * as there are no previously aligned characters. \
@@ -5000,6 +5108,7 @@ static struct fogsaa_queue_node fogsaa_queue_pop(struct fogsaa_queue *queue) {
     Iy_row[nB] = score; \
 \
     SELECT_SCORE_GLOBAL(M_row[nB], Ix_row[nB], Iy_row[nB]); \
+    Py_END_ALLOW_THREADS \
     PyMem_Free(M_row); \
     PyMem_Free(Ix_row); \
     PyMem_Free(Iy_row); \
@@ -5038,6 +5147,7 @@ exit: \
     if (!Ix_row) goto exit; \
     Iy_row = PyMem_Malloc((nB+1)*sizeof(double)); \
     if (!Iy_row) goto exit; \
+    Py_BEGIN_ALLOW_THREADS \
  \
     /* The top row of the score matrix is a special case, \
      * as there are no previously aligned characters. \
@@ -5112,6 +5222,7 @@ exit: \
                                    Ix_temp, \
                                    Iy_temp, \
                                    (align_score)); \
+    Py_END_ALLOW_THREADS \
     PyMem_Free(M_row); \
     PyMem_Free(Ix_row); \
     PyMem_Free(Iy_row); \
@@ -5190,6 +5301,7 @@ exit: \
     if (!Iy_row) goto exit; \
     M = paths->M; \
     gaps = paths->gaps.gotoh; \
+    Py_BEGIN_ALLOW_THREADS \
  \
     /* Gotoh algorithm with three states */ \
     M_row[0] = 0; \
@@ -5289,6 +5401,7 @@ exit: \
     if (M_row[nB] < score - epsilon) M[nA][nB].trace = 0; \
     if (Ix_row[nB] < score - epsilon) gaps[nA][nB].Ix = 0; \
     if (Iy_row[nB] < score - epsilon) gaps[nA][nB].Iy = 0; \
+    Py_END_ALLOW_THREADS \
     PyMem_Free(M_row); \
     PyMem_Free(Ix_row); \
     PyMem_Free(Iy_row); \
@@ -5338,6 +5451,7 @@ exit: \
     if (!Ix_row) goto exit; \
     Iy_row = PyMem_Malloc((nB+1)*sizeof(double)); \
     if (!Iy_row) goto exit; \
+    Py_BEGIN_ALLOW_THREADS \
     M_row[0] = 0; \
     Ix_row[0] = -DBL_MAX; \
     Iy_row[0] = -DBL_MAX; \
@@ -5410,9 +5524,11 @@ exit: \
     gaps[nA][nB].Ix = 0; \
     gaps[nA][nB].Iy = 0; \
 \
+    Py_END_ALLOW_THREADS \
     PyMem_Free(M_row); \
     PyMem_Free(Ix_row); \
     PyMem_Free(Iy_row); \
+    Py_BEGIN_ALLOW_THREADS \
 \
     /* As we don't allow zero-score extensions to alignments, \
      * we need to remove all traces towards an ENDPOINT. \
@@ -5476,6 +5592,7 @@ exit: \
         } \
     } \
 \
+    Py_END_ALLOW_THREADS \
     /* traceback */ \
     if (maximum == 0) M[0][0].path = DONE; \
     else M[0][0].path = 0; \
@@ -7230,145 +7347,1566 @@ Aligner_fogsaa_align_matrix(Aligner* self,
     FOGSAA_EXIT_ALIGN
 }
 
-static bool _check_indices(Py_buffer* view, Py_buffer* substitution_matrix) {
-    const Py_ssize_t m = substitution_matrix->shape[0];
-    const int* indices = view->buf;
-    const Py_ssize_t n = view->len / view->itemsize;
-    Py_ssize_t i;
-    for (i = 0; i < n; i++) {
-        const int index = indices[i];
-        if (index < 0) {
-            PyErr_Format(PyExc_ValueError,
-                         "sequence item %zd is negative (%d)",
-                         i, index);
-            return false;
-        }
-        if (index >= m) {
-            PyErr_Format(PyExc_ValueError,
-                         "sequence item %zd is out of bound"
-                         " (%d, should be < %zd)", i, index, m);
-            return false;
-        }
+/* ----------------- banded alignment ----------------- */
+
+/* Scores used by the banded alignment algorithm, with the left and right
+ * end gap scores already exchanged for alignments to the reverse strand.
+ * As in the other algorithms, A refers to gaps in sequence A (insertions,
+ * horizontal moves), and B to gaps in sequence B (deletions, vertical moves).
+ */
+typedef struct {
+    Mode mode;
+    const double* substitution_matrix;  /* NULL if match/mismatch is used */
+    Py_ssize_t n;
+    double match;
+    double mismatch;
+    int wildcard;
+    double open_A;
+    double extend_A;
+    double open_B;
+    double extend_B;
+    double left_open_A;
+    double left_extend_A;
+    double left_open_B;
+    double left_extend_B;
+    double right_open_A;
+    double right_extend_A;
+    double right_open_B;
+    double right_extend_B;
+} Scoring;
+
+static void
+_init_scoring(Aligner* self, unsigned char strand, Scoring* scoring)
+{
+    scoring->mode = self->mode;
+    if (self->substitution_matrix.obj) {
+        scoring->substitution_matrix = self->substitution_matrix.buf;
+        scoring->n = self->substitution_matrix.shape[0];
+    }
+    else {
+        scoring->substitution_matrix = NULL;
+        scoring->n = 0;
+    }
+    scoring->match = self->match;
+    scoring->mismatch = self->mismatch;
+    scoring->wildcard = self->wildcard;
+    scoring->open_A = self->open_internal_insertion_score;
+    scoring->extend_A = self->extend_internal_insertion_score;
+    scoring->open_B = self->open_internal_deletion_score;
+    scoring->extend_B = self->extend_internal_deletion_score;
+    if (strand == '+') {
+        scoring->left_open_A = self->open_left_insertion_score;
+        scoring->left_extend_A = self->extend_left_insertion_score;
+        scoring->left_open_B = self->open_left_deletion_score;
+        scoring->left_extend_B = self->extend_left_deletion_score;
+        scoring->right_open_A = self->open_right_insertion_score;
+        scoring->right_extend_A = self->extend_right_insertion_score;
+        scoring->right_open_B = self->open_right_deletion_score;
+        scoring->right_extend_B = self->extend_right_deletion_score;
+    }
+    else {
+        scoring->left_open_A = self->open_right_insertion_score;
+        scoring->left_extend_A = self->extend_right_insertion_score;
+        scoring->left_open_B = self->open_right_deletion_score;
+        scoring->left_extend_B = self->extend_right_deletion_score;
+        scoring->right_open_A = self->open_left_insertion_score;
+        scoring->right_extend_A = self->extend_left_insertion_score;
+        scoring->right_open_B = self->open_left_deletion_score;
+        scoring->right_extend_B = self->extend_left_deletion_score;
     }
-    return true;
 }
 
-static bool _map_indices(Py_buffer* view, const int* mapping, Py_ssize_t m) {
-    Py_ssize_t i;
-    const Py_ssize_t n = view->len / view->itemsize;
-    int* const indices = view->buf;
-    for (i = 0; i < n; i++) {
-        int index = indices[i];
-        if (index < 0) {
-            PyErr_Format(PyExc_ValueError,
-                         "sequence item %zd is negative (%d)",
-                         i, index);
-            return false;
+static inline double
+_substitution_score(const Scoring* scoring, int kA, int kB)
+{
+    if (scoring->substitution_matrix)
+        return scoring->substitution_matrix[kA * scoring->n + kB];
+    if (kA == scoring->wildcard || kB == scoring->wildcard) return 0;
+    if (kA == kB) return scoring->match;
+    return scoring->mismatch;
+}
+
+/* Trace codes for the banded traceback; two bits are used for each of the
+ * M, Ix, and Iy states, storing the state of the previous cell in the path.
+ */
+#define FROM_M 0
+#define FROM_Ix 1
+#define FROM_Iy 2
+#define FROM_START 3
+
+/* Fill the dynamic programming matrix restricted to the diagonals lo to hi
+ * (with diagonal j - i for cell (i, j)), keeping only two rows in memory.
+ * If traces is not NULL, it should have room for (nA+1)*(hi-lo+1) trace
+ * bytes. On return, score contains the optimal score, and i, j, and state
+ * the end point of the optimal path in the matrix. Returns false if
+ * memory allocation fails. This function does not use the Python C API, and
+ * can be called without holding the GIL.
+ */
+static bool
+_banded_fill(const Scoring* scoring, const int* sA, int nA, const int* sB, int nB,
+             int lo, int hi, unsigned char* traces,
+             double* score, int* iEnd, int* jEnd, int* state)
+{
+    const int W = hi - lo + 1;
+    const bool local = (scoring->mode == Local);
+    int i, j, k;
+    int code;
+    unsigned char trace;
+    double M, Ix, Iy;
+    double temp;
+    double open_A, extend_A, open_B, extend_B;
+    double maximum = 0;
+    double* pM;
+    double* pIx;
+    double* pIy;
+    double* cM;
+    double* cIx;
+    double* cIy;
+    double* swap;
+    double* rows = PyMem_RawMalloc(6 * (W+1) * sizeof(double));
+    if (!rows) return false;
+    pM = rows;
+    pIx = pM + W + 1;
+    pIy = pIx + W + 1;
+    cM = pIy + W + 1;
+    cIx = cM + W + 1;
+    cIy = cIx + W + 1;
+    /* the cell (i-1, j) beyond the band edge */
+    pM[W] = pIx[W] = pIy[W] = cM[W] = cIx[W] = cIy[W] = -DBL_MAX;
+    *iEnd = 0;
+    *jEnd = 0;
+    *state = FROM_M;
+    for (i = 0; i <= nA; i++) {
+        if (local || i < nA) {
+            open_A = scoring->open_A;
+            extend_A = scoring->extend_A;
         }
-        if (index >= m) {
-            PyErr_Format(PyExc_ValueError,
-                         "sequence item %zd is out of bound"
-                         " (%d, should be < %zd)", i, index, m);
-            return false;
+        else {
+            open_A = scoring->right_open_A;
+            extend_A = scoring->right_extend_A;
         }
-        index = mapping[index];
-        if (index == MISSING_LETTER) {
-            PyErr_SetString(PyExc_ValueError,
-                "sequence contains letters not in the alphabet");
-            return false;
+        for (k = 0; k < W; k++) {
+            j = i + lo + k;
+            trace = 0;
+            if (j < 0 || j > nB) {
+                M = -DBL_MAX;
+                Ix = -DBL_MAX;
+                Iy = -DBL_MAX;
+            }
+            else if (i == 0 || j == 0) {
+                M = -DBL_MAX;
+                Ix = -DBL_MAX;
+                Iy = -DBL_MAX;
+                if (local) ;
+                else if (i == 0 && j == 0) M = 0;
+                else if (i == 0) {
+                    if (j == 1) {
+                        Iy = scoring->left_open_A;
+                        trace = FROM_M << 4;
+                    }
+                    else {
+                        Iy = cIy[k-1] + scoring->left_extend_A;
+                        trace = FROM_Iy << 4;
+                    }
+                }
+                else {
+                    if (i == 1) {
+                        Ix = scoring->left_open_B;
+                        trace = FROM_M << 2;
+                    }
+                    else {
+                        Ix = pIx[k+1] + scoring->left_extend_B;
+                        trace = FROM_Ix << 2;
+                    }
+                }
+            }
+            else {
+                if (local || j < nB) {
+                    open_B = scoring->open_B;
+                    extend_B = scoring->extend_B;
+                }
+                else {
+                    open_B = scoring->right_open_B;
+                    extend_B = scoring->right_extend_B;
+                }
+                /* diagonal move from cell (i-1, j-1) */
+                M = pM[k];
+                code = FROM_M;
+                if (pIx[k] > M) {
+                    M = pIx[k];
+                    code = FROM_Ix;
+                }
+                if (pIy[k] > M) {
+                    M = pIy[k];
+                    code = FROM_Iy;
+                }
+                if (local && M <= 0) {
+                    M = 0;
+                    code = FROM_START;
+                }
+                M += _substitution_score(scoring, sA[i-1], sB[j-1]);
+                trace = code;
+                /* vertical move from cell (i-1, j) */
+                Ix = pM[k+1] + open_B;
+                code = FROM_M;
+                temp = pIx[k+1] + extend_B;
+                if (temp > Ix) {
+                    Ix = temp;
+                    code = FROM_Ix;
+                }
+                temp = pIy[k+1] + open_B;
+                if (temp > Ix) {
+                    Ix = temp;
+                    code = FROM_Iy;
+                }
+                trace |= code << 2;
+                /* horizontal move from cell (i, j-1) */
+                if (k > 0) {
+                    Iy = cM[k-1] + open_A;
+                    code = FROM_M;
+                    temp = cIx[k-1] + open_A;
+                    if (temp > Iy) {
+                        Iy = temp;
+                        code = FROM_Ix;
+                    }
+                    temp = cIy[k-1] + extend_A;
+                    if (temp > Iy) {
+                        Iy = temp;
+                        code = FROM_Iy;
+                    }
+                    trace |= code << 4;
+                }
+                else Iy = -DBL_MAX;
+                if (local && M > maximum) {
+                    maximum = M;
+                    *iEnd = i;
+                    *jEnd = j;
+                }
+            }
+            cM[k] = M;
+            cIx[k] = Ix;
+            cIy[k] = Iy;
+            if (traces) traces[(size_t)i * W + k] = trace;
+        }
+        swap = pM; pM = cM; cM = swap;
+        swap = pIx; pIx = cIx; cIx = swap;
+        swap = pIy; pIy = cIy; cIy = swap;
+    }
+    if (local) *score = maximum;
+    else {
+        k = nB - nA - lo;
+        *iEnd = nA;
+        *jEnd = nB;
+        *score = pM[k];
+        if (pIx[k] > *score) {
+            *score = pIx[k];
+            *state = FROM_Ix;
+        }
+        if (pIy[k] > *score) {
+            *score = pIy[k];
+            *state = FROM_Iy;
         }
-        indices[i] = index;
     }
+    PyMem_RawFree(rows);
     return true;
 }
 
-static bool _prepare_indices(Py_buffer* substitution_matrix, Py_buffer* bA, Py_buffer* bB)
+/* Find the diagonal band for the alignment, and calculate the alignment
+ * score in that band. For a fixed band width, the band extends by that width
+ * beyond the diagonals of the corners of the dynamic programming matrix.
+ * For an adaptive band, the width is doubled until no alignment outside the
+ * band can have a higher score than the best alignment inside the band.
+ * Returns false if memory allocation fails.
+ */
+static bool
+_banded_score(const Scoring* scoring, int band,
+              const int* sA, int nA, const int* sB, int nB,
+              int* lo, int* hi, double* score)
 {
-    if (PyObject_IsInstance(substitution_matrix->obj,
-                            (PyObject*)Array_Type)) {
-        const PyTypeObject* basetype = Array_Type->tp_base;
-        const Py_ssize_t offset = basetype->tp_basicsize;
-        Fields* fields = (Fields*)((intptr_t)substitution_matrix->obj + offset);
-        Py_buffer* buffer = &fields->mapping;
-        const int* mapping = buffer->buf;
-        if (mapping) {
-            const Py_ssize_t m = buffer->len / buffer->itemsize;
-            if (!_map_indices(bA, mapping, m)) return false;
-            if (!_map_indices(bB, mapping, m)) return false;
-            return true;
+    int iEnd, jEnd, state;
+    int width;
+    int pairs;
+    int gaps;
+    double bound;
+    double substitution_maximum = 0;
+    double gap_maximum = scoring->open_A;
+    const double gap_scores[] = {scoring->extend_A,
+                                 scoring->open_B, scoring->extend_B,
+                                 scoring->left_open_A, scoring->left_extend_A,
+                                 scoring->left_open_B, scoring->left_extend_B,
+                                 scoring->right_open_A, scoring->right_extend_A,
+                                 scoring->right_open_B, scoring->right_extend_B};
+    const int n = nB - nA;
+    const int diagonal_min = (n < 0) ? n : 0;
+    const int diagonal_max = (n > 0) ? n : 0;
+    Py_ssize_t p;
+
+    if (band != BAND_ADAPTIVE) {
+        *lo = diagonal_min - band;
+        *hi = diagonal_max + band;
+        if (*lo < -nA) *lo = -nA;
+        if (*hi > nB) *hi = nB;
+        return _banded_fill(scoring, sA, nA, sB, nB, *lo, *hi, NULL,
+                            score, &iEnd, &jEnd, &state);
+    }
+    if (scoring->substitution_matrix) {
+        const Py_ssize_t m = scoring->n * scoring->n;
+        for (p = 0; p < m; p++)
+            if (scoring->substitution_matrix[p] > substitution_maximum)
+                substitution_maximum = scoring->substitution_matrix[p];
+    }
+    else {
+        if (scoring->match > substitution_maximum)
+            substitution_maximum = scoring->match;
+        if (scoring->mismatch > substitution_maximum)
+            substitution_maximum = scoring->mismatch;
+    }
+    for (p = 0; p < (Py_ssize_t)(sizeof(gap_scores) / sizeof(double)); p++)
+        if (gap_scores[p] > gap_maximum) gap_maximum = gap_scores[p];
+    width = 16;
+    while (1) {
+        *lo = diagonal_min - width;
+        *hi = diagonal_max + width;
+        if (*lo <= -nA && *hi >= nB) {
+            /* the band covers the full matrix */
+            *lo = -nA;
+            *hi = nB;
+        }
+        if (!_banded_fill(scoring, sA, nA, sB, nB, *lo, *hi, NULL,
+                          score, &iEnd, &jEnd, &state)) return false;
+        if (*lo == -nA && *hi == nB) break;
+        if (gap_maximum <= 0) {
+            /* An alignment leaving the band has at least width+1 insertions
+             * and width+1 deletions in addition to the n gaps needed to
+             * align sequences of different lengths. */
+            pairs = ((nA < nB) ? nA : nB) - (width + 1);
+            if (pairs < 0) break;
+            gaps = abs(n) + 2 * (width + 1);
+            bound = substitution_maximum * pairs + gap_maximum * gaps;
+            if (*score >= bound) break;
         }
+        if (width > INT_MAX / 2) width = INT_MAX - abs(n);
+        else width *= 2;
     }
-    if (!_check_indices(bA, substitution_matrix)) return false;
-    if (!_check_indices(bB, substitution_matrix)) return false;
     return true;
 }
 
-static int
-sequence_converter(PyObject* argument, void* pointer)
+/* Create the path as a tuple with the target and query coordinates of its
+ * points, in the same format as the path generator. The n points are stored
+ * as (i, j) pairs in the order in which they occur in the path.
+ */
+static PyObject*
+_create_path(const int* points, Py_ssize_t n, int nB, unsigned char strand)
 {
-    Py_buffer* view = pointer;
-    const int flag = PyBUF_FORMAT | PyBUF_C_CONTIGUOUS;
+    int i, j;
+    Py_ssize_t k;
+    PyObject* target_row;
+    PyObject* query_row;
+    PyObject* value;
+    PyObject* tuple = PyTuple_New(2);
+    if (!tuple) return NULL;
+    target_row = PyTuple_New(n);
+    PyTuple_SET_ITEM(tuple, 0, target_row);
+    query_row = PyTuple_New(n);
+    PyTuple_SET_ITEM(tuple, 1, query_row);
+    if (!target_row || !query_row) goto error;
+    for (k = 0; k < n; k++) {
+        i = points[2*k];
+        j = points[2*k+1];
+        if (strand == '-') j = nB - j;
+        value = PyLong_FromLong(i);
+        if (!value) goto error;
+        PyTuple_SET_ITEM(target_row, k, value);
+        value = PyLong_FromLong(j);
+        if (!value) goto error;
+        PyTuple_SET_ITEM(query_row, k, value);
+    }
+    return tuple;
+error:
+    Py_DECREF(tuple);
+    return NULL;
+}
 
-    if (argument == NULL) {
-        PyBuffer_Release(view);
-        return 1;
-    }
+/* Returns the trace byte stored for cell (i, j). */
+typedef unsigned char (*TraceGetter)(const void* data, int i, int j);
 
-    if (PyObject_GetBuffer(argument, view, flag) != 0) {
-        PyErr_SetString(PyExc_TypeError, "argument is not a sequence");
-        return 0;
-    }
-    if (view->ndim != 1) {
-        PyErr_Format(PyExc_ValueError,
-                     "sequence has incorrect rank (%d expected 1)", view->ndim);
-        PyBuffer_Release(view);
-        return 0;
-    }
-    if (view->len == 0) {
-        PyErr_SetString(PyExc_ValueError, "sequence has zero length");
-        PyBuffer_Release(view);
-        return 0;
-    }
-    if (strcmp(view->format, "i") != 0 && strcmp(view->format, "l") != 0) {
-        PyErr_Format(PyExc_ValueError,
-                     "sequence has incorrect data type '%s'", view->format);
-        PyBuffer_Release(view);
-        return 0;
+typedef struct {
+    const unsigned char* traces;
+    int lo;
+    int W;
+} BandedTraces;
+
+static unsigned char
+_banded_trace(const void* data, int i, int j)
+{
+    const BandedTraces* band = data;
+    return band->traces[(size_t)i * band->W + (j - i - band->lo)];
+}
+
+/* Follow the traces back from the end point of the optimal path, and return
+ * the path as a tuple with the target and query coordinates of its points.
+ */
+static PyObject*
+_trace_path(TraceGetter get_trace, const void* data, Mode mode,
+            int nB, int i, int j, int state, unsigned char strand)
+{
+    int move;
+    int direction = 0;
+    int code = FROM_M;
+    unsigned char trace;
+    Py_ssize_t n = 0;
+    Py_ssize_t size = 64;
+    Py_ssize_t k;
+    PyObject* tuple;
+    int* points = PyMem_Malloc(2 * size * sizeof(int));
+    int* temp;
+    if (!points) return PyErr_NoMemory();
+
+#define ADD_POINT \
+    if (n == size) { \
+        size *= 2; \
+        temp = PyMem_Realloc(points, 2 * size * sizeof(int)); \
+        if (!temp) { \
+            PyMem_Free(points); \
+            return PyErr_NoMemory(); \
+        } \
+        points = temp; \
+    } \
+    points[2*n] = i; \
+    points[2*n+1] = j; \
+    n++;
+
+    ADD_POINT
+    while (1) {
+        if (mode == Global && i == 0 && j == 0) break;
+        trace = get_trace(data, i, j);
+        switch (state) {
+            case FROM_M: move = DIAGONAL; code = trace & 0x3; break;
+            case FROM_Ix: move = VERTICAL; code = (trace >> 2) & 0x3; break;
+            case FROM_Iy: move = HORIZONTAL; code = (trace >> 4) & 0x3; break;
+            default: move = 0; break;
+        }
+        if (direction && move != direction) {
+            ADD_POINT
+        }
+        direction = move;
+        switch (move) {
+            case DIAGONAL: i--; j--; break;
+            case VERTICAL: i--; break;
+            case HORIZONTAL: j--; break;
+        }
+        if (code == FROM_START) break;
+        state = code;
     }
-    if (view->itemsize != sizeof(int)) {
-        PyErr_Format(PyExc_ValueError,
-                    "sequence has unexpected item byte size "
-                    "(%ld, expected %ld)", view->itemsize, sizeof(int));
-        PyBuffer_Release(view);
-        return 0;
+    ADD_POINT
+
+#undef ADD_POINT
+
+    /* the points were stored starting from the end of the path */
+    for (k = 0; k < n / 2; k++) {
+        i = points[2*k];
+        j = points[2*k+1];
+        points[2*k] = points[2*(n-1-k)];
+        points[2*k+1] = points[2*(n-1-k)+1];
+        points[2*(n-1-k)] = i;
+        points[2*(n-1-k)+1] = j;
     }
-    return Py_CLEANUP_SUPPORTED;
+    tuple = _create_path(points, n, nB, strand);
+    PyMem_Free(points);
+    return tuple;
 }
- 
-static int
-strand_converter(PyObject* argument, void* pointer)
+
+static PyObject*
+_banded_path(const unsigned char* traces, int lo, int hi, Mode mode,
+             int nB, int i, int j, int state, unsigned char strand)
 {
-    if (!PyUnicode_Check(argument)) goto error;
-    if (PyUnicode_READY(argument) == -1) return 0;
-    if (PyUnicode_GET_LENGTH(argument) == 1) {
-        const Py_UCS4 ch = PyUnicode_READ_CHAR(argument, 0);
-        if (ch < 128) {
-            const char c = ch;
-            if (ch == '+' || ch == '-') {
-                *((char*)pointer) = c;
-                return 1;
-            }
-        }
+    BandedTraces band;
+    band.traces = traces;
+    band.lo = lo;
+    band.W = hi - lo + 1;
+    return _trace_path(_banded_trace, &band, mode, nB, i, j, state, strand);
+}
+
+static bool
+_check_algorithm(Aligner* self, const char* method)
+{
+    switch (_get_algorithm(self)) {
+        case NeedlemanWunschSmithWaterman:
+        case Gotoh:
+            return true;
+        default:
+            PyErr_Format(PyExc_ValueError,
+                         "%s is only available for the Needleman-Wunsch, "
+                         "Smith-Waterman, and Gotoh algorithms", method);
+            return false;
     }
-error:
-    PyErr_SetString(PyExc_ValueError, "strand must be '+' or '-'");
-    return 0;
 }
 
-static const char Aligner_score__doc__[] = "calculates the alignment score";
+static bool
+_check_banded_algorithm(Aligner* self)
+{
+    if (!_check_algorithm(self, "banded alignment")) return false;
+    if (self->band == BAND_ADAPTIVE && self->mode != Global) {
+        PyErr_SetString(PyExc_ValueError,
+                        "adaptive banding is only available for global "
+                        "alignments");
+        return false;
+    }
+    return true;
+}
 
 static PyObject*
-Aligner_score(Aligner* self, PyObject* args, PyObject* keywords)
+Aligner_banded_score(Aligner* self, const int* sA, int nA, const int* sB, int nB,
+                     unsigned char strand)
+{
+    Scoring scoring;
+    int lo, hi;
+    double score;
+    bool ok;
+    if (!_check_banded_algorithm(self)) return NULL;
+    _init_scoring(self, strand, &scoring);
+    Py_BEGIN_ALLOW_THREADS
+    ok = _banded_score(&scoring, self->band, sA, nA, sB, nB, &lo, &hi, &score);
+    Py_END_ALLOW_THREADS
+    if (!ok) return PyErr_NoMemory();
+    return PyFloat_FromDouble(score);
+}
+
+static PyObject*
+Aligner_banded_align(Aligner* self, const int* sA, int nA, const int* sB, int nB,
+                     unsigned char strand)
+{
+    Scoring scoring;
+    int lo, hi;
+    int i, j, state;
+    double score;
+    bool ok = true;
+    size_t size;
+    unsigned char* traces = NULL;
+    PyObject* path;
+    PyObject* paths;
+    if (!_check_banded_algorithm(self)) return NULL;
+    _init_scoring(self, strand, &scoring);
+    if (self->band == BAND_ADAPTIVE) {
+        Py_BEGIN_ALLOW_THREADS
+        ok = _banded_score(&scoring, self->band, sA, nA, sB, nB, &lo, &hi, &score);
+        Py_END_ALLOW_THREADS
+        if (!ok) return PyErr_NoMemory();
+    }
+    else {
+        const int n = nB - nA;
+        lo = ((n < 0) ? n : 0) - self->band;
+        hi = ((n > 0) ? n : 0) + self->band;
+        if (lo < -nA) lo = -nA;
+        if (hi > nB) hi = nB;
+    }
+    size = (size_t)(nA + 1) * (size_t)(hi - lo + 1);
+    traces = PyMem_RawMalloc(size);
+    if (!traces) return PyErr_NoMemory();
+    Py_BEGIN_ALLOW_THREADS
+    ok = _banded_fill(&scoring, sA, nA, sB, nB, lo, hi, traces,
+                      &score, &i, &j, &state);
+    Py_END_ALLOW_THREADS
+    if (!ok) {
+        PyMem_RawFree(traces);
+        return PyErr_NoMemory();
+    }
+    paths = PyList_New(0);
+    if (paths && (scoring.mode == Global || score > 0)) {
+        path = _banded_path(traces, lo, hi, scoring.mode, nB, i, j, state, strand);
+        if (!path || PyList_Append(paths, path) < 0) {
+            Py_CLEAR(paths);
+        }
+        Py_XDECREF(path);
+    }
+    PyMem_RawFree(traces);
+    if (!paths) return NULL;
+    return Py_BuildValue("dN", score, paths);
+}
+
+/* ----------------- linear-memory alignment ----------------- */
+
+/* The linear-memory alignment follows Myers and Miller (1988): the optimal
+ * path through a rectangle of the dynamic programming matrix is split where
+ * it leaves the middle row, found by combining the scores of a forward pass
+ * over the upper half and a backward pass over the lower half of the
+ * rectangle. Both halves are then aligned recursively, until the rectangle
+ * is small enough to store its traces.
+ */
+
+#define ANY_STATE -1
+#define LINEAR_BASE_CELLS 65536
+
+typedef struct {
+    const Scoring* scoring;
+    const int* sA;
+    int nA;
+    const int* sB;
+    int nB;
+    double* M;       /* forward scores in the current row */
+    double* Ix;
+    double* Iy;
+    double* rM;      /* backward scores in the current row */
+    double* rIx;
+    double* rIy;
+    unsigned char* traces;
+    unsigned char* moves;  /* the moves along the path, from start to end */
+    Py_ssize_t n;          /* number of moves stored */
+} LinearSpace;
+
+/* Gap scores for a horizontal move in row i. */
+static inline void
+_gap_scores_A(const Scoring* scoring, int i, int nA, double* open, double* extend)
+{
+    if (scoring->mode == Local || (i > 0 && i < nA)) {
+        *open = scoring->open_A;
+        *extend = scoring->extend_A;
+    }
+    else if (i == 0) {
+        *open = scoring->left_open_A;
+        *extend = scoring->left_extend_A;
+    }
+    else {
+        *open = scoring->right_open_A;
+        *extend = scoring->right_extend_A;
+    }
+}
+
+/* Gap scores for a vertical move in column j. */
+static inline void
+_gap_scores_B(const Scoring* scoring, int j, int nB, double* open, double* extend)
+{
+    if (scoring->mode == Local || (j > 0 && j < nB)) {
+        *open = scoring->open_B;
+        *extend = scoring->extend_B;
+    }
+    else if (j == 0) {
+        *open = scoring->left_open_B;
+        *extend = scoring->left_extend_B;
+    }
+    else {
+        *open = scoring->right_open_B;
+        *extend = scoring->right_extend_B;
+    }
+}
+
+/* Calculate the scores of the best paths starting at (i0, j0) in the given
+ * state, for rows i0 to i1 and columns j0 to j1. On return, space->M,
+ * space->Ix, and space->Iy contain the scores in row i1. If traces is not
+ * NULL, the trace codes of all cells are stored there.
+ */
+static void
+_linear_forward(LinearSpace* space, int i0, int i1, int j0, int j1, int start,
+                unsigned char* traces)
+{
+    const Scoring* scoring = space->scoring;
+    const int* sA = space->sA;
+    const int* sB = space->sB;
+    const int nA = space->nA;
+    const int nB = space->nB;
+    const int W = j1 - j0 + 1;
+    double* M = space->M;
+    double* Ix = space->Ix;
+    double* Iy = space->Iy;
+    double open_A, extend_A, open_B, extend_B;
+    double dM, dIx, dIy;
+    double uM, uIx, uIy;
+    double score, temp;
+    int i, j, k;
+    int code;
+    unsigned char trace;
+
+    _gap_scores_A(scoring, i0, nA, &open_A, &extend_A);
+    M[0] = -DBL_MAX;
+    Ix[0] = -DBL_MAX;
+    Iy[0] = -DBL_MAX;
+    switch (start) {
+        case FROM_M: M[0] = 0; break;
+        case FROM_Ix: Ix[0] = 0; break;
+        case FROM_Iy: Iy[0] = 0; break;
+    }
+    if (traces) traces[0] = 0;
+    /* keep the scores of the previous cell in local variables */
+    dM = M[0];
+    dIx = Ix[0];
+    dIy = Iy[0];
+    for (k = 1; k < W; k++) {
+        score = dM + open_A;
+        code = FROM_M;
+        temp = dIx + open_A;
+        if (temp > score) {
+            score = temp;
+            code = FROM_Ix;
+        }
+        temp = dIy + extend_A;
+        if (temp > score) {
+            score = temp;
+            code = FROM_Iy;
+        }
+        M[k] = -DBL_MAX;
+        Ix[k] = -DBL_MAX;
+        Iy[k] = score;
+        if (traces) traces[k] = code << 4;
+        dM = -DBL_MAX;
+        dIx = -DBL_MAX;
+        dIy = score;
+    }
+    for (i = i0 + 1; i <= i1; i++) {
+        _gap_scores_A(scoring, i, nA, &open_A, &extend_A);
+        dM = -DBL_MAX;
+        dIx = -DBL_MAX;
+        dIy = -DBL_MAX;
+        for (k = 0; k < W; k++) {
+            j = j0 + k;
+            _gap_scores_B(scoring, j, nB, &open_B, &extend_B);
+            uM = M[k];
+            uIx = Ix[k];
+            uIy = Iy[k];
+            trace = 0;
+            /* diagonal move from cell (i-1, j-1) */
+            if (k > 0) {
+                score = dM;
+                code = FROM_M;
+                if (dIx > score) {
+                    score = dIx;
+                    code = FROM_Ix;
+                }
+                if (dIy > score) {
+                    score = dIy;
+                    code = FROM_Iy;
+                }
+                M[k] = score + _substitution_score(scoring, sA[i-1], sB[j-1]);
+                trace = code;
+            }
+            else M[k] = -DBL_MAX;
+            /* vertical move from cell (i-1, j) */
+            score = uM + open_B;
+            code = FROM_M;
+            temp = uIx + extend_B;
+            if (temp > score) {
+                score = temp;
+                code = FROM_Ix;
+            }
+            temp = uIy + open_B;
+            if (temp > score) {
+                score = temp;
+                code = FROM_Iy;
+            }
+            Ix[k] = score;
+            trace |= code << 2;
+            /* horizontal move from cell (i, j-1) */
+            if (k > 0) {
+                score = M[k-1] + open_A;
+                code = FROM_M;
+                temp = Ix[k-1] + open_A;
+                if (temp > score) {
+                    score = temp;
+                    code = FROM_Ix;
+                }
+                temp = Iy[k-1] + extend_A;
+                if (temp > score) {
+                    score = temp;
+                    code = FROM_Iy;
+                }
+                Iy[k] = score;
+                trace |= code << 4;
+            }
+            else Iy[k] = -DBL_MAX;
+            if (traces) traces[(size_t)(i - i0) * W + k] = trace;
+            dM = uM;
+            dIx = uIx;
+            dIy = uIy;
+        }
+    }
+}
+
+/* Calculate the scores of the best paths from each cell in rows i0 to i1
+ * and columns j0 to j1 to the cell (i1, j1), which should be reached in the
+ * given state, or in any state if end is ANY_STATE. The scores depend on
+ * the state in which each cell was reached. On return, space->rM,
+ * space->rIx, and space->rIy contain the scores in row i0.
+ */
+static void
+_linear_backward(LinearSpace* space, int i0, int i1, int j0, int j1, int end)
+{
+    const Scoring* scoring = space->scoring;
+    const int* sA = space->sA;
+    const int* sB = space->sB;
+    const int nA = space->nA;
+    const int nB = space->nB;
+    const int W = j1 - j0 + 1;
+    double* M = space->rM;
+    double* Ix = space->rIx;
+    double* Iy = space->rIy;
+    double open_A, extend_A, open_B, extend_B;
+    double diagonal, vertical, horizontal;
+    double dM, uM, score;
+    int i, j, k;
+
+    _gap_scores_A(scoring, i1, nA, &open_A, &extend_A);
+    M[W-1] = (end == ANY_STATE || end == FROM_M) ? 0 : -DBL_MAX;
+    Ix[W-1] = (end == ANY_STATE || end == FROM_Ix) ? 0 : -DBL_MAX;
+    Iy[W-1] = (end == ANY_STATE || end == FROM_Iy) ? 0 : -DBL_MAX;
+    horizontal = Iy[W-1];
+    for (k = W - 2; k >= 0; k--) {
+        M[k] = horizontal + open_A;
+        Ix[k] = horizontal + open_A;
+        Iy[k] = horizontal + extend_A;
+        horizontal = Iy[k];
+    }
+    for (i = i1 - 1; i >= i0; i--) {
+        _gap_scores_A(scoring, i, nA, &open_A, &extend_A);
+        dM = -DBL_MAX;
+        for (k = W - 1; k >= 0; k--) {
+            j = j0 + k;
+            _gap_scores_B(scoring, j, nB, &open_B, &extend_B);
+            uM = M[k];
+            vertical = Ix[k];
+            if (k < W - 1) {
+                diagonal = dM + _substitution_score(scoring, sA[i], sB[j]);
+                horizontal = Iy[k+1];
+            }
+            else {
+                diagonal = -DBL_MAX;
+                horizontal = -DBL_MAX;
+            }
+            score = diagonal;
+            if (vertical + open_B > score) score = vertical + open_B;
+            if (horizontal + open_A > score) score = horizontal + open_A;
+            M[k] = score;
+            score = diagonal;
+            if (vertical + extend_B > score) score = vertical + extend_B;
+            if (horizontal + open_A > score) score = horizontal + open_A;
+            Ix[k] = score;
+            score = diagonal;
+            if (vertical + open_B > score) score = vertical + open_B;
+            if (horizontal + extend_A > score) score = horizontal + extend_A;
+            Iy[k] = score;
+            dM = uM;
+        }
+    }
+}
+
+/* Find the optimal path from cell (i0, j0) in state start to cell (i1, j1)
+ * in state end (or in any state if end is ANY_STATE), append its moves to
+ * space->moves, and return its score.
+ */
+static double
+_linear_align(LinearSpace* space, int i0, int i1, int j0, int j1,
+              int start, int end)
+{
+    const int W = j1 - j0 + 1;
+    int i, j, k;
+    int imid, jmid = j0;
+    int state = FROM_M;
+    int code;
+    double score = -DBL_MAX;
+    double temp;
+    unsigned char trace;
+    unsigned char* moves;
+    unsigned char move;
+    Py_ssize_t n;
+
+    if (i1 - i0 <= 1 || (size_t)(i1 - i0 + 1) * W <= LINEAR_BASE_CELLS) {
+        _linear_forward(space, i0, i1, j0, j1, start, space->traces);
+        k = W - 1;
+        if (end == ANY_STATE || end == FROM_M) {
+            score = space->M[k];
+            state = FROM_M;
+        }
+        if ((end == ANY_STATE || end == FROM_Ix) && space->Ix[k] > score) {
+            score = space->Ix[k];
+            state = FROM_Ix;
+        }
+        if ((end == ANY_STATE || end == FROM_Iy) && space->Iy[k] > score) {
+            score = space->Iy[k];
+            state = FROM_Iy;
+        }
+        moves = space->moves + space->n;
+        n = 0;
+        i = i1;
+        j = j1;
+        while (i > i0 || j > j0) {
+            trace = space->traces[(size_t)(i - i0) * W + (j - j0)];
+            switch (state) {
+                case FROM_M:
+                    move = DIAGONAL;
+                    code = trace & 0x3;
+                    i--;
+                    j--;
+                    break;
+                case FROM_Ix:
+                    move = VERTICAL;
+                    code = (trace >> 2) & 0x3;
+                    i--;
+                    break;
+                case FROM_Iy:
+                default:
+                    move = HORIZONTAL;
+                    code = (trace >> 4) & 0x3;
+                    j--;
+                    break;
+            }
+            moves[n++] = move;
+            state = code;
+        }
+        /* the moves were stored starting from the end of the path */
+        for (k = 0; k < n / 2; k++) {
+            move = moves[k];
+            moves[k] = moves[n-1-k];
+            moves[n-1-k] = move;
+        }
+        space->n += n;
+        return score;
+    }
+    imid = (i0 + i1) / 2;
+    _linear_forward(space, i0, imid, j0, j1, start, NULL);
+    _linear_backward(space, imid, i1, j0, j1, end);
+    for (k = 0; k < W; k++) {
+        temp = space->M[k] + space->rM[k];
+        if (temp > score) {
+            score = temp;
+            jmid = j0 + k;
+            state = FROM_M;
+        }
+        temp = space->Ix[k] + space->rIx[k];
+        if (temp > score) {
+            score = temp;
+            jmid = j0 + k;
+            state = FROM_Ix;
+        }
+        temp = space->Iy[k] + space->rIy[k];
+        if (temp > score) {
+            score = temp;
+            jmid = j0 + k;
+            state = FROM_Iy;
+        }
+    }
+    _linear_align(space, i0, imid, j0, jmid, start, state);
+    _linear_align(space, imid, i1, jmid, j1, state, end);
+    return score;
+}
+
+/* Find the score and the start and end points of the best local alignment,
+ * using the Smith-Waterman recursion while keeping track of the start point
+ * of the best path into each cell. Returns false if memory allocation fails.
+ */
+static bool
+_linear_local_endpoints(LinearSpace* space, double* score,
+                        int* iStart, int* jStart, int* iEnd, int* jEnd)
+{
+    const Scoring* scoring = space->scoring;
+    const int* sA = space->sA;
+    const int* sB = space->sB;
+    const int nA = space->nA;
+    const int nB = space->nB;
+    double* M = space->M;
+    double* Ix = space->Ix;
+    double* Iy = space->Iy;
+    const double open_A = scoring->open_A;
+    const double extend_A = scoring->extend_A;
+    const double open_B = scoring->open_B;
+    const double extend_B = scoring->extend_B;
+    double dM, dIx, dIy;
+    double uM, uIx, uIy;
+    double value, temp;
+    double maximum = 0;
+    Py_ssize_t dsM, dsIx, dsIy;
+    Py_ssize_t usM, usIx, usIy;
+    Py_ssize_t origin, best = 0;
+    int i, j;
+    Py_ssize_t* starts = PyMem_RawMalloc(3 * (nB + 1) * sizeof(Py_ssize_t));
+    Py_ssize_t* sM = starts;
+    Py_ssize_t* sIx = sM + nB + 1;
+    Py_ssize_t* sIy = sIx + nB + 1;
+    if (!starts) return false;
+
+    for (j = 0; j <= nB; j++) {
+        M[j] = -DBL_MAX;
+        Ix[j] = -DBL_MAX;
+        Iy[j] = -DBL_MAX;
+        sM[j] = 0;
+        sIx[j] = 0;
+        sIy[j] = 0;
+    }
+    *iEnd = 0;
+    *jEnd = 0;
+    for (i = 1; i <= nA; i++) {
+        dM = M[0];
+        dIx = Ix[0];
+        dIy = Iy[0];
+        dsM = sM[0];
+        dsIx = sIx[0];
+        dsIy = sIy[0];
+        for (j = 1; j <= nB; j++) {
+            uM = M[j];
+            uIx = Ix[j];
+            uIy = Iy[j];
+            usM = sM[j];
+            usIx = sIx[j];
+            usIy = sIy[j];
+            /* diagonal move from cell (i-1, j-1) */
+            value = dM;
+            origin = dsM;
+            if (dIx > value) {
+                value = dIx;
+                origin = dsIx;
+            }
+            if (dIy > value) {
+                value = dIy;
+                origin = dsIy;
+            }
+            if (value <= 0) {
+                value = 0;
+                origin = (Py_ssize_t)(i - 1) * (nB + 1) + (j - 1);
+            }
+            M[j] = value + _substitution_score(scoring, sA[i-1], sB[j-1]);
+            sM[j] = origin;
+            /* vertical move from cell (i-1, j) */
+            value = uM + open_B;
+            origin = usM;
+            temp = uIx + extend_B;
+            if (temp > value) {
+                value = temp;
+                origin = usIx;
+            }
+            temp = uIy + open_B;
+            if (temp > value) {
+                value = temp;
+                origin = usIy;
+            }
+            Ix[j] = value;
+            sIx[j] = origin;
+            /* horizontal move from cell (i, j-1) */
+            value = M[j-1] + open_A;
+            origin = sM[j-1];
+            temp = Ix[j-1] + open_A;
+            if (temp > value) {
+                value = temp;
+                origin = sIx[j-1];
+            }
+            temp = Iy[j-1] + extend_A;
+            if (temp > value) {
+                value = temp;
+                origin = sIy[j-1];
+            }
+            Iy[j] = value;
+            sIy[j] = origin;
+            if (M[j] > maximum) {
+                maximum = M[j];
+                best = sM[j];
+                *iEnd = i;
+                *jEnd = j;
+            }
+            dM = uM;
+            dIx = uIx;
+            dIy = uIy;
+            dsM = usM;
+            dsIx = usIx;
+            dsIy = usIy;
+        }
+    }
+    *score = maximum;
+    *iStart = (int)(best / (nB + 1));
+    *jStart = (int)(best % (nB + 1));
+    PyMem_RawFree(starts);
+    return true;
+}
+
+/* Calculate the optimal alignment score and path, storing the moves along
+ * the path in space->moves and its start point in i and j. Returns false if
+ * memory allocation fails. This function does not use the Python C API, and
+ * can be called without holding the GIL.
+ */
+static bool
+_linear(LinearSpace* space, double* score, int* i, int* j)
+{
+    int iEnd, jEnd;
+    unsigned char* moves = space->moves;
+    Py_ssize_t k;
+    switch (space->scoring->mode) {
+        case Global:
+            *i = 0;
+            *j = 0;
+            *score = _linear_align(space, 0, space->nA, 0, space->nB,
+                                   FROM_M, ANY_STATE);
+            break;
+        case Local:
+            if (!_linear_local_endpoints(space, score, i, j, &iEnd, &jEnd))
+                return false;
+            if (*score <= 0) break;
+            _linear_align(space, *i, iEnd, *j, jEnd, FROM_M, FROM_M);
+            /* gaps at the start of the path can only occur if they have a
+             * zero score; remove them, as local alignments start with an
+             * aligned pair of letters. */
+            for (k = 0; k < space->n; k++) {
+                if (moves[k] == DIAGONAL) break;
+                if (moves[k] == VERTICAL) (*i)++;
+                else (*j)++;
+            }
+            space->n -= k;
+            memmove(moves, moves + k, space->n);
+            break;
+        default:
+            break;
+    }
+    return true;
+}
+
+static PyObject*
+Aligner_linear_align(Aligner* self, const int* sA, int nA, const int* sB, int nB,
+                     unsigned char strand)
+{
+    Scoring scoring;
+    LinearSpace space;
+    double score = 0;
+    int i = 0, j = 0;
+    int direction;
+    bool ok;
+    Py_ssize_t k, n;
+    size_t size;
+    double* rows;
+    int* points = NULL;
+    PyObject* path;
+    PyObject* paths = NULL;
+
+    if (self->band != BAND_NONE) {
+        PyErr_SetString(PyExc_ValueError,
+                        "the linear-memory traceback cannot be combined with "
+                        "banded alignment");
+        return NULL;
+    }
+    if (!_check_algorithm(self, "the linear-memory traceback")) return NULL;
+    _init_scoring(self, strand, &scoring);
+    space.scoring = &scoring;
+    space.sA = sA;
+    space.nA = nA;
+    space.sB = sB;
+    space.nB = nB;
+    space.n = 0;
+    size = 2 * ((size_t)nB + 1);
+    if (size < LINEAR_BASE_CELLS) size = LINEAR_BASE_CELLS;
+    rows = PyMem_RawMalloc(6 * ((size_t)nB + 1) * sizeof(double));
+    space.traces = PyMem_RawMalloc(size);
+    space.moves = PyMem_RawMalloc((size_t)nA + nB + 1);
+    if (!rows || !space.traces || !space.moves) {
+        PyErr_NoMemory();
+        goto exit;
+    }
+    space.M = rows;
+    space.Ix = space.M + nB + 1;
+    space.Iy = space.Ix + nB + 1;
+    space.rM = space.Iy + nB + 1;
+    space.rIx = space.rM + nB + 1;
+    space.rIy = space.rIx + nB + 1;
+    Py_BEGIN_ALLOW_THREADS
+    ok = _linear(&space, &score, &i, &j);
+    Py_END_ALLOW_THREADS
+    if (!ok) {
+        PyErr_NoMemory();
+        goto exit;
+    }
+    paths = PyList_New(0);
+    if (!paths) goto exit;
+    if (scoring.mode == Local && score <= 0) goto exit;
+    /* store the start point, the points where the direction changes, and
+     * the end point of the path */
+    points = PyMem_Malloc(2 * ((size_t)space.n + 1) * sizeof(int));
+    if (!points) {
+        PyErr_NoMemory();
+        Py_CLEAR(paths);
+        goto exit;
+    }
+    n = 0;
+    direction = 0;
+    for (k = 0; k < space.n; k++) {
+        if (space.moves[k] != direction) {
+            points[2*n] = i;
+            points[2*n+1] = j;
+            n++;
+            direction = space.moves[k];
+        }
+        switch (direction) {
+            case DIAGONAL: i++; j++; break;
+            case VERTICAL: i++; break;
+            case HORIZONTAL: j++; break;
+        }
+    }
+    points[2*n] = i;
+    points[2*n+1] = j;
+    n++;
+    path = _create_path(points, n, nB, strand);
+    if (!path || PyList_Append(paths, path) < 0) Py_CLEAR(paths);
+    Py_XDECREF(path);
+exit:
+    PyMem_RawFree(rows);
+    PyMem_RawFree(space.traces);
+    PyMem_RawFree(space.moves);
+    PyMem_Free(points);
+    if (!paths) return NULL;
+    return Py_BuildValue("dN", score, paths);
+}
+
+/* ----------------- X-drop extension ----------------- */
+
+/* The X-drop extension (Zhang et al., Journal of Computational Biology 5:
+ * 197, 1998) aligns prefixes of two sequences, starting from cell (0, 0).
+ * Cells scoring more than xdrop below the best score found so far are
+ * pruned, and only the columns reachable from the cells that survived in the
+ * previous row are calculated. The extension stops when all cells in a row
+ * are pruned, such that the run time depends on the length of the alignment
+ * and not on the length of the sequences.
+ */
+
+typedef struct {
+    double M;
+    double Ix;
+    double Iy;
+} XdropCell;
+
+typedef struct {
+    unsigned char* traces;  /* traces of the calculated cells, row by row */
+    size_t* offsets;        /* index in traces of the first cell of each row */
+    int* starts;            /* first column calculated in each row */
+} XdropTraces;
+
+static unsigned char
+_xdrop_trace(const void* data, int i, int j)
+{
+    const XdropTraces* x = data;
+    return x->traces[x->offsets[i] + (size_t)(j - x->starts[i])];
+}
+
+static bool
+_xdrop_reserve(void** buffer, size_t* capacity, size_t needed, size_t size)
+{
+    size_t n = *capacity;
+    void* p;
+    if (needed <= n) return true;
+    if (n == 0) n = 256;
+    while (n < needed) n *= 2;
+    p = PyMem_RawRealloc(*buffer, n * size);
+    if (!p) return false;
+    *buffer = p;
+    *capacity = n;
+    return true;
+}
+
+/* Calculate the X-drop extension, storing the traces of the calculated cells
+ * in x. On return, score contains the best score of the extension (at least
+ * zero, for the empty extension), and i and j the cell where it ends in the
+ * M state; truncated is true if cells in the last row or column of the
+ * matrix survived, in which case longer sequences may give a longer
+ * extension. The caller should release the memory in x. Returns false if
+ * memory allocation fails. This function does not use the Python C API, and
+ * can be called without holding the GIL.
+ */
+static bool
+_xdrop_fill(const Scoring* scoring, const int* sA, int nA, const int* sB, int nB,
+            double xdrop, XdropTraces* x, double* score, int* iEnd, int* jEnd,
+            bool* truncated)
+{
+    const XdropCell dead = {-DBL_MAX, -DBL_MAX, -DBL_MAX};
+    const XdropCell* diagonal;
+    const XdropCell* up;
+    const XdropCell* left;
+    XdropCell* previous = NULL;
+    XdropCell* current = NULL;
+    XdropCell* swap;
+    size_t previous_capacity = 0;
+    size_t current_capacity = 0;
+    size_t offsets_capacity = 0;
+    size_t starts_capacity = 0;
+    size_t traces_capacity = 0;
+    size_t capacity;
+    size_t n = 0;
+    int i, j, k;
+    int lo = 0;     /* first column calculated in the current row */
+    int plo = 0;    /* columns calculated in the previous row: plo to phi-1 */
+    int phi = 0;
+    int plast = 0;  /* last column surviving in the previous row */
+    int first, last;
+    int code;
+    unsigned char trace;
+    double M, Ix, Iy;
+    double temp;
+    double best = 0;
+    bool ok = false;
+
+    x->traces = NULL;
+    x->offsets = NULL;
+    x->starts = NULL;
+    *iEnd = 0;
+    *jEnd = 0;
+    *truncated = false;
+    for (i = 0; i <= nA; i++) {
+        if (!_xdrop_reserve((void**)&x->offsets, &offsets_capacity, i + 1,
+                            sizeof(size_t))) goto exit;
+        if (!_xdrop_reserve((void**)&x->starts, &starts_capacity, i + 1,
+                            sizeof(int))) goto exit;
+        x->offsets[i] = n;
+        x->starts[i] = lo;
+        first = -1;
+        last = -1;
+        for (j = lo, k = 0; j <= nB; j++, k++) {
+            /* beyond the previous row, cells can only be reached by a
+             * horizontal move from a surviving cell in the current row */
+            if (j > plast + 1 && (k == 0 || last < j - 1)) break;
+            if (i == 0 && j == 0) {
+                M = 0;
+                Ix = -DBL_MAX;
+                Iy = -DBL_MAX;
+                trace = 0;
+            }
+            else {
+                diagonal = (j - 1 >= plo && j - 1 < phi) ? &previous[j-1-plo] : &dead;
+                up = (j >= plo && j < phi) ? &previous[j-plo] : &dead;
+                left = (k > 0) ? &current[k-1] : &dead;
+                /* diagonal move from cell (i-1, j-1) */
+                if (i > 0 && j > 0) {
+                    M = diagonal->M;
+                    code = FROM_M;
+                    if (diagonal->Ix > M) {
+                        M = diagonal->Ix;
+                        code = FROM_Ix;
+                    }
+                    if (diagonal->Iy > M) {
+                        M = diagonal->Iy;
+                        code = FROM_Iy;
+                    }
+                    M += _substitution_score(scoring, sA[i-1], sB[j-1]);
+                }
+                else {
+                    M = -DBL_MAX;
+                    code = FROM_M;
+                }
+                trace = code;
+                /* vertical move from cell (i-1, j) */
+                Ix = up->M + scoring->open_B;
+                code = FROM_M;
+                temp = up->Ix + scoring->extend_B;
+                if (temp > Ix) {
+                    Ix = temp;
+                    code = FROM_Ix;
+                }
+                temp = up->Iy + scoring->open_B;
+                if (temp > Ix) {
+                    Ix = temp;
+                    code = FROM_Iy;
+                }
+                trace |= code << 2;
+                /* horizontal move from cell (i, j-1) */
+                Iy = left->M + scoring->open_A;
+                code = FROM_M;
+                temp = left->Ix + scoring->open_A;
+                if (temp > Iy) {
+                    Iy = temp;
+                    code = FROM_Ix;
+                }
+                temp = left->Iy + scoring->extend_A;
+                if (temp > Iy) {
+                    Iy = temp;
+                    code = FROM_Iy;
+                }
+                trace |= code << 4;
+                if (M > best) {
+                    best = M;
+                    *iEnd = i;
+                    *jEnd = j;
+                }
+            }
+            temp = M;
+            if (Ix > temp) temp = Ix;
+            if (Iy > temp) temp = Iy;
+            if (temp < best - xdrop) {
+                M = -DBL_MAX;
+                Ix = -DBL_MAX;
+                Iy = -DBL_MAX;
+            }
+            else {
+                if (first < 0) first = j;
+                last = j;
+                if (i == nA || j == nB) *truncated = true;
+            }
+            if (!_xdrop_reserve((void**)&current, &current_capacity, k + 1,
+                                sizeof(XdropCell))) goto exit;
+            if (!_xdrop_reserve((void**)&x->traces, &traces_capacity, n + 1,
+                                sizeof(unsigned char))) goto exit;
+            current[k].M = M;
+            current[k].Ix = Ix;
+            current[k].Iy = Iy;
+            x->traces[n++] = trace;
+        }
+        if (first < 0) break;
+        plo = lo;
+        phi = j;
+        plast = last;
+        lo = first;
+        swap = previous;
+        previous = current;
+        current = swap;
+        capacity = previous_capacity;
+        previous_capacity = current_capacity;
+        current_capacity = capacity;
+    }
+    *score = best;
+    ok = true;
+exit:
+    PyMem_RawFree(previous);
+    PyMem_RawFree(current);
+    return ok;
+}
+
+static void
+_xdrop_free(XdropTraces* x)
+{
+    PyMem_RawFree(x->traces);
+    PyMem_RawFree(x->offsets);
+    PyMem_RawFree(x->starts);
+}
+
+static bool _check_indices(Py_buffer* view, Py_buffer* substitution_matrix) {
+    const Py_ssize_t m = substitution_matrix->shape[0];
+    const int* indices = view->buf;
+    const Py_ssize_t n = view->len / view->itemsize;
+    Py_ssize_t i;
+    for (i = 0; i < n; i++) {
+        const int index = indices[i];
+        if (index < 0) {
+            PyErr_Format(PyExc_ValueError,
+                         "sequence item %zd is negative (%d)",
+                         i, index);
+            return false;
+        }
+        if (index >= m) {
+            PyErr_Format(PyExc_ValueError,
+                         "sequence item %zd is out of bound"
+                         " (%d, should be < %zd)", i, index, m);
+            return false;
+        }
+    }
+    return true;
+}
+
+static bool _map_indices(Py_buffer* view, const int* mapping, Py_ssize_t m) {
+    Py_ssize_t i;
+    const Py_ssize_t n = view->len / view->itemsize;
+    int* const indices = view->buf;
+    for (i = 0; i < n; i++) {
+        int index = indices[i];
+        if (index < 0) {
+            PyErr_Format(PyExc_ValueError,
+                         "sequence item %zd is negative (%d)",
+                         i, index);
+            return false;
+        }
+        if (index >= m) {
+            PyErr_Format(PyExc_ValueError,
+                         "sequence item %zd is out of bound"
+                         " (%d, should be < %zd)", i, index, m);
+            return false;
+        }
+        index = mapping[index];
+        if (index == MISSING_LETTER) {
+            PyErr_SetString(PyExc_ValueError,
+                "sequence contains letters not in the alphabet");
+            return false;
+        }
+        indices[i] = index;
+    }
+    return true;
+}
+
+static bool _prepare_index(Py_buffer* substitution_matrix, Py_buffer* view)
+{
+    if (PyObject_IsInstance(substitution_matrix->obj,
+                            (PyObject*)Array_Type)) {
+        const PyTypeObject* basetype = Array_Type->tp_base;
+        const Py_ssize_t offset = basetype->tp_basicsize;
+        Fields* fields = (Fields*)((intptr_t)substitution_matrix->obj + offset);
+        Py_buffer* buffer = &fields->mapping;
+        const int* mapping = buffer->buf;
+        if (mapping) {
+            const Py_ssize_t m = buffer->len / buffer->itemsize;
+            return _map_indices(view, mapping, m);
+        }
+    }
+    return _check_indices(view, substitution_matrix);
+}
+
+static bool _prepare_indices(Py_buffer* substitution_matrix, Py_buffer* bA, Py_buffer* bB)
+{
+    if (!_prepare_index(substitution_matrix, bA)) return false;
+    if (!_prepare_index(substitution_matrix, bB)) return false;
+    return true;
+}
+
+static int
+sequence_converter(PyObject* argument, void* pointer)
+{
+    Py_buffer* view = pointer;
+    const int flag = PyBUF_FORMAT | PyBUF_C_CONTIGUOUS;
+
+    if (argument == NULL) {
+        PyBuffer_Release(view);
+        return 1;
+    }
+
+    if (PyObject_GetBuffer(argument, view, flag) != 0) {
+        PyErr_SetString(PyExc_TypeError, "argument is not a sequence");
+        return 0;
+    }
+    if (view->ndim != 1) {
+        PyErr_Format(PyExc_ValueError,
+                     "sequence has incorrect rank (%d expected 1)", view->ndim);
+        PyBuffer_Release(view);
+        return 0;
+    }
+    if (view->len == 0) {
+        PyErr_SetString(PyExc_ValueError, "sequence has zero length");
+        PyBuffer_Release(view);
+        return 0;
+    }
+    if (strcmp(view->format, "i") != 0 && strcmp(view->format, "l") != 0) {
+        PyErr_Format(PyExc_ValueError,
+                     "sequence has incorrect data type '%s'", view->format);
+        PyBuffer_Release(view);
+        return 0;
+    }
+    if (view->itemsize != sizeof(int)) {
+        PyErr_Format(PyExc_ValueError,
+                    "sequence has unexpected item byte size "
+                    "(%ld, expected %ld)", view->itemsize, sizeof(int));
+        PyBuffer_Release(view);
+        return 0;
+    }
+    return Py_CLEANUP_SUPPORTED;
+}
+ 
+static int
+strand_converter(PyObject* argument, void* pointer)
+{
+    if (!PyUnicode_Check(argument)) goto error;
+    if (PyUnicode_READY(argument) == -1) return 0;
+    if (PyUnicode_GET_LENGTH(argument) == 1) {
+        const Py_UCS4 ch = PyUnicode_READ_CHAR(argument, 0);
+        if (ch < 128) {
+            const char c = ch;
+            if (ch == '+' || ch == '-') {
+                *((char*)pointer) = c;
+                return 1;
+            }
+        }
+    }
+error:
+    PyErr_SetString(PyExc_ValueError, "strand must be '+' or '-'");
+    return 0;
+}
+
+static const char Aligner_score__doc__[] = "calculates the alignment score";
+
+static PyObject*
+Aligner_score(Aligner* self, PyObject* args, PyObject* keywords)
 {
     const int* sA;
     const int* sB;
@@ -7390,6 +8928,9 @@ Aligner_score(Aligner* self, PyObject* args, PyObject* keywords)
                                      strand_converter, &strand))
         return NULL;
 
+    /* Keep the substitution matrix alive while the GIL is released */
+    Py_XINCREF(substitution_matrix);
+
     if (substitution_matrix) {
         if (!_prepare_indices(&self->substitution_matrix, &bA, &bB)) goto exit;
     }
@@ -7403,6 +8944,11 @@ Aligner_score(Aligner* self, PyObject* args, PyObject* keywords)
     sA = bA.buf;
     sB = bB.buf;
 
+    if (self->band != BAND_NONE) {
+        result = Aligner_banded_score(self, sA, nA, sB, nB, strand);
+        goto exit;
+    }
+
     switch (algorithm) {
         case NeedlemanWunschSmithWaterman:
             switch (mode) {
@@ -7480,6 +9026,7 @@ Aligner_score(Aligner* self, PyObject* args, PyObject* keywords)
 exit:
     sequence_converter(NULL, &bA);
     sequence_converter(NULL, &bB);
+    Py_XDECREF(substitution_matrix);
 
     return result;
 }
@@ -7509,6 +9056,9 @@ Aligner_align(Aligner* self, PyObject* args, PyObject* keywords)
                                     strand_converter, &strand))
         return NULL;
 
+    /* Keep the substitution matrix alive while the GIL is released */
+    Py_XINCREF(substitution_matrix);
+
     if (substitution_matrix) {
         if (!_prepare_indices(&self->substitution_matrix, &bA, &bB)) goto exit;
     }
@@ -7522,6 +9072,15 @@ Aligner_align(Aligner* self, PyObject* args, PyObject* keywords)
     sA = bA.buf;
     sB = bB.buf;
 
+    if (self->traceback == LinearTraceback) {
+        result = Aligner_linear_align(self, sA, nA, sB, nB, strand);
+        goto exit;
+    }
+    if (self->band != BAND_NONE) {
+        result = Aligner_banded_align(self, sA, nA, sB, nB, strand);
+        goto exit;
+    }
+
     switch (algorithm) {
         case NeedlemanWunschSmithWaterman:
             switch (mode) {
@@ -7599,6 +9158,80 @@ Aligner_align(Aligner* self, PyObject* args, PyObject* keywords)
 exit:
     sequence_converter(NULL, &bA);
     sequence_converter(NULL, &bB);
+    Py_XDECREF(substitution_matrix);
+
+    return result;
+}
+
+static const char Aligner_xdrop_extend__doc__[] =
+"extend an alignment from the start of both sequences by the X-drop algorithm";
+
+static PyObject*
+Aligner_xdrop_extend(Aligner* self, PyObject* args, PyObject* keywords)
+{
+    int nA;
+    int nB;
+    int i, j;
+    bool ok;
+    bool truncated = false;
+    double xdrop;
+    double score = 0;
+    Scoring scoring;
+    XdropTraces traces;
+    Py_buffer bA = {0};
+    Py_buffer bB = {0};
+    PyObject* path;
+    PyObject* result = NULL;
+    PyObject* substitution_matrix = self->substitution_matrix.obj;
+
+    static char *kwlist[] = {"sequenceA", "sequenceB", "xdrop", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, keywords, "O&O&d", kwlist,
+                                     sequence_converter, &bA,
+                                     sequence_converter, &bB,
+                                     &xdrop))
+        return NULL;
+
+    /* Keep the substitution matrix alive while the GIL is released */
+    Py_XINCREF(substitution_matrix);
+
+    if (!(xdrop >= 0)) {
+        PyErr_SetString(PyExc_ValueError, "xdrop must be non-negative");
+        goto exit;
+    }
+    if (!_check_algorithm(self, "X-drop extension")) goto exit;
+    if (substitution_matrix) {
+        if (!_prepare_indices(&self->substitution_matrix, &bA, &bB)) goto exit;
+    }
+    nA = (int) (bA.len / bA.itemsize);
+    nB = (int) (bB.len / bB.itemsize);
+    if (nA != bA.len / bA.itemsize || nB != bB.len / bB.itemsize) {
+        PyErr_SetString(PyExc_ValueError, "sequences too long");
+        goto exit;
+    }
+    _init_scoring(self, '+', &scoring);
+    Py_BEGIN_ALLOW_THREADS
+    ok = _xdrop_fill(&scoring, bA.buf, nA, bB.buf, nB, xdrop, &traces,
+                     &score, &i, &j, &truncated);
+    Py_END_ALLOW_THREADS
+    if (!ok) PyErr_NoMemory();
+    else if (i == 0 && j == 0) {
+        const int points[] = {0, 0};
+        path = _create_path(points, 1, nB, '+');
+        if (path) result = Py_BuildValue("dNO", score, path,
+                                         truncated ? Py_True : Py_False);
+    }
+    else {
+        path = _trace_path(_xdrop_trace, &traces, Global, nB, i, j, FROM_M, '+');
+        if (path) result = Py_BuildValue("dNO", score, path,
+                                         truncated ? Py_True : Py_False);
+    }
+    _xdrop_free(&traces);
+
+exit:
+    sequence_converter(NULL, &bA);
+    sequence_converter(NULL, &bB);
+    Py_XDECREF(substitution_matrix);
 
     return result;
 }
@@ -7662,6 +9295,11 @@ static PyMethodDef Aligner_methods[] = {
      METH_VARARGS | METH_KEYWORDS,
      Aligner_align__doc__
     },
+    {"_xdrop_extend",
+     (PyCFunction)Aligner_xdrop_extend,
+     METH_VARARGS | METH_KEYWORDS,
+     Aligner_xdrop_extend__doc__
+    },
     {"warn_defaults_changed",
      (PyCFunction)Aligner_warn_defaults_changed,
      METH_NOARGS,
@@ -7685,6 +9323,448 @@ static PyTypeObject Aligner_Type = {
 };
 
 
+/* ----------------- query profiles ----------------- */
+
+/* A query profile stores the substitution scores of each letter against the
+ * query sequence, in the striped layout of Farrar (2007): the query is
+ * divided into PROFILE_LANES stretches of equal length, and query position j
+ * is stored in segment j % segments, lane j / segments. The local alignment
+ * score against a target is then calculated for all lanes simultaneously,
+ * using loops over the lanes that the compiler can vectorize. The striped
+ * algorithm uses integer scores; a profile for scores that are not integers
+ * falls back to the scalar Smith-Waterman recursion.
+ */
+
+#define PROFILE_LANES 8
+#define PROFILE_NEG (-(1 << 29))
+#define PROFILE_PAD (-(1 << 20))
+#define PROFILE_MAX (1 << 28)
+
+typedef struct {
+    PyObject_HEAD
+    Scoring scoring;
+    Py_buffer substitution_matrix;
+    int* query;
+    int length;
+    int* letters;  /* sorted distinct query letters, if no substitution matrix is used */
+    int nletters;
+    int nrows;
+    int segments;
+    int* profile;  /* NULL if the scores are not integers */
+    int open_A;
+    int extend_A;
+    int open_B;
+    int extend_B;
+    int maximum;   /* largest absolute value of any score */
+} QueryProfile;
+
+static void
+QueryProfile_clear(QueryProfile* self)
+{
+    PyBuffer_Release(&self->substitution_matrix);
+    PyMem_Free(self->query);
+    self->query = NULL;
+    PyMem_Free(self->letters);
+    self->letters = NULL;
+    PyMem_Free(self->profile);
+    self->profile = NULL;
+}
+
+static void
+QueryProfile_dealloc(QueryProfile* self)
+{
+    QueryProfile_clear(self);
+    Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+static int
+_compare_letters(const void* a, const void* b)
+{
+    const int x = *(const int*)a;
+    const int y = *(const int*)b;
+    return (x > y) - (x < y);
+}
+
+/* Return the profile row to be used for a letter in the target. */
+static inline int
+_profile_row(const QueryProfile* self, int letter)
+{
+    int lo, hi, mid;
+    if (self->scoring.substitution_matrix) return letter;
+    if (letter == self->scoring.wildcard) return self->nletters + 1;
+    lo = 0;
+    hi = self->nletters - 1;
+    while (lo <= hi) {
+        mid = (lo + hi) / 2;
+        if (self->letters[mid] < letter) lo = mid + 1;
+        else if (self->letters[mid] > letter) hi = mid - 1;
+        else return mid;
+    }
+    return self->nletters;
+}
+
+/* Return the substitution score of the letter of a profile row against a
+ * letter in the query. */
+static double
+_profile_score(const QueryProfile* self, int row, int letter)
+{
+    const Scoring* scoring = &self->scoring;
+    if (scoring->substitution_matrix)
+        return scoring->substitution_matrix[row * scoring->n + letter];
+    if (row < self->nletters)
+        return _substitution_score(scoring, self->letters[row], letter);
+    if (row > self->nletters || letter == scoring->wildcard) return 0;
+    return scoring->mismatch;
+}
+
+static bool
+_integer_score(double score, int* value)
+{
+    if (score != floor(score) || fabs(score) >= PROFILE_MAX) return false;
+    *value = (int)score;
+    return true;
+}
+
+static bool
+_create_profile(QueryProfile* self)
+{
+    const Scoring* scoring = &self->scoring;
+    const int m = self->length;
+    const int S = (m + PROFILE_LANES - 1) / PROFILE_LANES;
+    int r, s, l, j;
+    int value;
+    int maximum = 0;
+    int* profile;
+    int* p;
+
+    if (!_integer_score(scoring->open_A, &self->open_A)) return true;
+    if (!_integer_score(scoring->extend_A, &self->extend_A)) return true;
+    if (!_integer_score(scoring->open_B, &self->open_B)) return true;
+    if (!_integer_score(scoring->extend_B, &self->extend_B)) return true;
+    /* The striped recursion combines the M, Ix, and Iy states into a single
+     * score, which is exact only if gaps never increase the score and
+     * opening a gap never scores higher than extending one. */
+    if (self->extend_A > 0 || self->extend_B > 0) return true;
+    if (self->open_A > self->extend_A || self->open_B > self->extend_B)
+        return true;
+    maximum = -self->open_A;
+    if (-self->open_B > maximum) maximum = -self->open_B;
+    profile = PyMem_Malloc((size_t)self->nrows * S * PROFILE_LANES * sizeof(int));
+    if (!profile) {
+        PyErr_NoMemory();
+        return false;
+    }
+    p = profile;
+    for (r = 0; r < self->nrows; r++) {
+        for (s = 0; s < S; s++) {
+            for (l = 0; l < PROFILE_LANES; l++) {
+                j = l * S + s;
+                if (j < m) {
+                    if (!_integer_score(_profile_score(self, r, self->query[j]),
+                                        &value)) {
+                        PyMem_Free(profile);
+                        return true;
+                    }
+                    if (value > maximum) maximum = value;
+                    else if (-value > maximum) maximum = -value;
+                }
+                else value = PROFILE_PAD;
+                *(p++) = value;
+            }
+        }
+    }
+    self->segments = S;
+    self->maximum = maximum;
+    self->profile = profile;
+    return true;
+}
+
+static int
+QueryProfile_init(QueryProfile* self, PyObject* args, PyObject* kwds)
+{
+    Aligner* aligner;
+    Py_buffer view = {0};
+    PyObject* substitution_matrix;
+    int* query;
+    int* letters;
+    int i, k, m;
+    int result = -1;
+
+    static char *kwlist[] = {"aligner", "query", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O!O&", kwlist,
+                                     &Aligner_Type, &aligner,
+                                     sequence_converter, &view))
+        return -1;
+
+    QueryProfile_clear(self);
+    if (aligner->mode != Local) {
+        PyErr_SetString(PyExc_ValueError,
+                        "query profiles are only available for local "
+                        "alignments");
+        goto exit;
+    }
+    if (!_check_algorithm(aligner, "a query profile")) goto exit;
+    substitution_matrix = aligner->substitution_matrix.obj;
+    if (substitution_matrix) {
+        if (PyObject_GetBuffer(substitution_matrix, &self->substitution_matrix,
+                               PyBUF_FORMAT | PyBUF_ND) != 0) goto exit;
+        if (!_prepare_index(&self->substitution_matrix, &view)) goto exit;
+    }
+    _init_scoring(aligner, '+', &self->scoring);
+    self->scoring.substitution_matrix = self->substitution_matrix.buf;
+    m = (int)(view.len / view.itemsize);
+    if (m != view.len / view.itemsize) {
+        PyErr_SetString(PyExc_ValueError, "sequence too long");
+        goto exit;
+    }
+    query = PyMem_Malloc(m * sizeof(int));
+    if (!query) {
+        PyErr_NoMemory();
+        goto exit;
+    }
+    memcpy(query, view.buf, m * sizeof(int));
+    self->query = query;
+    self->length = m;
+    if (substitution_matrix) {
+        self->nletters = 0;
+        self->nrows = (int)self->scoring.n;
+    }
+    else {
+        letters = PyMem_Malloc(m * sizeof(int));
+        if (!letters) {
+            PyErr_NoMemory();
+            goto exit;
+        }
+        memcpy(letters, query, m * sizeof(int));
+        qsort(letters, m, sizeof(int), _compare_letters);
+        k = 0;
+        for (i = 0; i < m; i++)
+            if (i == 0 || letters[i] != letters[k-1]) letters[k++] = letters[i];
+        self->letters = letters;
+        self->nletters = k;
+        /* one row for each letter in the query, one for any other letter,
+         * and one for the wildcard */
+        self->nrows = k + 2;
+    }
+    if (!_create_profile(self)) goto exit;
+    result = 0;
+exit:
+    PyBuffer_Release(&view);
+    return result;
+}
+
+/* Calculate the best local alignment score of the target against the query
+ * profile, and the end point of the alignment, using the striped algorithm.
+ * The workspace should have room for 3 * segments * PROFILE_LANES integers.
+ */
+static void
+_striped_local(const QueryProfile* self, const int* target, int n,
+               int* workspace, int* score, int* iEnd, int* jEnd)
+{
+    const int S = self->segments;
+    const int L = PROFILE_LANES;
+    const int open_A = self->open_A;
+    const int extend_A = self->extend_A;
+    const int open_B = self->open_B;
+    const int extend_B = self->extend_B;
+    const int threshold = open_A - extend_A;
+    int* H = workspace;
+    int* Hp = H + S * L;
+    int* E = Hp + S * L;
+    int* h;
+    int* e;
+    int* swap;
+    const int* p;
+    const int* hp;
+    int vH[PROFILE_LANES];
+    int vF[PROFILE_LANES];
+    int vMax[PROFILE_LANES];
+    int i, j, l, s;
+    int x, best = 0, row_max;
+    bool more;
+
+    *iEnd = 0;
+    *jEnd = 0;
+    for (s = 0; s < S * L; s++) {
+        H[s] = 0;
+        E[s] = PROFILE_NEG;
+    }
+    for (i = 0; i < n; i++) {
+        p = self->profile + (size_t)_profile_row(self, target[i]) * S * L;
+        /* the diagonal predecessors of segment 0 are in the last segment of
+         * the previous row, shifted by one lane */
+        vH[0] = 0;
+        for (l = 1; l < L; l++) vH[l] = H[(S-1)*L + l - 1];
+        swap = Hp; Hp = H; H = swap;
+        for (l = 0; l < L; l++) {
+            vF[l] = PROFILE_NEG;
+            vMax[l] = 0;
+        }
+        for (s = 0; s < S; s++) {
+            h = H + s * L;
+            e = E + s * L;
+            hp = Hp + s * L;
+            for (l = 0; l < L; l++) {
+                x = vH[l] + p[l];
+                vMax[l] = (x > vMax[l]) ? x : vMax[l];
+                x = (e[l] > x) ? e[l] : x;
+                x = (vF[l] > x) ? vF[l] : x;
+                x = (x > 0) ? x : 0;
+                h[l] = x;
+                e[l] = (e[l] + extend_B > x + open_B) ? e[l] + extend_B : x + open_B;
+                vF[l] = (vF[l] + extend_A > x + open_A) ? vF[l] + extend_A : x + open_A;
+                vH[l] = hp[l];
+            }
+            p += L;
+        }
+        /* Horizontal gaps crossing from one lane to the next were not taken
+         * into account; propagate them until they can no longer improve the
+         * scores (the "lazy F" loop). */
+        for (l = L - 1; l > 0; l--) vF[l] = vF[l-1];
+        vF[0] = PROFILE_NEG;
+        s = 0;
+        while (1) {
+            h = H + s * L;
+            e = E + s * L;
+            more = false;
+            for (l = 0; l < L; l++) if (vF[l] > h[l] + threshold) more = true;
+            if (!more) break;
+            for (l = 0; l < L; l++) {
+                if (vF[l] > h[l]) {
+                    h[l] = vF[l];
+                    if (h[l] + open_B > e[l]) e[l] = h[l] + open_B;
+                }
+                vF[l] += extend_A;
+            }
+            if (++s == S) {
+                s = 0;
+                for (l = L - 1; l > 0; l--) vF[l] = vF[l-1];
+                vF[0] = PROFILE_NEG;
+            }
+        }
+        row_max = vMax[0];
+        for (l = 1; l < L; l++) if (vMax[l] > row_max) row_max = vMax[l];
+        if (row_max > best) {
+            best = row_max;
+            *iEnd = i + 1;
+            for (j = 0; j < self->length; j++) {
+                if (H[(j % S) * L + j / S] == best) {
+                    *jEnd = j + 1;
+                    break;
+                }
+            }
+        }
+    }
+    *score = best;
+}
+
+static char QueryProfile_locate__doc__[] =
+"locate(target) -> (score, target_end, query_end)\n"
+"\n"
+"Return the best local alignment score of the target against the query,\n"
+"and the end coordinates of the alignment in the target and the query.\n";
+
+static PyObject*
+QueryProfile_locate(QueryProfile* self, PyObject* args, PyObject* keywords)
+{
+    Py_buffer view = {0};
+    const int* target;
+    int n;
+    int iStart, jStart, iEnd = 0, jEnd = 0;
+    int value;
+    double score = 0;
+    bool ok = true;
+    LinearSpace space;
+    double* rows;
+    int* workspace;
+    PyObject* result = NULL;
+
+    static char *kwlist[] = {"target", NULL};
+
+    if (!self->query) {
+        PyErr_SetString(PyExc_RuntimeError, "query profile was not initialized");
+        return NULL;
+    }
+    if (!PyArg_ParseTupleAndKeywords(args, keywords, "O&", kwlist,
+                                     sequence_converter, &view))
+        return NULL;
+    if (self->substitution_matrix.obj) {
+        if (!_prepare_index(&self->substitution_matrix, &view)) goto exit;
+    }
+    n = (int)(view.len / view.itemsize);
+    if (n != view.len / view.itemsize) {
+        PyErr_SetString(PyExc_ValueError, "sequence too long");
+        goto exit;
+    }
+    target = view.buf;
+    if (self->profile
+     && (double)self->maximum * ((double)n + self->length + 1) < PROFILE_MAX) {
+        workspace = PyMem_RawMalloc(3 * (size_t)self->segments * PROFILE_LANES * sizeof(int));
+        if (!workspace) {
+            PyErr_NoMemory();
+            goto exit;
+        }
+        Py_BEGIN_ALLOW_THREADS
+        _striped_local(self, target, n, workspace, &value, &iEnd, &jEnd);
+        Py_END_ALLOW_THREADS
+        PyMem_RawFree(workspace);
+        score = value;
+    }
+    else {
+        rows = PyMem_RawMalloc(3 * ((size_t)self->length + 1) * sizeof(double));
+        if (!rows) {
+            PyErr_NoMemory();
+            goto exit;
+        }
+        space.scoring = &self->scoring;
+        space.sA = target;
+        space.nA = n;
+        space.sB = self->query;
+        space.nB = self->length;
+        space.M = rows;
+        space.Ix = rows + self->length + 1;
+        space.Iy = space.Ix + self->length + 1;
+        Py_BEGIN_ALLOW_THREADS
+        ok = _linear_local_endpoints(&space, &score, &iStart, &jStart, &iEnd, &jEnd);
+        Py_END_ALLOW_THREADS
+        PyMem_RawFree(rows);
+        if (!ok) {
+            PyErr_NoMemory();
+            goto exit;
+        }
+    }
+    result = Py_BuildValue("dii", score, iEnd, jEnd);
+exit:
+    PyBuffer_Release(&view);
+    return result;
+}
+
+static PyMethodDef QueryProfile_methods[] = {
+    {"locate",
+     (PyCFunction)QueryProfile_locate,
+     METH_VARARGS | METH_KEYWORDS,
+     QueryProfile_locate__doc__
+    },
+    {NULL}  /* Sentinel */
+};
+
+static char QueryProfile_doc[] =
+"QueryProfile objects store the substitution scores of a query sequence\n"
+"for fast calculation of local alignment scores against many targets.\n";
+
+static PyTypeObject QueryProfile_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "_pairwisealigner.QueryProfile",
+    .tp_basicsize = sizeof(QueryProfile),
+    .tp_dealloc = (destructor)QueryProfile_dealloc,
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE,
+    .tp_doc = QueryProfile_doc,
+    .tp_methods = QueryProfile_methods,
+    .tp_init = (initproc)QueryProfile_init,
+};
+
+
 /* Module definition */
 
 static char _pairwisealigner__doc__[] =
@@ -7702,9 +9782,11 @@ PyInit__pairwisealigner(void)
 {
     PyObject* module;
     Aligner_Type.tp_new = PyType_GenericNew;
+    QueryProfile_Type.tp_new = PyType_GenericNew;
 
     if (PyType_Ready(&Aligner_Type) < 0
-     || PyType_Ready(&PathGenerator_Type) < 0)
+     || PyType_Ready(&PathGenerator_Type) < 0
+     || PyType_Ready(&QueryProfile_Type) < 0)
         return NULL;
 
     module = PyModule_Create(&moduledef);
@@ -7720,6 +9802,14 @@ PyInit__pairwisealigner(void)
         return NULL;
     }
 
+    Py_INCREF(&QueryProfile_Type);
+    if (PyModule_AddObject(module,
+                           "QueryProfile", (PyObject*) &QueryProfile_Type) < 0) {
+        Py_DECREF(&QueryProfile_Type);
+        Py_DECREF(module);
+        return NULL;
+    }
+
     PyObject *mod = PyImport_ImportModule("Bio.Align.substitution_matrices._arraycore");
     if (!mod) {
         Py_DECREF(&Aligner_Type);
@@ -21,6 +21,8 @@ typedef enum {NeedlemanWunschSmithWaterman,
 
 typedef enum {Global, Local, FOGSAA_Mode} Mode;
 
+typedef enum {FullTraceback, LinearTraceback} Traceback;
+
 typedef struct {
     PyObject_HEAD
     Mode mode;
@@ -57,4 +59,6 @@ typedef struct {
     Py_buffer substitution_matrix;
     PyObject* alphabet;
     int wildcard;
+    int band;
+    Traceback traceback;
 } Aligner;
@@ -6,6 +6,8 @@
 # package.
 """Code for performing calculations on codon alignments."""
 
+import functools
+import os
 import sys
 from collections import Counter
 from collections import defaultdict
@@ -53,6 +55,12 @@ def calculate_dn_ds(alignment, method="NG86", codon_table=None, k=1, cfreq=None)
         raise ValueError("cfreq must be 'F1x4', 'F3x4', or 'F61'")
     if codon_table is None:
         codon_table = CodonTable.generic_by_id[1]
+    codons1, codons2 = _get_codons(alignment)
+    return _calculate_dn_ds(codons1, codons2, method, codon_table, k, cfreq)
+
+
+def _get_codons(alignment):
+    """Return the lists of aligned codons of a pairwise alignment (PRIVATE)."""
     codons1 = []
     codons2 = []
     sequence1, sequence2 = alignment.sequences
@@ -85,6 +93,11 @@ def calculate_dn_ds(alignment, method="NG86", codon_table=None, k=1, cfreq=None)
                 f"Unrecognized character in {codon2} in the query sequence"
                 " (Codons consist of A, T, C or G)"
             )
+    return codons1, codons2
+
+
+def _calculate_dn_ds(codons1, codons2, method, codon_table, k=1, cfreq="F3x4"):
+    """Calculate dN and dS of two lists of aligned codons (PRIVATE)."""
     if method == "ML":
         return _ml(codons1, codons2, cfreq, codon_table)
     elif method == "NG86":
@@ -762,12 +775,20 @@ def _ml(codons1, codons2, cmethod, codon_table):
     from scipy.optimize import minimize
 
     pi = _get_pi(codons1, codons2, cmethod, codon_table=codon_table)
-    codon_cnt = Counter(zip(codons1, codons2))
     codons = [
         codon
         for codon in list(codon_table.forward_table.keys()) + codon_table.stop_codons
         if "U" not in codon
     ]
+    # count the codon pairs once, as a matrix indexed like the Q matrix
+    indices = {codon: i for i, codon in enumerate(codons)}
+    codon_cnt = np.zeros((len(codons), len(codons)))
+    for (codon1, codon2), count in Counter(zip(codons1, codons2)).items():
+        codon_cnt[indices[codon1], indices[codon2]] = count
+    sense, synonymous = _get_Q_structure(tuple(codons), codon_table)[2:]
+    synonymous = sense & synonymous
+    nonsynonymous = sense & ~synonymous
+    frequencies = np.array([pi[codon] for codon in codons])
 
     # apply optimization
     def func(
@@ -794,25 +815,9 @@ def _ml(codons1, codons2, cmethod, codon_table):
     )
     t, k, w = opt_res.x
     Q = _get_Q(pi, k, w, codons, codon_table)
-    Sd = Nd = 0
-    for i, codon1 in enumerate(codons):
-        for j, codon2 in enumerate(codons):
-            if i != j:
-                try:
-                    if (
-                        codon_table.forward_table[codon1]
-                        == codon_table.forward_table[codon2]
-                    ):
-                        # synonymous count
-                        Sd += pi[codon1] * Q[i, j]
-                    else:
-                        # nonsynonymous count
-                        Nd += pi[codon1] * Q[i, j]
-                except KeyError:
-                    # This is probably due to stop codons
-                    pass
-    Sd *= t
-    Nd *= t
+    rates = frequencies[:, None] * Q
+    Sd = t * rates[synonymous].sum()
+    Nd = t * rates[nonsynonymous].sum()
 
     # count differences (with w fixed to 1)
     def func_w1(
@@ -839,25 +844,9 @@ def _ml(codons1, codons2, cmethod, codon_table):
     t, k = opt_res.x
     w = 1.0
     Q = _get_Q(pi, k, w, codons, codon_table)
-    rhoS = rhoN = 0
-    for i, codon1 in enumerate(codons):
-        for j, codon2 in enumerate(codons):
-            if i != j:
-                try:
-                    if (
-                        codon_table.forward_table[codon1]
-                        == codon_table.forward_table[codon2]
-                    ):
-                        # synonymous count
-                        rhoS += pi[codon1] * Q[i, j]
-                    else:
-                        # nonsynonymous count
-                        rhoN += pi[codon1] * Q[i, j]
-                except KeyError:
-                    # This is probably due to stop codons
-                    pass
-    rhoS *= 3
-    rhoN *= 3
+    rates = frequencies[:, None] * Q
+    rhoS = 3 * rates[synonymous].sum()
+    rhoN = 3 * rates[nonsynonymous].sum()
     dN = Nd / rhoN
     dS = Sd / rhoS
     return dN, dS
@@ -912,132 +901,347 @@ def _get_pi(codons1, codons2, cmethod, codon_table):
     return pi
 
 
-def _q(codon1, codon2, pi, k, w, codon_table):
+@functools.lru_cache(maxsize=16)
+def _get_Q_structure(codons, codon_table):
+    """Classify the substitutions between codons for the Q matrix (PRIVATE).
+
+    Returns four boolean matrices, indexed by the codons in the tuple codons:
+     - single      : the codons differ by one nucleotide, and are not stop codons
+     - transition  : the codons differ by one transition
+     - sense       : the codons are different and are not stop codons
+     - synonymous  : the codons code for the same amino acid
+
+    These depend on the codon table only, and are calculated once, instead
+    of for each Q matrix evaluated during the optimization.
+    """
+    purine = ("A", "G")
+    pyrimidine = ("T", "C")
+    forward_table = codon_table.forward_table
+    stop_codons = codon_table.stop_codons
+    n = len(codons)
+    single = np.zeros((n, n), bool)
+    transition = np.zeros((n, n), bool)
+    sense = np.zeros((n, n), bool)
+    synonymous = np.zeros((n, n), bool)
+    for i1, codon1 in enumerate(codons):
+        if codon1 in stop_codons:
+            continue
+        for i2, codon2 in enumerate(codons):
+            if i1 == i2 or codon2 in stop_codons:
+                continue
+            sense[i1, i2] = True
+            synonymous[i1, i2] = forward_table[codon1] == forward_table[codon2]
+            diff = [
+                (nucleotide1, nucleotide2)
+                for nucleotide1, nucleotide2 in zip(codon1, codon2)
+                if nucleotide1 != nucleotide2
+            ]
+            if len(diff) == 1:
+                single[i1, i2] = True
+                nucleotide1, nucleotide2 = diff[0]
+                if nucleotide1 in purine and nucleotide2 in purine:
+                    transition[i1, i2] = True
+                elif nucleotide1 in pyrimidine and nucleotide2 in pyrimidine:
+                    transition[i1, i2] = True
+    return single, transition, sense, synonymous
+
+
+def _get_Q(pi, k, w, codons, codon_table):
     """Q matrix for codon substitution (PRIVATE).
 
     Arguments:
-     - codon1, codon2  : three letter codon string
      - pi              : expected codon frequency
      - k               : transition/transversion ratio
      - w               : nonsynonymous/synonymous rate ratio
+     - codons          : list of three letter codon strings
      - codon_table     : Bio.Data.CodonTable object
 
     """
-    if codon1 == codon2:
-        # diagonal elements is the sum of all other elements
-        return 0
-    if codon1 in codon_table.stop_codons or codon2 in codon_table.stop_codons:
-        return 0
-    if (codon1 not in pi) or (codon2 not in pi):
-        return 0
-    purine = ("A", "G")
-    pyrimidine = ("T", "C")
-    diff = [
-        (i, nucleotide1, nucleotide2)
-        for i, (nucleotide1, nucleotide2) in enumerate(zip(codon1, codon2))
-        if nucleotide1 != nucleotide2
-    ]
-    if len(diff) >= 2:
-        return 0
-    if codon_table.forward_table[codon1] == codon_table.forward_table[codon2]:
-        # synonymous substitution
-        if diff[0][1] in purine and diff[0][2] in purine:
-            # transition
-            return k * pi[codon2]
-        elif diff[0][1] in pyrimidine and diff[0][2] in pyrimidine:
-            # transition
-            return k * pi[codon2]
-        else:
-            # transversion
-            return pi[codon2]
-    else:
-        # nonsynonymous substitution
-        if diff[0][1] in purine and diff[0][2] in purine:
-            # transition
-            return w * k * pi[codon2]
-        elif diff[0][1] in pyrimidine and diff[0][2] in pyrimidine:
-            # transition
-            return w * k * pi[codon2]
-        else:
-            # transversion
-            return w * pi[codon2]
-
-
-def _get_Q(pi, k, w, codons, codon_table):
-    """Q matrix for codon substitution (PRIVATE)."""
-    codon_num = len(codons)
-    Q = np.zeros((codon_num, codon_num))
-    for i1, codon1 in enumerate(codons):
-        for i2, codon2 in enumerate(codons):
-            if i1 != i2:
-                Q[i1, i2] = _q(codon1, codon2, pi, k, w, codon_table=codon_table)
-    nucl_substitutions = 0
-    for i, codon in enumerate(codons):
-        Q[i, i] = -sum(Q[i, :])
-        try:
-            nucl_substitutions += pi[codon] * (-Q[i, i])
-        except KeyError:
-            pass
+    single, transition, sense, synonymous = _get_Q_structure(tuple(codons), codon_table)
+    # codons missing from pi do not take part in any substitutions
+    present = np.array([codon in pi for codon in codons])
+    frequencies = np.array([pi[codon] if codon in pi else 0 for codon in codons])
+    Q = np.where(transition, k, 1.0) * np.where(synonymous, 1.0, w)
+    Q *= frequencies
+    Q[~(single & present[:, None] & present)] = 0
+    np.fill_diagonal(Q, -Q.sum(1))
+    nucl_substitutions = -(frequencies * np.diagonal(Q)).sum()
     Q /= nucl_substitutions
     return Q
 
 
 def _likelihood_func(t, k, w, pi, codon_cnt, codons, codon_table):
-    """Likelihood function for ML method (PRIVATE)."""
+    """Likelihood function for ML method (PRIVATE).
+
+    Here, codon_cnt is a matrix with the number of times each pair of codons
+    in codons appears in the alignment.
+    """
     from scipy.linalg import expm
 
     Q = _get_Q(pi, k, w, codons, codon_table)
     P = expm(Q * t)
-    likelihood = 0
-    for i, codon1 in enumerate(codons):
-        for j, codon2 in enumerate(codons):
-            if (codon1, codon2) in codon_cnt:
-                if P[i, j] * pi[codon1] <= 0:
-                    likelihood += codon_cnt[(codon1, codon2)] * 0
-                else:
-                    likelihood += codon_cnt[(codon1, codon2)] * log(
-                        pi[codon1] * P[i, j]
-                    )
-    return likelihood
+    frequencies = np.array([pi[codon] for codon in codons])
+    P *= frequencies[:, None]
+    mask = (codon_cnt > 0) & (P > 0)
+    return (codon_cnt[mask] * np.log(P[mask])).sum()
 
 
-def calculate_dn_ds_matrix(alignment, method="NG86", codon_table=None):
+def calculate_dn_ds_matrix(alignment, method="NG86", codon_table=None, processes=1):
     """Calculate dN and dS pairwise for the multiple alignment, and return as matrices.
 
     Argument:
      - method       - Available methods include NG86, LWL85, YN00 and ML.
      - codon_table  - Codon table to use for forward translation.
-
+     - processes    - Number of worker processes to use for the YN00 and ML
+                      methods, which fit a model to each pair of sequences
+                      separately. If None, use the number of CPUs (as given
+                      by os.cpu_count()). Default value is 1, which performs
+                      the calculation in the current process.
+
+    For the NG86 and LWL85 methods, the number of sites and differences are
+    counted for all pairs of sequences at once using NumPy arrays if the
+    alignment consists of complete codons of unambiguous nucleotides.
     """
     from Bio.Phylo.TreeConstruction import DistanceMatrix
 
+    if processes is None:
+        processes = os.cpu_count()
+    elif processes < 1:
+        raise ValueError("processes must be positive")
     if codon_table is None:
         codon_table = CodonTable.generic_by_id[1]
     sequences = alignment.sequences
-    coordinates = alignment.coordinates
     names = [record.id for record in sequences]
     size = len(names)
-    dn_matrix = []
-    ds_matrix = []
-    for i in range(size):
-        dn_matrix.append([])
-        ds_matrix.append([])
-        for j in range(i):
-            pairwise_sequences = [sequences[i], sequences[j]]
-            pairwise_coordinates = coordinates[(i, j), :]
-            pairwise_alignment = Alignment(pairwise_sequences, pairwise_coordinates)
-            dn, ds = calculate_dn_ds(
-                pairwise_alignment, method=method, codon_table=codon_table
-            )
-            dn_matrix[i].append(dn)
-            ds_matrix[i].append(ds)
-        dn_matrix[i].append(0.0)
-        ds_matrix[i].append(0.0)
+    codons = _encode_codons(alignment, codon_table)
+    dn = ds = None
+    if codons is not None and method in ("NG86", "LWL85"):
+        if method == "NG86":
+            dn, ds = _ng86_matrix(codons, codon_table)
+        else:
+            dn, ds = _lwl85_matrix(codons, codon_table)
+        if not (np.isfinite(dn).all() and np.isfinite(ds).all()):
+            # Let the pairwise calculation raise the appropriate exception
+            dn = ds = None
+    if dn is None:
+        dn = np.zeros((size, size))
+        ds = np.zeros((size, size))
+        pairs = [(i, j) for i in range(size) for j in range(i)]
+        tasks = (
+            (*_get_pair_codons(alignment, codons, i, j), method, codon_table)
+            for i, j in pairs
+        )
+        if processes == 1 or len(pairs) < 2:
+            results = map(_calculate_dn_ds_task, tasks)
+            for (i, j), result in zip(pairs, results):
+                dn[i, j], ds[i, j] = result
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunksize = max(1, len(pairs) // (4 * processes))
+            with ProcessPoolExecutor(processes) as executor:
+                results = executor.map(
+                    _calculate_dn_ds_task, tasks, chunksize=chunksize
+                )
+                for (i, j), result in zip(pairs, results):
+                    dn[i, j], ds[i, j] = result
+    dn_matrix = [dn[i, :i].tolist() + [0.0] for i in range(size)]
+    ds_matrix = [ds[i, :i].tolist() + [0.0] for i in range(size)]
     dn_dm = DistanceMatrix(names, matrix=dn_matrix)
     ds_dm = DistanceMatrix(names, matrix=ds_matrix)
     return dn_dm, ds_dm
 
 
+def _calculate_dn_ds_task(task):
+    """Calculate dN and dS for a pair of sequences in a worker process (PRIVATE)."""
+    codons1, codons2, method, codon_table = task
+    return _calculate_dn_ds(codons1, codons2, method, codon_table)
+
+
+def _get_pair_codons(alignment, codons, i, j):
+    """Return the aligned codons of sequences i and j (PRIVATE).
+
+    Here, codons is the array returned by _encode_codons, or None if the
+    alignment could not be encoded.
+    """
+    if codons is None:
+        sequences = [alignment.sequences[i], alignment.sequences[j]]
+        coordinates = alignment.coordinates[(i, j), :]
+        return _get_codons(Alignment(sequences, coordinates))
+    mask = (codons[i] < 64) & (codons[j] < 64)
+    names = _codon_names
+    return [names[c] for c in codons[i, mask]], [names[c] for c in codons[j, mask]]
+
+
+_codon_names = tuple(
+    nucleotide1 + nucleotide2 + nucleotide3
+    for nucleotide1 in "TCAG"
+    for nucleotide2 in "TCAG"
+    for nucleotide3 in "TCAG"
+)
+
+
+def _encode_codons(alignment, codon_table):
+    """Encode the codons in the alignment as integers from 0 to 63 (PRIVATE).
+
+    Returns an array with one row for each sequence and one column for each
+    codon position in the alignment, with the index of the codon in
+    _codon_names, or 64 for a gap. Returns None if the alignment cannot be
+    encoded in this way; this is the case if the aligned segments do not
+    consist of complete codons, if a sequence contains letters other than
+    A, C, G, and T, or if the alignment contains stop codons.
+    """
+    coordinates = alignment.coordinates
+    steps = np.diff(coordinates, axis=1)
+    if (steps < 0).any():
+        return None
+    if (np.cumsum(steps.max(axis=0, initial=0)) % 3).any():
+        return None
+    try:
+        letters = np.array(alignment, "S1")
+    except Exception:  # e.g. undefined sequence contents
+        return None
+    # 0, 1, 2, 3 for T, C, A, G, 4 for a gap, and 5 for anything else
+    bases = np.full(256, 5, np.uint8)
+    for i, letter in enumerate(b"TCAG-"):
+        bases[letter] = i
+    bases = bases[letters.view(np.uint8)]
+    if (bases == 5).any():
+        return None
+    n, m = bases.shape
+    bases = bases.reshape(n, m // 3, 3).astype(np.intp)
+    gaps = bases == 4
+    if (gaps.any(axis=2) != gaps.all(axis=2)).any():
+        return None
+    codons = 16 * bases[:, :, 0] + 4 * bases[:, :, 1] + bases[:, :, 2]
+    codons[gaps[:, :, 0]] = 64
+    stops = [
+        _codon_names.index(codon)
+        for codon in codon_table.stop_codons
+        if "U" not in codon
+    ]
+    if np.isin(codons, stops).any():
+        return None
+    return codons
+
+
+@functools.lru_cache(maxsize=16)
+def _get_codon_diff_NG86(codon_table):
+    """Return the synonymous and nonsynonymous differences between codons (PRIVATE).
+
+    The returned arrays are indexed by the codon indices used by _encode_codons,
+    with zeros for the gap index 64.
+    """
+    stop_codons = codon_table.stop_codons
+    S = np.zeros((65, 65))
+    N = np.zeros((65, 65))
+    for i1, codon1 in enumerate(_codon_names):
+        if codon1 in stop_codons:
+            continue
+        for i2, codon2 in enumerate(_codon_names):
+            if codon2 in stop_codons:
+                continue
+            S[i1, i2], N[i1, i2] = _count_diff_NG86(codon1, codon2, codon_table)
+    return S, N
+
+
+def _sum_pairs(values, codons):
+    """Sum the values of both codons over the codons shared by each pair (PRIVATE).
+
+    Here, values is a one-dimensional array of values indexed by codon, and
+    codons is the array returned by _encode_codons.
+    """
+    present = (codons < 64).astype(float)
+    values = values[codons] * present
+    return values @ present.T + present @ values.T
+
+
+def _sum_differences(table, codons):
+    """Sum the differences between the aligned codons for all pairs (PRIVATE).
+
+    Here, table is an array indexed by the codon indices of two codons, with
+    the differences along its remaining dimensions. The sum for the pair i, j
+    is stored in element [i, j] of the returned array for j < i, using the
+    codons of sequence i as the first index of the table.
+    """
+    n = len(codons)
+    table = table.reshape(65 * 65, -1)
+    sums = np.zeros((n, n, table.shape[1]))
+    for i in range(1, n):
+        indices = 65 * codons[i] + codons[:i]
+        sums[i, :i] = table[indices].sum(axis=1)
+    return sums
+
+
+def _ng86_matrix(codons, codon_table):
+    """Calculate dN and dS for all pairs of sequences using NG86 (PRIVATE)."""
+    S_site = np.zeros(65)
+    N_site = np.zeros(65)
+    for i, codon in enumerate(_codon_names):
+        if codon not in codon_table.stop_codons:
+            S_site[i], N_site[i] = _count_site_NG86([codon], codon_table)
+    S_sites = _sum_pairs(S_site, codons) / 2.0
+    N_sites = _sum_pairs(N_site, codons) / 2.0
+    S, N = _get_codon_diff_NG86(codon_table)
+    SN = _sum_differences(np.stack([S, N], axis=-1), codons)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ps = SN[:, :, 0] / S_sites
+        pn = SN[:, :, 1] / N_sites
+        dS = np.where(ps < 3 / 4, np.abs(-3.0 / 4 * np.log(1 - 4.0 / 3 * ps)), -1)
+        dN = np.where(pn < 3 / 4, np.abs(-3.0 / 4 * np.log(1 - 4.0 / 3 * pn)), -1)
+    # ps and pn are NaN or infinite if there are no sites
+    dS[~np.isfinite(ps)] = np.nan
+    dN[~np.isfinite(pn)] = np.nan
+    return _lower(dN), _lower(dS)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_codon_diff_LWL85(codon_table):
+    """Return the sites and substitutions in each degenerate class (PRIVATE).
+
+    Returns an array with the number of sites in the 0-fold, 2-fold, and
+    4-fold degenerate classes for each codon, and an array with the number
+    of transitions (P0, P2, P4) and transversions (Q0, Q2, Q4) for each
+    pair of codons. Both are indexed by the codon indices of _encode_codons.
+    """
+    codon_fold_dict = _get_codon_fold(codon_table)
+    L = np.zeros((65, 3))
+    PQ = np.zeros((65, 65, 6))
+    for i1, codon1 in enumerate(_codon_names):
+        if codon1 not in codon_fold_dict:
+            continue
+        fold_num = codon_fold_dict[codon1]
+        L[i1] = [fold_num.count(f) for f in "024"]
+        for i2, codon2 in enumerate(_codon_names):
+            if codon2 in codon_fold_dict:
+                PQ[i1, i2] = _diff_codon(codon1, codon2, codon_fold_dict)
+    return L, PQ
+
+
+def _lwl85_matrix(codons, codon_table):
+    """Calculate dN and dS for all pairs of sequences using LWL85 (PRIVATE)."""
+    sites, PQ = _get_codon_diff_LWL85(codon_table)
+    L = [_sum_pairs(sites[:, i], codons) / 2.0 for i in range(3)]
+    PQ = _sum_differences(PQ, codons)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        P = [PQ[:, :, i] / L[i] for i in range(3)]
+        Q = [PQ[:, :, i + 3] / L[i] for i in range(3)]
+        A = [
+            (1.0 / 2) * np.log(1.0 / (1 - 2 * i - j))
+            - (1.0 / 4) * np.log(1.0 / (1 - 2 * j))
+            for i, j in zip(P, Q)
+        ]
+        B = [(1.0 / 2) * np.log(1.0 / (1 - 2 * i)) for i in Q]
+        dS = 3 * (L[2] * A[1] + L[2] * (A[2] + B[2])) / (L[1] + 3 * L[2])
+        dN = 3 * (L[2] * B[1] + L[0] * (A[0] + B[0])) / (2 * L[1] + 3 * L[0])
+    return _lower(dN), _lower(dS)
+
+
+def _lower(matrix):
+    """Set the diagonal and upper triangle of the square matrix to zero (PRIVATE)."""
+    return np.tril(matrix, -1)
+
+
 def mktest(alignment, species=None, codon_table=None):
     """McDonald-Kreitman test for neutrality.
 
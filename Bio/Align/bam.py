@@ -0,0 +1,884 @@
+# Copyright 2026 by the Biopython contributors.
+# All rights reserved.
+#
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Bio.Align support for the "bam" pairwise alignment format.
+
+The BAM format is the binary representation of the Sequence Alignment/Map
+(SAM) format. A BAM file is compressed in the BGZF format (see Bio.bgzf), which
+allows random access to the alignments using a BAI or CSI index file.
+
+See http://www.htslib.org/ for more information, and the SAM/BAM format
+specification at https://samtools.github.io/hts-specs/SAMv1.pdf.
+
+You are expected to use this module via the Bio.Align functions.
+
+The alignments are returned in the same way as by the SAM parser in
+Bio.Align.sam; the FLAG, MAPQ, RNEXT, PNEXT and TLEN columns are stored as
+attributes of each alignment, and the tags are stored in its annotations.
+
+If the alignments are sorted by position and an index file is available, the
+search method of the alignment iterator only reads and decompresses the parts
+of the file that contain alignments overlapping the region of interest.
+"""
+
+import io
+import os
+import struct
+
+import numpy as np
+
+from Bio import bgzf
+from Bio import StreamModeError
+from Bio.Align import Alignments
+from Bio.Align import sam
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+_record_formatter = struct.Struct("<iiBBHHHIiii")
+
+# Letters encoded by the four bits per nucleotide in the sequence field
+_nucleotides = "=ACMGRSVTWYHKDBN"
+_decoded_pairs = [(c1 + c2).encode() for c1 in _nucleotides for c2 in _nucleotides]
+_encoded_pairs = {
+    (c1 + c2).encode(): 16 * i1 + i2
+    for i1, c1 in enumerate(_nucleotides)
+    for i2, c2 in enumerate(_nucleotides)
+}
+# Translation table from letters to their four-bit codes; letters that cannot
+# be stored in BAM are translated to 255
+_nucleotide_codes = bytes(
+    _nucleotides.index(chr(c)) if chr(c) in _nucleotides else 255 for c in range(256)
+)
+
+_operations = "MIDNSHP=X"
+_operation_codes = {operation: code for code, operation in enumerate(_operations)}
+# CIGAR operations that consume the reference sequence (M, D, N, =, X)
+_reference_operations = frozenset((0, 2, 3, 7, 8))
+
+# struct formats of the tag types storing a single number
+_tag_formats = {
+    "c": "<b",
+    "C": "<B",
+    "s": "<h",
+    "S": "<H",
+    "i": "<i",
+    "I": "<I",
+    "f": "<f",
+}
+
+
+def _reference_end(pos, cigar):
+    """Return the end position on the reference of an alignment (PRIVATE).
+
+    Arguments:
+     - pos   - zero-based start position of the alignment.
+     - cigar - sequence of integers with the BAM-encoded CIGAR operations.
+
+    Alignments without any CIGAR operations consuming the reference sequence
+    (such as unmapped reads) are considered to cover one base.
+    """
+    end = pos
+    for operation in cigar:
+        if operation & 0xF in _reference_operations:
+            end += operation >> 4
+    if end == pos:
+        end += 1
+    return end
+
+
+def _reg2bin(beg, end, min_shift=14, depth=5):
+    """Return the bin of the smallest region containing beg to end (PRIVATE)."""
+    end -= 1
+    shift = min_shift
+    offset = ((1 << (3 * depth + 3)) - 1) // 7
+    for level in range(depth, 0, -1):
+        offset -= 1 << (3 * level)
+        if beg >> shift == end >> shift:
+            return offset + (beg >> shift)
+        shift += 3
+    return 0
+
+
+def _reg2bins(beg, end, min_shift=14, depth=5):
+    """Return the bins that may contain alignments overlapping beg to end (PRIVATE)."""
+    bins = []
+    end -= 1
+    shift = min_shift + 3 * depth
+    offset = 0
+    for level in range(depth + 1):
+        bins.extend(range(offset + (beg >> shift), offset + (end >> shift) + 1))
+        offset += 1 << (3 * level)
+        shift -= 3
+    return bins
+
+
+class _Index:
+    """BAI or CSI index of a BAM file (PRIVATE).
+
+    Attributes:
+     - min_shift  - number of bits of the smallest bins (14 for BAI files).
+     - depth      - number of levels of the binning scheme (5 for BAI files).
+     - references - list of (bins, intervals) tuples, one for each reference
+                    sequence. The dictionary bins maps each bin number to a
+                    tuple (offset, chunks), where chunks is a list of
+                    (start, end) tuples of virtual file offsets, and offset is
+                    the smallest virtual file offset of the alignments in the
+                    bin (CSI only). The list intervals contains the linear
+                    index (BAI only).
+     - unplaced   - number of unplaced reads, or None if not available.
+
+    """
+
+    def __init__(self, min_shift=14, depth=5):
+        self.min_shift = min_shift
+        self.depth = depth
+        self.references = []
+        self.unplaced = None
+
+    @property
+    def pseudo_bin(self):
+        """Return the number of the bin storing metadata."""
+        return ((1 << (3 * self.depth + 3)) - 1) // 7 + 1
+
+    @classmethod
+    def read(cls, stream):
+        """Read a BAI or CSI index from a binary stream."""
+        if stream.read(2) == b"\x1f\x8b":
+            # CSI files are BGZF-compressed
+            stream.seek(0)
+            stream = bgzf.BgzfReader(fileobj=stream, mode="rb")
+        else:
+            stream.seek(0)
+        magic = stream.read(4)
+        if magic == b"BAI\1":
+            index = cls()
+            csi = False
+        elif magic == b"CSI\1":
+            min_shift, depth, l_aux = struct.unpack("<iii", stream.read(12))
+            stream.read(l_aux)
+            index = cls(min_shift, depth)
+            csi = True
+        else:
+            raise ValueError("index file is neither a BAI file nor a CSI file")
+        (n_ref,) = struct.unpack("<i", stream.read(4))
+        for i in range(n_ref):
+            bins = {}
+            (n_bin,) = struct.unpack("<i", stream.read(4))
+            for j in range(n_bin):
+                if csi:
+                    bin_, offset, n_chunk = struct.unpack("<IQi", stream.read(16))
+                else:
+                    bin_, n_chunk = struct.unpack("<Ii", stream.read(8))
+                    offset = 0
+                chunks = struct.unpack(
+                    "<%dQ" % (2 * n_chunk), stream.read(16 * n_chunk)
+                )
+                bins[bin_] = (offset, list(zip(chunks[::2], chunks[1::2])))
+            if csi:
+                intervals = []
+            else:
+                (n_intv,) = struct.unpack("<i", stream.read(4))
+                intervals = struct.unpack("<%dQ" % n_intv, stream.read(8 * n_intv))
+            index.references.append((bins, intervals))
+        data = stream.read(8)
+        if len(data) == 8:
+            (index.unplaced,) = struct.unpack("<Q", data)
+        return index
+
+    def chunks(self, refID, start, end):
+        """Return the chunks of the file that may contain alignments in a region.
+
+        Returns a sorted list of non-overlapping (start, end) tuples of virtual
+        file offsets.
+        """
+        try:
+            bins, intervals = self.references[refID]
+        except IndexError:
+            return []
+        min_shift = self.min_shift
+        if intervals:
+            i = min(start >> min_shift, len(intervals) - 1)
+            min_offset = intervals[i]
+        else:
+            # find the smallest bin containing start that is in the index
+            bin_ = ((1 << (3 * self.depth)) - 1) // 7 + (start >> min_shift)
+            while bin_ > 0 and bin_ not in bins:
+                bin_ = (bin_ - 1) >> 3
+            min_offset = bins.get(bin_, (0, None))[0]
+        chunks = []
+        pseudo_bin = self.pseudo_bin
+        for bin_ in _reg2bins(start, end, min_shift, self.depth):
+            if bin_ == pseudo_bin:
+                continue
+            try:
+                offset, bin_chunks = bins[bin_]
+            except KeyError:
+                continue
+            chunks.extend(chunk for chunk in bin_chunks if chunk[1] > min_offset)
+        chunks.sort()
+        merged = []
+        for chunk_start, chunk_end in chunks:
+            if merged and chunk_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], chunk_end)
+            else:
+                merged.append([max(chunk_start, min_offset), chunk_end])
+        return merged
+
+
+class _IndexBuilder:
+    """Collect the BAI index while writing a sorted BAM file (PRIVATE)."""
+
+    def __init__(self, names):
+        self.names = names
+        self.references = [({}, []) for name in names]
+        self.counts = [[0, 0, None, None] for name in names]
+        self.unplaced = 0
+        self.refID = -1
+        self.pos = -1
+
+    def add(self, record, start_offset, end_offset):
+        """Add a BAM record written from start_offset to end_offset."""
+        refID, pos, l_read_name, mapq, bin_, n_cigar_op, flag = (
+            _record_formatter.unpack_from(record, 4)[:7]
+        )
+        if refID < 0:
+            self.unplaced += 1
+            self.refID = len(self.names)
+            return
+        if refID < self.refID or (refID == self.refID and pos < self.pos):
+            raise ValueError(
+                "alignments must be sorted by position to create a BAM index"
+            )
+        self.refID = refID
+        self.pos = pos
+        i = 36 + l_read_name
+        cigar = struct.unpack_from("<%dI" % n_cigar_op, record, i)
+        end = _reference_end(pos, cigar)
+        bins, intervals = self.references[refID]
+        chunks = bins.setdefault(bin_, [])
+        if chunks and chunks[-1][1] == start_offset:
+            chunks[-1][1] = end_offset
+        else:
+            chunks.append([start_offset, end_offset])
+        last = (end - 1) >> 14
+        if len(intervals) <= last:
+            intervals.extend([0] * (last + 1 - len(intervals)))
+        for window in range(pos >> 14, last + 1):
+            if intervals[window] == 0:
+                intervals[window] = start_offset
+        counts = self.counts[refID]
+        if flag & 0x4:
+            counts[1] += 1
+        else:
+            counts[0] += 1
+        if counts[2] is None:
+            counts[2] = start_offset
+        counts[3] = end_offset
+
+    def _finish(self):
+        """Fill the gaps in the linear index (PRIVATE)."""
+        for bins, intervals in self.references:
+            # windows without alignments inherit the offset of the previous window
+            offset = 0
+            for i, value in enumerate(intervals):
+                if value == 0:
+                    intervals[i] = offset
+                else:
+                    offset = value
+
+    def _metadata(self, refID):
+        """Return the pseudo-bin chunks with the metadata of a reference (PRIVATE)."""
+        n_mapped, n_unmapped, start_offset, end_offset = self.counts[refID]
+        if start_offset is None:
+            return None
+        return [[start_offset, end_offset], [n_mapped, n_unmapped]]
+
+    def to_bai(self):
+        """Return the index in the BAI format as a bytes object."""
+        self._finish()
+        data = [b"BAI\1", struct.pack("<i", len(self.references))]
+        for refID, (bins, intervals) in enumerate(self.references):
+            metadata = self._metadata(refID)
+            items = sorted(bins.items())
+            if metadata is not None:
+                items.append((37450, metadata))
+            data.append(struct.pack("<i", len(items)))
+            for bin_, chunks in items:
+                data.append(struct.pack("<Ii", bin_, len(chunks)))
+                for chunk in chunks:
+                    data.append(struct.pack("<QQ", *chunk))
+            data.append(struct.pack("<i", len(intervals)))
+            data.append(struct.pack("<%dQ" % len(intervals), *intervals))
+        data.append(struct.pack("<Q", self.unplaced))
+        return b"".join(data)
+
+    def to_csi(self):
+        """Return the index in the CSI format as a bytes object (uncompressed)."""
+        self._finish()
+        min_shift = 14
+        depth = 5
+        data = [
+            b"CSI\1",
+            struct.pack("<iiii", min_shift, depth, 0, len(self.references)),
+        ]
+        for refID, (bins, intervals) in enumerate(self.references):
+            metadata = self._metadata(refID)
+            items = []
+            for bin_, chunks in sorted(bins.items()):
+                # offset of the first alignment overlapping the region of the bin
+                level = 0
+                while bin_ >= ((1 << (3 * level + 3)) - 1) // 7:
+                    level += 1
+                first = bin_ - ((1 << (3 * level)) - 1) // 7
+                window = first << (3 * (depth - level))
+                offset = intervals[window] if window < len(intervals) else 0
+                items.append((bin_, offset, chunks))
+            if metadata is not None:
+                items.append((37450, 0, metadata))
+            data.append(struct.pack("<i", len(items)))
+            for bin_, offset, chunks in items:
+                data.append(struct.pack("<IQi", bin_, offset, len(chunks)))
+                for chunk in chunks:
+                    data.append(struct.pack("<QQ", *chunk))
+        data.append(struct.pack("<Q", self.unplaced))
+        return b"".join(data)
+
+
+class AlignmentWriter(sam.AlignmentWriter):
+    """Alignment file writer for the Binary Alignment/Map (BAM) file format."""
+
+    fmt = "BAM"
+    mode = "b"
+
+    def __init__(self, target, md=False, targets=None, index=None):
+        """Create an AlignmentWriter object.
+
+        Arguments:
+         - target  - output stream or file name.
+         - md      - If True, calculate the MD tag from the alignment and
+                     include it in the output.
+                     If False (default), do not include the MD tag in the
+                     output.
+         - targets - A list of SeqRecord objects with the reference sequences,
+                     in the order in which they should appear in the BAM
+                     header. The sequence contents in each SeqRecord may be
+                     undefined, but the sequence length must be defined.
+                     If targets is None (the default value), the alignments
+                     must have an attribute .targets providing the list of
+                     SeqRecord objects.
+         - index   - output stream or file name to write a BAI index to. If
+                     the file name ends with .csi, a CSI index is written
+                     instead. The alignments must then be sorted by position.
+                     If None (default), no index is written.
+
+        """
+        super().__init__(target, md)
+        self.targets = targets
+        self.index = index
+
+    def write_header(self, stream, alignments):
+        """Write the BAM header, and store the reference names."""
+        header = Alignments()
+        try:
+            header.metadata = alignments.metadata
+        except AttributeError:
+            pass
+        if self.targets is None:
+            try:
+                targets = alignments.targets
+            except AttributeError:
+                raise ValueError(
+                    "targets must be provided if the alignments do not have a "
+                    "targets attribute"
+                ) from None
+        else:
+            targets = self.targets
+        header.targets = targets
+        text = io.StringIO()
+        super().write_header(text, header)
+        text = text.getvalue().encode()
+        data = [b"BAM\1", struct.pack("<i", len(text)), text]
+        data.append(struct.pack("<i", len(targets)))
+        names = {}
+        for refID, record in enumerate(targets):
+            name = record.id.encode() + b"\0"
+            data.append(struct.pack("<i", len(name)))
+            data.append(name)
+            data.append(struct.pack("<i", len(record.seq)))
+            names[record.id] = refID
+        self._refIDs = names
+        stream.write(b"".join(data))
+
+    def format_alignment(self, alignment, md=None):
+        """Return a bytes object with a single alignment as a BAM record."""
+        (
+            qname,
+            flag,
+            rname,
+            pos,
+            mapq,
+            cigar,
+            rnext,
+            pnext,
+            tlen,
+            seq,
+            phred,
+            md,
+        ) = self._get_fields(alignment, md)
+        refIDs = self._refIDs
+        qname = qname.encode() + b"\0"
+        if rname == "*":
+            refID = -1
+        else:
+            refID = refIDs[rname]
+        if cigar is None:
+            cigar = []
+        else:
+            cigar = [
+                count << 4 | _operation_codes[operation] for count, operation in cigar
+            ]
+        if rnext == "*":
+            next_refID = -1
+        elif rnext == "=":
+            next_refID = refID
+        else:
+            next_refID = refIDs[rnext]
+        if seq is None:
+            l_seq = 0
+            seq = b""
+        else:
+            l_seq = len(seq)
+            codes = seq.upper().encode().translate(_nucleotide_codes)
+            if b"\xff" in codes:
+                raise ValueError(
+                    "sequence contains letters that cannot be stored in BAM"
+                )
+            if l_seq % 2:
+                codes += b"\0"  # pad with "="
+            # each code is less than 16, so shifting the codes at even
+            # positions by four bits packs two codes into each byte
+            high = int.from_bytes(codes[0::2], "big")
+            low = int.from_bytes(codes[1::2], "big")
+            seq = (high << 4 | low).to_bytes(len(codes) // 2, "big")
+        if phred is None:
+            qual = b"\xff" * l_seq
+        else:
+            qual = bytes(list(phred))
+        tags = []
+        if md is not None:
+            tags.append(b"MDZ" + md.encode() + b"\0")
+        for tag, datatype, value in self._get_tags(alignment):
+            tags.append(tag.encode())
+            if datatype == "i":
+                for letter in "CSI" if value >= 0 else "csi":
+                    try:
+                        tags.append(
+                            letter.encode() + struct.pack(_tag_formats[letter], value)
+                        )
+                    except struct.error:
+                        continue
+                    break
+                else:
+                    raise ValueError(f"integer value in tag {tag} is out of range")
+            elif datatype == "f":
+                tags.append(b"f" + struct.pack("<f", value))
+            elif datatype == "A":
+                tags.append(b"A" + value.encode())
+            elif datatype == "Z":
+                tags.append(b"Z" + value.encode() + b"\0")
+            elif datatype == "H":
+                tags.append(b"H" + value.hex().upper().encode() + b"\0")
+            elif datatype == "B":
+                letter, values = value
+                dtype = np.dtype(sam._array_dtypes[letter]).newbyteorder("<")
+                values = np.asarray(values, dtype)
+                tags.append(b"B" + letter.encode() + struct.pack("<i", len(values)))
+                tags.append(values.tobytes())
+        if len(cigar) > 0xFFFF:
+            # store the CIGAR in the CG tag, as described in the specification
+            values = np.array(cigar, "<u4")
+            tags.append(b"CGBI" + struct.pack("<i", len(values)) + values.tobytes())
+            end = _reference_end(pos, cigar)
+            cigar = [l_seq << 4 | 4, (end - pos) << 4 | 3]
+        if refID < 0:
+            bin_ = 4680
+        else:
+            bin_ = _reg2bin(pos, _reference_end(pos, cigar))
+        data = _record_formatter.pack(
+            refID,
+            pos,
+            len(qname),
+            mapq,
+            bin_,
+            len(cigar),
+            flag,
+            l_seq,
+            next_refID,
+            pnext,
+            tlen,
+        )
+        data = b"".join(
+            [
+                data,
+                qname,
+                struct.pack("<%dI" % len(cigar), *cigar),
+                seq,
+                qual,
+                *tags,
+            ]
+        )
+        return struct.pack("<i", len(data)) + data
+
+    def write_alignments(self, stream, alignments):
+        """Write alignments to the BGZF output stream, and return the number of alignments.
+
+        alignments - A list or iterator returning Alignment objects
+        stream     - Output BGZF stream.
+        """
+        index = self._index
+        count = 0
+        for alignment in alignments:
+            record = self.format_alignment(alignment)
+            start_offset = stream.tell()
+            stream.write(record)
+            if index is not None:
+                index.add(record, start_offset, stream.tell())
+            count += 1
+        return count
+
+    def write_file(self, stream, alignments):
+        """Write the alignments to the file stream, and return the number of alignments.
+
+        alignments - A list or iterator returning Alignment objects
+        stream     - Output file stream.
+        """
+        bgzf_stream = bgzf.BgzfWriter(fileobj=stream)
+        self.write_header(bgzf_stream, alignments)
+        # Give the header its own BGZF block, as samtools does
+        bgzf_stream.flush()
+        if self.index is None:
+            self._index = None
+        else:
+            self._index = _IndexBuilder(list(self._refIDs))
+        count = self.write_alignments(bgzf_stream, alignments)
+        bgzf_stream.flush()
+        stream.write(bgzf._bgzf_eof)
+        if self._index is not None:
+            if isinstance(self.index, str) and self.index.endswith(".csi"):
+                with bgzf.BgzfWriter(self.index, "wb") as output:
+                    output.write(self._index.to_csi())
+            else:
+                data = self._index.to_bai()
+                try:
+                    self.index.write(data)
+                except AttributeError:
+                    with open(self.index, "wb") as output:
+                        output.write(data)
+        return count
+
+
+class AlignmentIterator(sam._AlignmentIterator):
+    """Alignment iterator for Binary Alignment/Map (BAM) files.
+
+    Each record in the file contains one genomic alignment, which are loaded
+    and returned incrementally. The information in each record is stored in
+    the alignment as described for Bio.Align.sam.AlignmentIterator.
+    """
+
+    fmt = "BAM"
+    mode = "b"
+
+    def __init__(self, source, index=None):
+        """Create an AlignmentIterator object.
+
+        Arguments:
+         - source - input file stream, or path to input file.
+         - index  - input file stream, or path to the BAI or CSI index file.
+                    If None (default), and source is a path, then the index
+                    file is searched for by adding the extension .bai or .csi
+                    to the path, or by replacing the .bam extension by .bai.
+                    The index is used by the search method only.
+
+        """
+        self.source = source
+        try:
+            handle = open(source, "rb")
+        except TypeError:  # not a path, assume we received a stream
+            if source.read(0) != b"":
+                raise StreamModeError(
+                    f"{self.fmt} files must be opened in binary mode."
+                ) from None
+            handle = source
+        else:
+            if index is None:
+                paths = [source + ".bai", source + ".csi"]
+                if source.endswith(".bam"):
+                    paths.append(source[:-4] + ".bai")
+                for path in paths:
+                    if os.path.isfile(path):
+                        index = path
+                        break
+        self._handle = handle
+        self._stream = bgzf.BgzfReader(fileobj=handle, mode="rb")
+        self._index = 0
+        self._read_header(self._stream)
+        self._bam_index = index
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        try:
+            handle = self._handle
+        except AttributeError:
+            return
+        if handle is not self.source:
+            handle.close()
+        del self._handle
+        del self._stream
+
+    def _read_header(self, stream):
+        magic = stream.read(4)
+        if magic != b"BAM\1":
+            raise ValueError("file does not start with the BAM magic string")
+        (l_text,) = struct.unpack("<i", stream.read(4))
+        text = stream.read(l_text).rstrip(b"\0").decode()
+        super()._read_header(io.StringIO(text))
+        records = {record.id: record for record in self.targets}
+        targets = []
+        (n_ref,) = struct.unpack("<i", stream.read(4))
+        for refID in range(n_ref):
+            (l_name,) = struct.unpack("<i", stream.read(4))
+            name = stream.read(l_name)[:-1].decode()
+            (l_ref,) = struct.unpack("<i", stream.read(4))
+            record = records.get(name)
+            if record is None or len(record.seq) != l_ref:
+                sequence = Seq(None, length=l_ref)
+                record = SeqRecord(sequence, id=name, description="")
+            targets.append(record)
+        self.targets = targets
+        self._target_indices = {
+            record.id: index for index, record in enumerate(self.targets)
+        }
+        self._data_offset = stream.tell()
+
+    def _read_record(self, stream):
+        """Read the data of one BAM record, or return None at the end (PRIVATE)."""
+        data = stream.read(4)
+        if not data:
+            return None
+        if len(data) < 4:
+            raise ValueError("BAM file is truncated")
+        (block_size,) = struct.unpack("<i", data)
+        data = stream.read(block_size)
+        if len(data) < block_size:
+            raise ValueError("BAM file is truncated")
+        return data
+
+    def _parse_record(self, data):
+        """Return the fields of a BAM record as for a SAM line (PRIVATE)."""
+        (
+            refID,
+            pos,
+            l_read_name,
+            mapq,
+            bin_,
+            n_cigar_op,
+            flag,
+            l_seq,
+            next_refID,
+            next_pos,
+            tlen,
+        ) = _record_formatter.unpack_from(data)
+        i = 32
+        qname = data[i : i + l_read_name - 1].decode()
+        i += l_read_name
+        cigar = struct.unpack_from("<%dI" % n_cigar_op, data, i)
+        i += 4 * n_cigar_op
+        n = (l_seq + 1) // 2
+        seq = data[i : i + n]
+        i += n
+        qual = data[i : i + l_seq]
+        i += l_seq
+        tags = self._parse_tags(data, i)
+        if (
+            n_cigar_op == 2
+            and cigar[0] == l_seq << 4 | 4
+            and cigar[1] & 0xF == 3
+            and "CG" in tags
+        ):
+            # the real CIGAR is stored in the CG tag
+            cigar = tags.pop("CG").tolist()
+        if cigar:
+            cigar = "".join(
+                "%d%s" % (operation >> 4, _operations[operation & 0xF])
+                for operation in cigar
+            )
+        else:
+            cigar = "*"
+        if l_seq == 0:
+            query = "*"
+        else:
+            query = b"".join(map(_decoded_pairs.__getitem__, seq))
+            query = query[:l_seq].decode()
+        if l_seq == 0 or qual[0] == 0xFF:
+            phred = None
+        else:
+            phred = list(qual)
+        if refID < 0:
+            rname = "*"
+        else:
+            rname = self.targets[refID].id
+        if next_refID < 0:
+            rnext = "*"
+        elif next_refID == refID:
+            rnext = "="
+        else:
+            rnext = self.targets[next_refID].id
+        return (
+            qname,
+            flag,
+            rname,
+            pos,
+            mapq,
+            cigar,
+            rnext,
+            next_pos,
+            tlen,
+            query,
+            phred,
+            tags,
+        )
+
+    @staticmethod
+    def _parse_tags(data, i):
+        """Return a dictionary with the tags in a BAM record (PRIVATE)."""
+        tags = {}
+        n = len(data)
+        while i < n:
+            tag = data[i : i + 2].decode()
+            datatype = chr(data[i + 2])
+            i += 3
+            if datatype == "A":
+                value = chr(data[i])
+                i += 1
+            elif datatype in ("Z", "H"):
+                j = data.index(b"\0", i)
+                value = data[i:j].decode()
+                i = j + 1
+                if datatype == "H":
+                    value = bytes.fromhex(value)
+            elif datatype == "B":
+                letter = chr(data[i])
+                (count,) = struct.unpack_from("<i", data, i + 1)
+                i += 5
+                dtype = np.dtype(sam._array_dtypes[letter]).newbyteorder("<")
+                value = np.frombuffer(data, dtype, count, i)
+                value = value.astype(sam._array_dtypes[letter])
+                i += count * dtype.itemsize
+            else:
+                try:
+                    fmt = _tag_formats[datatype]
+                except KeyError:
+                    raise ValueError(
+                        f"Unknown data type '{datatype}' in tag '{tag}'"
+                    ) from None
+                (value,) = struct.unpack_from(fmt, data, i)
+                i += struct.calcsize(fmt)
+            tags[tag] = value
+        return tags
+
+    def _read_next_alignment(self, stream):
+        data = self._read_record(stream)
+        if data is None:
+            return None
+        return self._create_alignment(*self._parse_record(data))
+
+    def search(self, chromosome=None, start=None, end=None):
+        """Iterate over alignments overlapping the specified chromosome region.
+
+        This method finds the alignments to the specified chromosome that
+        fully or partially overlap the chromosome region between start and
+        end. If an index file is available, only the parts of the file that
+        may contain such alignments are read and decompressed; this requires
+        the alignments to be sorted by position. Otherwise, all alignments in
+        the file are scanned.
+
+        Arguments:
+         - chromosome - chromosome name. If None (default value), include all
+           alignments.
+         - start      - starting position on the chromosome. If None (default
+           value), use 0 as the starting position.
+         - end        - end position on the chromosome. If None (default value),
+           use the length of the chromosome as the end position.
+
+        As for unmapped reads placed on a chromosome, alignments that do not
+        consume any reference sequence are considered to cover a single base
+        at their position.
+        """
+        stream = self._stream
+        if chromosome is None:
+            if start is not None or end is not None:
+                raise ValueError(
+                    "start and end must both be None if chromosome is None"
+                )
+            chunks = [[self._data_offset, None]]
+            refID = None
+        else:
+            try:
+                refID = self._target_indices[chromosome]
+            except KeyError:
+                raise ValueError(
+                    "Failed to find %s in alignments" % chromosome
+                ) from None
+            if start is None:
+                if end is None:
+                    start = 0
+                    end = len(self.targets[refID])
+                else:
+                    raise ValueError("end must be None if start is None")
+            elif end is None:
+                end = start + 1
+            index = self._bam_index
+            if index is None:
+                chunks = [[self._data_offset, None]]
+            else:
+                if not isinstance(index, _Index):
+                    index = self._bam_index = self._read_index(index)
+                chunks = index.chunks(refID, start, end)
+        for chunk_start, chunk_end in chunks:
+            offset = chunk_start
+            while chunk_end is None or offset < chunk_end:
+                stream.seek(offset)
+                data = self._read_record(stream)
+                if data is None:
+                    break
+                offset = stream.tell()
+                if refID is not None:
+                    record_refID, pos, l_read_name = struct.unpack_from("<iiB", data)
+                    if record_refID != refID:
+                        if self._bam_index is None:
+                            continue
+                        break
+                    if pos >= end:
+                        if self._bam_index is None:
+                            continue
+                        break
+                    (n_cigar_op,) = struct.unpack_from("<H", data, 12)
+                    cigar = struct.unpack_from(
+                        "<%dI" % n_cigar_op, data, 32 + l_read_name
+                    )
+                    if _reference_end(pos, cigar) <= start:
+                        continue
+                yield self._create_alignment(*self._parse_record(data))
+
+    @staticmethod
+    def _read_index(index):
+        """Read the index from a path or a binary stream (PRIVATE)."""
+        try:
+            stream = open(index, "rb")
+        except TypeError:  # not a path, assume we received a stream
+            return _Index.read(index)
+        with stream:
+            return _Index.read(stream)
@@ -53,10 +53,14 @@ You are expected to use this module via the Bio.Align functions.
 import copy
 import io
 import itertools
+import os
 import struct
 import sys
+import tempfile
 import zlib
 from collections import namedtuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 import numpy as np
@@ -229,6 +233,8 @@ class AlignmentWriter(interfaces.AlignmentWriter):
         itemsPerSlot=512,
         blockSize=256,
         extraIndex=(),
+        streaming=False,
+        threads=1,
     ):
         """Create an AlignmentWriter object.
 
@@ -265,9 +271,33 @@ class AlignmentWriter(interfaces.AlignmentWriter):
          - extraIndex   - List of strings with the names of extra columns to be
                           indexed.
                           Default value is an empty list.
+         - streaming    - If False (default), the alignments are read three
+                          times (to find the chromosomes, to write the data,
+                          and to calculate the zoom levels), and therefore
+                          must be stored in a list or in an Alignments object
+                          that can be rewound.
+                          If True, the alignments are read only once, and
+                          stored in binary form in a temporary file (created
+                          by the tempfile module) from which they are read
+                          back in sequence. Any iterator over alignments can
+                          then be used, and at most the data of a single
+                          chromosome are kept in memory.
+         - threads      - Number of threads used to compress the data blocks
+                          and the zoom level blocks.
+                          If None, use the number of processors on the
+                          machine.
+                          Default value is 1.
+
+        The file contents do not depend on the streaming and threads
+        arguments; in particular, they remain identical to the bigBed files
+        written by UCSC's bedToBigBed program.
         """
         if bedN < 3 or bedN > 12:
             raise ValueError("bedN must be between 3 and 12")
+        if threads is None:
+            threads = os.cpu_count() or 1
+        elif threads < 1:
+            raise ValueError("threads must be positive")
         super().__init__(target)
         self.bedN = bedN
         self.declaration = declaration
@@ -276,13 +306,29 @@ class AlignmentWriter(interfaces.AlignmentWriter):
         self.extraIndexNames = extraIndex
         self.itemsPerSlot = itemsPerSlot
         self.blockSize = blockSize
+        self.streaming = streaming
+        self.threads = threads
+        self._executor = None
 
     def write_file(self, stream, alignments):
-        """Write the alignments to the file stream, and return the number of alignments.
+        """Write the alignments to the file stream.
 
         alignments - A list or iterator returning Alignment objects
         stream     - Output file stream.
         """
+        if self.threads == 1:
+            self._write_file(stream, alignments)
+            return
+        # zlib releases the GIL while compressing, so the data blocks are
+        # compressed in parallel in a pool of threads.
+        with ThreadPoolExecutor(self.threads) as executor:
+            self._executor = executor
+            try:
+                self._write_file(stream, alignments)
+            finally:
+                self._executor = None
+
+    def _write_file(self, stream, alignments):
         if self.targets is None:
             targets = alignments.targets
         else:
@@ -297,9 +343,74 @@ class AlignmentWriter(interfaces.AlignmentWriter):
         declaration = self.declaration
         header.fieldCount = len(declaration)
         extra_indices = _ExtraIndices(self.extraIndexNames, declaration)
-        chromUsageList, aveSize = self._get_chrom_usage(
-            alignments, targets, extra_indices
-        )
+        if self.streaming:
+            with tempfile.TemporaryFile() as spool:
+                keys = [[] for extra_index in extra_indices]
+                alignments = self._spool_alignments(
+                    alignments, spool, extra_indices, keys
+                )
+                chromUsageList, aveSize, bedCount = self._get_chrom_usage(
+                    alignments, targets, extra_indices
+                )
+                extra_indices.initialize(bedCount)
+                if bedCount > 0:
+                    for extra_index, names in zip(extra_indices, keys):
+                        extra_index.chunks["name"] = names
+                del keys
+                records = self._read_spool(spool)
+                ranges = (record[:3] for record in self._read_spool(spool))
+                self._write_contents(
+                    stream,
+                    records,
+                    ranges,
+                    bedCount,
+                    header,
+                    extra_indices,
+                    chromUsageList,
+                    aveSize,
+                )
+        else:
+            chromUsageList, aveSize, bedCount = self._get_chrom_usage(
+                alignments, targets, extra_indices
+            )
+            extra_indices.initialize(bedCount)
+            records = self._pack_alignments(alignments, extra_indices)
+            ranges = self._get_ranges(alignments, chromUsageList)
+            self._write_contents(
+                stream,
+                records,
+                ranges,
+                bedCount,
+                header,
+                extra_indices,
+                chromUsageList,
+                aveSize,
+            )
+
+    @staticmethod
+    def _get_ranges(alignments, chromUsageList):
+        """Return the chromosome index, start, and end of each alignment (PRIVATE)."""
+        chromIds = {
+            chromName.decode(): chromId
+            for chromName, chromId, chromSize in chromUsageList
+        }
+        for alignment in alignments:
+            chromId = chromIds[alignment.target.id]
+            coordinates = alignment.coordinates
+            yield chromId, coordinates[0, 0], coordinates[0, -1]
+
+    def _write_contents(
+        self,
+        stream,
+        records,
+        ranges,
+        bedCount,
+        header,
+        extra_indices,
+        chromUsageList,
+        aveSize,
+    ):
+        declaration = self.declaration
         stream.write(bytes(header.size))
         stream.write(bytes(_ZoomLevels.size))
         header.autoSqlOffset = stream.tell()
@@ -314,10 +425,9 @@ class AlignmentWriter(interfaces.AlignmentWriter):
         )
         header.fullDataOffset = stream.tell()
         reductions = _ZoomLevels.calculate_reductions(aveSize)
-        stream.write(len(alignments).to_bytes(8, sys.byteorder))
-        extra_indices.initialize(len(alignments))
-        maxBlockSize, regions = self.write_alignments(
-            alignments,
+        stream.write(bedCount.to_bytes(8, sys.byteorder))
+        maxBlockSize, regions = self._write_records(
+            records,
             stream,
             reductions,
             extra_indices,
@@ -332,12 +442,14 @@ class AlignmentWriter(interfaces.AlignmentWriter):
         _RTreeFormatter().write(
             regions, self.blockSize, 1, header.fullIndexOffset, stream
         )
+        del regions
         zoomList, totalSum = self._write_zoom_levels(
-            alignments,
+            ranges,
             stream,
             header.fullIndexOffset - header.fullDataOffset,
             chromUsageList,
             reductions,
+            bedCount,
         )
         header.zoomLevels = len(zoomList)
         for extra_index in extra_indices:
@@ -419,15 +531,14 @@ class AlignmentWriter(interfaces.AlignmentWriter):
         )
         if bedCount > 0:
             aveSize = totalBases / bedCount
-        alignments._len = bedCount
-        return chromUsageList, aveSize
+        return chromUsageList, aveSize, bedCount
 
     def _write_zoom_levels(
-        self, alignments, output, dataSize, chromUsageList, reductions
+        self, ranges, output, dataSize, chromUsageList, reductions, bedCount
     ):
         zoomList = _ZoomLevels()
         totalSum = _Summary()
-        if len(alignments) == 0:
+        if bedCount == 0:
             totalSum.minVal = 0.0
             totalSum.maxVal = 0.0
         else:
@@ -446,13 +557,14 @@ class AlignmentWriter(interfaces.AlignmentWriter):
                 initialReduction = reductions[0]
             initialReduction["size"].tofile(output)
             size = itemsPerSlot * _RegionSummary.size
+            executor = self._executor
             if doCompress:
-                buffer = _ZippedBufferedStream(output, size)
+                buffer = _ZippedBufferedStream(output, size, executor)
             else:
                 buffer = _BufferedStream(output, size)
             regions = []
             rezoomedList = []
-            trees = _RangeTree.generate(chromUsageList, alignments)
+            trees = _RangeTree.generate(chromUsageList, ranges)
             scale = int(initialReduction["scale"])
             doubleReductionSize = scale * _ZoomLevels.bbiResIncrement
             for tree in trees:
@@ -476,7 +588,7 @@ class AlignmentWriter(interfaces.AlignmentWriter):
                 regions, blockSize, itemsPerSlot, indexOffset, output
             )
             if doCompress:
-                buffer = _ZippedBufferedStream(output, size)
+                buffer = _ZippedBufferedStream(output, size, executor)
             else:
                 buffer = _BufferedStream(output, _RegionSummary.size)
             zoomList.reduce(
@@ -599,96 +711,331 @@ class AlignmentWriter(interfaces.AlignmentWriter):
         return chrom, chromStart, chromEnd, rest
 
     def write_alignments(self, alignments, output, reductions, extra_indices):
-        """Write alignments to the output file, and return the number of alignments.
+        """Write alignments to the output file, and return the regions of the data blocks.
 
         alignments - A list or iterator returning Alignment objects
         stream     - Output file stream.
         """
-        itemsPerSlot = self.itemsPerSlot
-        chromId = -1
-        itemIx = 0
-        sectionStartIx = 0
-        sectionEndIx = 0
-        currentChrom = None
+        records = self._pack_alignments(alignments, extra_indices)
+        return self._write_records(records, output, reductions, extra_indices)
 
-        regions = []
-        if self.compress is True:
-            buffer = _ZippedStream()
-        else:
-            buffer = BytesIO()
-        maxBlockSize = 0
+    def _pack_alignments(self, alignments, extra_indices):
+        """Return the alignments as bigBed records (PRIVATE).
 
+        For each alignment, this generator yields the chromosome index, the
+        start and end position, and the alignment in the binary bigBed format.
+        """
         # Supplemental Table 12: Binary BED-data format
         # chromId     4 bytes, unsigned
         # chromStart  4 bytes, unsigned
         # chromEnd    4 bytes, unsigned
         # rest        zero-terminated string in tab-separated format
         formatter = struct.Struct("=III")
+        chromId = -1
+        currentChrom = None
+        for recordIx, alignment in enumerate(alignments):
+            chrom, start, end, rest = self._extract_fields(alignment)
+            if chrom != currentChrom:
+                currentChrom = chrom
+                chromId += 1
+            for extra_index in extra_indices:
+                extra_index.addKeysFromRow(alignment, recordIx)
+            data = formatter.pack(chromId, start, end) + rest + b"\0"
+            yield chromId, start, end, data
 
-        done = False
-        region = None
-        alignments = iter(alignments)
+    def _spool_alignments(self, alignments, spool, extra_indices, keys):
+        """Store the alignments in binary form in a temporary file (PRIVATE).
+
+        This generator yields each alignment before storing it, so that the
+        alignments can be checked by _get_chrom_usage while they are read.
+        The values of the extra indices are appended to the lists in keys.
+        """
+        formatter = struct.Struct("=III")
+        chromId = -1
+        currentChrom = None
+        for alignment in alignments:
+            yield alignment
+            chrom, start, end, rest = self._extract_fields(alignment)
+            if chrom != currentChrom:
+                currentChrom = chrom
+                chromId += 1
+            for extra_index, names in zip(extra_indices, keys):
+                names.append(extra_index.get_value(alignment).encode())
+            spool.write(formatter.pack(chromId, start, end) + rest + b"\0")
+
+    @staticmethod
+    def _read_spool(spool, size=1 << 24):
+        """Read the bigBed records stored in a temporary file (PRIVATE).
+
+        The file is read in chunks of the given size; for each record, this
+        generator yields the chromosome index, the start and end position, and
+        the record in binary form.
+        """
+        formatter = struct.Struct("=III")
+        offset = formatter.size
+        spool.seek(0)
+        data = b""
         while True:
-            try:
-                alignment = next(alignments)
-            except StopIteration:
-                itemIx = itemsPerSlot
-                done = True
+            chunk = spool.read(size)
+            if not chunk:
+                break
+            data += chunk
+            i = 0
+            while True:
+                # the zero-terminated string starts after the binary fields
+                j = data.find(b"\0", i + offset)
+                if j < 0:
+                    break
+                j += 1
+                chromId, start, end = formatter.unpack_from(data, i)
+                yield chromId, start, end, data[i:j]
+                i = j
+            data = data[i:]
+        assert not data
+
+    def _write_records(self, records, output, reductions, extra_indices):
+        """Write the bigBed records in data blocks (PRIVATE).
+
+        Return the maximum size of the uncompressed data blocks, and the
+        regions covered by each data block.
+        """
+        itemsPerSlot = self.itemsPerSlot
+        if self._executor is None:
+            batchSize = 1
+        else:
+            batchSize = 16 * self.threads
+        regions = []
+        blocks = []
+        items = []
+        region = None
+        maxBlockSize = 0
+        sectionStartIx = 0
+        sectionEndIx = 0
+        # Count the number of summaries in each zoom level in Python lists, as
+        # accessing the fields of a NumPy record is slow.
+        scales = reductions["scale"].tolist()
+        sizes = reductions["size"].tolist()
+        ends = reductions["end"].tolist()
+        levels = range(len(scales))
+        for chromId, start, end, record in records:
+            if (
+                region is not None
+                and chromId == region.chromId
+                and len(items) < itemsPerSlot
+            ):
+                if end > region.end:
+                    region.end = end
             else:
-                chrom, start, end, rest = self._extract_fields(alignment)
-                if chrom != currentChrom:
-                    if currentChrom is not None:
-                        itemIx = itemsPerSlot
-                    currentChrom = chrom
-                    chromId += 1
-                    reductions["end"] = 0
-            if itemIx == itemsPerSlot:
-                blockStartOffset = output.tell()
-                size = buffer.tell()
-                if size > maxBlockSize:
-                    maxBlockSize = size
-                data = buffer.getvalue()
-                output.write(data)
-                buffer.seek(0)
-                buffer.truncate(0)
-                if extra_indices:
-                    blockEndOffset = output.tell()
-                    blockSize = blockEndOffset - blockStartOffset
-                    for extra_index in extra_indices:
-                        extra_index.addOffsetSize(
-                            blockStartOffset,
-                            blockSize,
-                            sectionStartIx,
-                            sectionEndIx,
-                        )
+                if region is None or chromId != region.chromId:
+                    ends = [0] * len(scales)
+                if items:
+                    data = b"".join(items)
+                    blocks.append((region, sectionStartIx, sectionEndIx, data))
+                    items = []
                     sectionStartIx = sectionEndIx
-                region.offset = blockStartOffset
-                if done is True:
-                    break
-                itemIx = 0
-            if itemIx == 0:
+                    if len(blocks) == batchSize:
+                        size = self._write_blocks(blocks, output, extra_indices)
+                        maxBlockSize = max(maxBlockSize, size)
+                        blocks = []
                 region = _Region(chromId, start, end)
                 regions.append(region)
-            elif end > region.end:
-                region.end = end
-            itemIx += 1
-            for row in reductions:
-                if start >= row["end"]:
-                    row["size"] += 1
-                    row["end"] = start + row["scale"]
-                while end > row["end"]:
-                    row["size"] += 1
-                    row["end"] += row["scale"]
-            if extra_indices:
-                for extra_index in extra_indices:
-                    extra_index.addKeysFromRow(alignment, sectionEndIx)
-                sectionEndIx += 1
-            data = formatter.pack(chromId, start, end)
-            buffer.write(data + rest + b"\0")
+            items.append(record)
+            sectionEndIx += 1
+            for i in levels:
+                if start >= ends[i]:
+                    sizes[i] += 1
+                    ends[i] = start + scales[i]
+                while end > ends[i]:
+                    sizes[i] += 1
+                    ends[i] += scales[i]
+        reductions["size"] = sizes
+        reductions["end"] = ends
+        if items:
+            blocks.append((region, sectionStartIx, sectionEndIx, b"".join(items)))
+            size = self._write_blocks(blocks, output, extra_indices)
+            maxBlockSize = max(maxBlockSize, size)
         return maxBlockSize, regions
 
+    def _write_blocks(self, blocks, output, extra_indices):
+        """Write data blocks, and return the largest uncompressed size (PRIVATE)."""
+        data = [block for region, startIx, endIx, block in blocks]
+        maxBlockSize = max(len(block) for block in data)
+        if self.compress:
+            data = _compress_blocks(data, self._executor)
+        for (region, startIx, endIx, _), block in zip(blocks, data):
+            region.offset = output.tell()
+            output.write(block)
+            for extra_index in extra_indices:
+                extra_index.addOffsetSize(region.offset, len(block), startIx, endIx)
+        return maxBlockSize
+
+
+class _BBIReader:
+    """Region searches shared by the bigBed and bigWig file readers (PRIVATE).
+
+    Subclasses store the file stream as _stream, the byte order as byteorder,
+    the chromosomes as targets, the zoom levels as _zoomList, and set
+    _compressed to True if the data blocks are compressed. A dictionary
+    _zoomTrees and an OrderedDict _cache must be initialized to empty.
+    """
+
+    # maximum number of decompressed data blocks kept in the cache
+    cache_size = 256
 
-class AlignmentIterator(interfaces.AlignmentIterator):
+    def _parse_region(self, chromosome, start, end):
+        """Return the chromosome region as a list of (chromIx, start, end) tuples (PRIVATE).
+
+        If chromosome is None, the list includes all chromosomes.
+        """
+        if chromosome is None:
+            if start is not None or end is not None:
+                raise ValueError(
+                    "start and end must both be None if chromosome is None"
+                )
+            return [
+                (chromIx, 0, len(target)) for chromIx, target in enumerate(self.targets)
+            ]
+        try:
+            chromIds = self._chromIds
+        except AttributeError:
+            chromIds = {
+                target.id: chromIx for chromIx, target in enumerate(self.targets)
+            }
+            self._chromIds = chromIds
+        try:
+            chromIx = chromIds[chromosome]
+        except KeyError:
+            raise ValueError("Failed to find %s in alignments" % chromosome) from None
+        if start is None:
+            if end is None:
+                start = 0
+                end = len(self.targets[chromIx])
+            else:
+                raise ValueError("end must be None if start is None")
+        elif end is None:
+            end = start + 1
+        return [(chromIx, start, end)]
+
+    def _find_blocks(self, tree, chromIx, start, end):
+        """Return the data blocks of the R tree overlapping the region (PRIVATE).
+
+        The data blocks are returned as a list of (dataOffset, dataSize) tuples,
+        sorted by their offset in the file.
+        """
+        padded_start = start - 1
+        padded_end = end + 1
+        blocks = []
+        nodes = [tree]
+        while nodes:
+            node = nodes.pop()
+            for child in node.children:
+                if (child.endChromIx, child.endBase) < (chromIx, padded_start):
+                    continue
+                if (chromIx, padded_end) < (child.startChromIx, child.startBase):
+                    continue
+                try:
+                    child.children
+                except AttributeError:
+                    blocks.append((child.dataOffset, child.dataSize))
+                else:
+                    nodes.append(child)
+        blocks.sort()
+        return blocks
+
+    def _read_blocks(self, blocks):
+        """Return a dictionary of decompressed data blocks keyed by offset (PRIVATE).
+
+        The blocks are specified as (dataOffset, dataSize) tuples sorted by
+        offset. Blocks found in the cache are not read again; the remaining
+        blocks are read from the file, with adjacent blocks fetched in a single
+        read, and stored in the cache.
+        """
+        cache = self._cache
+        data = {}
+        runs = []
+        for offset, size in blocks:
+            try:
+                data[offset] = cache[offset]
+            except KeyError:
+                if runs and runs[-1][1] == offset:
+                    runs[-1][1] += size
+                    runs[-1][2].append((offset, size))
+                else:
+                    runs.append([offset, offset + size, [(offset, size)]])
+            else:
+                cache.move_to_end(offset)
+        stream = self._stream
+        for start, end, run in runs:
+            stream.seek(start)
+            buffer = stream.read(end - start)
+            for offset, size in run:
+                i = offset - start
+                block = buffer[i : i + size]
+                if self._compressed:
+                    block = zlib.decompress(block)
+                data[offset] = block
+                if self.cache_size > 0:
+                    cache[offset] = block
+                    if len(cache) > self.cache_size:
+                        cache.popitem(last=False)
+        return data
+
+    def _summarize(self, chromosome, start, end, bins, exact=False):
+        """Return the summary of a chromosome region divided into bins (PRIVATE).
+
+        The summary is calculated from the zoom level with the largest reduction
+        level that is at most half the bin size, or from the data by the
+        _summarize_data method if no zoom level is fine enough or if exact is
+        True.
+        """
+        if chromosome is None:
+            raise ValueError("chromosome must not be None")
+        ((chromIx, start, end),) = self._parse_region(chromosome, start, end)
+        if bins < 1:
+            raise ValueError("bins must be positive")
+        edges = start + (np.arange(bins + 1) * (end - start)) // bins
+        desiredReduction = (end - start) // bins // 2
+        zoomLevel = None
+        if desiredReduction > 1 and not exact:
+            for level in self._zoomList:
+                if level.reductionLevel > desiredReduction:
+                    continue
+                if zoomLevel is None or level.reductionLevel > zoomLevel.reductionLevel:
+                    zoomLevel = level
+        if zoomLevel is None:
+            return self._summarize_data(chromIx, edges)
+        records = self._read_zoom_records(zoomLevel, chromIx, start, end)
+        return _bin_summaries(records, edges)
+
+    def _summarize_data(self, chromIx, edges):
+        """Return the summary of the data in each bin between the edges (PRIVATE)."""
+        records = self._summarize_records(chromIx, edges[0], edges[-1])
+        return _bin_summaries(records, edges)
+
+    def _read_zoom_records(self, zoomLevel, chromIx, start, end):
+        """Return the zoom level summary records overlapping the region (PRIVATE)."""
+        indexOffset = zoomLevel.indexOffset
+        try:
+            tree = self._zoomTrees[indexOffset]
+        except KeyError:
+            stream = self._stream
+            stream.seek(indexOffset)
+            tree = _RTreeFormatter(self.byteorder).read(stream)
+            self._zoomTrees[indexOffset] = tree
+        blocks = self._find_blocks(tree, chromIx, start, end)
+        data = self._read_blocks(blocks)
+        dtype = _RegionSummary.dtype.newbyteorder(self.byteorder)
+        records = [np.frombuffer(data[offset], dtype) for offset, size in blocks]
+        records = np.concatenate(records + [np.zeros(0, dtype)])
+        records = records[
+            (records["chromId"] == chromIx)
+            & (records["start"] < end)
+            & (start < records["end"])
+        ]
+        return records
+
+
+class AlignmentIterator(_BBIReader, interfaces.AlignmentIterator):
     """Alignment iterator for bigBed files.
 
     The pairwise alignments stored in the bigBed file are loaded and returned
@@ -701,11 +1048,15 @@ class AlignmentIterator(interfaces.AlignmentIterator):
 
     def _read_header(self, stream):
         header = _Header.fromfile(stream)
+        definedFieldCount = header.definedFieldCount
+        if definedFieldCount < 3 or definedFieldCount > 12:
+            raise ValueError(
+                "expected between 3 and 12 columns, found %d" % definedFieldCount
+            )
         byteorder = header.byteorder
         autoSqlOffset = header.autoSqlOffset
         self.byteorder = byteorder
         fieldCount = header.fieldCount
-        definedFieldCount = header.definedFieldCount
         fullDataOffset = header.fullDataOffset
         zoomList = _ZoomLevels(byteorder)
         zoomList.read(stream)
@@ -726,6 +1077,9 @@ class AlignmentIterator(interfaces.AlignmentIterator):
                 self.itemsPerSlot,
             ) = formatter.unpack(data)
             assert signature == _RTreeFormatter.signature
+        self._zoomList = zoomList
+        self._zoomTrees = {}
+        self._cache = OrderedDict()
         self.declaration = self._read_autosql(stream, header)
         stream.seek(fullDataOffset)
         (dataCount,) = struct.unpack(byteorder + "Q", stream.read(8))
@@ -843,7 +1197,7 @@ class AlignmentIterator(interfaces.AlignmentIterator):
             else:
                 node = children[0]
 
-    def _search_index(self, stream, chromIx, start, end):
+    def _parse_block(self, data, chromIx, start, end):
         # Supplemental Table 12: Binary BED-data format
         # chromId     4 bytes, unsigned
         # chromStart  4 bytes, unsigned
@@ -851,88 +1205,55 @@ class AlignmentIterator(interfaces.AlignmentIterator):
         # rest        zero-terminated string in tab-separated format
         formatter = struct.Struct(self.byteorder + "III")
         size = formatter.size
-        padded_start = start - 1
-        padded_end = end + 1
-        node = self.tree
-        while True:
-            try:
-                children = node.children
-            except AttributeError:
-                stream.seek(node.dataOffset)
-                data = stream.read(node.dataSize)
-                if self._compressed > 0:
-                    data = zlib.decompress(data)
-                if self.itemsPerSlot == 1:
-                    child_chromIx, child_chromStart, child_chromEnd = formatter.unpack(
-                        data[:size]
+        if self.itemsPerSlot == 1:
+            child_chromIx, child_chromStart, child_chromEnd = formatter.unpack(
+                data[:size]
+            )
+            if child_chromIx == chromIx:
+                if (child_chromStart < end and start < child_chromEnd) or (
+                    child_chromStart == child_chromEnd
+                    and (child_chromStart == end or start == child_chromEnd)
+                ):
+                    yield (
+                        child_chromIx,
+                        child_chromStart,
+                        child_chromEnd,
+                        data,
+                        size,
+                        len(data),
                     )
-                    if child_chromIx == chromIx:
-                        if (child_chromStart < end and start < child_chromEnd) or (
-                            child_chromStart == child_chromEnd
-                            and (child_chromStart == end or start == child_chromEnd)
-                        ):
-                            yield (
-                                child_chromIx,
-                                child_chromStart,
-                                child_chromEnd,
-                                data,
-                                size,
-                                len(data),
-                            )
-                else:
-                    i = 0
-                    n = len(data)
-                    while i < n:
-                        j = i + size
-                        child_chromIx, child_chromStart, child_chromEnd = (
-                            formatter.unpack(data[i:j])
-                        )
-                        i = j
-                        j = data.index(b"\00", i) + 1
-                        rest = data[i:j]
-                        i = j
-                        if child_chromIx != chromIx:
-                            continue
-                        if end <= child_chromStart or child_chromEnd <= start:
-                            if child_chromStart != child_chromEnd:
-                                continue
-                            if child_chromStart != end and child_chromEnd != start:
-                                continue
-                        yield (
-                            child_chromIx,
-                            child_chromStart,
-                            child_chromEnd,
-                            rest,
-                            0,
-                            len(rest),
-                        )
-            else:
-                visit_child = False
-                for child in children:
-                    if (child.endChromIx, child.endBase) < (chromIx, padded_start):
+        else:
+            i = 0
+            n = len(data)
+            while i < n:
+                j = i + size
+                child_chromIx, child_chromStart, child_chromEnd = formatter.unpack(
+                    data[i:j]
+                )
+                i = j
+                j = data.index(b"\00", i) + 1
+                rest = data[i:j]
+                i = j
+                if child_chromIx != chromIx:
+                    continue
+                if end <= child_chromStart or child_chromEnd <= start:
+                    if child_chromStart != child_chromEnd:
                         continue
-                    if (chromIx, padded_end) < (child.startChromIx, child.startBase):
+                    if child_chromStart != end and child_chromEnd != start:
                         continue
-                    visit_child = True
-                    break
-                if visit_child:
-                    node = child
-                    continue
-            while True:
-                parent = node.parent
-                if parent is None:
-                    return
-                for index, child in enumerate(parent.children):
-                    if id(node) == id(child):
-                        break
-                else:
-                    raise RuntimeError("Failed to find child node")
-                try:
-                    node = parent.children[index + 1]
-                except IndexError:
-                    node = parent
-                else:
-                    break
+                yield (
+                    child_chromIx,
+                    child_chromStart,
+                    child_chromEnd,
+                    rest,
+                    0,
+                    len(rest),
+                )
+
+    def _search_index(self, chromIx, start, end):
+        for offset, size in self._find_blocks(self.tree, chromIx, start, end):
+            data = self._read_blocks([(offset, size)])[offset]
+            yield from self._parse_block(data, chromIx, start, end)
 
     def _read_next_alignment(self, stream):
         try:
@@ -1054,77 +1375,242 @@ class AlignmentIterator(interfaces.AlignmentIterator):
          - end        - end position on the chromosome. If None (default value),
            use the length of the chromosome as the end position.
 
+        Decompressed data blocks are kept in a cache of at most ``cache_size``
+        blocks (least recently used blocks are discarded first), so that
+        repeated searches of nearby regions do not read and decompress the same
+        data blocks again.
         """
-        stream = self._stream
-        if chromosome is None:
-            if start is not None or end is not None:
-                raise ValueError(
-                    "start and end must both be None if chromosome is None"
+        for region in self._parse_region(chromosome, start, end):
+            for row in self._search_index(*region):
+                chromIx, chromStart, chromEnd, rest, dataStart, dataEnd = row
+                alignment = self._create_alignment(
+                    chromIx, chromStart, chromEnd, rest, dataStart, dataEnd
                 )
-        else:
-            for chromIx, target in enumerate(self.targets):
-                if target.id == chromosome:
-                    break
-            else:
-                raise ValueError("Failed to find %s in alignments" % chromosome)
-            if start is None:
-                if end is None:
-                    start = 0
-                    end = len(target)
-                else:
-                    raise ValueError("end must be None if start is None")
-            elif end is None:
-                end = start + 1
-        data = self._search_index(stream, chromIx, start, end)
-        for row in data:
-            chromIx, chromStart, chromEnd, rest, dataStart, dataEnd = row
-            alignment = self._create_alignment(
-                chromIx, chromStart, chromEnd, rest, dataStart, dataEnd
-            )
-            yield alignment
+                yield alignment
 
+    def search_many(self, regions):
+        """Iterate over the alignments overlapping each of the chromosome regions.
 
-class _ZippedStream(io.BytesIO):
-    def getvalue(self):
-        data = super().getvalue()
-        return zlib.compress(data)
+        Arguments:
+         - regions - an iterable of (chromosome, start, end) tuples, with the
+           same meaning as the arguments of the ``search`` method.
+
+        For each region, this method yields a list of the alignments overlapping
+        the region, in the same order as the regions. The data blocks needed for
+        all regions are collected first, such that each data block is read and
+        decompressed only once, even if it is needed for several regions, and
+        adjacent data blocks are read from the file in a single read.
+        """
+        queries = []
+        blocks = set()
+        for chromosome, start, end in regions:
+            query = []
+            for region in self._parse_region(chromosome, start, end):
+                region_blocks = self._find_blocks(self.tree, *region)
+                blocks.update(region_blocks)
+                query.append((region, region_blocks))
+            queries.append(query)
+        data = self._read_blocks(sorted(blocks))
+        for query in queries:
+            alignments = []
+            for region, region_blocks in query:
+                for offset, size in region_blocks:
+                    for row in self._parse_block(data[offset], *region):
+                        alignment = self._create_alignment(*row)
+                        alignments.append(alignment)
+            yield alignments
+
+    def summary(self, chromosome, start=None, end=None, bins=1):
+        """Return a summary of the alignment coverage of a chromosome region.
+
+        Arguments:
+         - chromosome - chromosome name.
+         - start      - starting position on the chromosome. If None (default
+           value), use 0 as the starting position.
+         - end        - end position on the chromosome. If None (default value),
+           use the length of the chromosome as the end position.
+         - bins       - number of bins of (nearly) equal size into which the
+           region is divided (default value 1).
+
+        The coverage is summarized from the zoom level stored in the bigBed
+        file with the largest reduction level that is at most half the bin size,
+        without parsing the alignments. If no zoom level is fine enough, the
+        coverage is calculated from the start and end positions of the
+        alignments in the region. Zoom levels summarize the coverage over
+        larger regions, which are assigned proportionally to overlapping bins;
+        the summary is then an approximation. As in the zoom levels created by
+        bedToBigBed, each alignment is taken to cover the chromosome region
+        from its start to its end position, including any gaps between its
+        aligned blocks.
+
+        This method returns a NumPy structured array with one element for each
+        bin, with the following fields:
+         - start      - start position of the bin;
+         - end        - end position of the bin;
+         - validCount - number of bases covered by at least one alignment;
+         - minVal     - minimum coverage depth of the covered bases (NaN if
+           validCount is zero);
+         - maxVal     - maximum coverage depth of the covered bases (NaN if
+           validCount is zero);
+         - sumData    - sum of the coverage depth over the bin, which is equal
+           to the number of aligned bases in the bin;
+         - sumSquares - sum of the squared coverage depth over the bin.
+        """
+        return self._summarize(chromosome, start, end, bins)
+
+    def _summarize_records(self, chromIx, start, end):
+        """Return the coverage depth in the region, calculated from the records (PRIVATE).
+
+        The coverage depth is returned in a NumPy structured array with the same
+        fields as the summary records stored in the zoom levels.
+        """
+        starts = []
+        ends = []
+        for row in self._search_index(chromIx, start, end):
+            starts.append(row[1])
+            ends.append(row[2])
+        starts = np.clip(np.array(starts, np.int64), start, end)
+        ends = np.clip(np.array(ends, np.int64), start, end)
+        positions = np.unique(np.concatenate([starts, ends, [start, end]]))
+        depths = np.searchsorted(np.sort(starts), positions[:-1], "right")
+        depths -= np.searchsorted(np.sort(ends), positions[:-1], "right")
+        sizes = np.diff(positions)
+        indices = np.flatnonzero((depths > 0) & (sizes > 0))
+        records = np.zeros(len(indices), _summary_dtype)
+        records["start"] = positions[indices]
+        records["end"] = positions[indices + 1]
+        sizes = sizes[indices]
+        depths = depths[indices]
+        records["validCount"] = sizes
+        records["minVal"] = depths
+        records["maxVal"] = depths
+        records["sumData"] = sizes * depths
+        records["sumSquares"] = sizes * depths * depths
+        return records
+
+
+_summary_dtype = np.dtype(
+    [
+        ("start", np.int64),
+        ("end", np.int64),
+        ("validCount", np.int64),
+        ("minVal", np.float64),
+        ("maxVal", np.float64),
+        ("sumData", np.float64),
+        ("sumSquares", np.float64),
+    ]
+)
+
+
+def _bin_summaries(records, edges):
+    """Distribute the coverage summary records over the bins (PRIVATE).
+
+    The records must be sorted and non-overlapping. Each record contributes to
+    a bin in proportion to the size of its overlap with the bin.
+    """
+    bins = len(edges) - 1
+    starts = records["start"].astype(np.int64)
+    ends = records["end"].astype(np.int64)
+    positions = np.sort(np.concatenate([starts, ends, edges]))
+    positions = positions[np.diff(positions, prepend=-1) != 0]
+    positions = positions[(edges[0] <= positions) & (positions <= edges[-1])]
+    sizes = np.diff(positions)
+    positions = positions[:-1]
+    # find the record containing each segment between consecutive positions
+    indices = np.searchsorted(starts, positions, "right") - 1
+    mask = indices >= 0
+    indices = indices[mask]
+    positions = positions[mask]
+    sizes = sizes[mask]
+    mask = positions < ends[indices]
+    indices = indices[mask]
+    positions = positions[mask]
+    factors = sizes[mask] / np.maximum(ends[indices] - starts[indices], 1)
+    records = records[indices]
+    bin_indices = np.searchsorted(edges, positions, "right") - 1
+    validCount = np.zeros(bins)
+    sumData = np.zeros(bins)
+    sumSquares = np.zeros(bins)
+    minVal = np.full(bins, np.inf)
+    maxVal = np.full(bins, -np.inf)
+    if len(bin_indices) > 0:
+        # The segments are sorted by position, and therefore by bin.
+        groups = np.flatnonzero(np.diff(bin_indices, prepend=-1))
+        bin_indices = bin_indices[groups]
+        validCount[bin_indices] = np.add.reduceat(
+            records["validCount"] * factors, groups
+        )
+        sumData[bin_indices] = np.add.reduceat(records["sumData"] * factors, groups)
+        sumSquares[bin_indices] = np.add.reduceat(
+            records["sumSquares"] * factors, groups
+        )
+        minVal[bin_indices] = np.minimum.reduceat(records["minVal"], groups)
+        maxVal[bin_indices] = np.maximum.reduceat(records["maxVal"], groups)
+    summaries = np.zeros(bins, _summary_dtype)
+    summaries["start"] = edges[:-1]
+    summaries["end"] = edges[1:]
+    summaries["validCount"] = np.round(validCount)
+    summaries["minVal"] = np.where(np.isfinite(minVal), minVal, np.nan)
+    summaries["maxVal"] = np.where(np.isfinite(maxVal), maxVal, np.nan)
+    summaries["sumData"] = sumData
+    summaries["sumSquares"] = sumSquares
+    return summaries
+
+
+def _compress_blocks(blocks, executor=None):
+    """Compress the data blocks, in a pool of threads if an executor is given (PRIVATE)."""
+    if executor is None:
+        return map(zlib.compress, blocks)
+    return executor.map(zlib.compress, blocks)
 
 
 class _BufferedStream:
-    def __init__(self, output, size):
+    batchSize = 64
+
+    def __init__(self, output, size, executor=None):
         self.buffer = BytesIO()
         self.output = output
         self.size = size
+        self.executor = executor
+        self.items = []
+        self.blocks = []
 
     def write(self, item):
-        item.offset = self.output.tell()
-        data = bytes(item)
-        self.buffer.write(data)
+        self.items.append(item)
+        self.buffer.write(bytes(item))
         if self.buffer.tell() == self.size:
-            self.output.write(self.buffer.getvalue())
-            self.buffer.seek(0)
-            self.buffer.truncate(0)
+            self._end_block()
 
     def flush(self):
-        self.output.write(self.buffer.getvalue())
+        self._end_block()
+        self._write_blocks()
+
+    def _end_block(self):
+        self.blocks.append((self.items, self.buffer.getvalue()))
+        self.items = []
         self.buffer.seek(0)
         self.buffer.truncate(0)
+        if self.executor is None or len(self.blocks) == self.batchSize:
+            self._write_blocks()
 
+    def _encode(self, blocks):
+        return blocks
 
-class _ZippedBufferedStream(_BufferedStream):
-    def write(self, item):
-        item.offset = self.output.tell()
-        data = bytes(item)
-        self.buffer.write(data)
-        if self.buffer.tell() == self.size:
-            self.output.write(zlib.compress(self.buffer.getvalue()))
-            self.buffer.seek(0)
-            self.buffer.truncate(0)
+    def _write_blocks(self):
+        output = self.output
+        items = [items for items, block in self.blocks]
+        blocks = self._encode([block for items, block in self.blocks])
+        for items, block in zip(items, blocks):
+            offset = output.tell()
+            for item in items:
+                item.offset = offset
+            output.write(block)
+        self.blocks = []
 
-    def flush(self):
-        self.output.write(zlib.compress(self.buffer.getvalue()))
-        self.buffer.seek(0)
-        self.buffer.truncate(0)
+
+class _ZippedBufferedStream(_BufferedStream):
+    def _encode(self, blocks):
+        return _compress_blocks(blocks, self.executor)
 
 
 class _Header:
@@ -1159,19 +1645,20 @@ class _Header:
     formatter = struct.Struct("=IHHQQQHHQQIQ")
     size = formatter.size
     signature = 0x8789F2EB
+    fmt = "bigBed"
     bbiCurrentVersion = 4
 
     @classmethod
     def fromfile(cls, stream):
         magic = stream.read(4)
-        if int.from_bytes(magic, byteorder="little") == _Header.signature:
+        if int.from_bytes(magic, byteorder="little") == cls.signature:
             byteorder = "<"
-        elif int.from_bytes(magic, byteorder="big") == _Header.signature:
+        elif int.from_bytes(magic, byteorder="big") == cls.signature:
             byteorder = ">"
         else:
-            raise ValueError("not a bigBed file")
+            raise ValueError("not a %s file" % cls.fmt)
         formatter = struct.Struct(byteorder + "HHQQQHHQQIQ")
-        header = _Header()
+        header = cls()
         header.byteorder = byteorder
         size = formatter.size
         data = stream.read(size)
@@ -1188,18 +1675,13 @@ class _Header:
             header.uncompressBufSize,
             header.extraIndicesOffset,
         ) = formatter.unpack(data)
-        assert version == _Header.bbiCurrentVersion
-        definedFieldCount = header.definedFieldCount
-        if definedFieldCount < 3 or definedFieldCount > 12:
-            raise ValueError(
-                "expected between 3 and 12 columns, found %d" % definedFieldCount
-            )
+        assert version == cls.bbiCurrentVersion
         return header
 
     def __bytes__(self):
-        return _Header.formatter.pack(
-            _Header.signature,
-            _Header.bbiCurrentVersion,
+        return self.formatter.pack(
+            self.signature,
+            self.bbiCurrentVersion,
             self.zoomLevels,
             self.chromosomeTreeOffset,
             self.fullDataOffset,
@@ -1441,6 +1923,18 @@ class _RegionSummary(_Summary):
 
     formatter = struct.Struct("=IIIIffff")
     size = formatter.size
+    dtype = np.dtype(
+        [
+            ("chromId", "=u4"),
+            ("start", "=u4"),
+            ("end", "=u4"),
+            ("validCount", "=u4"),
+            ("minVal", "=f4"),
+            ("maxVal", "=f4"),
+            ("sumData", "=f4"),
+            ("sumSquares", "=f4"),
+        ]
+    )
 
     def __init__(self, chromId, start, end, value):
         self.chromId = chromId
@@ -1520,22 +2014,20 @@ class _RangeTree:
         self.chromSize = chromSize
 
     @classmethod
-    def generate(cls, chromUsageList, alignments):
-        alignments = iter(alignments)
-        alignment = None
+    def generate(cls, chromUsageList, ranges):
+        # ranges yields the chromosome index, start, and end of each alignment
+        ranges = iter(ranges)
+        item = None
         for chromName, chromId, chromSize in chromUsageList:
-            chromName = chromName.decode()
             tree = _RangeTree(chromId, chromSize)
-            if alignment is not None:
-                tree.addToCoverageDepth(alignment)
-            while True:
-                try:
-                    alignment = next(alignments)
-                except StopIteration:
-                    break
-                if alignment.target.id != chromName:
+            if item is not None:
+                tree.addToCoverageDepth(item[1], item[2])
+            for item in ranges:
+                if item[0] != chromId:
                     break
-                tree.addToCoverageDepth(alignment)
+                tree.addToCoverageDepth(item[1], item[2])
+            else:
+                item = None
             yield tree
 
     def generate_summaries(self, scale, totalSum):
@@ -1684,9 +2176,7 @@ class _RangeTree:
                 x = m
                 p = self.stack.pop()
 
-    def addToCoverageDepth(self, alignment):
-        start = alignment.coordinates[0, 0]
-        end = alignment.coordinates[0, -1]
+    def addToCoverageDepth(self, start, end):
         if start > end:
             start, end = end, start
         existing = self.find(start, end)
@@ -1882,7 +2372,11 @@ class _RTreeFormatter:
                 while True:
                     parent = node.parent
                     if parent is None:
-                        assert itemsCounted == itemCount
+                        # Each leaf points to a data block of up to itemsPerSlot
+                        # items; for the zoom levels, blocks contain multiple
+                        # summaries, each counted separately in itemCount.
+                        assert itemsCounted <= itemCount
+                        assert itemsCounted * itemsPerSlot >= itemCount
                         return node
                     for index, child in enumerate(parent.children):
                         if id(node) == id(child):
@@ -2034,7 +2528,6 @@ class _RTreeFormatter:
     def rWriteIndexLevel(
         self, parent, blockSize, childNodeSize, curLevel, destLevel, offset, output
     ):
-        previous_offset = offset
         formatter_nonleaf = self.formatter_nonleaf
         if curLevel == destLevel:
             isLeaf = False
@@ -2064,21 +2557,38 @@ class _RTreeFormatter:
                     offset,
                     output,
                 )
-        position = output.tell()
-        if position != previous_offset:
-            raise RuntimeError(
-                f"Internal error: offset mismatch ({position} vs {previous_offset})"
-            )
         return offset
 
-    def write(self, items, blockSize, itemsPerSlot, endFileOffset, output):
+    def write(
+        self, items, blockSize, itemsPerSlot, endFileOffset, output, itemCount=None
+    ):
+        # If each item describes a complete data block instead of a single
+        # record, the number of records is passed separately as itemCount.
+        if itemCount is None:
+            itemCount = len(items)
+        if len(items) == 0:
+            data = self.formatter_header.pack(
+                _RTreeFormatter.signature,
+                blockSize,
+                0,
+                0,
+                0,
+                0,
+                0,
+                endFileOffset,
+                itemsPerSlot,
+            )
+            output.write(data)
+            # an empty leaf node as the root
+            output.write(self.formatter_node.pack(True, 0))
+            return
         root, levelCount = self.rTreeFromChromRangeArray(
             blockSize, items, endFileOffset
         )
         data = self.formatter_header.pack(
             _RTreeFormatter.signature,
             blockSize,
-            len(items),
+            itemCount,
             root.startChromId,
             root.startBase,
             root.endChromId,
@@ -2088,9 +2598,6 @@ class _RTreeFormatter:
         )
         output.write(data)
 
-        if root is None:
-            return
-
         levelSizes = np.zeros(levelCount, int)
         root.calcLevelSizes(levelSizes, level=0)
         size = self.formatter_node.size + self.formatter_nonleaf.size * blockSize
@@ -2100,6 +2607,11 @@ class _RTreeFormatter:
             if i == levelCount - 3:
                 size = self.formatter_node.size + self.formatter_leaf.size * blockSize
             self.rWriteIndexLevel(root, blockSize, size, 0, i, levelOffset, output)
+            position = output.tell()
+            if position != levelOffset:
+                raise RuntimeError(
+                    f"Internal error: offset mismatch ({position} vs {levelOffset})"
+                )
         leafLevel = levelCount - 2
         self.rWriteLeaves(blockSize, size, root, 0, leafLevel, output)
 
@@ -2236,6 +2748,6 @@ class _BPlusTreeFormatter:
             if n == 0:
                 break
             output.write(formatter_node.pack(isLeaf, n))
-            block.tofile(output)
+            output.write(block.tobytes())
             data = bytes((blockSize - n) * items.itemsize)
             output.write(data)
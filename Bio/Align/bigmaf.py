@@ -165,6 +165,23 @@ class AlignmentIterator(bigbed.AlignmentIterator, maf.AlignmentIterator):
         self.reference = None
         super().__init__(source)
 
+    def get_spliced(self, chromosome, starts, ends, strand="+"):
+        """Return the alignment of a spliced region of the reference sequence.
+
+        Arguments:
+         - chromosome - name of the reference sequence, such as "mm9.chr10".
+         - starts     - list of start positions of the exons.
+         - ends       - list of end positions of the exons.
+         - strand     - "+" (default) to return the alignment on the forward
+                        strand of the reference sequence, or "-" for the
+                        reverse strand.
+
+        This method uses the search method to find the alignment blocks
+        overlapping each exon, and splices them in the same way as the
+        get_spliced method of Bio.Align.maf.MafIndex.
+        """
+        return maf._get_spliced(self.search, chromosome, starts, ends, strand)
+
     def _read_reference(self, stream):
         # Supplemental Table 12: Binary BED-data format
         # chromId     4 bytes, unsigned
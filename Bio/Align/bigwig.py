@@ -0,0 +1,1015 @@
+# Copyright 2026 by the Biopython contributors.
+# All rights reserved.
+#
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Reading and writing signal tracks in the bigWig format.
+
+The bigWig format stores a numerical value (for example, the read coverage or a
+conservation score) for regions of the chromosomes of a genome in a single
+indexed binary file. The file layout is shared with the bigBed format: the
+chromosomes are stored in a B+ tree, the data are stored in (compressed) blocks
+indexed by an R tree, and zoom levels store summaries of the data at
+increasingly coarse resolutions. This module therefore uses the index
+structures implemented in Bio.Align.bigbed.
+
+See http://genome.ucsc.edu/goldenPath/help/bigWig.html for more information.
+
+As the bigWig format stores values instead of alignments, it is not accessed
+through the Bio.Align functions. Instead, use the BigWigReader class to read a
+bigWig file, and the BigWigWriter class to create one:
+
+>>> import numpy as np
+>>> from io import BytesIO
+>>> from Bio.Align.bigwig import BigWigReader, BigWigWriter
+>>> stream = BytesIO()
+>>> with BigWigWriter(stream, {"chr1": 1000, "chr2": 500}) as writer:
+...     writer.add_intervals("chr1", [100, 150], [150, 200], [1.0, 3.0])
+...     writer.add_values("chr2", [0.5, 0.25, np.nan, 1.0], start=10, step=10)
+...
+>>> reader = BigWigReader(stream)
+>>> reader.values("chr1", 145, 155).tolist()
+[1.0, 1.0, 1.0, 1.0, 1.0, 3.0, 3.0, 3.0, 3.0, 3.0]
+>>> reader.stats("chr1", 0, 1000, "mean", bins=4).tolist()
+[2.0, nan, nan, nan]
+>>> reader.intervals("chr2").tolist()
+[(10, 20, 0.5), (20, 30, 0.25), (40, 50, 1.0)]
+
+The summary and stats methods use the zoom levels stored in the file where
+possible, without reading the data blocks, in the same way as the bigWigSummary
+program from UCSC.
+"""
+
+# The file format is described in
+# W. J. Kent, A. S. Zweig, G. Barber, A. S. Hinrichs, and D. Karolchik:
+# "BigWig and BigBed: enabling browsing of large distributed datasets."
+# Bioinformatics 26(17): 2204–2207 (2010)
+# in particular in the tables in the supplemental materials listing the contents
+# of a bigWig file byte-by-byte.
+
+import io
+import os
+import struct
+import sys
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from Bio.Align import bigbed
+from Bio.Align.bigbed import _BPlusTreeFormatter
+from Bio.Align.bigbed import _Region
+from Bio.Align.bigbed import _RegionSummary
+from Bio.Align.bigbed import _RTreeFormatter
+from Bio.Align.bigbed import _Summary
+from Bio.Align.bigbed import _summary_dtype
+from Bio.Align.bigbed import _ZoomLevels
+
+# Data types of the intervals returned by BigWigReader.intervals
+_interval_dtype = np.dtype(
+    [("start", np.int64), ("end", np.int64), ("value", np.float32)]
+)
+
+# Supplemental Table 19: bigWig section item formats
+# bedGraph: start (4 bytes, unsigned), end (4 bytes, unsigned), value (float)
+# varStep: start (4 bytes, unsigned), value (float)
+# fixedStep: value (float)
+_bedGraphType = 1
+_varStepType = 2
+_fixedStepType = 3
+
+
+class _Header(bigbed._Header):
+    __slots__ = ()
+
+    signature = 0x888FFC26
+    fmt = "bigWig"
+
+
+class _Section:
+    # Supplemental Table 18: bigWig section header
+    # chromId    4 bytes, unsigned
+    # start      4 bytes, unsigned
+    # end        4 bytes, unsigned
+    # itemStep   4 bytes, unsigned
+    # itemSpan   4 bytes, unsigned
+    # type       1 byte
+    # reserved   1 byte
+    # itemCount  2 bytes, unsigned
+    formatter = struct.Struct("=IIIIIBxH")
+    size = formatter.size
+
+    @classmethod
+    def parse(cls, data, byteorder):
+        """Return chromId and the starts, ends, and values stored in a section."""
+        formatter = struct.Struct(byteorder + cls.formatter.format[1:])
+        (
+            chromId,
+            start,
+            end,
+            itemStep,
+            itemSpan,
+            sectionType,
+            itemCount,
+        ) = formatter.unpack_from(data)
+        offset = cls.size
+        if sectionType == _bedGraphType:
+            dtype = np.dtype(
+                [
+                    ("start", byteorder + "u4"),
+                    ("end", byteorder + "u4"),
+                    ("value", byteorder + "f4"),
+                ]
+            )
+            items = np.frombuffer(data, dtype, itemCount, offset)
+            starts = items["start"].astype(np.int64)
+            ends = items["end"].astype(np.int64)
+            values = items["value"]
+        elif sectionType == _varStepType:
+            dtype = np.dtype([("start", byteorder + "u4"), ("value", byteorder + "f4")])
+            items = np.frombuffer(data, dtype, itemCount, offset)
+            starts = items["start"].astype(np.int64)
+            ends = starts + itemSpan
+            values = items["value"]
+        elif sectionType == _fixedStepType:
+            values = np.frombuffer(data, byteorder + "f4", itemCount, offset)
+            starts = start + itemStep * np.arange(itemCount, dtype=np.int64)
+            ends = starts + itemSpan
+        else:
+            raise ValueError("Unknown section type %d" % sectionType)
+        return chromId, starts, ends, values.astype(np.float32)
+
+
+def _fill_values(array, offset, starts, ends, values):
+    """Store the values of the intervals in the array starting at offset (PRIVATE)."""
+    starts = np.maximum(starts, offset) - offset
+    ends = np.minimum(ends, offset + len(array)) - offset
+    sizes = ends - starts
+    indices = np.arange(sizes.sum()) - np.repeat(
+        np.cumsum(sizes) - sizes - starts, sizes
+    )
+    array[indices] = np.repeat(values, sizes)
+
+
+class BigWigReader(bigbed._BBIReader):
+    """Reader for bigWig files.
+
+    The header, the chromosome list, and the R tree index of the bigWig file
+    are read when the BigWigReader object is created; the data blocks are read
+    only when needed. Decompressed data blocks are kept in a cache of at most
+    ``cache_size`` blocks (least recently used blocks are discarded first).
+
+    The chromosomes in the bigWig file are stored in the targets attribute as
+    a list of SeqRecord objects with undefined sequence contents.
+    """
+
+    def __init__(self, source):
+        """Open the bigWig file and read its header and index.
+
+        Arguments:
+         - source - file name or a file stream opened in binary mode.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            self._stream = open(source, "rb")
+            self._should_close_stream = True
+        else:
+            self._stream = source
+            self._should_close_stream = False
+        try:
+            self._read_header(self._stream)
+        except Exception:
+            self.close()
+            raise
+
+    def _read_header(self, stream):
+        stream.seek(0)
+        header = _Header.fromfile(stream)
+        byteorder = header.byteorder
+        self.byteorder = byteorder
+        zoomList = _ZoomLevels(byteorder)
+        zoomList.read(stream)
+        self._zoomList = zoomList
+        self._zoomTrees = {}
+        self._cache = OrderedDict()
+        self._compressed = header.uncompressBufSize > 0
+        stream.seek(header.chromosomeTreeOffset)
+        self.targets = _BPlusTreeFormatter(byteorder).read(stream)
+        stream.seek(header.fullIndexOffset)
+        self.tree = _RTreeFormatter(byteorder).read(stream)
+
+    def close(self):
+        """Close the file, if it was opened by the BigWigReader."""
+        if self._should_close_stream:
+            self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def _search(self, chromIx, start, end):
+        """Return the starts, ends, and values of data overlapping the region (PRIVATE)."""
+        blocks = self._find_blocks(self.tree, chromIx, start, end)
+        data = self._read_blocks(blocks)
+        starts = [np.zeros(0, np.int64)]
+        ends = [np.zeros(0, np.int64)]
+        values = [np.zeros(0, np.float32)]
+        for offset, size in blocks:
+            chromId, s, e, v = _Section.parse(data[offset], self.byteorder)
+            if chromId != chromIx:
+                continue
+            starts.append(s)
+            ends.append(e)
+            values.append(v)
+        starts = np.concatenate(starts)
+        ends = np.concatenate(ends)
+        values = np.concatenate(values)
+        mask = (starts < end) & (start < ends)
+        return starts[mask], ends[mask], values[mask]
+
+    def _region(self, chromosome, start, end):
+        if chromosome is None:
+            raise ValueError("chromosome must not be None")
+        ((chromIx, start, end),) = self._parse_region(chromosome, start, end)
+        return chromIx, start, end
+
+    def intervals(self, chromosome, start=None, end=None):
+        """Return the intervals with data overlapping a chromosome region.
+
+        Arguments:
+         - chromosome - chromosome name.
+         - start      - starting position on the chromosome. If None (default
+           value), use 0 as the starting position.
+         - end        - end position on the chromosome. If None (default value),
+           use the length of the chromosome as the end position.
+
+        This method returns a NumPy structured array with fields start, end,
+        and value, with one element for each interval stored in the file that
+        overlaps the region. The intervals are not clipped to the region.
+        """
+        chromIx, start, end = self._region(chromosome, start, end)
+        starts, ends, values = self._search(chromIx, start, end)
+        intervals = np.empty(len(starts), _interval_dtype)
+        intervals["start"] = starts
+        intervals["end"] = ends
+        intervals["value"] = values
+        return intervals
+
+    def values(self, chromosome, start=None, end=None):
+        """Return the value at each position of a chromosome region.
+
+        Arguments:
+         - chromosome - chromosome name.
+         - start      - starting position on the chromosome. If None (default
+           value), use 0 as the starting position.
+         - end        - end position on the chromosome. If None (default value),
+           use the length of the chromosome as the end position.
+
+        This method returns a NumPy array of single-precision floating point
+        values with length end - start; positions without data are NaN.
+        """
+        chromIx, start, end = self._region(chromosome, start, end)
+        array = np.full(end - start, np.nan, np.float32)
+        starts, ends, values = self._search(chromIx, start, end)
+        _fill_values(array, start, starts, ends, values)
+        return array
+
+    def summary(self, chromosome, start=None, end=None, bins=1, exact=False):
+        """Return a summary of the values in a chromosome region.
+
+        Arguments:
+         - chromosome - chromosome name.
+         - start      - starting position on the chromosome. If None (default
+           value), use 0 as the starting position.
+         - end        - end position on the chromosome. If None (default value),
+           use the length of the chromosome as the end position.
+         - bins       - number of bins of (nearly) equal size into which the
+           region is divided (default value 1).
+         - exact      - If False (default), use the zoom level with the largest
+           reduction level that is at most half the bin size. Zoom levels
+           summarize the data over larger regions, which are assigned
+           proportionally to overlapping bins; the summary is then an
+           approximation. If no zoom level is fine enough, or if exact is
+           True, the summary is calculated from the data.
+
+        This method returns a NumPy structured array with one element for each
+        bin, with the following fields:
+         - start      - start position of the bin;
+         - end        - end position of the bin;
+         - validCount - number of bases with data;
+         - minVal     - minimum value (NaN if validCount is zero);
+         - maxVal     - maximum value (NaN if validCount is zero);
+         - sumData    - sum of the values over the bases with data;
+         - sumSquares - sum of the squared values over the bases with data.
+        """
+        return self._summarize(chromosome, start, end, bins, exact)
+
+    def stats(
+        self, chromosome, start=None, end=None, statistic="mean", bins=1, exact=False
+    ):
+        """Return a summary statistic of the values in each bin of a region.
+
+        Arguments:
+         - chromosome - chromosome name.
+         - start      - starting position on the chromosome. If None (default
+           value), use 0 as the starting position.
+         - end        - end position on the chromosome. If None (default value),
+           use the length of the chromosome as the end position.
+         - statistic  - "mean" (default), "min", "max", "std" (the standard
+           deviation), or "coverage" (the fraction of bases with data).
+         - bins       - number of bins of (nearly) equal size into which the
+           region is divided (default value 1).
+         - exact      - If True, calculate the statistic from the data instead
+           of from the zoom levels; see the summary method.
+
+        This method returns a NumPy array with the statistic for each bin; the
+        mean, minimum, maximum, and standard deviation are NaN for bins without
+        data.
+        """
+        summary = self.summary(chromosome, start, end, bins, exact)
+        validCount = summary["validCount"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if statistic == "mean":
+                return np.where(validCount > 0, summary["sumData"] / validCount, np.nan)
+            elif statistic == "min":
+                return summary["minVal"]
+            elif statistic == "max":
+                return summary["maxVal"]
+            elif statistic == "coverage":
+                return validCount / (summary["end"] - summary["start"])
+            elif statistic == "std":
+                sumData = summary["sumData"]
+                variance = (summary["sumSquares"] - sumData * sumData / validCount) / (
+                    validCount - 1
+                )
+                variance = np.where(validCount > 1, np.maximum(variance, 0), 0)
+                return np.where(validCount > 0, np.sqrt(variance), np.nan)
+        raise ValueError(f"Unknown statistic '{statistic}'")
+
+    def _summarize_data(self, chromIx, edges):
+        """Return the summary of the data in each bin between the edges (PRIVATE)."""
+        start = edges[0]
+        end = edges[-1]
+        starts, ends, values = self._search(chromIx, start, end)
+        starts = np.maximum(starts, start)
+        ends = np.minimum(ends, end)
+        first = np.searchsorted(edges, starts, "right") - 1
+        last = np.searchsorted(edges, ends - 1, "right") - 1
+        indices, bins = _split_bins(first, last)
+        sizes = np.minimum(ends[indices], edges[bins + 1])
+        sizes -= np.maximum(starts[indices], edges[bins])
+        values = values[indices].astype(np.float64)
+        n = len(edges) - 1
+        validCount = np.zeros(n, np.int64)
+        sumData = np.zeros(n)
+        sumSquares = np.zeros(n)
+        minVal = np.full(n, np.nan)
+        maxVal = np.full(n, np.nan)
+        if len(bins) > 0:
+            groups = np.flatnonzero(np.diff(bins, prepend=-1))
+            bins = bins[groups]
+            validCount[bins] = np.add.reduceat(sizes, groups)
+            sumData[bins] = np.add.reduceat(values * sizes, groups)
+            sumSquares[bins] = np.add.reduceat(values * values * sizes, groups)
+            minVal[bins] = np.minimum.reduceat(values, groups)
+            maxVal[bins] = np.maximum.reduceat(values, groups)
+        summaries = np.zeros(n, _summary_dtype)
+        summaries["start"] = edges[:-1]
+        summaries["end"] = edges[1:]
+        summaries["validCount"] = validCount
+        summaries["minVal"] = minVal
+        summaries["maxVal"] = maxVal
+        summaries["sumData"] = sumData
+        summaries["sumSquares"] = sumSquares
+        return summaries
+
+
+class BigWigWriter:
+    """Writer for bigWig files.
+
+    Data are added chromosome by chromosome with the add_intervals (for
+    variable-size intervals, as in the bedGraph format), add_values (for
+    values at regularly spaced positions, as in the fixedStep wiggle format),
+    and add_bedgraph (to copy a bedGraph file) methods, and written to the
+    file immediately. Chromosomes must be added in alphabetical (ASCII) order
+    of their names, as produced by ``sort -k1,1``, and the data for each
+    chromosome must be sorted by position and must not overlap.
+
+    When the writer is closed, the data blocks are read back from the file to
+    calculate the zoom levels, such that the memory usage does not depend on
+    the amount of data. If the target is a stream, it must therefore be
+    opened for both reading and writing (for example, with mode "w+b").
+    """
+
+    def __init__(
+        self, target, chromosomes, compress=True, itemsPerSlot=1024, blockSize=256
+    ):
+        """Create a BigWigWriter object.
+
+        Arguments:
+         - target       - output stream or file name.
+         - chromosomes  - dictionary with the chromosome names as keys and the
+                          chromosome lengths as values, or a list of SeqRecord
+                          objects with a defined sequence length.
+         - compress     - If True (default), compress data using zlib.
+                          If False, do not compress data.
+         - itemsPerSlot - Maximum number of data items in a data block.
+                          Default value is 1024, as used by UCSC's
+                          bedGraphToBigWig program.
+         - blockSize    - Number of items to bundle in r-tree.
+                          Default value is 256.
+        """
+        if isinstance(chromosomes, dict):
+            sizes = dict(chromosomes)
+        else:
+            sizes = {record.id: len(record) for record in chromosomes}
+        if not sizes:
+            raise ValueError("no chromosomes specified")
+        names = sorted(sizes, key=str.encode)
+        keySize = max(len(name.encode()) for name in names)
+        self._chromUsageList = np.array(
+            [
+                (name.encode(), chromId, sizes[name])
+                for chromId, name in enumerate(names)
+            ],
+            dtype=[("name", f"S{keySize}"), ("id", "=i4"), ("size", "=i4")],
+        )
+        self._chromIds = {name: chromId for chromId, name in enumerate(names)}
+        self.compress = compress
+        self.itemsPerSlot = itemsPerSlot
+        self.blockSize = blockSize
+        if isinstance(target, (str, os.PathLike)):
+            stream = open(target, "w+b")
+            self._should_close_stream = True
+        else:
+            stream = target
+            self._should_close_stream = False
+        self._stream = stream
+        self._chromIx = -1
+        self._position = 0
+        self._sections = []
+        self._sectionSizes = []
+        self._maxBlockSize = 0
+        # used to select the resolution of the first zoom level:
+        self._basesCovered = 0
+        self._runCount = 0
+        self._minSpan = sys.maxsize
+        header = _Header()
+        header.fieldCount = 0
+        header.definedFieldCount = 0
+        header.autoSqlOffset = 0
+        header.extraIndicesOffset = 0
+        self._header = header
+        stream.write(bytes(header.size))
+        stream.write(bytes(_ZoomLevels.size))
+        header.totalSummaryOffset = stream.tell()
+        stream.write(bytes(_Summary.size))
+        header.chromosomeTreeOffset = stream.tell()
+        _BPlusTreeFormatter().write(
+            self._chromUsageList, min(blockSize, len(names)), stream
+        )
+        header.fullDataOffset = stream.tell()
+        # The number of sections is filled in by close
+        stream.write(bytes(8))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if exc_type is None:
+            self.close()
+        elif self._should_close_stream:
+            self._stream.close()
+
+    def _check_order(self, chromosome, start):
+        """Return the chromosome index and the end of the previous data (PRIVATE).
+
+        A ValueError is raised if the data starting at start on the chromosome
+        would precede the data that were already added.
+        """
+        try:
+            chromIx = self._chromIds[chromosome]
+        except KeyError:
+            raise ValueError(
+                f"failed to find chromosome '{chromosome}' in chromosome list"
+            ) from None
+        if chromIx < self._chromIx:
+            raise ValueError(
+                f"chromosomes are not sorted by name at chromosome '{chromosome}'"
+            )
+        if chromIx > self._chromIx:
+            return chromIx, 0
+        if start < self._position:
+            raise ValueError(f"data are not sorted or overlap at {chromosome}:{start}")
+        return chromIx, self._position
+
+    def _write_section(self, chromIx, start, end, step, span, sectionType, items):
+        data = _Section.formatter.pack(
+            chromIx, start, end, step, span, sectionType, len(items)
+        )
+        data += items.tobytes()
+        self._maxBlockSize = max(self._maxBlockSize, len(data))
+        if self.compress:
+            data = zlib.compress(data)
+        region = _Region(chromIx, start, end)
+        region.offset = self._stream.tell()
+        self._sections.append(region)
+        self._sectionSizes.append(len(data))
+        self._stream.write(data)
+
+    def add_intervals(self, chromosome, starts, ends, values):
+        """Add the values of the intervals from starts to ends on a chromosome.
+
+        Arguments:
+         - chromosome - chromosome name.
+         - starts     - array of interval start positions.
+         - ends       - array of interval end positions.
+         - values     - array of values; intervals with a NaN value are skipped.
+
+        The intervals must be sorted and must not overlap each other or the
+        intervals previously added for this chromosome.
+        """
+        starts = np.asarray(starts, np.int64)
+        ends = np.asarray(ends, np.int64)
+        values = np.asarray(values, np.float32)
+        if not starts.shape == ends.shape == values.shape or starts.ndim != 1:
+            raise ValueError(
+                "starts, ends, and values must be one-dimensional arrays of equal length"
+            )
+        mask = ~np.isnan(values)
+        starts = starts[mask]
+        ends = ends[mask]
+        values = values[mask]
+        if len(starts) == 0:
+            return
+        chromIx, position = self._check_order(chromosome, starts[0])
+        if (ends <= starts).any():
+            raise ValueError(
+                "interval end positions must be larger than start positions"
+            )
+        if (starts[1:] < ends[:-1]).any():
+            raise ValueError(
+                f"data are not sorted or overlap on chromosome '{chromosome}'"
+            )
+        if starts[0] < 0 or ends[-1] > self._chromUsageList[chromIx]["size"]:
+            raise ValueError(f"intervals extend beyond chromosome '{chromosome}'")
+        sizes = ends - starts
+        self._basesCovered += int(sizes.sum())
+        self._runCount += int(np.count_nonzero(starts[1:] != ends[:-1]))
+        if starts[0] != position:
+            self._runCount += 1
+        self._minSpan = min(self._minSpan, int(sizes.min()))
+        self._chromIx = chromIx
+        self._position = int(ends[-1])
+        items = np.empty(
+            len(starts), [("start", "=u4"), ("end", "=u4"), ("value", "=f4")]
+        )
+        items["start"] = starts
+        items["end"] = ends
+        items["value"] = values
+        itemsPerSlot = self.itemsPerSlot
+        for i in range(0, len(items), itemsPerSlot):
+            block = items[i : i + itemsPerSlot]
+            self._write_section(
+                chromIx,
+                block["start"][0],
+                block["end"][-1],
+                0,
+                0,
+                _bedGraphType,
+                block,
+            )
+
+    def add_values(self, chromosome, values, start=0, step=1, span=None):
+        """Add values at regularly spaced positions on a chromosome.
+
+        Arguments:
+         - chromosome - chromosome name.
+         - values     - array of values; NaN values are skipped.
+         - start      - position of the first value (default value 0).
+         - step       - distance between the positions of consecutive values
+                        (default value 1).
+         - span       - number of bases covered by each value. If None
+                        (default value), use the step size.
+
+        The values are stored as fixedStep sections, which take a third of the
+        space of the intervals stored by add_intervals. The values must not
+        overlap the intervals previously added for this chromosome.
+        """
+        values = np.asarray(values, np.float32)
+        if values.ndim != 1:
+            raise ValueError("values must be a one-dimensional array")
+        if span is None:
+            span = step
+        if step < 1 or span < 1 or span > step:
+            raise ValueError("span must be positive and must not exceed step")
+        mask = ~np.isnan(values)
+        count = np.count_nonzero(mask)
+        if count == 0:
+            return
+        # runs of consecutive values that are not NaN:
+        boundaries = np.flatnonzero(np.diff(mask, prepend=False, append=False))
+        runStarts = boundaries[0::2]
+        runEnds = boundaries[1::2]
+        first = start + runStarts[0] * step
+        chromIx, position = self._check_order(chromosome, first)
+        if (
+            first < 0
+            or start + (runEnds[-1] - 1) * step + span
+            > self._chromUsageList[chromIx]["size"]
+        ):
+            raise ValueError(f"values extend beyond chromosome '{chromosome}'")
+        self._basesCovered += count * span
+        if span == step:
+            self._runCount += len(runStarts)
+            if first == position:
+                self._runCount -= 1
+        else:
+            self._runCount += count
+        self._minSpan = min(self._minSpan, span)
+        self._chromIx = chromIx
+        self._position = int(start + (runEnds[-1] - 1) * step + span)
+        itemsPerSlot = self.itemsPerSlot
+        for runStart, runEnd in zip(runStarts, runEnds):
+            for i in range(runStart, runEnd, itemsPerSlot):
+                block = values[i : min(i + itemsPerSlot, runEnd)]
+                blockStart = start + i * step
+                blockEnd = blockStart + (len(block) - 1) * step + span
+                self._write_section(
+                    chromIx,
+                    blockStart,
+                    blockEnd,
+                    step,
+                    span,
+                    _fixedStepType,
+                    block.astype("=f4"),
+                )
+
+    def add_bedgraph(self, source):
+        """Add the data in a bedGraph file.
+
+        Arguments:
+         - source - file name or file stream of a bedGraph file. The file must
+                    be sorted with ``sort -k1,1 -k2,2n``.
+
+        The bedGraph file is read and converted in chunks, so that large files
+        can be converted without reading them into memory first.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as stream:
+                self._add_bedgraph(stream)
+        else:
+            self._add_bedgraph(source)
+
+    def _add_bedgraph(self, stream):
+        while True:
+            lines = stream.readlines(1 << 24)
+            if not lines:
+                break
+            if isinstance(lines[0], str):
+                prefixes = ("track", "browser", "#")
+                empty = ""
+            else:
+                prefixes = (b"track", b"browser", b"#")
+                empty = b""
+            lines = [
+                line for line in lines if line.strip() and not line.startswith(prefixes)
+            ]
+            words = empty.join(lines).split()
+            if len(words) != 4 * len(lines):
+                raise ValueError("bedGraph lines must have four columns")
+            chromosomes = np.array(words[0::4])
+            starts = np.array(words[1::4]).astype(np.int64)
+            ends = np.array(words[2::4]).astype(np.int64)
+            values = np.array(words[3::4]).astype(np.float32)
+            indices = np.flatnonzero(chromosomes[1:] != chromosomes[:-1]) + 1
+            indices = [0, *indices, len(chromosomes)]
+            for i, j in zip(indices[:-1], indices[1:]):
+                chromosome = chromosomes[i]
+                if isinstance(chromosome, bytes):
+                    chromosome = chromosome.decode()
+                self.add_intervals(str(chromosome), starts[i:j], ends[i:j], values[i:j])
+
+    def close(self):
+        """Write the index, the zoom levels, and the header, and close the file."""
+        stream = self._stream
+        if stream is None:
+            return
+        header = self._header
+        header.fullIndexOffset = stream.tell()
+        stream.seek(header.fullDataOffset)
+        stream.write(len(self._sections).to_bytes(8, sys.byteorder))
+        stream.seek(header.fullIndexOffset)
+        _RTreeFormatter().write(
+            self._sections, self.blockSize, 1, header.fullIndexOffset, stream
+        )
+        zoomList, totalSum = self._write_zoom_levels(
+            header.fullIndexOffset - header.fullDataOffset
+        )
+        header.zoomLevels = len(zoomList)
+        if self.compress:
+            header.uncompressBufSize = max(
+                self._maxBlockSize, self.itemsPerSlot * _RegionSummary.size
+            )
+        else:
+            header.uncompressBufSize = 0
+        stream.seek(0)
+        stream.write(bytes(header))
+        stream.write(bytes(zoomList))
+        stream.seek(header.totalSummaryOffset)
+        stream.write(bytes(totalSum))
+        stream.seek(0, io.SEEK_END)
+        stream.write(header.signature.to_bytes(4, sys.byteorder))
+        if self._should_close_stream:
+            stream.close()
+        else:
+            stream.flush()
+        self._stream = None
+
+    def _read_sections(self):
+        """Read the data back from the file, chromosome by chromosome (PRIVATE).
+
+        Yields tuples (chromIx, starts, ends, values, final), where final is
+        True for the last data of each chromosome. Each tuple contains the
+        data of a bounded number of sections.
+        """
+        stream = self._stream
+        sections = self._sections
+        sizes = self._sectionSizes
+        n = len(sections)
+        batchSize = 256
+        i = 0
+        while i < n:
+            chromIx = sections[i].chromId
+            j = i + 1
+            while j < n and j < i + batchSize and sections[j].chromId == chromIx:
+                j += 1
+            final = j == n or sections[j].chromId != chromIx
+            stream.seek(sections[i].offset)
+            data = stream.read(
+                sections[j - 1].offset + sizes[j - 1] - sections[i].offset
+            )
+            starts = []
+            ends = []
+            values = []
+            offset = 0
+            for size in sizes[i:j]:
+                block = data[offset : offset + size]
+                offset += size
+                if self.compress:
+                    block = zlib.decompress(block)
+                _, s, e, v = _Section.parse(block, "=")
+                starts.append(s)
+                ends.append(e)
+                values.append(v)
+            yield (
+                chromIx,
+                np.concatenate(starts),
+                np.concatenate(ends),
+                np.concatenate(values),
+                final,
+            )
+            i = j
+
+    def _initial_reduction(self, dataSize):
+        """Return the reduction level of the first zoom level (PRIVATE).
+
+        As in UCSC's bedGraphToBigWig, start with ten times the smallest item
+        size, and double it until the zoom level is smaller than half the data.
+        """
+        # The genomic extent of the data on each chromosome:
+        extents = {}
+        for section in self._sections:
+            extent = extents.setdefault(section.chromId, [section.start, section.end])
+            extent[1] = section.end
+        extent = sum(end - start for start, end in extents.values())
+        reduction = 10 * self._minSpan
+        maxReducedSize = dataSize / 2
+        lastSize = None
+        while reduction < 2**31:
+            # Estimate the number of bins with data from above: each run of
+            # adjacent items touches at most one bin more than the number of
+            # bins it would fill completely, and no bins outside the extent of
+            # the data are touched.
+            count = min(
+                self._basesCovered // reduction + self._runCount,
+                extent // reduction + len(extents),
+            )
+            size = count * _RegionSummary.size
+            if self.compress:
+                size /= 2
+            if size <= maxReducedSize or size == lastSize:
+                break
+            lastSize = size
+            reduction *= 2
+        return reduction
+
+    def _write_zoom_levels(self, dataSize):
+        stream = self._stream
+        zoomList = _ZoomLevels()
+        totalSum = _Summary()
+        if not self._sections:
+            totalSum.minVal = 0.0
+            totalSum.maxVal = 0.0
+            del zoomList[:]
+            return zoomList, totalSum
+        reduction = self._initial_reduction(dataSize)
+        reductions = []
+        for i in range(_ZoomLevels.bbiMaxZoomLevels):
+            if reduction >= 2**32:
+                break
+            reductions.append(reduction)
+            reduction *= _ZoomLevels.bbiResIncrement
+        # The first zoom level is written while reading the data back;
+        # the coarser zoom levels are kept in memory and written afterwards.
+        zoomLevels = [_ZoomLevelWriter(self, reduction) for reduction in reductions]
+        zoomLevels[0].dataOffset = stream.tell()
+        stream.write(bytes(4))
+        position = stream.tell()
+        for chromIx, starts, ends, values, final in self._read_sections():
+            records = _split_intervals(starts, ends, values, reductions[0])
+            totalSum.validCount += int(records["validCount"].sum())
+            totalSum.minVal = min(totalSum.minVal, float(records["minVal"].min()))
+            totalSum.maxVal = max(totalSum.maxVal, float(records["maxVal"].max()))
+            totalSum.sumData += float(records["sumData"].sum())
+            totalSum.sumSquares += float(records["sumSquares"].sum())
+            stream.seek(position)
+            for zoomLevel in zoomLevels:
+                records = zoomLevel.add(chromIx, records, final)
+            position = stream.tell()
+        stream.seek(position)
+        zoomCount = zoomLevels[0].count
+        stream.seek(zoomLevels[0].dataOffset)
+        stream.write(zoomCount.to_bytes(4, sys.byteorder))
+        stream.seek(position)
+        zoomLevels[0].write_index()
+        for zoomLevel in zoomLevels[1:]:
+            if zoomLevel.count >= zoomCount:
+                break
+            zoomCount = zoomLevel.count
+            zoomLevel.dataOffset = stream.tell()
+            stream.write(zoomCount.to_bytes(4, sys.byteorder))
+            zoomLevel.write_records()
+            zoomLevel.write_index()
+        zoomLevels = [
+            zoomLevel for zoomLevel in zoomLevels if zoomLevel.indexOffset is not None
+        ]
+        del zoomList[len(zoomLevels) :]
+        for zoomLevel, zoomLevelWriter in zip(zoomList, zoomLevels):
+            zoomLevel.reductionLevel = zoomLevelWriter.reduction
+            zoomLevel.dataOffset = zoomLevelWriter.dataOffset
+            zoomLevel.indexOffset = zoomLevelWriter.indexOffset
+        return zoomList, totalSum
+
+
+def _split_bins(first, last):
+    """Return the index of the interval and the bin for each piece (PRIVATE).
+
+    Interval i extends from bin first[i] to bin last[i]; it is split into one
+    piece for each of these bins.
+    """
+    counts = last - first + 1
+    indices = np.repeat(np.arange(len(first)), counts)
+    bins = (
+        np.arange(len(indices))
+        - np.repeat(np.cumsum(counts) - counts, counts)
+        + first[indices]
+    )
+    return indices, bins
+
+
+def _split_intervals(starts, ends, values, reduction):
+    """Split the intervals at multiples of reduction, and summarize them (PRIVATE).
+
+    The summary records are returned in a NumPy structured array with the same
+    fields as the summary records stored in the zoom levels.
+    """
+    indices, bins = _split_bins(starts // reduction, (ends - 1) // reduction)
+    records = np.zeros(len(indices), _summary_dtype)
+    records["start"] = np.maximum(starts[indices], bins * reduction)
+    records["end"] = np.minimum(ends[indices], (bins + 1) * reduction)
+    sizes = records["end"] - records["start"]
+    values = values[indices].astype(np.float64)
+    records["validCount"] = sizes
+    records["minVal"] = values
+    records["maxVal"] = values
+    records["sumData"] = values * sizes
+    records["sumSquares"] = values * values * sizes
+    return records
+
+
+def _merge_records(records, reduction):
+    """Merge summary records in the same bin of size reduction (PRIVATE).
+
+    The bins start at multiples of the reduction; each record must fall in a
+    single bin, and the records must be sorted.
+    """
+    if len(records) == 0:
+        return records
+    bins = records["start"] // reduction
+    indices = np.flatnonzero(np.diff(bins, prepend=-1))
+    merged = records[indices]
+    merged["end"] = np.maximum.reduceat(records["end"], indices)
+    merged["validCount"] = np.add.reduceat(records["validCount"], indices)
+    merged["minVal"] = np.minimum.reduceat(records["minVal"], indices)
+    merged["maxVal"] = np.maximum.reduceat(records["maxVal"], indices)
+    merged["sumData"] = np.add.reduceat(records["sumData"], indices)
+    merged["sumSquares"] = np.add.reduceat(records["sumSquares"], indices)
+    return merged
+
+
+class _ZoomLevelWriter:
+    """Collect the summary records of one zoom level of a bigWig file (PRIVATE).
+
+    The records of the first zoom level are written to the file in blocks as
+    soon as they are complete; the records of the coarser zoom levels are
+    stored until write_records is called.
+    """
+
+    def __init__(self, writer, reduction):
+        self.writer = writer
+        self.reduction = reduction
+        self.pending = np.zeros(0, _summary_dtype)
+        self.chromIx = None
+        self.count = 0
+        self.blocks = []
+        self.buffer = []
+        self.regions = []
+        self.dataOffset = None
+        self.indexOffset = None
+
+    def add(self, chromIx, records, final):
+        """Add summary records, and return the completed records.
+
+        The last record is kept, as it may be continued by the next records,
+        unless final is True.
+        """
+        records = np.concatenate([self.pending, records])
+        records = _merge_records(records, self.reduction)
+        if final:
+            self.pending = records[:0]
+        else:
+            self.pending = records[-1:]
+            records = records[:-1]
+        self.count += len(records)
+        if self.dataOffset is None:
+            # coarser zoom level; keep the records in memory
+            if len(records) > 0:
+                self.blocks.append((chromIx, records))
+        else:
+            self.buffer.append(records)
+            self._write_blocks(chromIx, final)
+        return records
+
+    def _write_blocks(self, chromIx, final):
+        itemsPerSlot = self.writer.itemsPerSlot
+        records = np.concatenate(self.buffer)
+        n = len(records)
+        if final:
+            end = n
+        else:
+            end = n - n % itemsPerSlot
+        for i in range(0, end, itemsPerSlot):
+            self._write_block(chromIx, records[i : i + itemsPerSlot])
+        self.buffer = [records[end:]]
+
+    def _write_block(self, chromIx, records):
+        stream = self.writer._stream
+        summaries = np.zeros(len(records), _RegionSummary.dtype)
+        summaries["chromId"] = chromIx
+        for name in ("start", "end", "validCount", "minVal", "maxVal"):
+            summaries[name] = records[name]
+        summaries["sumData"] = records["sumData"]
+        summaries["sumSquares"] = records["sumSquares"]
+        data = summaries.tobytes()
+        if self.writer.compress:
+            data = zlib.compress(data)
+        region = _Region(chromIx, int(records["start"][0]), int(records["end"].max()))
+        region.offset = stream.tell()
+        self.regions.append(region)
+        stream.write(data)
+
+    def write_records(self):
+        """Write the stored records of a coarser zoom level to the file."""
+        itemsPerSlot = self.writer.itemsPerSlot
+        for chromIx, records in self.blocks:
+            for i in range(0, len(records), itemsPerSlot):
+                self._write_block(chromIx, records[i : i + itemsPerSlot])
+        self.blocks = []
+
+    def write_index(self):
+        """Write the R tree index of the zoom level to the file."""
+        writer = self.writer
+        stream = writer._stream
+        self.indexOffset = stream.tell()
+        _RTreeFormatter().write(
+            self.regions,
+            writer.blockSize,
+            writer.itemsPerSlot,
+            self.indexOffset,
+            stream,
+            itemCount=self.count,
+        )
@@ -19,6 +19,8 @@ Coordinates in the chain file format are defined in terms of zero-based start
 positions (like Python) and aligning region sizes.
 """
 
+import os
+
 import numpy as np
 
 from Bio.Align import Alignment
@@ -265,3 +267,352 @@ class AlignmentIterator(interfaces.AlignmentIterator):
             line = stream.readline()
         self._line = line
         return alignment
+
+
+class LiftOver:
+    """Map genomic coordinates between genome assemblies using chain alignments.
+
+    A LiftOver object loads the chains once, and stores the aligned blocks of
+    all chains in sorted NumPy arrays for each chromosome of the source genome
+    assembly (the target of the chains). Positions and intervals are then
+    mapped to the destination genome assembly (the query of the chains) in
+    vectorized batches, and alignments to the source genome assembly can be
+    lifted to the destination genome assembly one by one.
+
+    Arguments:
+     - chains - the name of a chain file, a file stream opened in text mode,
+                or an iterable of chain Alignment objects.
+
+    >>> from Bio.Align.chain import LiftOver
+    >>> liftover = LiftOver("Blat/panTro5ToPanTro6.over.chain")
+    >>> chromosomes, positions, strands = liftover.map_positions(
+    ...     "chr1", [122250000, 122251300, 122835789, 100]
+    ... )
+    >>> chromosomes.tolist()
+    ['chr1', '', 'chr1', '']
+    >>> positions.tolist()
+    [111776384, -1, 111982717, -1]
+    >>> strands.tolist()
+    ['+', '', '+', '']
+
+    Position 122251300 of chr1 in panTro5 falls in a gap of the chain, while
+    position 100 of chr1 is not covered by any chain.
+    """
+
+    def __init__(self, chains):
+        """Load the chains and build the block index."""
+        if isinstance(chains, (str, os.PathLike)) or hasattr(chains, "read"):
+            chains = AlignmentIterator(chains)
+        blocks = {}
+        names = []
+        strands = []
+        scores = []
+        self._queries = []
+        for index, alignment in enumerate(chains):
+            coordinates = alignment.coordinates
+            if coordinates[0, 0] > coordinates[0, -1]:
+                # chain on the reverse strand of the target; flip the columns
+                # such that the target coordinates are increasing
+                coordinates = coordinates[:, ::-1]
+            steps = np.diff(coordinates, 1)
+            aligned = (steps[0] != 0) & (steps[1] != 0)
+            blocks.setdefault(alignment.target.id, []).append(
+                (
+                    coordinates[0, :-1][aligned],
+                    coordinates[0, 1:][aligned],
+                    coordinates[1, :-1][aligned],
+                    np.full(np.count_nonzero(aligned), index),
+                )
+            )
+            names.append(alignment.query.id)
+            if coordinates[1, 0] > coordinates[1, -1]:
+                strands.append(-1)
+            else:
+                strands.append(+1)
+            scores.append(alignment.score)
+            self._queries.append(alignment.query)
+        self._names = np.array(names, str)
+        self._strands = np.array(strands, np.int8)
+        self._scores = np.array(scores, float)
+        self._blocks = {}
+        self._overlapping = False
+        for name, values in blocks.items():
+            starts, ends, qstarts, indices = (np.concatenate(v) for v in zip(*values))
+            order = np.argsort(starts, kind="stable")
+            starts = starts[order]
+            ends = ends[order]
+            # The running maximum of the block ends allows us to find all blocks
+            # overlapping an interval by binary search, even if the blocks of
+            # different chains overlap each other.
+            maxends = np.maximum.accumulate(ends)
+            if (starts[1:] < maxends[:-1]).any():
+                self._overlapping = True
+            self._blocks[name] = (starts, ends, maxends, qstarts[order], indices[order])
+
+    def __len__(self):
+        """Return the number of chains."""
+        return len(self._names)
+
+    def _overlaps(self, name, starts, ends):
+        """Return the indices of overlapping intervals and blocks (PRIVATE)."""
+        try:
+            bstarts, bends, maxends, _, _ = self._blocks[name]
+        except KeyError:
+            empty = np.zeros(0, np.intp)
+            return empty, empty
+        lo = np.searchsorted(maxends, starts, "right")
+        hi = np.searchsorted(bstarts, ends, "left")
+        counts = np.maximum(hi - lo, 0)
+        counts[starts >= ends] = 0
+        intervals = np.repeat(np.arange(len(starts)), counts)
+        offsets = np.cumsum(counts) - counts
+        blocks = np.arange(len(intervals)) - np.repeat(offsets - lo, counts)
+        keep = bends[blocks] > starts[intervals]
+        return intervals[keep], blocks[keep]
+
+    @staticmethod
+    def _group(chromosomes, n):
+        """Return each chromosome name with the indices of its entries (PRIVATE)."""
+        if isinstance(chromosomes, str):
+            yield chromosomes, np.arange(n)
+            return
+        chromosomes = np.asarray(chromosomes, str)
+        if chromosomes.shape != (n,):
+            raise ValueError("chromosomes and coordinates have different lengths")
+        names, inverse = np.unique(chromosomes, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(names) + 1))
+        for i, name in enumerate(names):
+            yield name, order[bounds[i] : bounds[i + 1]]
+
+    def map_positions(self, chromosomes, positions):
+        """Map positions to the destination genome assembly.
+
+        Arguments:
+         - chromosomes - the chromosome name of each position, as an
+                         array-like of strings, or a single string if all
+                         positions are on the same chromosome.
+         - positions   - array-like of zero-based positions.
+
+        Returns a tuple of three NumPy arrays, with the chromosome name, the
+        zero-based position, and the strand ("+" or "-") of each position in
+        the destination genome assembly. For positions that cannot be mapped,
+        the chromosome name and strand are empty strings, and the position is
+        -1. If a position is covered by more than one chain, the chain with
+        the highest score is used.
+        """
+        positions = np.asarray(positions, np.int64)
+        n = len(positions)
+        result_indices = []
+        result_chains = []
+        result_positions = []
+        for name, indices in self._group(chromosomes, n):
+            values = positions[indices]
+            intervals, blocks = self._overlaps(name, values, values + 1)
+            if len(blocks) == 0:
+                continue
+            bstarts, _, _, qstarts, chains = self._blocks[name]
+            chains = chains[blocks]
+            offsets = values[intervals] - bstarts[blocks]
+            strands = self._strands[chains]
+            values = np.where(
+                strands > 0,
+                qstarts[blocks] + offsets,
+                qstarts[blocks] - offsets - 1,
+            )
+            result_indices.append(indices[intervals])
+            result_chains.append(chains)
+            result_positions.append(values)
+        chromosomes = np.full(n, "", self._names.dtype)
+        strands = np.full(n, "", "U1")
+        mapped_positions = np.full(n, -1, np.int64)
+        if result_indices:
+            indices = np.concatenate(result_indices)
+            chains = np.concatenate(result_chains)
+            values = np.concatenate(result_positions)
+            if self._overlapping:
+                # use the highest-scoring chain for each position
+                order = np.lexsort((-self._scores[chains], indices))
+                indices, first = np.unique(indices[order], return_index=True)
+                order = order[first]
+                chains = chains[order]
+                values = values[order]
+            chromosomes[indices] = self._names[chains]
+            mapped_positions[indices] = values
+            strands[indices] = np.where(self._strands[chains] > 0, "+", "-")
+        return chromosomes, mapped_positions, strands
+
+    def map_intervals(self, chromosomes, starts, ends):
+        """Map intervals to the destination genome assembly.
+
+        Arguments:
+         - chromosomes - the chromosome name of each interval, as an
+                         array-like of strings, or a single string if all
+                         intervals are on the same chromosome.
+         - starts      - array-like of zero-based start positions.
+         - ends        - array-like of end positions.
+
+        An interval is mapped to one piece for each aligned block of a chain
+        that it overlaps. Intervals spanning a gap in a chain, or overlapping
+        more than one chain, are therefore split into several pieces; intervals
+        that do not overlap any aligned block are unmapped.
+
+        Returns a dictionary of NumPy arrays with one element for each piece,
+        sorted by interval and then by start position in the source genome
+        assembly:
+
+         - index        - the index of the interval in the input arrays;
+         - source_start - the start of the piece in the source assembly;
+         - source_end   - the end of the piece in the source assembly;
+         - chromosome   - the chromosome name in the destination assembly;
+         - start        - the start of the piece in the destination assembly;
+         - end          - the end of the piece in the destination assembly;
+         - strand       - the strand ("+" or "-") in the destination assembly;
+         - chain        - the index of the chain used for the mapping.
+
+        >>> import numpy as np
+        >>> from Bio.Align.chain import LiftOver
+        >>> liftover = LiftOver("Blat/panTro5ToPanTro6.over.chain")
+        >>> starts = [122250100, 122250390, 50000000]
+        >>> ends = [122250200, 122250410, 50000100]
+        >>> pieces = liftover.map_intervals("chr1", starts, ends)
+        >>> pieces["index"].tolist()
+        [0, 1, 1]
+        >>> pieces["start"].tolist()
+        [111776484, 111776774, 111776785]
+        >>> pieces["end"].tolist()
+        [111776584, 111776784, 111776795]
+        >>> counts = np.bincount(pieces["index"], minlength=len(starts))
+        >>> counts.tolist()  # the second interval is split; the third unmapped
+        [1, 2, 0]
+        """
+        starts = np.asarray(starts, np.int64)
+        ends = np.asarray(ends, np.int64)
+        n = len(starts)
+        if ends.shape != starts.shape:
+            raise ValueError("starts and ends have different lengths")
+        pieces = []
+        for name, indices in self._group(chromosomes, n):
+            intervals, blocks = self._overlaps(name, starts[indices], ends[indices])
+            if len(blocks) == 0:
+                continue
+            bstarts, bends, _, qstarts, chains = self._blocks[name]
+            chains = chains[blocks]
+            indices = indices[intervals]
+            source_starts = np.maximum(starts[indices], bstarts[blocks])
+            source_ends = np.minimum(ends[indices], bends[blocks])
+            qstarts = qstarts[blocks]
+            bstarts = bstarts[blocks]
+            mapped_starts = np.where(
+                self._strands[chains] > 0,
+                qstarts + (source_starts - bstarts),
+                qstarts - (source_ends - bstarts),
+            )
+            mapped_ends = mapped_starts + (source_ends - source_starts)
+            pieces.append(
+                (
+                    indices,
+                    source_starts,
+                    source_ends,
+                    chains,
+                    mapped_starts,
+                    mapped_ends,
+                )
+            )
+        if pieces:
+            values = [np.concatenate(value) for value in zip(*pieces)]
+        else:
+            values = [np.zeros(0, np.intp)] + [np.zeros(0, np.int64)] * 5
+        indices, source_starts, source_ends, chains, mapped_starts, mapped_ends = values
+        order = np.lexsort((source_starts, indices))
+        chains = chains[order]
+        return {
+            "index": indices[order],
+            "source_start": source_starts[order],
+            "source_end": source_ends[order],
+            "chromosome": self._names[chains],
+            "start": mapped_starts[order],
+            "end": mapped_ends[order],
+            "strand": np.where(self._strands[chains] > 0, "+", "-"),
+            "chain": chains,
+        }
+
+    def _subchain(self, index, starts, ends, qstarts, source):
+        """Return the part of a chain consisting of these blocks (PRIVATE).
+
+        The target and query of the returned alignment are the destination
+        and source sequences, respectively, as required by Alignment.map.
+        """
+        sign = self._strands[index]
+        qends = qstarts + sign * (ends - starts)
+        m = len(starts)
+        coordinates = np.empty((2, 3 * m - 1), np.int64)
+        coordinates[0, 0::3] = qstarts
+        coordinates[1, 0::3] = starts
+        coordinates[0, 1::3] = qends
+        coordinates[1, 1::3] = ends
+        # gap in the source sequence, followed by a gap in the destination
+        coordinates[0, 2::3] = qends[:-1]
+        coordinates[1, 2::3] = starts[1:]
+        if sign < 0:
+            # Alignment.map expects increasing target coordinates
+            coordinates = coordinates[:, ::-1]
+        return Alignment([self._queries[index], source], coordinates)
+
+    def lift(self, alignments, unmapped=None):
+        """Lift alignments to the source genome assembly to the destination.
+
+        Arguments:
+         - alignments - an iterable of pairwise Alignment objects (for example
+                        as parsed from a BED, PSL, or SAM file), each with a
+                        target on a chromosome of the source genome assembly.
+         - unmapped   - optional list; alignments that cannot be lifted are
+                        appended to this list.
+
+        This generator yields the lifted alignments, with the chromosome of the
+        destination genome assembly as the target, one by one. Only the chains
+        overlapping the alignment are used. An alignment overlapping more than
+        one chain yields one lifted alignment for each chain, in order of
+        decreasing chain score.
+
+        >>> from Bio import Align
+        >>> from Bio.Align.chain import LiftOver
+        >>> liftover = LiftOver("Blat/panTro5ToPanTro6.over.chain")
+        >>> alignments = Align.parse("Blat/est.panTro5.psl", "psl")
+        >>> for alignment in liftover.lift(alignments):
+        ...     print(alignment.target.id, alignment.query.id)
+        ...     print(alignment.coordinates.tolist())
+        chr1 DC525629
+        [[111982717, 111982775, 111987921, 111988073, 112009200, 112009302], [32, 90, 90, 242, 242, 344]]
+        """
+        for alignment in alignments:
+            name = alignment.target.id
+            row = alignment.coordinates[0]
+            start = min(row[0], row[-1])
+            end = max(row[0], row[-1])
+            _, blocks = self._overlaps(
+                name, np.array([start], np.int64), np.array([end], np.int64)
+            )
+            lifted = False
+            if len(blocks) > 0:
+                bstarts, bends, _, qstarts, chains = self._blocks[name]
+                chains = chains[blocks]
+                indices = np.unique(chains)
+                indices = indices[np.argsort(-self._scores[indices], kind="stable")]
+                for index in indices:
+                    selected = blocks[chains == index]
+                    chain = self._subchain(
+                        index,
+                        bstarts[selected],
+                        bends[selected],
+                        qstarts[selected],
+                        alignment.target,
+                    )
+                    result = chain.map(alignment)
+                    steps = np.diff(result.coordinates, 1)
+                    if not ((steps[0] != 0) & (steps[1] != 0)).any():
+                        continue
+                    lifted = True
+                    yield result
+            if not lifted and unmapped is not None:
+                unmapped.append(alignment)
@@ -29,7 +29,17 @@ zero-based end position. We can therefore manipulate ``start`` and
 ``start + size`` as python list slice boundaries.
 """
 
+import os
 import shlex
+from itertools import islice
+
+try:
+    from sqlite3 import dbapi2
+except ImportError:
+    # Python was compiled without sqlite3 support
+    dbapi2 = None  # type: ignore
+
+import numpy as np
 
 from Bio.Align import Alignment
 from Bio.Align import interfaces
@@ -455,3 +465,410 @@ class AlignmentIterator(interfaces.AlignmentIterator):
         if score is not None:
             alignment.score = score
         return alignment
+
+
+# UCSC bin indexing system; see src/lib/binRange.c in Jim Kent's source code.
+# Regions ending at or before 512 Mbp are stored in the standard bins; longer
+# chromosomes use the extended bins.
+_binOffsets = (512 + 64 + 8 + 1, 64 + 8 + 1, 8 + 1, 1, 0)
+_binOffsetsExtended = (
+    4096 + 512 + 64 + 8 + 1,
+    512 + 64 + 8 + 1,
+    64 + 8 + 1,
+    8 + 1,
+    1,
+    0,
+)
+_binFirstShift = 17
+_binNextShift = 3
+_binOffsetOldToExtended = 4681
+_binRangeMaxEnd512M = 512 * 1024 * 1024
+
+
+def _bin_from_range(start, end):
+    """Return the smallest bin containing the region from start to end (PRIVATE)."""
+    if end <= _binRangeMaxEnd512M:
+        offsets = _binOffsets
+        extra = 0
+    else:
+        offsets = _binOffsetsExtended
+        extra = _binOffsetOldToExtended
+    startBin = start >> _binFirstShift
+    endBin = (end - 1) >> _binFirstShift
+    for offset in offsets:
+        if startBin == endBin:
+            return extra + offset + startBin
+        startBin >>= _binNextShift
+        endBin >>= _binNextShift
+    raise ValueError(f"region {start}-{end} is out of range")
+
+
+def _bins_overlapping(start, end):
+    """Return the bins that may store regions overlapping start to end (PRIVATE)."""
+    end = max(end, start + 1)
+    bins = []
+    if start < _binRangeMaxEnd512M:
+        last = min(end, _binRangeMaxEnd512M) - 1
+        shift = _binFirstShift
+        for offset in _binOffsets:
+            bins.extend(range(offset + (start >> shift), offset + (last >> shift) + 1))
+            shift += _binNextShift
+    # A region ending after 512 Mbp may still overlap a region before it.
+    last = end - 1
+    shift = _binFirstShift
+    for offset in _binOffsetsExtended:
+        offset += _binOffsetOldToExtended
+        bins.extend(range(offset + (start >> shift), offset + (last >> shift) + 1))
+        shift += _binNextShift
+    return bins
+
+
+def _get_spliced(search, chromosome, starts, ends, strand):
+    """Splice the alignment blocks overlapping the exons (PRIVATE).
+
+    This function is used by the get_spliced methods of MafIndex and of the
+    bigMaf AlignmentIterator; search is the search method of these objects.
+    """
+    if strand not in ("+", "-"):
+        raise ValueError(f"strand must be '+' or '-' (found '{strand}')")
+    if len(starts) != len(ends):
+        raise ValueError("starts and ends must have the same length")
+    # The names of all sequences, in order of appearance, with the reference
+    # sequence first:
+    names = {chromosome: None}
+    # Each piece of the spliced alignment is stored as the number of columns
+    # and a dictionary with the aligned letters of each sequence in the piece.
+    pieces = []
+    for start, end in zip(starts, ends):
+        if end <= start:
+            raise ValueError(f"exon coordinates ({start}, {end}) are invalid")
+        position = start
+        for alignment in search(chromosome, start, end):
+            ids = [record.id for record in alignment.sequences]
+            row = ids.index(chromosome)
+            if alignment.coordinates[row, 0] > alignment.coordinates[row, -1]:
+                alignment = alignment.reverse_complement()
+            blockStart = alignment.coordinates[row, 0]
+            blockEnd = alignment.coordinates[row, -1]
+            first = max(position, blockStart)
+            last = min(end, blockEnd)
+            if first >= last:
+                continue
+            if first > position:
+                pieces.append((first - position, {}))
+            letters = np.array(alignment, "S1")
+            # Assign each column to a position in the reference sequence;
+            # columns with a gap in the reference sequence are assigned to the
+            # position of the next letter, or to the last position of the block.
+            mask = letters[row] != b"-"
+            positions = blockStart + np.cumsum(mask) - mask
+            np.minimum(positions, blockEnd - 1, out=positions)
+            i, j = np.searchsorted(positions, (first, last))
+            piece = {}
+            for name, line in zip(ids, letters[:, i:j]):
+                names.setdefault(name)
+                piece.setdefault(name, line.tobytes())
+            pieces.append((j - i, piece))
+            position = last
+        if position < end:
+            pieces.append((end - position, {}))
+    lines = []
+    for name in names:
+        if name == chromosome:
+            filler = b"N"
+        else:
+            filler = b"-"
+        line = b"".join(piece.get(name, filler * n) for n, piece in pieces)
+        if strand == "-":
+            line = bytes(Seq(line).reverse_complement())
+        lines.append(line)
+    sequences, coordinates = Alignment.parse_printed_alignment(lines)
+    records = [
+        SeqRecord(Seq(sequence), id=name, name="", description="")
+        for name, sequence in zip(names, sequences)
+    ]
+    return Alignment(records, coordinates)
+
+
+class MafIndex:
+    """Index of the alignment blocks in a MAF file by their reference region.
+
+    For each alignment block, the index stores the name, start, and end
+    position of the reference sequence in the block, together with the UCSC
+    bin of this region and the file offset of the block, in an SQLite
+    database. Searching the index for a chromosome region then parses only
+    the alignment blocks overlapping the region.
+
+    >>> from Bio.Align.maf import MafIndex
+    >>> index = MafIndex(None, "MAF/ucsc_mm9_chr10.maf", "mm9")
+    >>> len(index)
+    48
+    >>> for alignment in index.search("mm9.chr10", 3014700, 3014800):
+    ...     print(alignment.sequences[0].id, alignment.coordinates[0, [0, -1]])
+    ...
+    mm9.chr10 [3014689 3014742]
+    mm9.chr10 [3014742 3014778]
+    mm9.chr10 [3014778 3014795]
+    mm9.chr10 [3014795 3014842]
+    >>> index.close()
+
+    """
+
+    version = 1
+
+    def __init__(self, index_filename, maf_filename, reference):
+        """Load the index of a MAF file, or create it if it does not exist yet.
+
+        Arguments:
+         - index_filename - name of the SQLite file storing the index. If None,
+                            the index is created in memory.
+         - maf_filename   - name of the MAF file, which may be compressed by
+                            BGZF.
+         - reference      - name of the reference species, such as "mm9". The
+                            region of each alignment block is taken from the
+                            first sequence in the block whose name consists of
+                            the reference name followed by a dot, such as
+                            "mm9.chr10", or is equal to the reference name.
+        """
+        if dbapi2 is None:
+            from Bio import MissingPythonDependencyError
+
+            raise MissingPythonDependencyError(
+                "Python was compiled without the sqlite3 module"
+            )
+        # avoid a circular import
+        from Bio.Align._index import MafRandomAccess
+
+        self.reference = reference
+        self._proxy = MafRandomAccess(maf_filename, "maf")
+        if index_filename is None:
+            index_filename = ":memory:"
+            directory = os.getcwd()
+            exists = False
+        else:
+            directory = os.path.dirname(os.path.abspath(index_filename))
+            exists = os.path.isfile(index_filename)
+        try:
+            relative_path = os.path.relpath(os.path.abspath(maf_filename), directory)
+        except ValueError:
+            # on Windows, the files may be on different drives
+            relative_path = os.path.abspath(maf_filename)
+        # Store the path in Unix style, as the index may be shared between
+        # platforms.
+        relative_path = relative_path.replace(os.path.sep, "/")
+        self._con = dbapi2.connect(index_filename)
+        try:
+            if exists:
+                self._count = self._check_index(relative_path)
+            else:
+                self._count = self._build_index(relative_path)
+        except (dbapi2.OperationalError, dbapi2.DatabaseError) as err:
+            self.close()
+            raise ValueError(f"Problem with SQLite database: {err}") from None
+        except ValueError:
+            self.close()
+            raise
+
+    def _check_index(self, relative_path):
+        """Check if the index file matches the MAF file (PRIVATE)."""
+        con = self._con
+        metadata = dict(con.execute("SELECT key, value FROM meta_data;"))
+        version = int(metadata["version"])
+        if version != self.version:
+            raise ValueError(
+                f"Index version ({version}) incompatible with this version of "
+                f"MafIndex ({self.version})"
+            )
+        if metadata["filename"] != relative_path:
+            raise ValueError(
+                f"Index uses a different file ({metadata['filename']} != {relative_path})"
+            )
+        if metadata["reference"] != self.reference:
+            raise ValueError(
+                f"Index was created for reference {metadata['reference']}, "
+                f"expected {self.reference}"
+            )
+        count = int(metadata["record_count"])
+        if count == -1:
+            raise ValueError("Unfinished/partial database provided")
+        (found,) = con.execute("SELECT COUNT(*) FROM offset_data;").fetchone()
+        if found != count:
+            raise ValueError(f"Expected {count} records, found {found}. Corrupt index?")
+        return count
+
+    def _build_index(self, relative_path):
+        """Scan the MAF file and store the region of each block (PRIVATE)."""
+        con = self._con
+        con.execute("CREATE TABLE meta_data (key TEXT, value TEXT);")
+        con.executemany(
+            "INSERT INTO meta_data (key, value) VALUES (?, ?);",
+            [
+                ("version", self.version),
+                ("filename", relative_path),
+                ("reference", self.reference),
+                ("record_count", -1),
+            ],
+        )
+        con.execute(
+            "CREATE TABLE offset_data "
+            "(chromosome TEXT, bin INTEGER, start INTEGER, end INTEGER, offset INTEGER);"
+        )
+        count = 0
+        blocks = self._scan()
+        while True:
+            batch = list(islice(blocks, 1000))
+            if not batch:
+                break
+            con.executemany(
+                "INSERT INTO offset_data (chromosome, bin, start, end, offset) "
+                "VALUES (?, ?, ?, ?, ?);",
+                batch,
+            )
+            count += len(batch)
+        con.execute("CREATE INDEX bin_index ON offset_data(chromosome, bin);")
+        con.execute(
+            "UPDATE meta_data SET value = ? WHERE key = 'record_count';", (count,)
+        )
+        con.commit()
+        return count
+
+    def _scan(self):
+        """Yield the region and file offset of each alignment block (PRIVATE)."""
+        handle = self._proxy._handle
+        handle.seek(self._proxy._start)
+        reference = self.reference.encode()
+        prefix = reference + b"."
+        offset = None
+        while True:
+            position = handle.tell()
+            line = handle.readline()
+            if not line:
+                break
+            if line.startswith(b"a") and line[1:2].isspace():
+                if offset is not None:
+                    break
+                offset = position
+            elif offset is not None and line.startswith(b"s "):
+                words = line.split(None, 6)
+                src = words[1]
+                if src == reference or src.startswith(prefix):
+                    start = int(words[2])
+                    end = start + int(words[3])
+                    if words[4] == b"-":
+                        srcSize = int(words[5])
+                        start, end = srcSize - end, srcSize - start
+                    yield src.decode(), _bin_from_range(start, end), start, end, offset
+                    offset = None
+        if offset is not None:
+            raise ValueError(
+                f"Failed to find reference {self.reference} in the alignment "
+                f"block at offset {offset}"
+            )
+
+    def close(self):
+        """Close the index and the MAF file."""
+        try:
+            con = self._con
+        except AttributeError:
+            pass
+        else:
+            con.close()
+            del self._con
+        self._proxy._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def __len__(self):
+        """Return the number of alignment blocks in the index."""
+        return self._count
+
+    def __repr__(self):
+        """Return a string representation of the index."""
+        return f"MafIndex({self._proxy._handle.name!r}, reference={self.reference!r})"
+
+    def _get(self, chromosome, start, end, offset):
+        """Parse the alignment block at offset, and check its region (PRIVATE)."""
+        alignment = self._proxy.get(offset)
+        for record, row in zip(alignment.sequences, alignment.coordinates):
+            if record.id == chromosome:
+                rowStart = min(row[0], row[-1])
+                rowEnd = max(row[0], row[-1])
+                if rowStart == start and rowEnd == end:
+                    return alignment
+                break
+        raise ValueError(
+            f"Expected {chromosome}:{start}-{end} in the alignment block at offset "
+            f"{offset}; the index may be out of date"
+        )
+
+    def search(self, chromosome=None, start=None, end=None):
+        """Iterate over alignment blocks overlapping the specified region.
+
+        Arguments:
+         - chromosome - name of the reference sequence, such as "mm9.chr10".
+           If None (default value), include all alignment blocks, in the order
+           in which they are stored in the file.
+         - start      - starting position on the chromosome. If None (default
+           value), use 0 as the starting position.
+         - end        - end position on the chromosome. If None (default value),
+           use the end of the chromosome as the end position if start is None,
+           and start + 1 otherwise.
+
+        The alignment blocks are returned as Alignment objects, sorted by the
+        start and end position of the reference sequence.
+        """
+        con = self._con
+        if chromosome is None:
+            if start is not None or end is not None:
+                raise ValueError(
+                    "start and end must both be None if chromosome is None"
+                )
+            rows = con.execute(
+                "SELECT chromosome, start, end, offset FROM offset_data ORDER BY rowid;"
+            )
+        elif start is None:
+            if end is not None:
+                raise ValueError("end must be None if start is None")
+            rows = con.execute(
+                "SELECT chromosome, start, end, offset FROM offset_data "
+                "WHERE chromosome = ? ORDER BY start, end, offset;",
+                (chromosome,),
+            )
+        else:
+            if end is None:
+                end = start + 1
+            bins = ", ".join(map(str, _bins_overlapping(start, end)))
+            rows = con.execute(
+                "SELECT chromosome, start, end, offset FROM offset_data "
+                f"WHERE chromosome = ? AND bin IN ({bins}) AND start < ? AND end > ? "
+                "ORDER BY start, end, offset;",
+                (chromosome, end, start),
+            )
+        for row in rows.fetchall():
+            yield self._get(*row)
+
+    def get_spliced(self, chromosome, starts, ends, strand="+"):
+        """Return the alignment of a spliced region of the reference sequence.
+
+        Arguments:
+         - chromosome - name of the reference sequence, such as "mm9.chr10".
+         - starts     - list of start positions of the exons.
+         - ends       - list of end positions of the exons.
+         - strand     - "+" (default) to return the alignment on the forward
+                        strand of the reference sequence, or "-" for the
+                        reverse strand.
+
+        The alignment columns of each exon are taken from the alignment blocks
+        overlapping the exon, and the exons are concatenated. Columns with a
+        gap in the reference sequence are included if they are followed by a
+        letter of the exon in the reference sequence. Positions not covered
+        by any alignment block are filled with N in the reference sequence and
+        with gaps in the other sequences. The returned Alignment object
+        contains each sequence once, with the spliced letters as its
+        sequence contents.
+        """
+        return _get_spliced(self.search, chromosome, starts, ends, strand)
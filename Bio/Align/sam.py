@@ -23,7 +23,9 @@ with Python and other alignment formats.
 """
 
 import copy
+import re
 from itertools import chain
+from itertools import islice
 
 import numpy as np
 
@@ -34,6 +36,162 @@ from Bio.Seq import Seq
 from Bio.Seq import UndefinedSequenceError
 from Bio.SeqRecord import SeqRecord
 
+# NumPy data types of the numeric arrays stored in tags of type B
+_array_dtypes = {
+    "c": np.int8,
+    "C": np.uint8,
+    "s": np.int16,
+    "S": np.uint16,
+    "i": np.int32,
+    "I": np.uint32,
+    "f": np.float32,
+}
+
+# Translation table from quality characters to phred scores
+_phred_table = bytes((code - 33) % 256 for code in range(256))
+
+# Operations of the CIGAR string
+_cigar_pattern = re.compile(r"(\d+)([MIDNSHP=X])")
+_cigar_validator = re.compile(r"(?:\d+[MIDNSHP=X])*")
+
+
+def _parse_quality(qual):
+    """Return the quality string of a SAM line as a list of phred scores (PRIVATE)."""
+    if qual == "*":
+        return None
+    return list(qual.encode().translate(_phred_table))
+
+
+def _parse_tag(field):
+    """Return the tag name and value of a tag in a SAM line (PRIVATE)."""
+    tag, datatype, value = field.split(":", 2)
+    if tag == "AS":
+        assert datatype == "i"
+    elif tag == "MD":
+        assert datatype == "Z"
+    if datatype == "i":
+        value = int(value)
+    elif datatype == "f":
+        value = float(value)
+    elif datatype in ("A", "Z"):  # string
+        pass
+    elif datatype == "H":
+        value = bytes.fromhex(value)
+    elif datatype == "B":
+        letter, *value = value.split(",")
+        try:
+            dtype = _array_dtypes[letter]
+        except KeyError:
+            raise ValueError(
+                f"Unknown number type '{letter}' in tag '{field}'"
+            ) from None
+        value = np.array(value, dtype)
+    return tag, value
+
+
+def _decode_cigar(target_pos, cigar):
+    """Decode the CIGAR string of one alignment (PRIVATE).
+
+    Returns a tuple (coordinates, query_length, operations, hard_clip_left,
+    hard_clip_right, store_operations), where coordinates is a 2 x n NumPy
+    array with the query coordinates on the forward strand.
+    """
+    query_pos = 0
+    coordinates = [[target_pos, query_pos]]
+    operations = bytearray()
+    hard_clip_left = None
+    hard_clip_right = None
+    store_operations = False
+    if cigar == "*":
+        terms = ()
+    elif _cigar_validator.fullmatch(cigar):
+        terms = _cigar_pattern.findall(cigar)
+    else:
+        raise ValueError(f"Invalid CIGAR string '{cigar}'")
+    for number, letter in terms:
+        length = int(number)
+        if letter == "M":
+            # M: alignment match
+            target_pos += length
+            query_pos += length
+        elif letter in "=X":
+            # =: sequence match
+            # X: sequence mismatch
+            target_pos += length
+            query_pos += length
+            store_operations = True
+        elif letter == "I":
+            # I: insertion to the reference
+            query_pos += length
+        elif letter == "S":
+            # S: soft clipping
+            if query_pos == 0:
+                coordinates[0][1] += length
+            query_pos += length
+            continue
+        elif letter == "D":
+            # D: deletion from the reference
+            target_pos += length
+        elif letter == "N":
+            # N: skipped region from the reference
+            target_pos += length
+            store_operations = True
+        elif letter == "H":
+            # hard clipping (clipped sequences not present in sequence)
+            if query_pos == 0:
+                hard_clip_left = length
+            else:
+                hard_clip_right = length
+            continue
+        else:  # P: padding
+            raise NotImplementedError("padding operator is not yet implemented")
+        coordinates.append([target_pos, query_pos])
+        operations.append(ord(letter))
+    coordinates = np.array(coordinates, np.intp).transpose()
+    return (
+        coordinates,
+        query_pos,
+        operations,
+        hard_clip_left,
+        hard_clip_right,
+        store_operations,
+    )
+
+
+def _decode_cigars(cigars):
+    """Decode the CIGAR strings of many alignments at once (PRIVATE).
+
+    Returns a tuple (offsets, operations, lengths) of NumPy arrays, where
+    operations and lengths are the operation letters (as ASCII codes) and
+    their lengths in all CIGAR strings, and the operations of CIGAR string i
+    are stored from offsets[i] to offsets[i+1].
+    """
+    cigars = ["" if cigar == "*" else cigar for cigar in cigars]
+    ends = np.cumsum([len(cigar) for cigar in cigars])
+    data = np.frombuffer("".join(cigars).encode(), np.uint8)
+    digits = (data >= ord("0")) & (data <= ord("9"))
+    positions = np.flatnonzero(~digits)
+    operations = data[positions]
+    valid = np.zeros(256, bool)
+    valid[np.frombuffer(b"MIDNSHP=X", np.uint8)] = True
+    if not valid[operations].all():
+        raise ValueError("Invalid CIGAR string")
+    # each operation is preceded by its length, and each CIGAR string ends
+    # with an operation:
+    counts = np.diff(positions, prepend=-1) - 1
+    if (counts == 0).any() or (len(data) and digits[ends[ends > 0] - 1].any()):
+        raise ValueError("Invalid CIGAR string")
+    if (operations == ord("P")).any():
+        raise NotImplementedError("padding operator is not yet implemented")
+    indices = np.flatnonzero(digits)
+    owners = np.repeat(np.arange(len(positions)), counts)
+    powers = positions[owners] - indices - 1
+    values = (data[indices] - ord("0")).astype(np.int64) * 10**powers
+    lengths = np.add.reduceat(values, np.cumsum(counts) - counts)
+    lengths = lengths[: len(operations)]
+    offsets = np.searchsorted(positions, np.concatenate(([0], ends)))
+    return offsets, operations, lengths
+
 
 class AlignmentWriter(interfaces.AlignmentWriter):
     """Alignment file writer for the Sequence Alignment/Map (SAM) file format."""
@@ -116,17 +274,73 @@ class AlignmentWriter(interfaces.AlignmentWriter):
 
     def format_alignment(self, alignment, md=None):
         """Return a string with a single alignment formatted as one SAM line."""
+        (
+            qName,
+            flag,
+            rname,
+            pos,
+            mapq,
+            cigar,
+            rnext,
+            pnext,
+            tLen,
+            query,
+            phred,
+            md,
+        ) = self._get_fields(alignment, md)
+        if cigar is None:
+            cigar = "*"
+        else:
+            cigar = "".join("%d%s" % (count, operation) for count, operation in cigar)
+        if query is None:
+            query = "*"
+        if phred is None:
+            qual = "*"
+        else:
+            qual = "".join(chr(value + 33) for value in phred)
+        fields = [
+            qName,
+            str(flag),
+            rname,
+            str(pos + 1),  # 1-based coordinate
+            str(mapq),
+            cigar,
+            rnext,
+            str(pnext + 1),  # 1-based coordinate
+            str(tLen),
+            query,
+            qual,
+        ]
+        if md is not None:
+            fields.append("MD:Z:%s" % md)
+        fields.extend(self._format_tags(alignment))
+        line = "\t".join(fields) + "\n"
+        return line
+
+    def _get_fields(self, alignment, md=None):
+        """Return the SAM fields of an alignment as a tuple of values (PRIVATE).
+
+        The tuple contains the query name, flag, reference name, zero-based
+        position (-1 if unavailable), mapping quality, CIGAR as a list of
+        (count, operation) tuples (None for unmapped reads), RNEXT, zero-based
+        PNEXT (-1 if unavailable), TLEN, query sequence (None if undefined),
+        phred quality scores (None if unavailable), and the MD tag (None if
+        not requested). These values are formatted as text by the SAM writer,
+        and encoded as a binary record by the BAM writer.
+        """
         if not isinstance(alignment, Alignment):
             raise TypeError("Expected an Alignment object")
+        if alignment.coordinates is None:
+            return self._get_unmapped_fields(alignment)
         coordinates = alignment.coordinates.transpose()
         target, query = alignment.sequences
         hard_clip_left = None
         hard_clip_right = None
+        phred = None
         try:
             qName = query.id
         except AttributeError:
             qName = "query"
-            qual = "*"
         else:
             try:
                 hard_clip_left = query.annotations["hard_clip_left"]
@@ -139,9 +353,7 @@ class AlignmentWriter(interfaces.AlignmentWriter):
             try:
                 phred = query.letter_annotations["phred_quality"]
             except (AttributeError, KeyError):
-                qual = "*"
-            else:
-                qual = "".join(chr(value + 33) for value in phred)
+                pass
             query = query.seq
         qSize = len(query)
         try:
@@ -169,16 +381,16 @@ class AlignmentWriter(interfaces.AlignmentWriter):
         except TypeError:  # string
             pass
         except UndefinedSequenceError:
-            query = "*"
+            query = None
         else:
             query = str(query, "ASCII")
         tStart, qStart = coordinates[0, :]
-        pos = tStart + 1  # 1-based coordinate
-        cigar = ""
+        pos = tStart
+        cigar = []
         if hard_clip_left is not None:
-            cigar += "%dH" % hard_clip_left
+            cigar.append((hard_clip_left, "H"))
         if qStart > 0:
-            cigar += "%dS" % qStart
+            cigar.append((qStart, "S"))
         try:
             operations = alignment.operations
         except AttributeError:
@@ -187,15 +399,15 @@ class AlignmentWriter(interfaces.AlignmentWriter):
                 tCount = tEnd - tStart
                 qCount = qEnd - qStart
                 if tCount == 0:
-                    cigar += "%dI" % qCount  # insertion to the reference
+                    cigar.append((qCount, "I"))  # insertion to the reference
                     qStart = qEnd
                 elif qCount == 0:
-                    cigar += "%dD" % tCount  # deletion from the reference
+                    cigar.append((tCount, "D"))  # deletion from the reference
                     tStart = tEnd
                 else:
                     if tCount != qCount:
                         raise ValueError("Unequal step sizes in alignment")
-                    cigar += "%dM" % tCount
+                    cigar.append((tCount, "M"))
                     tStart = tEnd
                     qStart = qEnd
         else:
@@ -204,13 +416,15 @@ class AlignmentWriter(interfaces.AlignmentWriter):
                 qCount = qEnd - qStart
                 if tCount == 0:
                     assert operation == ord("I")
-                    cigar += "%dI" % qCount  # insertion to the reference
+                    cigar.append((qCount, "I"))  # insertion to the reference
                     qStart = qEnd
                 elif qCount == 0:
                     if operation == ord("N"):
-                        cigar += "%dN" % tCount  # skipped region from the reference
+                        # skipped region from the reference
+                        cigar.append((tCount, "N"))
                     elif operation == ord("D"):
-                        cigar += "%dD" % tCount  # deletion from the reference
+                        # deletion from the reference
+                        cigar.append((tCount, "D"))
                     else:
                         raise ValueError(f"Unexpected operation {operation}")
                     tStart = tEnd
@@ -218,13 +432,13 @@ class AlignmentWriter(interfaces.AlignmentWriter):
                     if tCount != qCount:
                         raise ValueError("Unequal step sizes in alignment")
                     assert operation == ord("M")
-                    cigar += "%dM" % tCount
+                    cigar.append((tCount, "M"))
                     tStart = tEnd
                     qStart = qEnd
         if qEnd < qSize:
-            cigar += "%dS" % (qSize - qEnd)
+            cigar.append((qSize - qEnd, "S"))
         if hard_clip_right is not None:
-            cigar += "%dH" % hard_clip_right
+            cigar.append((hard_clip_right, "H"))
         try:
             mapq = alignment.mapq
         except AttributeError:
@@ -239,27 +453,15 @@ class AlignmentWriter(interfaces.AlignmentWriter):
         try:
             pnext = alignment.pnext
         except AttributeError:
-            pnext = 0
-        else:
-            pnext += 1  # 1-based coordinates
-        tLen = 0
-        fields = [
-            qName,
-            str(flag),
-            rname,
-            str(pos),
-            str(mapq),
-            cigar,
-            rnext,
-            str(pnext),
-            str(tLen),
-            query,
-            qual,
-        ]
+            pnext = -1
+        try:
+            tLen = alignment.tlen
+        except AttributeError:
+            tLen = 0
         if md is None:
             md = self.md
         if md is True:
-            if query == "*":
+            if query is None:
                 raise ValueError("requested MD tag with undefined sequence")
             # calculate the MD tag from the alignment coordinates and sequences
             tStart, qStart = coordinates[0, :]
@@ -323,15 +525,38 @@ class AlignmentWriter(interfaces.AlignmentWriter):
                         qStart = qEnd
                 if number:
                     md += str(number)
-            field = "MD:Z:%s" % md
-            fields.append(field)
+            md = str(md)  # target may be a Seq object
+        else:
+            md = None
+        return (
+            qName,
+            flag,
+            rname,
+            pos,
+            mapq,
+            cigar,
+            rnext,
+            pnext,
+            tLen,
+            query,
+            phred,
+            md,
+        )
+
+    def _get_tags(self, alignment):
+        """Return a list of (tag, datatype, value) tuples for the score and annotations (PRIVATE).
+
+        Integer, floating-point, and character values are returned as is,
+        strings of hexadecimal digits as bytes, and numeric arrays as a tuple
+        (letter, array) with the array subtype letter.
+        """
+        tags = []
         try:
             score = alignment.score
         except AttributeError:
             pass
         else:
-            field = "AS:i:%.0f" % score
-            fields.append(field)
+            tags.append(("AS", "i", int("%.0f" % score)))
         try:
             annotations = alignment.annotations
         except AttributeError:
@@ -340,10 +565,8 @@ class AlignmentWriter(interfaces.AlignmentWriter):
             for key, value in annotations.items():
                 if isinstance(value, int):
                     datatype = "i"
-                    value = str(value)
                 elif isinstance(value, float):
                     datatype = "f"
-                    value = str(value)
                 elif isinstance(value, str):
                     if len(value) == 1:
                         datatype = "A"
@@ -351,51 +574,360 @@ class AlignmentWriter(interfaces.AlignmentWriter):
                         datatype = "Z"
                 elif isinstance(value, bytes):
                     datatype = "H"
-                    value = "".join(map(str, value))
-                elif isinstance(value, np.array):
+                elif isinstance(value, np.ndarray):
                     datatype = "B"
-                    if np.issubdtype(value.dtype, np.integer):
-                        pass
-                    elif np.issubdtype(value.dtype, float):
-                        pass
+                    for letter, dtype in _array_dtypes.items():
+                        if value.dtype == dtype:
+                            break
                     else:
-                        raise ValueError(
-                            f"Array of incompatible data type {value.dtype} in annotation '{key}'"
-                        )
-                    value = "".join(map(str, value))
-                field = f"{key}:{datatype}:{value}"
-                fields.append(field)
-        line = "\t".join(fields) + "\n"
-        return line
+                        if np.issubdtype(value.dtype, np.integer):
+                            letter = "i"
+                        elif np.issubdtype(value.dtype, np.floating):
+                            letter = "f"
+                        else:
+                            raise ValueError(
+                                f"Array of incompatible data type {value.dtype} in annotation '{key}'"
+                            )
+                    value = (letter, value)
+                tags.append((key, datatype, value))
+        return tags
 
+    def _format_tags(self, alignment):
+        """Return a list with the score and annotations formatted as SAM tags (PRIVATE)."""
+        tags = []
+        for key, datatype, value in self._get_tags(alignment):
+            if datatype == "H":
+                value = value.hex().upper()
+            elif datatype == "B":
+                letter, value = value
+                value = ",".join([letter, *map(str, value.tolist())])
+            field = f"{key}:{datatype}:{value}"
+            tags.append(field)
+        return tags
 
-class AlignmentIterator(interfaces.AlignmentIterator):
-    """Alignment iterator for Sequence Alignment/Map (SAM) files.
+    def _get_unmapped_fields(self, alignment):
+        """Return the SAM fields of an unmapped read as a tuple of values (PRIVATE).
 
-    Each line in the file contains one genomic alignment, which are loaded
-    and returned incrementally.  The following columns are stored as attributes
-    of the alignment:
+        If the position of its mate is known, the read is placed at the same
+        position, as recommended by the SAM specification.
+        """
+        query = alignment.sequences[1]
+        phred = None
+        try:
+            qName = query.id
+        except AttributeError:
+            qName = "query"
+        else:
+            try:
+                phred = query.letter_annotations["phred_quality"]
+            except (AttributeError, KeyError):
+                pass
+            query = query.seq
+        try:
+            query = bytes(query)
+        except TypeError:  # string
+            pass
+        except UndefinedSequenceError:
+            query = None
+        else:
+            query = str(query, "ASCII")
+        flag = getattr(alignment, "flag", 0) | 0x4
+        mapq = getattr(alignment, "mapq", 255)
+        try:
+            rname = alignment.rnext
+            pos = alignment.pnext
+        except AttributeError:
+            rname = "*"
+            pos = -1
+            rnext = "*"
+            pnext = -1
+        else:
+            rnext = "="
+            pnext = pos
+        tLen = getattr(alignment, "tlen", 0)
+        return (
+            qName,
+            flag,
+            rname,
+            pos,
+            mapq,
+            None,
+            rnext,
+            pnext,
+            tLen,
+            query,
+            phred,
+            None,
+        )
 
-      - flag: The FLAG combination of bitwise flags;
-      - mapq: Mapping Quality (only stored if available)
-      - rnext: Reference sequence name of the primary alignment of the next read
-               in the alignment (only stored if available)
-      - pnext: Zero-based position of the primary alignment of the next read in
-               the template (only stored if available)
-      - tlen: signed observed template length (only stored if available)
 
-    Other information associated with the alignment by its tags are stored in
-    the annotations attribute of each alignment.
+class AlignmentBlock:
+    """Block of consecutive alignments in a SAM file, stored column-wise.
 
-    Any hard clipping (clipped sequences not present in the query sequence)
-    are stored as 'hard_clip_left' and 'hard_clip_right' in the annotations
-    dictionary attribute of the query sequence record.
+    An ``AlignmentBlock`` is created by the ``blocks`` method of a SAM
+    ``AlignmentIterator``. The mandatory fields of the SAM records are stored
+    in the following attributes, which are NumPy arrays unless noted:
 
-    The sequence quality, if available, is stored as 'phred_quality' in the
-    letter_annotations dictionary attribute of the query sequence record.
+      - qname: list of query names;
+      - flag: the FLAG combination of bitwise flags;
+      - rname: index of the reference sequence name in ``names``, or -1 if
+               not available;
+      - pos: zero-based leftmost mapping position on the reference sequence;
+      - end: zero-based end position on the reference sequence;
+      - mapq: mapping quality;
+      - cigar: list of CIGAR strings;
+      - rnext: index of the reference sequence name of the next read in
+               ``names``, or -1 if not available;
+      - pnext: zero-based position of the next read, or -1 if not available;
+      - tlen: signed observed template length;
+      - query: list of query sequences (as in the SAM file);
+      - quality: list of quality strings (as in the SAM file).
+
+    The ``names`` attribute is a list of reference sequence names; these are
+    the names of the targets in the header of the SAM file, followed by any
+    other reference sequence names found in the block.
+
+    The CIGAR strings of all records in the block are decoded together into
+    the arrays ``cigar_operations`` (with the operation letters as ASCII
+    codes) and ``cigar_lengths``, where the operations of record i are stored
+    from ``cigar_offsets[i]`` to ``cigar_offsets[i + 1]``. The tags of each
+    record are parsed only when requested, by the ``tag`` method, or when
+    creating an ``Alignment`` object from a record by indexing the block.
     """
 
-    fmt = "SAM"
+    _target_consuming = np.zeros(256, bool)
+    _target_consuming[np.frombuffer(b"MDN=X", np.uint8)] = True
+    _query_consuming = np.zeros(256, bool)
+    _query_consuming[np.frombuffer(b"MIS=X", np.uint8)] = True
+    _stored = np.zeros(256, bool)  # operations stored as alignment columns
+    _stored[np.frombuffer(b"MIDN=X", np.uint8)] = True
+    _extended = np.zeros(256, bool)  # operations stored in alignment.operations
+    _extended[np.frombuffer(b"N=X", np.uint8)] = True
+
+    def __init__(self, iterator, lines):
+        """Parse the SAM records in lines (PRIVATE)."""
+        self._iterator = iterator
+        rows = [line.split(None, 11) for line in lines]
+        for row in rows:
+            if len(row) < 11:
+                raise ValueError("line has %d columns; expected at least 11" % len(row))
+        columns = list(zip(*rows))
+        n = len(rows)
+        self.qname = list(columns[0])
+        self.flag = np.array(columns[1], np.int64).astype(np.uint16)
+        self.pos = np.array(columns[3], np.int64) - 1
+        self.mapq = np.array(columns[4], np.int64).astype(np.uint8)
+        self.cigar = list(columns[5])
+        self.pnext = np.array(columns[7], np.int64) - 1
+        self.tlen = np.array(columns[8], np.int64)
+        self.query = list(columns[9])
+        self.quality = list(columns[10])
+        self._tags = [row[11] if len(row) > 11 else "" for row in rows]
+        names = [target.id for target in iterator.targets]
+        indices = dict(iterator._target_indices)
+        indices["*"] = -1
+        indices["="] = -2  # same as rname; used for rnext only
+        rname = [indices.get(name) for name in columns[2]]
+        rnext = [indices.get(name) for name in columns[6]]
+        if None in rname or None in rnext:
+            for values, column in ((rname, columns[2]), (rnext, columns[6])):
+                for i, index in enumerate(values):
+                    if index is None:
+                        name = column[i]
+                        index = indices.get(name)
+                        if index is None:
+                            index = indices[name] = len(names)
+                            names.append(name)
+                        values[i] = index
+        self.rname = np.array(rname, np.int32)
+        rnext = np.array(rnext, np.int32)
+        self.rnext = np.where(rnext == -2, self.rname, rnext)
+        self.names = names
+        mapped = (self.flag & 0x4) == 0
+        if iterator.targets:
+            missing = mapped & (self.rname >= len(iterator.targets))
+            if missing.any():
+                name = names[self.rname[missing][0]]
+                raise ValueError(f"Found target {name} missing from header")
+        offsets, operations, lengths = _decode_cigars(self.cigar)
+        self.cigar_offsets = offsets
+        self.cigar_operations = operations
+        self.cigar_lengths = lengths
+        # The position of each operation in the target and query, relative to
+        # the start of the alignment:
+        records = np.repeat(np.arange(n), np.diff(offsets))
+        steps = lengths * self._target_consuming[operations]
+        positions = np.concatenate(([0], np.cumsum(steps)))
+        target_ends = positions[1:] - positions[offsets[:-1]][records]
+        self.end = self.pos + positions[offsets[1:]] - positions[offsets[:-1]]
+        steps = lengths * self._query_consuming[operations]
+        positions = np.concatenate(([0], np.cumsum(steps)))
+        query_ends = positions[1:] - positions[offsets[:-1]][records]
+        query_starts = query_ends - steps
+        self._query_lengths = positions[offsets[1:]] - positions[offsets[:-1]]
+        # Soft clipping at the start of the query shifts the query start;
+        # hard clipping is stored as an annotation:
+        clips = operations == ord("S")
+        leading = clips & (query_starts == 0)
+        starts = np.bincount(records[leading], lengths[leading], minlength=n)
+        clips = operations == ord("H")
+        self._hard_clip_left = np.full(n, -1, np.int64)
+        self._hard_clip_right = np.full(n, -1, np.int64)
+        leading = clips & (query_starts == 0)
+        self._hard_clip_left[records[leading]] = lengths[leading]
+        trailing = clips & (query_starts > 0)
+        self._hard_clip_right[records[trailing]] = lengths[trailing]
+        self._extended_operations = np.bincount(
+            records, self._extended[operations], minlength=n
+        ).astype(bool)
+        # Flat arrays with the coordinates of all alignments:
+        stored = self._stored[operations]
+        counts = np.bincount(records[stored], minlength=n) + 1
+        self._coordinate_offsets = np.concatenate(([0], np.cumsum(counts)))
+        size = self._coordinate_offsets[-1]
+        self._target_coordinates = np.empty(size, np.intp)
+        self._query_coordinates = np.empty(size, np.intp)
+        indices = self._coordinate_offsets[:-1]
+        self._target_coordinates[indices] = self.pos
+        self._query_coordinates[indices] = starts
+        # the stored operations of record i start at offsets[i] - i:
+        indices = np.flatnonzero(stored)
+        ranks = np.cumsum(stored)[indices]
+        indices_ = ranks + records[indices]
+        self._target_coordinates[indices_] = (
+            self.pos[records[indices]] + target_ends[indices]
+        )
+        self._query_coordinates[indices_] = query_ends[indices]
+        self._stored_operations = operations[stored]
+
+    def __len__(self):
+        """Return the number of alignments in the block."""
+        return len(self.qname)
+
+    def coordinates(self, index):
+        """Return the coordinates of one alignment, or None if it is unmapped.
+
+        The coordinates are returned as a 2 x n NumPy array, as stored in the
+        coordinates attribute of an Alignment object.
+        """
+        index = range(len(self))[index]
+        flag = self.flag[index]
+        if flag & 0x4:
+            return None
+        start, end = self._coordinate_offsets[index : index + 2]
+        coordinates = np.array(
+            [self._target_coordinates[start:end], self._query_coordinates[start:end]]
+        )
+        if flag & 0x10:
+            coordinates[1, :] = self._query_lengths[index] - coordinates[1, :]
+        return coordinates
+
+    def tag(self, name):
+        """Return the values of a tag for all alignments in the block as a list.
+
+        Only the requested tag is parsed. The value is None for alignments
+        without this tag.
+        """
+        prefix = name + ":"
+        values = []
+        for tags in self._tags:
+            if prefix in tags:
+                for field in tags.split():
+                    if field.startswith(prefix):
+                        values.append(_parse_tag(field)[1])
+                        break
+                else:
+                    values.append(None)
+            else:
+                values.append(None)
+        return values
+
+    def _get_fields(self):
+        """Return the fields needed to create Alignment objects as lists (PRIVATE)."""
+        try:
+            return self._fields
+        except AttributeError:
+            pass
+        names = self.names + ["*"]  # index -1 is used for "*"
+        self._fields = (
+            self.flag.tolist(),
+            [names[index] for index in self.rname.tolist()],
+            self.pos.tolist(),
+            self.mapq.tolist(),
+            [names[index] for index in self.rnext.tolist()],
+            self.pnext.tolist(),
+            self.tlen.tolist(),
+            self._coordinate_offsets.tolist(),
+            np.array([self._target_coordinates, self._query_coordinates]),
+            self._query_lengths.tolist(),
+            [None if value < 0 else value for value in self._hard_clip_left.tolist()],
+            [None if value < 0 else value for value in self._hard_clip_right.tolist()],
+            self._extended_operations.tolist(),
+        )
+        return self._fields
+
+    def __getitem__(self, index):
+        """Return one alignment in the block as an Alignment object."""
+        index = range(len(self))[index]
+        (
+            flags,
+            rnames,
+            positions,
+            mapqs,
+            rnexts,
+            pnexts,
+            tlens,
+            offsets,
+            coordinates,
+            query_lengths,
+            hard_clips_left,
+            hard_clips_right,
+            extended_operations,
+        ) = self._get_fields()
+        tags = dict(map(_parse_tag, self._tags[index].split()))
+        flag = flags[index]
+        if flag & 0x4 or "MD" in tags:
+            decoded = None
+        else:
+            start = offsets[index]
+            end = offsets[index + 1]
+            operations = self._stored_operations[start - index : end - index - 1]
+            decoded = (
+                coordinates[:, start:end].copy(),
+                query_lengths[index],
+                bytearray(operations.tobytes()),
+                hard_clips_left[index],
+                hard_clips_right[index],
+                extended_operations[index],
+            )
+        return self._iterator._create_alignment(
+            self.qname[index],
+            flag,
+            rnames[index],
+            positions[index],
+            mapqs[index],
+            self.cigar[index],
+            rnexts[index],
+            pnexts[index],
+            tlens[index],
+            self.query[index],
+            _parse_quality(self.quality[index]),
+            tags,
+            decoded,
+        )
+
+    def __iter__(self):
+        """Iterate over the alignments in the block as Alignment objects."""
+        for index in range(len(self)):
+            yield self[index]
+
+
+class _AlignmentIterator(interfaces.AlignmentIterator):
+    """Base class of the SAM and BAM alignment iterators (PRIVATE).
+
+    This class parses the SAM header, and creates the Alignment object from
+    the fields of each record; these are the same for SAM and BAM files.
+    """
 
     def _read_header(self, stream):
         self.metadata = {}
@@ -458,6 +990,263 @@ class AlignmentIterator(interfaces.AlignmentIterator):
             record.id: index for index, record in enumerate(self.targets)
         }
 
+    def _create_alignment(
+        self,
+        qname,
+        flag,
+        rname,
+        target_pos,
+        mapq,
+        cigar,
+        rnext,
+        pnext,
+        tlen,
+        query,
+        phred,
+        tags,
+        decoded=None,
+    ):
+        """Create an Alignment object from the fields of one record (PRIVATE).
+
+        The fields are given as in the SAM format, except that the positions
+        are zero-based, the quality is given as a list of phred scores (or
+        None if not available), and the tags are given as a dictionary of
+        tag values. Apart from the alignment score (AS) and the MD tag, the
+        tags are stored in the annotations of the alignment.
+
+        If the CIGAR string was already decoded, the result of _decode_cigar
+        can be passed as decoded; it is used only if there is no MD tag.
+        """
+        score = tags.pop("AS", None)
+        md = tags.pop("MD", None)
+        annotations = tags
+        if flag & 0x10:
+            strand = "-"
+        else:
+            strand = "+"
+        hard_clip_left = None
+        hard_clip_right = None
+        store_operations = False
+        if flag & 0x4:  # unmapped
+            target = None
+            coordinates = None
+        elif md is None:
+            if decoded is None:
+                decoded = _decode_cigar(target_pos, cigar)
+            (
+                coordinates,
+                query_pos,
+                operations,
+                hard_clip_left,
+                hard_clip_right,
+                store_operations,
+            ) = decoded
+            index = self._target_indices.get(rname)
+            if index is None:
+                if self.targets:
+                    raise ValueError(f"Found target {rname} missing from header")
+                target = SeqRecord(None, id=rname, description="")
+            else:
+                target = self.targets[index]
+        else:
+            query_pos = 0
+            coordinates = [[target_pos, query_pos]]
+            seq = query
+            target = ""
+            starts = [target_pos]
+            size = 0
+            sizes = []
+            number = ""
+            operations = bytearray()
+            for letter in cigar:
+                if letter in "M":
+                    # M: alignment match
+                    length = int(number)
+                    target_pos += length
+                    query_pos += length
+                    target += seq[:length]
+                    seq = seq[length:]
+                    size += length
+                elif letter in "=X":
+                    # =: sequence match
+                    # X: sequence mismatch
+                    length = int(number)
+                    target_pos += length
+                    query_pos += length
+                    target += seq[:length]
+                    seq = seq[length:]
+                    size += length
+                    store_operations = True
+                elif letter == "I":
+                    # I: insertion to the reference
+                    length = int(number)
+                    query_pos += length
+                    seq = seq[length:]
+                elif letter == "S":
+                    # S: soft clipping
+                    length = int(number)
+                    if query_pos == 0:
+                        coordinates[0][1] += length
+                    query_pos += length
+                    seq = seq[length:]
+                    number = ""
+                    continue
+                elif letter == "D":  # deletion from the reference
+                    length = int(number)
+                    target_pos += length
+                    size += length
+                    starts.append(target_pos)
+                    sizes.append(size)
+                    size = 0
+                elif letter == "N":  # skipped region from the reference
+                    length = int(number)
+                    target_pos += length
+                    starts.append(target_pos)
+                    sizes.append(size)
+                    size = 0
+                    store_operations = True
+                elif letter == "H":
+                    # hard clipping (clipped sequences not present in sequence)
+                    if query_pos == 0:
+                        hard_clip_left = int(number)
+                    else:
+                        hard_clip_right = int(number)
+                    number = ""
+                    continue
+                elif letter == "P":  # padding
+                    raise NotImplementedError("padding operator is not yet implemented")
+                else:
+                    number += letter
+                    continue
+                coordinates.append([target_pos, query_pos])
+                operations.append(ord(letter))
+                number = ""
+            sizes.append(size)
+            seq = target
+            target = ""
+            number = ""
+            letters = iter(md)
+            for letter in letters:
+                if letter in "ACGTNacgtn":
+                    if number:
+                        number = int(number)
+                        target += seq[:number]
+                        seq = seq[number:]
+                        number = ""
+                    target += letter
+                    seq = seq[1:]
+                elif letter == "^":
+                    if number:
+                        number = int(number)
+                        target += seq[:number]
+                        seq = seq[number:]
+                        number = ""
+                    for letter in letters:
+                        if letter not in "ACGTNacgtn":
+                            break
+                        target += letter
+                    else:
+                        break
+                    number = letter
+                else:
+                    number += letter
+            if number:
+                number = int(number)
+                target += seq[:number]
+            seq = target
+            rname_target = self.targets[self._target_indices[rname]]
+            length = len(rname_target.seq)
+            data = {}
+            index = 0
+            for start, size in zip(starts, sizes):
+                data[start] = seq[index : index + size]
+                index += size
+
+            target = SeqRecord._from_validated(
+                Seq(data, length=length),
+                rname_target.id,
+                rname_target.name,
+                rname_target.description,
+                annotations={
+                    key: copy.copy(val) for key, val in rname_target.annotations.items()
+                },
+            )
+            coordinates = np.array(coordinates, np.intp).transpose()
+        if coordinates is not None:
+            if strand == "-":
+                coordinates[1, :] = query_pos - coordinates[1, :]
+        if query == "*":
+            length = query_pos
+            sequence = Seq(None, length=length)
+        else:
+            sequence = Seq(query)
+            if not (flag & 0x4):  # not unmapped
+                assert len(query) == query_pos
+                if strand == "-":
+                    sequence = sequence.reverse_complement()
+        query = SeqRecord(sequence, id=qname, description="")
+        if strand == "-":
+            hard_clip_left, hard_clip_right = hard_clip_right, hard_clip_left
+        if hard_clip_left is not None:
+            query.annotations["hard_clip_left"] = hard_clip_left
+        if hard_clip_right is not None:
+            query.annotations["hard_clip_right"] = hard_clip_right
+        if phred is not None:
+            query.letter_annotations["phred_quality"] = phred
+        records = [target, query]
+        alignment = Alignment(records, coordinates)
+        alignment.flag = flag
+        if mapq != 255:
+            alignment.mapq = mapq
+        if rnext == "=":
+            alignment.rnext = rname
+        elif rnext != "*":
+            alignment.rnext = rnext
+        if pnext >= 0:
+            alignment.pnext = pnext
+        if tlen != 0:
+            alignment.tlen = tlen
+        if score is not None:
+            alignment.score = score
+        if annotations:
+            alignment.annotations = annotations
+        if hard_clip_left is not None:
+            alignment.hard_clip_left = hard_clip_left
+        if hard_clip_right is not None:
+            alignment.hard_clip_right = hard_clip_right
+        if store_operations:
+            alignment.operations = operations
+        return alignment
+
+
+class AlignmentIterator(_AlignmentIterator):
+    """Alignment iterator for Sequence Alignment/Map (SAM) files.
+
+    Each line in the file contains one genomic alignment, which are loaded
+    and returned incrementally.  The following columns are stored as attributes
+    of the alignment:
+
+      - flag: The FLAG combination of bitwise flags;
+      - mapq: Mapping Quality (only stored if available)
+      - rnext: Reference sequence name of the primary alignment of the next read
+               in the alignment (only stored if available)
+      - pnext: Zero-based position of the primary alignment of the next read in
+               the template (only stored if available)
+      - tlen: signed observed template length (only stored if available)
+
+    Other information associated with the alignment by its tags are stored in
+    the annotations attribute of each alignment.
+
+    Any hard clipping (clipped sequences not present in the query sequence)
+    are stored as 'hard_clip_left' and 'hard_clip_right' in the annotations
+    dictionary attribute of the query sequence record.
+
+    The sequence quality, if available, is stored as 'phred_quality' in the
+    letter_annotations dictionary attribute of the query sequence record.
+    """
+
+    fmt = "SAM"
+
     def _read_next_alignment(self, stream):
         try:
             line = self._line
@@ -482,284 +1271,46 @@ class AlignmentIterator(interfaces.AlignmentIterator):
             pnext = int(fields[7]) - 1
             tlen = int(fields[8])
             query = fields[9]
-            qual = fields[10]
-            md = None
-            score = None
-            annotations = {}
-            for field in fields[11:]:
-                tag, datatype, value = field.split(":", 2)
-                if tag == "AS":
-                    assert datatype == "i"
-                    score = int(value)
-                elif tag == "MD":
-                    assert datatype == "Z"
-                    md = value
-                else:
-                    if datatype == "i":
-                        value = int(value)
-                    elif datatype == "f":
-                        value = float(value)
-                    elif datatype in ("A", "Z"):  # string
-                        pass
-                    elif datatype == "H":
-                        n = len(value)
-                        value = bytes(int(value[i : i + 2]) for i in range(0, n, 2))
-                    elif datatype == "B":
-                        letter = value[0]
-                        value = value[1:].split(",")
-                        if letter in "cCsSiI":
-                            dtype = int
-                        elif letter == "f":
-                            dtype = float
-                        else:
-                            raise ValueError(
-                                f"Unknown number type '{letter}' in tag '{field}'"
-                            )
-                        value = np.array(value, dtype)
-                    annotations[tag] = value
-            if flag & 0x10:
-                strand = "-"
-            else:
-                strand = "+"
-            hard_clip_left = None
-            hard_clip_right = None
-            store_operations = False
-            if flag & 0x4:  # unmapped
-                target = None
-                coordinates = None
-            elif md is None:
-                query_pos = 0
-                coordinates = [[target_pos, query_pos]]
-                number = ""
-                operations = bytearray()
-                for letter in cigar:
-                    if letter == "M":
-                        # M: alignment match
-                        length = int(number)
-                        target_pos += length
-                        query_pos += length
-                    elif letter in "=X":
-                        # =: sequence match
-                        # X: sequence mismatch
-                        length = int(number)
-                        target_pos += length
-                        query_pos += length
-                        store_operations = True
-                    elif letter == "I":
-                        # I: insertion to the reference
-                        length = int(number)
-                        query_pos += length
-                    elif letter == "S":
-                        # S: soft clipping
-                        length = int(number)
-                        if query_pos == 0:
-                            coordinates[0][1] += length
-                        query_pos += length
-                        number = ""
-                        continue
-                    elif letter == "D":
-                        # D: deletion from the reference
-                        length = int(number)
-                        target_pos += length
-                    elif letter == "N":
-                        # N: skipped region from the reference
-                        length = int(number)
-                        target_pos += length
-                        store_operations = True
-                    elif letter == "H":  # hard clipping
-                        if query_pos == 0:
-                            hard_clip_left = int(number)
-                        else:
-                            hard_clip_right = int(number)
-                        number = ""
-                        continue
-                    elif letter == "P":  # padding
-                        raise NotImplementedError(
-                            "padding operator is not yet implemented"
-                        )
-                    else:
-                        number += letter
-                        continue
-                    coordinates.append([target_pos, query_pos])
-                    operations.append(ord(letter))
-                    number = ""
-                index = self._target_indices.get(rname)
-                if index is None:
-                    if self.targets:
-                        raise ValueError(f"Found target {rname} missing from header")
-                    target = SeqRecord(None, id=rname, description="")
-                else:
-                    target = self.targets[index]
-            else:
-                query_pos = 0
-                coordinates = [[target_pos, query_pos]]
-                seq = query
-                target = ""
-                starts = [target_pos]
-                size = 0
-                sizes = []
-                number = ""
-                operations = bytearray()
-                for letter in cigar:
-                    if letter in "M":
-                        # M: alignment match
-                        length = int(number)
-                        target_pos += length
-                        query_pos += length
-                        target += seq[:length]
-                        seq = seq[length:]
-                        size += length
-                    elif letter in "=X":
-                        # =: sequence match
-                        # X: sequence mismatch
-                        length = int(number)
-                        target_pos += length
-                        query_pos += length
-                        target += seq[:length]
-                        seq = seq[length:]
-                        size += length
-                        store_operations = True
-                    elif letter == "I":
-                        # I: insertion to the reference
-                        length = int(number)
-                        query_pos += length
-                        seq = seq[length:]
-                    elif letter == "S":
-                        # S: soft clipping
-                        length = int(number)
-                        if query_pos == 0:
-                            coordinates[0][1] += length
-                        query_pos += length
-                        seq = seq[length:]
-                        number = ""
-                        continue
-                    elif letter == "D":  # deletion from the reference
-                        length = int(number)
-                        target_pos += length
-                        size += length
-                        starts.append(target_pos)
-                        sizes.append(size)
-                        size = 0
-                    elif letter == "N":  # skipped region from the reference
-                        length = int(number)
-                        target_pos += length
-                        starts.append(target_pos)
-                        sizes.append(size)
-                        size = 0
-                        store_operations = True
-                    elif letter == "H":
-                        # hard clipping (clipped sequences not present in sequence)
-                        if query_pos == 0:
-                            hard_clip_left = int(number)
-                        else:
-                            hard_clip_right = int(number)
-                        number = ""
-                        continue
-                    elif letter == "P":  # padding
-                        raise NotImplementedError(
-                            "padding operator is not yet implemented"
-                        )
-                    else:
-                        number += letter
-                        continue
-                    coordinates.append([target_pos, query_pos])
-                    operations.append(ord(letter))
-                    number = ""
-                sizes.append(size)
-                seq = target
-                target = ""
-                number = ""
-                letters = iter(md)
-                for letter in letters:
-                    if letter in "ACGTNacgtn":
-                        if number:
-                            number = int(number)
-                            target += seq[:number]
-                            seq = seq[number:]
-                            number = ""
-                        target += letter
-                        seq = seq[1:]
-                    elif letter == "^":
-                        if number:
-                            number = int(number)
-                            target += seq[:number]
-                            seq = seq[number:]
-                            number = ""
-                        for letter in letters:
-                            if letter not in "ACGTNacgtn":
-                                break
-                            target += letter
-                        else:
-                            break
-                        number = letter
-                    else:
-                        number += letter
-                if number:
-                    number = int(number)
-                    target += seq[:number]
-                seq = target
-                rname_target = self.targets[self._target_indices[rname]]
-                length = len(rname_target.seq)
-                data = {}
-                index = 0
-                for start, size in zip(starts, sizes):
-                    data[start] = seq[index : index + size]
-                    index += size
-
-                target = SeqRecord._from_validated(
-                    Seq(data, length=length),
-                    rname_target.id,
-                    rname_target.name,
-                    rname_target.description,
-                    annotations={
-                        key: copy.copy(val)
-                        for key, val in rname_target.annotations.items()
-                    },
-                )
-            if coordinates is not None:
-                coordinates = np.array(coordinates, np.intp).transpose()
-                if strand == "-":
-                    coordinates[1, :] = query_pos - coordinates[1, :]
-            if query == "*":
-                length = query_pos
-                sequence = Seq(None, length=length)
-            else:
-                sequence = Seq(query)
-                if not (flag & 0x4):  # not unmapped
-                    assert len(query) == query_pos
-                    if strand == "-":
-                        sequence = sequence.reverse_complement()
-            query = SeqRecord(sequence, id=qname, description="")
-            if strand == "-":
-                hard_clip_left, hard_clip_right = hard_clip_right, hard_clip_left
-            if hard_clip_left is not None:
-                query.annotations["hard_clip_left"] = hard_clip_left
-            if hard_clip_right is not None:
-                query.annotations["hard_clip_right"] = hard_clip_right
-            if qual != "*":
-                phred = [ord(c) - 33 for c in qual]
-                query.letter_annotations["phred_quality"] = phred
-            records = [target, query]
-            alignment = Alignment(records, coordinates)
-            alignment.flag = flag
-            if mapq != 255:
-                alignment.mapq = mapq
-            if rnext == "=":
-                alignment.rnext = rname
-            elif rnext != "*":
-                alignment.rnext = rnext
-            if pnext >= 0:
-                alignment.pnext = pnext
-            if tlen != 0:
-                alignment.tlen = tlen
-            if score is not None:
-                alignment.score = score
-            if annotations:
-                alignment.annotations = annotations
-            if hard_clip_left is not None:
-                alignment.hard_clip_left = hard_clip_left
-            if hard_clip_right is not None:
-                alignment.hard_clip_right = hard_clip_right
-            if store_operations:
-                alignment.operations = operations
-            return alignment
+            phred = _parse_quality(fields[10])
+            tags = dict(map(_parse_tag, fields[11:]))
+            return self._create_alignment(
+                qname,
+                flag,
+                rname,
+                target_pos,
+                mapq,
+                cigar,
+                rnext,
+                pnext,
+                tlen,
+                query,
+                phred,
+                tags,
+            )
+
+    def blocks(self, size=65536):
+        """Iterate over the remaining alignments in blocks of records.
+
+        This method reads the alignments in blocks of up to ``size`` lines,
+        and yields each block as an ``AlignmentBlock`` object storing the
+        fields of the SAM records in NumPy arrays. The CIGAR strings of all
+        records in a block are decoded together, while tags are parsed only
+        when requested. Use this method if you need only some of the fields
+        of the SAM records, or to create Alignment objects for a selection of
+        the records only.
+        """
+        if size < 1:
+            raise ValueError("size must be positive")
+        try:
+            line = self._line
+        except AttributeError:
+            lines = self._stream
+        else:
+            lines = chain([line], self._stream)
+            del self._line
+        while True:
+            block = list(islice(lines, size))
+            if not block:
+                break
+            self._index += len(block)
+            yield AlignmentBlock(self, block)
@@ -90,10 +90,12 @@ Slicing specific columns of an alignment will slice any per-column-annotations:
 
 import textwrap
 from collections import defaultdict
+from itertools import compress
 
 import numpy as np
 
 from Bio.Align import Alignment
+from Bio.Align import ArrayAlignment
 from Bio.Align import interfaces
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
@@ -211,6 +213,34 @@ class AlignmentIterator(interfaces.AlignmentIterator):
         "LO": "look",
     }
 
+    annotation_types = ("GF", "GS", "GR", "GC")
+
+    def __init__(self, source, annotations=None, array=False):
+        """Create an AlignmentIterator object.
+
+        Arguments:
+         - source      - input file stream, or path to input file
+         - annotations - the types of annotation lines to parse, as an
+                         iterable containing "GF", "GS", "GR", and/or "GC".
+                         Annotation lines of other types are skipped without
+                         parsing them. If None (default), all annotations are
+                         parsed.
+         - array       - If False (default), return Alignment objects.
+                         If True, return ArrayAlignment objects, which store
+                         the aligned sequences as a single two-dimensional
+                         array of bytes.
+
+        """
+        if annotations is None:
+            annotations = self.annotation_types
+        annotations = frozenset(annotations)
+        for annotation_type in annotations:
+            if annotation_type not in self.annotation_types:
+                raise ValueError(f"Unknown annotation type '{annotation_type}'")
+        self._annotations = annotations
+        self._array = array
+        super().__init__(source)
+
     @staticmethod
     def _store_per_file_annotations(alignment, gf, rows):
         for key, value in gf.items():
@@ -248,11 +278,9 @@ class AlignmentIterator(interfaces.AlignmentIterator):
             alignment.column_annotations = {}
             for key, value in gc.items():
                 if skipped_columns.size > 0:
-                    value = "".join(
-                        letter
-                        for index, letter in enumerate(value)
-                        if index not in skipped_columns
-                    )
+                    mask = np.ones(len(value), bool)
+                    mask[skipped_columns[skipped_columns < len(value)]] = False
+                    value = "".join(compress(value, mask))
                 if len(value) != columns:
                     raise ValueError(
                         f"{key} length is {len(value)}, expected {columns}"
@@ -262,100 +290,72 @@ class AlignmentIterator(interfaces.AlignmentIterator):
                 ] = value
 
     @staticmethod
-    def _store_per_sequence_annotations(alignment, gs):
-        for seqname, annotations in gs.items():
-            for record in alignment.sequences:
-                if record.id == seqname:
-                    break
+    def _store_per_sequence_annotations(record, annotations):
+        for key, value in annotations.items():
+            if key == "DE":
+                record.description = value
+            elif key == "DR":
+                record.dbxrefs = value
             else:
-                raise ValueError(f"Failed to find seqname {seqname}")
-            for key, value in annotations.items():
-                if key == "DE":
-                    record.description = value
-                elif key == "DR":
-                    record.dbxrefs = value
-                else:
-                    record.annotations[AlignmentIterator.gs_mapping.get(key, key)] = (
-                        value
-                    )
+                record.annotations[AlignmentIterator.gs_mapping.get(key, key)] = value
 
     @staticmethod
-    def _store_per_sequence_and_per_column_annotations(alignment, gr):
-        for seqname, letter_annotations in gr.items():
-            for record in alignment.sequences:
-                if record.id == seqname:
-                    break
+    def _store_per_sequence_and_per_column_annotations(record, letter_annotations):
+        for key, letter_annotation in letter_annotations.items():
+            feature = AlignmentIterator.gr_mapping.get(key, key)
+            if key == "CSA":
+                letter_annotation = letter_annotation.replace("-", "")
             else:
-                raise ValueError(f"Failed to find seqname {seqname}")
-            for key, letter_annotation in letter_annotations.items():
-                feature = AlignmentIterator.gr_mapping.get(key, key)
-                if key == "CSA":
-                    letter_annotation = letter_annotation.replace("-", "")
-                else:
-                    letter_annotation = letter_annotation.replace(".", "")
-                record.letter_annotations[feature] = letter_annotation
-
-    def _read_next_alignment(self, stream):
+                letter_annotation = letter_annotation.replace(".", "")
+            record.letter_annotations[feature] = letter_annotation
+
+    def _parse_rows(self, stream):
+        """Parse the next alignment in the stream, yielding its rows (PRIVATE).
+
+        For each aligned sequence, this generator yields a tuple
+        (record, aligned_sequence, letter_annotations) after reading the #=GR
+        lines following the sequence. Here, record is a SeqRecord without a
+        sequence, storing the #=GS annotations preceding the sequence;
+        aligned_sequence is the aligned sequence as a string, as found in the
+        file; and letter_annotations is a dictionary with the #=GR annotations
+        of the sequence. The rows are not stored by the generator.
+
+        The generator returns a tuple (annotations, gf, gc, gs) with the
+        per-file annotations, the per-column annotations, and the #=GS
+        annotations that were not stored on a record (as they did not precede
+        the sequence), or None if the end of the stream was reached before
+        the end of the alignment.
+        """
+        parse_gf = "GF" in self._annotations
+        parse_gc = "GC" in self._annotations
+        parse_gs = "GS" in self._annotations
+        parse_gr = "GR" in self._annotations
+        for line in stream:
+            if line.strip() == "# STOCKHOLM 1.0":
+                break
+        else:
+            return None
+        references = []
+        reference_comments = []
+        database_references = []
+        nested_domains = []
+        gf = defaultdict(list)
+        gc = {}
+        gs = defaultdict(lambda: {"DR": []})
+        row = None  # the current sequence, waiting for its #=GR lines
+        length = None
         for line in stream:
             line = line.strip()
             if not line:
                 continue
-            elif line == "# STOCKHOLM 1.0":
-                # Starting a new alignment
-                records = []
-                aligned_sequences = []
-                references = []
-                reference_comments = []
-                database_references = []
-                nested_domains = []
-                gf = defaultdict(list)
-                gc = {}
-                gs = defaultdict(lambda: {"DR": []})
-                gr = defaultdict(dict)
-                length = None
-            elif line == "//":
-                # Reached the end of the alignment.
-                aligned_sequences = np.array(
-                    [np.frombuffer(row.encode(), np.int8) for row in aligned_sequences]
-                )
-                skipped_columns = np.nonzero((aligned_sequences == ord("-")).all(0))[0]
-                aligned_sequences = np.delete(aligned_sequences, skipped_columns, 1)
-                aligned_sequences = [row.tobytes() for row in aligned_sequences]
-                sequences, coordinates = Alignment.parse_printed_alignment(
-                    aligned_sequences
-                )
-                for sequence, record in zip(sequences, records):
-                    record.seq = Seq(sequence)
-                alignment = Alignment(records, coordinates)
-                for index in sorted(skipped_columns, reverse=True):
-                    del operations[index]  # noqa: F821
-                alignment.operations = operations  # noqa: F821
-                alignment.annotations = {}
-                if references:
-                    alignment.annotations["references"] = []
-                    for reference in references:
-                        reference = dict(reference)
-                        reference["title"] = " ".join(reference["title"])
-                        reference["author"] = " ".join(reference["author"])
-                        reference["location"] = " ".join(reference["location"])
-                        alignment.annotations["references"].append(reference)
-                if database_references:
-                    alignment.annotations["database references"] = database_references
-                if nested_domains:
-                    alignment.annotations["nested domains"] = nested_domains
-                rows, columns = alignment.shape
-                AlignmentIterator._store_per_file_annotations(alignment, gf, rows)
-                AlignmentIterator._store_per_column_annotations(
-                    alignment, gc, columns, skipped_columns
-                )
-                AlignmentIterator._store_per_sequence_annotations(alignment, gs)
-                AlignmentIterator._store_per_sequence_and_per_column_annotations(
-                    alignment, gr
-                )
-                return alignment
             elif not line.startswith("#"):
                 # Sequence
                 # Format: "<seqname> <sequence>"
+                if row is not None:
+                    yield row
+                if line == "//":
+                    # Reached the end of the alignment.
+                    break
                 try:
                     seqname, aligned_sequence = line.split(None, 1)
                 except ValueError:
@@ -366,25 +366,49 @@ class AlignmentIterator(interfaces.AlignmentIterator):
                     ) from None
                 if length is None:
                     length = len(aligned_sequence)
-                    operations = bytearray(b"M" * length)
                 elif length != len(aligned_sequence):
                     raise ValueError(
                         f"Aligned sequence {seqname} consists of {len(aligned_sequence)} letters, expected {length} letters)"
                     )
-                for i, letter in enumerate(aligned_sequence):
-                    if letter == "-":
-                        assert operations[i] != ord("I")
-                        operations[i] = ord("D")  # deletion
-                    elif letter == ".":
-                        assert operations[i] != ord("D")
-                        operations[i] = ord("I")  # insertion
-                aligned_sequence = aligned_sequence.replace(".", "-")
-                aligned_sequences.append(aligned_sequence)
                 record = SeqRecord(None, id=seqname, description="")
-                records.append(record)
+                annotations = gs.pop(seqname, None)
+                if annotations is not None:
+                    AlignmentIterator._store_per_sequence_annotations(
+                        record, annotations
+                    )
+                letter_annotations = {}
+                row = (record, aligned_sequence, letter_annotations)
+            elif line.startswith("#=GR "):
+                # Generic per-Sequence AND per-Column markup
+                # Format: "#=GR <seqname> <feature> <exactly 1 char per column>"
+                if not parse_gr:
+                    continue
+                terms = line[5:].split(None, 2)
+                assert terms[0] == seqname
+                feature = terms[1]
+                letter_annotations[feature] = terms[2].strip()
+            elif line.startswith("#=GS "):
+                # Generic per-Sequence annotation, free text
+                # Format: "#=GS <seqname> <feature> <free text>"
+                if not parse_gs:
+                    continue
+                try:
+                    seqname, feature, text = line[5:].strip().split(None, 2)
+                except ValueError:
+                    # Free text can sometimes be empty, which a one line split throws an error for.
+                    # See https://github.com/biopython/biopython/issues/2982 for more details
+                    seqname, feature = line[5:].strip().split(None, 1)
+                    text = ""
+                if feature == "DR":
+                    gs[seqname][feature].append(text)
+                else:
+                    assert feature not in gs[seqname]
+                    gs[seqname][feature] = text
             elif line.startswith("#=GF "):
                 # Generic per-File annotation, free text
                 # Format: #=GF <feature> <free text>
+                if not parse_gf:
+                    continue
                 feature, text = line[5:].strip().split(None, 1)
                 if feature == "RN":
                     assert text.startswith("[")
@@ -426,33 +450,150 @@ class AlignmentIterator(interfaces.AlignmentIterator):
             elif line.startswith("#=GC "):
                 # Generic per-Column annotation, exactly 1 char per column
                 # Format: "#=GC <feature> <exactly 1 char per column>"
+                if not parse_gc:
+                    continue
                 feature, text = line[5:].strip().split(None, 2)
                 if feature not in gc:
                     gc[feature] = ""
                 gc[feature] += text.strip()  # append to any previous entry
                 # Might be interleaved blocks, so can't check length yet
-            elif line.startswith("#=GS "):
-                # Generic per-Sequence annotation, free text
-                # Format: "#=GS <seqname> <feature> <free text>"
+        else:
+            return None
+        annotations = {}
+        if references:
+            annotations["references"] = []
+            for reference in references:
+                reference = dict(reference)
+                reference["title"] = " ".join(reference["title"])
+                reference["author"] = " ".join(reference["author"])
+                reference["location"] = " ".join(reference["location"])
+                annotations["references"].append(reference)
+        if database_references:
+            annotations["database references"] = database_references
+        if nested_domains:
+            annotations["nested domains"] = nested_domains
+        return annotations, gf, gc, gs
+
+    def _read_next_alignment(self, stream):
+        rows = self._parse_rows(stream)
+        records = []
+        letter_annotations = {}
+        data = bytearray()
+        while True:
+            try:
+                record, aligned_sequence, annotations = next(rows)
+            except StopIteration as exception:
+                result = exception.value
+                break
+            if annotations:
+                letter_annotations[len(records)] = annotations
+            records.append(record)
+            data += aligned_sequence.encode()
+        if result is None:
+            return None
+        annotations, gf, gc, gs = result
+        if records:
+            data = np.frombuffer(data, np.uint8).reshape(len(records), -1)
+        else:
+            data = np.zeros((0, 0), np.uint8)
+        deletions = (data == ord("-")).any(0)
+        insertions = data == ord(".")
+        data[insertions] = ord("-")
+        insertions = insertions.any(0)
+        assert not (deletions & insertions).any()
+        operations = np.full(data.shape[1], ord("M"), np.uint8)
+        operations[deletions] = ord("D")  # deletion
+        operations[insertions] = ord("I")  # insertion
+        skipped_columns = np.nonzero((data == ord("-")).all(0))[0]
+        if skipped_columns.size > 0:
+            data = np.delete(data, skipped_columns, 1)
+            operations = np.delete(operations, skipped_columns)
+        if self._array:
+            for index in letter_annotations:
+                record = records[index]
+                record.seq = Seq(None, np.count_nonzero(data[index] != ord("-")))
+            alignment = ArrayAlignment(data, records)
+        else:
+            sequences, coordinates = Alignment.parse_printed_alignment(
+                [row.tobytes() for row in data]
+            )
+            for sequence, record in zip(sequences, records):
+                record.seq = Seq(sequence)
+            alignment = Alignment(records, coordinates)
+        alignment.operations = bytearray(operations.tobytes())
+        alignment.annotations = annotations
+        rows, columns = alignment.shape
+        AlignmentIterator._store_per_file_annotations(alignment, gf, rows)
+        AlignmentIterator._store_per_column_annotations(
+            alignment, gc, columns, skipped_columns
+        )
+        if gs:
+            # #=GS lines following the sequence
+            index = {}
+            for record in records:
+                index.setdefault(record.id, record)
+            for seqname, annotations in gs.items():
                 try:
-                    seqname, feature, text = line[5:].strip().split(None, 2)
-                except ValueError:
-                    # Free text can sometimes be empty, which a one line split throws an error for.
-                    # See https://github.com/biopython/biopython/issues/2982 for more details
-                    seqname, feature = line[5:].strip().split(None, 1)
-                    text = ""
-                if feature == "DR":
-                    gs[seqname][feature].append(text)
-                else:
-                    assert feature not in gs[seqname]
-                    gs[seqname][feature] = text
-            elif line[:5] == "#=GR ":
-                # Generic per-Sequence AND per-Column markup
-                # Format: "#=GR <seqname> <feature> <exactly 1 char per column>"
-                terms = line[5:].split(None, 2)
-                assert terms[0] == seqname
-                feature = terms[1]
-                gr[seqname][feature] = terms[2].strip()
+                    record = index[seqname]
+                except KeyError:
+                    raise ValueError(f"Failed to find seqname {seqname}") from None
+                AlignmentIterator._store_per_sequence_annotations(record, annotations)
+        for index, annotations in letter_annotations.items():
+            AlignmentIterator._store_per_sequence_and_per_column_annotations(
+                records[index], annotations
+            )
+        return alignment
+
+    def rows(self):
+        """Iterate over the sequences of the next alignment without storing them.
+
+        For very large alignments, such as the largest families in Pfam-A.full,
+        storing all aligned sequences may require more memory than available.
+        This method parses the next alignment in the file, and yields each of
+        its aligned sequences as a SeqRecord as soon as it has been read,
+        without storing it. The aligned sequence of the SeqRecord includes
+        gaps, shown as dashes ("-"); columns consisting of gaps only are not
+        removed. Any #=GR annotations are stored, with gaps, in the
+        letter_annotations of the SeqRecord, and any #=GS annotations are
+        stored on the SeqRecord if they precede the aligned sequence in the
+        file.
+
+        After the generator is exhausted, the per-file and per-column
+        annotations of the alignment are available as the ``annotations``
+        and ``column_annotations`` attributes of the iterator. At the end of
+        the file, the generator yields no sequences, and these attributes are
+        set to None.
+        """
+        rows = self._parse_rows(self._stream)
+        self.annotations = None
+        self.column_annotations = None
+        count = 0
+        length = 0
+        while True:
+            try:
+                record, aligned_sequence, letter_annotations = next(rows)
+            except StopIteration as exception:
+                result = exception.value
+                break
+            record.seq = Seq(aligned_sequence.replace(".", "-"))
+            for key, letter_annotation in letter_annotations.items():
+                feature = AlignmentIterator.gr_mapping.get(key, key)
+                record.letter_annotations[feature] = letter_annotation
+            count += 1
+            length = len(aligned_sequence)
+            yield record
+        if result is None:
+            return
+        annotations, gf, gc, gs = result
+        for seqname in gs:
+            raise ValueError(f"Failed to find seqname {seqname} preceding #=GS line")
+        self._index += 1
+        self.annotations = annotations
+        self.column_annotations = {}
+        AlignmentIterator._store_per_file_annotations(self, gf, count)
+        AlignmentIterator._store_per_column_annotations(
+            self, gc, length, np.array([], int)
+        )
 
 
 class AlignmentWriter(interfaces.AlignmentWriter):
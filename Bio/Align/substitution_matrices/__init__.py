@@ -7,6 +7,7 @@
 
 """Substitution matrices."""
 
+import functools
 import os
 import string
 
@@ -457,44 +458,58 @@ def read(handle, dtype=float):
             break
         header.append(line[1:].strip())
     rows = [line.split() for line in lines[i:]]
+    rows = [row for row in rows if row]
     if len(rows[0]) == len(rows[1]) == 2:
         alphabet = [key for key, value in rows]
-        for key in alphabet:
-            if len(key) > 1:
-                alphabet = tuple(alphabet)
-                break
-        else:
-            alphabet = "".join(alphabet)
-        matrix = Array(alphabet=alphabet, dims=1, dtype=dtype)
-        matrix.update(rows)
+        data = np.array([value for key, value in rows], dtype)
+        dims = 1
     else:
         alphabet = rows.pop(0)
-        for key in alphabet:
-            if len(key) > 1:
-                alphabet = tuple(alphabet)
-                break
-        else:
-            alphabet = "".join(alphabet)
-        matrix = Array(alphabet=alphabet, dims=2, dtype=dtype)
         for letter1, row in zip(alphabet, rows):
             letter = row.pop(0)
-            assert letter1 == letter
-            for letter2, word in zip(alphabet, row):
-                matrix[letter1, letter2] = float(word)
+            if letter1 != letter:
+                raise ValueError(
+                    f"expected row for letter '{letter1}', found '{letter}'"
+                )
+        data = np.array(rows, float)
+        dims = 2
+    for key in alphabet:
+        if len(key) > 1:
+            alphabet = tuple(alphabet)
+            break
+    else:
+        alphabet = "".join(alphabet)
+    matrix = Array(alphabet=alphabet, dims=dims, data=data, dtype=dtype)
     matrix.header = header
     return matrix
 
 
+@functools.lru_cache(maxsize=None)
+def _load(name):
+    """Parse the matrix file in the data directory (PRIVATE).
+
+    The returned matrix is shared between all calls to this function, and
+    should not be modified.
+    """
+    path = os.path.realpath(__file__)
+    directory = os.path.dirname(path)
+    path = os.path.join(directory, "data", name)
+    return read(path)
+
+
 def load(name=None):
     """Load and return a precalculated substitution matrix.
 
     >>> from Bio.Align import substitution_matrices
     >>> names = substitution_matrices.load()
+
+    Each matrix file is parsed only once; later calls return a new copy of
+    the parsed matrix, which you are free to modify.
     """
-    path = os.path.realpath(__file__)
-    directory = os.path.dirname(path)
-    subdirectory = os.path.join(directory, "data")
     if name is None:
+        path = os.path.realpath(__file__)
+        directory = os.path.dirname(path)
+        subdirectory = os.path.join(directory, "data")
         filenames = os.listdir(subdirectory)
         try:
             filenames.remove("README.txt")
@@ -503,6 +518,7 @@ def load(name=None):
         except ValueError:
             pass
         return sorted(filenames)
-    path = os.path.join(subdirectory, name)
-    matrix = read(path)
-    return matrix
+    matrix = _load(name)
+    copy = matrix.copy()
+    copy.header = list(matrix.header)
+    return copy
@@ -218,15 +218,46 @@ class AmbiguousCodonTable(CodonTable):
                 ambiguous_protein_values,
             ),
             codon_table.back_table,
-            # These two are WRONG!  I need to get the
-            # list of ambiguous codons which code for
-            # the stop codons  XXX
-            list_ambiguous_codons(
-                codon_table.start_codons, ambiguous_nucleotide_values
-            ),
-            list_ambiguous_codons(codon_table.stop_codons, ambiguous_nucleotide_values),
+            # The start and stop codons are extended with ambiguous codons
+            # on first use only, as this is slow (see the properties below).
+            None,
+            None,
         )
         self._codon_table = codon_table
+        self._ambiguous_nucleotide_values = ambiguous_nucleotide_values
+
+    # The start and stop codons of the original table are extended with the
+    # ambiguous codons that only cover start or stop codons, respectively,
+    # when first accessed; the result is stored on the instance.
+    @property
+    def start_codons(self):
+        """Start codons, including the ambiguous codons they cover."""
+        start_codons = self.__dict__["start_codons"]
+        if start_codons is None:
+            start_codons = list_ambiguous_codons(
+                self._codon_table.start_codons, self._ambiguous_nucleotide_values
+            )
+            self.__dict__["start_codons"] = start_codons
+        return start_codons
+
+    @start_codons.setter
+    def start_codons(self, value):
+        self.__dict__["start_codons"] = value
+
+    @property
+    def stop_codons(self):
+        """Stop codons, including the ambiguous codons they cover."""
+        stop_codons = self.__dict__["stop_codons"]
+        if stop_codons is None:
+            stop_codons = list_ambiguous_codons(
+                self._codon_table.stop_codons, self._ambiguous_nucleotide_values
+            )
+            self.__dict__["stop_codons"] = stop_codons
+        return stop_codons
+
+    @stop_codons.setter
+    def stop_codons(self, value):
+        self.__dict__["stop_codons"] = value
 
     # Be sneaky and forward attribute lookups to the original table.
     # This lets us get the names, if the original table is an NCBI
@@ -391,6 +422,107 @@ class AmbiguousForwardTable:
         self._inverted = inverted
 
         self._cache = {}
+        self._compiled = False
+        self._index = None
+        self._dense = None
+
+    def _compile(self):
+        """Translate all codons of three ambiguous nucleotides at once (PRIVATE).
+
+        The amino acids (and stop) that a codon may encode are represented as
+        a bit mask. The masks of the ambiguous codons are built up one position
+        at a time from those of the unambiguous codons, so each codon costs a
+        few bitwise operations instead of expanding it into all its possible
+        unambiguous codons. The results are stored in a dense list indexed by
+        the positions of the three letters in the nucleotide alphabet (4096
+        entries for the 16 IUPAC letters), using the same values as stored in
+        the cache by __getitem__ for a single codon, or None if the translation
+        should be left to __getitem__.
+        """
+        self._compiled = True
+        forward_table = self.forward_table
+        values = self.ambiguous_nucleotide
+        letters = list(values)
+        bases = sorted(set("".join(values.values())))
+        bits = {}
+        stop = 1
+        masks = {}
+        for y1 in bases:
+            for y2 in bases:
+                for y3 in bases:
+                    codon = y1 + y2 + y3
+                    try:
+                        amino = forward_table[codon]
+                    except KeyError:
+                        masks[codon] = stop
+                    else:
+                        if amino not in bits:
+                            bits[amino] = 2 << len(bits)
+                        masks[codon] = bits[amino]
+        for y1 in bases:
+            for y2 in bases:
+                for c3 in letters:
+                    mask = 0
+                    for y3 in values[c3]:
+                        mask |= masks[y1 + y2 + y3]
+                    masks[y1 + y2 + c3] = mask
+        for y1 in bases:
+            for c2 in letters:
+                for c3 in letters:
+                    mask = 0
+                    for y2 in values[c2]:
+                        mask |= masks[y1 + y2 + c3]
+                    masks[y1 + c2 + c3] = mask
+        aminos = {bit: amino for amino, bit in bits.items()}
+        results = {}
+        dense = []
+        for c1 in letters:
+            for c2 in letters:
+                for c3 in letters:
+                    codon = c1 + c2 + c3
+                    if codon in forward_table:
+                        dense.append(forward_table[codon])
+                        continue
+                    mask = 0
+                    for y1 in values[c1]:
+                        mask |= masks[y1 + c2 + c3]
+                    try:
+                        x = results[mask]
+                    except KeyError:
+                        x = results[mask] = self._resolve(
+                            [aminos[bit] for bit in aminos if mask & bit], mask & stop
+                        )
+                    dense.append(x)
+        self._index = {letter: i for i, letter in enumerate(letters)}
+        self._dense = dense
+
+    def _resolve(self, possible, stop):
+        """Return the translation of a set of amino acids and stop (PRIVATE).
+
+        Returns None if the translation should be left to __getitem__.
+        """
+        if not possible:
+            # This is a true stop codon, or has no nucleotide values at all
+            return KeyError if stop else None
+        if stop:
+            return TranslationError  # codes for proteins and stop codons
+        if len(possible) == 1:
+            return possible[0]
+        # Find the ambiguous residues which exist in every coding set.
+        terms = None
+        for amino in possible:
+            try:
+                inverted = self._inverted[amino]
+            except KeyError:
+                return None
+            if terms is None:
+                terms = set(inverted)
+            else:
+                terms.intersection_update(inverted)
+        if not terms:
+            return TranslationError  # no valid translation
+        # To be unique, sort by smallest ambiguity then alphabetically
+        return min(terms, key=lambda x: (len(self.ambiguous_protein[x]), x))
 
     def __contains__(self, codon):
         """Check if codon works as key for ambiguous forward_table.
@@ -436,6 +568,32 @@ class AmbiguousForwardTable:
         except KeyError:
             pass
 
+        if len(codon) == 3:
+            values = self.ambiguous_nucleotide
+            forward_table = self.forward_table
+            try:
+                x1, x2, x3 = (values[letter] for letter in codon)
+            except KeyError:
+                pass
+            else:
+                if not any(
+                    y1 + y2 + y3 in forward_table for y1 in x1 for y2 in x2 for y3 in x3
+                ):
+                    # all unambiguous codons are stop codons
+                    self._cache[codon] = KeyError
+                    raise KeyError(codon)  # it's a stop codon
+                if not self._compiled:
+                    # First ambiguous coding codon; translate all of them in one go.
+                    self._compile()
+                if self._dense is not None:
+                    index = self._index
+                    size = len(index)
+                    i = (index[codon[0]] * size + index[codon[1]]) * size
+                    x = self._dense[i + index[codon[2]]]
+                    if x is not None:
+                        self._cache[codon] = x
+                        return self.__getitem__(codon)
+
         # XXX Need to make part of this into a method which returns
         # a list of all possible encodings for a codon!
         try:
@@ -78,8 +78,8 @@ def as_handle(handleish, mode="r", **kwargs):
 def _open_for_random_access(filename):
     """Open a file in binary mode, spot if it is BGZF format etc (PRIVATE).
 
-    This functionality is used by the Bio.SeqIO and Bio.SearchIO index
-    and index_db functions.
+    This functionality is used by the Bio.SeqIO, Bio.SearchIO and Bio.Align
+    index and index_db functions.
 
     If the file is gzipped but not BGZF, a specific ValueError is raised.
     """
@@ -106,8 +106,8 @@ def _open_for_random_access(filename):
     return handle
 
 
-# The rest of this file defines code used in Bio.SeqIO and Bio.SearchIO
-# for indexing
+# The rest of this file defines code used in Bio.SeqIO, Bio.SearchIO and
+# Bio.Align for indexing
 
 
 class _IndexedSeqFileProxy(ABC):
@@ -146,12 +146,21 @@ class _IndexedSeqFileProxy(ABC):
         # Should be done by each sub-class (if possible)
         raise NotImplementedError("Not available for this file format.")
 
+    def get_id(self, record):
+        """Return the identifier of a parsed record, used to check its key.
+
+        By default this is the record's id attribute; file formats with parsed
+        objects lacking an id attribute (such as alignments) override this.
+        """
+        return record.id
+
 
 class _IndexedSeqFileDict(collections.abc.Mapping):
     """Read only dictionary interface to a sequential record file.
 
-    This code is used in both Bio.SeqIO for indexing as SeqRecord
-    objects, and in Bio.SearchIO for indexing QueryResult objects.
+    This code is used in Bio.SeqIO for indexing as SeqRecord objects, in
+    Bio.SearchIO for indexing QueryResult objects, and in Bio.Align for
+    indexing Alignment objects.
 
     Keeps the keys and associated file offsets in memory, reads the file
     to access entries as objects parsing them on demand. This approach
@@ -237,9 +246,9 @@ class _IndexedSeqFileDict(collections.abc.Mapping):
         # Pass the offset to the proxy
         record = self._proxy.get(self._offsets[key])
         if self._key_function:
-            key2 = self._key_function(record.id)
+            key2 = self._key_function(self._proxy.get_id(record))
         else:
-            key2 = record.id
+            key2 = self._proxy.get_id(record)
         if key != key2:
             raise ValueError(f"Key did not match ({key} vs {key2})")
         self._cached_prev_record = (key, record)
@@ -565,19 +574,19 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         file_number, offset = row
         proxies = self._proxies
         if file_number in proxies:
-            record = proxies[file_number].get(offset)
+            proxy = proxies[file_number]
         else:
             if len(proxies) >= self._max_open:
                 # Close an old handle...
                 proxies.popitem()[1]._handle.close()
             # Open a new handle...
             proxy = self._proxy_factory(self._format, self._filenames[file_number])
-            record = proxy.get(offset)
             proxies[file_number] = proxy
+        record = proxy.get(offset)
         if self._key_function:
-            key2 = self._key_function(record.id)
+            key2 = self._key_function(proxy.get_id(record))
         else:
-            key2 = record.id
+            key2 = proxy.get_id(record)
         if key != key2:
             raise ValueError(f"Key did not match ({key} vs {key2})")
         return record
@@ -0,0 +1,281 @@
+# Copyright 2026 by the Biopython contributors.
+# All rights reserved.
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Codon usage indices for many genes at once.
+
+The CodonCounts class counts the codons in a collection of coding sequences
+into a matrix with one row per gene and one column for each of the 64 codons
+(in alphabetical order, AAA, AAC, ..., TTT). Codons are encoded with two bits
+per nucleotide, such that the counting is done with NumPy array operations.
+From this matrix, the codon adaptation index (CAI), frequency of optimal
+codons (Fop), effective number of codons (ENC), and relative synonymous codon
+usage (RSCU) are calculated for all genes in a single pass. All results are
+NumPy arrays aligned with the order of the input sequences.
+
+>>> from Bio.SeqUtils.CodonBatch import CodonCounts
+>>> counts = CodonCounts(["ATGGCTGCAGCAGCCTAA", "ATGAAAAAGAAACTGCTGTAA"])
+>>> counts.counts.shape
+(2, 64)
+>>> index = counts.adaptation_index()
+>>> print(index["GCA"], index["GCT"])
+1.0 0.5
+>>> counts.cai(index).round(3).tolist()
+[0.758, 0.891]
+
+The codon adaptation index can also be trained on a subset of the genes, for
+example highly expressed genes, and then applied to all of them.
+"""
+
+from itertools import product
+
+try:
+    import numpy as np
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Please install NumPy if you want to use Bio.SeqUtils.CodonBatch. "
+        "See http://www.numpy.org/"
+    ) from None
+
+from Bio.Data.CodonTable import standard_dna_table
+from Bio.SeqUtils import CodonAdaptationIndex
+
+codons = tuple("".join(codon) for codon in product("ACGT", repeat=3))
+
+_nucleotide_codes = np.full(256, 4, np.uint8)
+_nucleotide_codes[np.frombuffer(b"ACGTacgt", np.uint8)] = [0, 1, 2, 3] * 2
+
+
+def _synonymous_groups(table):
+    """Return a list of arrays of codon indices, one for each amino acid (PRIVATE).
+
+    The stop codons form the last group.
+    """
+    groups = {aminoacid: [] for aminoacid in table.protein_alphabet}
+    for codon, aminoacid in table.forward_table.items():
+        groups[aminoacid].append(codons.index(codon))
+    groups = [np.array(group, int) for group in groups.values() if group]
+    groups.append(np.array([codons.index(codon) for codon in table.stop_codons]))
+    return groups
+
+
+class CodonCounts:
+    """Codon counts for a collection of coding sequences.
+
+    Attributes:
+     - counts - NumPy array of shape (number of genes, 64), with the number of
+                times each codon (in the order of CodonBatch.codons) appears in
+                each gene.
+     - names  - list with the id of each gene for SeqRecord objects, or None.
+     - table  - the Bio.Data.CodonTable.CodonTable object defining the genetic
+                code.
+
+    """
+
+    def __init__(self, sequences, table=standard_dna_table):
+        """Count the codons in the coding DNA sequences.
+
+        Arguments:
+         - sequences: An iterable over DNA sequences, which may be plain
+                      strings, Seq objects, MutableSeq objects, or SeqRecord
+                      objects. The length of each sequence must be a
+                      multiple of three.
+         - table:     A Bio.Data.CodonTable.CodonTable object defining the
+                      genetic code. By default, the standard genetic code is
+                      used.
+        """
+        self.table = table
+        names = []
+        data = []
+        for sequence in sequences:
+            try:  # SeqRecord
+                name = sequence.id
+                sequence = sequence.seq
+            except AttributeError:  # str, Seq, or MutableSeq
+                name = None
+            if isinstance(sequence, str):
+                sequence = sequence.encode("ASCII")
+            else:
+                sequence = bytes(sequence)
+            if len(sequence) % 3:
+                codon = sequence[len(sequence) // 3 * 3 :].decode()
+                self._illegal_codon(codon, name)
+            names.append(name)
+            data.append(sequence)
+        self.names = names
+        n = len(data)
+        lengths = np.array([len(sequence) // 3 for sequence in data], np.int64)
+        nucleotides = _nucleotide_codes[np.frombuffer(b"".join(data), np.uint8)]
+        nucleotides = nucleotides.reshape(-1, 3)
+        owners = np.repeat(np.arange(n), lengths)
+        illegal = (nucleotides == 4).any(axis=1)
+        if illegal.any():
+            i = np.flatnonzero(illegal)[0]
+            gene = owners[i]
+            start = 3 * (i - lengths[:gene].sum())
+            codon = data[gene][start : start + 3].decode()
+            self._illegal_codon(codon, names[gene])
+        indices = 16 * nucleotides[:, 0] + 4 * nucleotides[:, 1] + nucleotides[:, 2]
+        self.counts = np.bincount(owners * 64 + indices, minlength=64 * n).reshape(
+            n, 64
+        )
+
+    @staticmethod
+    def _illegal_codon(codon, name):
+        """Raise a ValueError for an illegal codon (PRIVATE)."""
+        if name is None:
+            message = f"illegal codon '{codon}'"
+        else:
+            message = f"illegal codon '{codon}' in gene {name}"
+        raise ValueError(message)
+
+    def __len__(self):
+        """Return the number of genes."""
+        return len(self.counts)
+
+    def adaptation_index(self, genes=None):
+        """Return a CodonAdaptationIndex calculated from the codon counts.
+
+        The relative adaptiveness of each codon is calculated as in the
+        CodonAdaptationIndex class of Bio.SeqUtils, using the summed codon
+        counts of all genes, or of the genes selected by the genes argument
+        (any index to select rows of the counts matrix, such as a boolean
+        mask or a list of integers).
+        """
+        if genes is None:
+            counts = self.counts.sum(axis=0)
+        else:
+            counts = self.counts[genes].sum(axis=0)
+        # Following the description in the original paper, we use a value
+        # of 0.5 for codons that do not appear in the reference sequences.
+        counts = np.where(counts == 0, 0.5, counts)
+        weights = np.ones(64)
+        for group in _synonymous_groups(self.table):
+            weights[group] = counts[group] / counts[group].max()
+        index = CodonAdaptationIndex([], self.table)
+        index.update(zip(codons, weights.tolist()))
+        return index
+
+    def cai(self, index):
+        """Calculate the codon adaptation index (CAI) of each gene.
+
+        Argument index is a CodonAdaptationIndex object, or another
+        dictionary mapping codons to their relative adaptiveness. The values
+        are the same as calculated by the calculate method of
+        CodonAdaptationIndex for each gene; in particular, ATG and TGG are
+        excluded, as are stop codons missing from the index.
+        """
+        weights = np.ones(64)
+        used = np.ones(64, bool)
+        for i, codon in enumerate(codons):
+            if codon in ("ATG", "TGG"):
+                # Exclude these two codons as their index is always one.
+                used[i] = False
+            elif codon in index:
+                weights[i] = index[codon]
+            elif codon in ("TGA", "TAA", "TAG"):
+                # Stop codon, which is valid but may be missing from the index.
+                used[i] = False
+            elif self.counts[:, i].any():
+                raise TypeError(f"illegal codon in sequence: {codon}")
+            else:
+                used[i] = False
+        counts = self.counts[:, used]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_weights = np.log(weights[used])
+            return np.exp((counts * log_weights).sum(axis=1) / counts.sum(axis=1))
+
+    def fop(self, optimal_codons):
+        """Calculate the frequency of optimal codons (Fop) of each gene.
+
+        Argument optimal_codons is an iterable of optimal codons. Alternatively,
+        a CodonAdaptationIndex object may be given, in which case the codons
+        with a relative adaptiveness of 1 are considered to be optimal. The Fop
+        is the number of optimal codons divided by the number of codons for
+        amino acids with at least one optimal codon, excluding amino acids
+        encoded by a single codon and stop codons (Ikemura 1981).
+        """
+        if isinstance(optimal_codons, dict):
+            optimal_codons = [c for c, w in optimal_codons.items() if w == 1.0]
+        optimal = np.zeros(64, bool)
+        for codon in optimal_codons:
+            optimal[codons.index(codon.upper())] = True
+        considered = np.zeros(64, bool)
+        for group in _synonymous_groups(self.table)[:-1]:
+            if len(group) > 1 and optimal[group].any():
+                considered[group] = True
+        optimal &= considered
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.counts[:, optimal].sum(axis=1) / self.counts[:, considered].sum(
+                axis=1
+            )
+
+    def rscu(self):
+        """Calculate the relative synonymous codon usage (RSCU) of each gene.
+
+        Returns an array of shape (number of genes, 64), with the observed
+        count of each codon divided by the count expected if all synonymous
+        codons were used equally (Sharp, Tuohy & Mosurski 1986). Stop codons
+        are treated as one synonymous group. Codons for amino acids absent
+        from a gene get a value of NaN.
+        """
+        rscu = np.empty(self.counts.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for group in _synonymous_groups(self.table):
+                counts = self.counts[:, group]
+                expected = counts.sum(axis=1, keepdims=True) / len(group)
+                rscu[:, group] = counts / expected
+        return rscu
+
+    def enc(self):
+        """Calculate the effective number of codons (ENC) of each gene.
+
+        The ENC is calculated as described by Wright (Gene 87: 23-29 (1990)),
+        grouping amino acids by their degeneracy in the genetic code. If no
+        amino acid with a degeneracy of three is present, the average of the
+        values for degeneracies two and four is used for it, as proposed by
+        Wright. The ENC is capped at the number of sense codons; genes for
+        which a degeneracy class cannot be estimated get a value of NaN.
+        """
+        groups = _synonymous_groups(self.table)[:-1]
+        degeneracies = sorted({len(group) for group in groups})
+        n = len(self)
+        enc = np.zeros(n)
+        homozygosities = {}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for degeneracy in degeneracies:
+                members = [group for group in groups if len(group) == degeneracy]
+                if degeneracy == 1:
+                    enc += len(members)
+                    continue
+                total = np.zeros(n)
+                number = np.zeros(n)
+                for group in members:
+                    counts = self.counts[:, group]
+                    amino_acid_count = counts.sum(axis=1)
+                    p = counts / amino_acid_count[:, None]
+                    f = (amino_acid_count * (p**2).sum(axis=1) - 1) / (
+                        amino_acid_count - 1
+                    )
+                    valid = amino_acid_count > 1
+                    total[valid] += f[valid]
+                    number[valid] += 1
+                homozygosities[degeneracy] = (len(members), total / number)
+            if 3 in homozygosities and 2 in homozygosities and 4 in homozygosities:
+                size, f3 = homozygosities[3]
+                estimate = (homozygosities[2][1] + homozygosities[4][1]) / 2
+                homozygosities[3] = (size, np.where(np.isnan(f3), estimate, f3))
+            for size, f in homozygosities.values():
+                enc += size / f
+        sense_codons = sum(len(group) for group in groups)
+        return np.minimum(enc, sense_codons)
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+
+    run_doctest()
@@ -18,6 +18,10 @@ temperature of oligonucleotides:
    Correction for mismatches, dangling ends, salt concentration and other
    additives are available.
 
+For many oligonucleotides at once (e.g. to screen candidate primers),
+Tm_NN_batch calculates the same nearest neighbor Tm as Tm_NN in vectorized form
+and returns a NumPy array.
+
 General parameters for most Tm methods:
  - seq -- A Biopython sequence object or a string.
  - check -- Checks if the sequence is valid for the given method (default=
@@ -1070,6 +1074,293 @@ def Tm_NN(
     return melting_temp
 
 
+def _salt_correction_batch(Na, K, Tris, Mg, dNTPs, method, lengths, gc):
+    """Calculate salt correction terms for many sequences at once (PRIVATE).
+
+    This is the vectorized equivalent of salt_correction, with lengths and gc
+    the length and GC fraction (as NumPy arrays) of each sequence. The ion
+    concentrations may be scalars or arrays broadcastable to lengths.
+    """
+    import numpy as np
+
+    Na, K, Tris, Mg, dNTPs = np.broadcast_arrays(
+        *(np.asarray(value, float) for value in (Na, K, Tris, Mg, dNTPs)),
+        lengths,
+    )[:5]
+    Mon = Na + K + Tris / 2.0
+    mg = Mg * 1e-3
+    if method != 7:
+        # Na equivalent according to von Ahsen et al. (2001):
+        use_mg = (K + Mg + Tris + dNTPs > 0) & (dNTPs < Mg)
+        Mon = Mon + np.where(use_mg, 120 * np.sqrt(np.abs(Mg - dNTPs)), 0.0)
+    mon = Mon * 1e-3
+    if method in range(1, 7) and not np.all(mon):
+        raise ValueError(
+            "Total ion concentration of zero is not allowed in this method."
+        )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == 1:
+            return 16.6 * np.log10(mon)
+        if method == 2:
+            return 16.6 * np.log10(mon / (1.0 + 0.7 * mon))
+        if method == 3:
+            return 12.5 * np.log10(mon)
+        if method == 4:
+            return 11.7 * np.log10(mon)
+        if method == 5:
+            return 0.368 * (lengths - 1) * np.log(mon)
+        if method == 6:
+            return (4.29 * gc - 3.95) * 1e-5 * np.log(mon) + 9.40e-6 * np.log(mon) ** 2
+        if method == 7:
+            dntps = dNTPs * 1e-3
+            ka = 3e4  # Dissociation constant for Mg:dNTP
+            # Free Mg2+ calculation:
+            free_mg = (
+                -(ka * dntps - ka * mg + 1.0)
+                + np.sqrt((ka * dntps - ka * mg + 1.0) ** 2 + 4.0 * ka * mg)
+            ) / (2.0 * ka)
+            mg = np.where(dNTPs > 0, free_mg, mg)
+            R = np.sqrt(mg) / mon
+            low = (Mon > 0) & (R < 0.22)
+            mid = (Mon > 0) & (R >= 0.22) & (R < 6.0)
+            a = np.where(mid, 3.92 * (0.843 - 0.352 * np.sqrt(mon) * np.log(mon)), 3.92)
+            d = np.where(
+                mid,
+                1.42 * (1.279 - 4.03e-3 * np.log(mon) - 8.03e-3 * np.log(mon) ** 2),
+                1.42,
+            )
+            g = np.where(
+                mid,
+                8.31 * (0.486 - 0.258 * np.log(mon) + 5.25e-3 * np.log(mon) ** 3),
+                8.31,
+            )
+            b, c, e, f = -0.911, 6.26, -48.2, 52.5
+            corr = (
+                a
+                + b * np.log(mg)
+                + gc * (c + d * np.log(mg))
+                + (1 / (2.0 * (lengths - 1)))
+                * (e + f * np.log(mg) + g * np.log(mg) ** 2)
+            ) * 1e-5
+            monovalent = (4.29 * gc - 3.95) * 1e-5 * np.log(mon) + 9.40e-6 * np.log(
+                mon
+            ) ** 2
+            return np.where(low, monovalent, corr)
+    raise ValueError("Allowed values for parameter 'method' are 1-7.")
+
+
+def _neighbor_tables(letters, nn_table, tmm_table, imm_table):
+    """Return lookup arrays of thermodynamic values for nearest neighbors (PRIVATE).
+
+    The arrays are indexed by 256 * x + y, where x and y are the byte values
+    of two consecutive letters in the sequence, assuming a perfectly
+    complementary target sequence. Returned are the dH, dS values and a
+    boolean mask of missing data for zipping, and the dH, dS values and a
+    boolean mask of available data for terminal mismatches at the left and
+    right end.
+    """
+    import numpy as np
+
+    complements = str(Seq.Seq(letters).complement())
+    nn = np.zeros((3, 65536))
+    nn[2, :] = 1  # missing data
+    left = np.zeros((3, 65536))
+    right = np.zeros((3, 65536))
+    for x, cx in zip(letters, complements):
+        for y, cy in zip(letters, complements):
+            index = 256 * ord(x) + ord(y)
+            neighbors = x + y + "/" + cx + cy
+            for table, key in (
+                (imm_table, neighbors),
+                (imm_table, neighbors[::-1]),
+                (nn_table, neighbors),
+                (nn_table, neighbors[::-1]),
+            ):
+                if key in table:
+                    nn[:2, index] = table[key]
+                    nn[2, index] = 0
+                    break
+            # Terminal mismatches, as defined in Tm_NN:
+            key = cy + cx + "/" + y + x
+            if key in tmm_table:
+                left[:, index] = (*tmm_table[key], 1)
+            if neighbors in tmm_table:
+                right[:, index] = (*tmm_table[neighbors], 1)
+    return nn, left, right
+
+
+def Tm_NN_batch(
+    seqs,
+    check=True,
+    strict=True,
+    nn_table=None,
+    tmm_table=None,
+    imm_table=None,
+    dnac1=25,
+    dnac2=25,
+    selfcomp=False,
+    Na=50,
+    K=0,
+    Tris=0,
+    Mg=0,
+    dNTPs=0,
+    saltcorr=5,
+    DMSO=0,
+    fmd=0,
+    DMSOfactor=0.75,
+    fmdfactor=0.65,
+    fmdmethod=1,
+):
+    """Return the Tm of many oligonucleotides using nearest neighbor thermodynamics.
+
+    This is a vectorized version of Tm_NN for many sequences hybridizing to
+    their perfect complement, as used for example to screen candidate primers.
+    The sequences may have different lengths. The nearest neighbor tables are
+    converted to NumPy arrays once, and the nearest neighbor contributions,
+    the salt correction, and the chemical correction are then calculated for
+    all sequences at the same time. The results are identical (to
+    floating-point tolerance) to those of Tm_NN for each sequence separately;
+    the result is returned as a NumPy array of floats.
+
+    Arguments:
+     - seqs: An iterable of sequences, as strings or Biopython sequence objects.
+     - check, strict, nn_table, tmm_table, imm_table, Na, K, Tris, Mg, dNTPs,
+       saltcorr: As in Tm_NN. Dangling ends and mismatches (the c_seq, shift,
+       and de_table arguments of Tm_NN) are not supported.
+     - dnac1, dnac2, selfcomp: As in Tm_NN; these, as well as the ion
+       concentrations, may be given as scalars or as arrays with one value
+       per sequence.
+     - DMSO, fmd, DMSOfactor, fmdfactor, fmdmethod: If DMSO or fmd is nonzero,
+       the melting temperatures are corrected for these chemical additives as
+       in chem_correction, using the GC content of each sequence.
+
+    For example, mt.Tm_NN_batch(['CGTTCCAAAGATGTGGGCATGAGCTTAC', 'ACGTTGCAAG'])
+    returns an array with the values 60.32 and 26.08 (rounded to two digits).
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        from Bio import MissingPythonDependencyError
+
+        raise MissingPythonDependencyError(
+            "Please install NumPy if you want to use Tm_NN_batch. "
+            "See http://www.numpy.org/"
+        ) from None
+
+    # Set defaults
+    if not nn_table:
+        nn_table = DNA_NN3
+    if not tmm_table:
+        tmm_table = DNA_TMM1
+    if not imm_table:
+        imm_table = DNA_IMM1
+
+    if check:
+        seqs = [_check(str(seq), "Tm_NN") for seq in seqs]
+    else:
+        seqs = [str(seq) for seq in seqs]
+    n = len(seqs)
+    lengths = np.array([len(seq) for seq in seqs], np.int64)
+    if n == 0:
+        return np.zeros(0)
+    if not lengths.all():
+        raise ValueError("empty sequences are not allowed")
+    data = np.frombuffer("".join(seqs).encode("ASCII"), np.uint8)
+    starts = np.zeros(n, np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    ends = starts + lengths
+    firsts = data[starts]
+    lasts = data[ends - 1]
+
+    letters = "".join(chr(letter) for letter in np.unique(data))
+    nn, left, right = _neighbor_tables(letters, nn_table, tmm_table, imm_table)
+    # Pairs of consecutive letters in the concatenated sequences:
+    pairs = 256 * data[:-1].astype(np.int64) + data[1:]
+    pair_owner = np.repeat(np.arange(n), lengths)[:-1]
+
+    delta_h = np.zeros(n)
+    delta_s = np.zeros(n)
+
+    # Terminal mismatches
+    left_hit = np.zeros(n, bool)
+    right_hit = np.zeros(n, bool)
+    mask = lengths >= 2
+    left_pairs = pairs[starts[mask]]
+    left_hit[mask] = left[2, left_pairs] > 0
+    delta_h[mask] += left[0, left_pairs]
+    delta_s[mask] += left[1, left_pairs]
+    mask = lengths - left_hit >= 2
+    right_pairs = pairs[ends[mask] - 2]
+    right_hit[mask] = right[2, right_pairs] > 0
+    delta_h[mask] += right[0, right_pairs]
+    delta_s[mask] += right[1, right_pairs]
+
+    # Initiation
+    delta_h += nn_table["init"][0]
+    delta_s += nn_table["init"][1]
+    gc_counts = np.zeros(256, np.int64)
+    gc_counts[np.frombuffer(b"CGScgs", np.uint8)] = 1
+    gc = np.bincount(np.repeat(np.arange(n), lengths), gc_counts[data], minlength=n)
+    gc /= lengths
+    delta_h += np.where(gc == 0, nn_table["init_allA/T"][0], nn_table["init_oneG/C"][0])
+    delta_s += np.where(gc == 0, nn_table["init_allA/T"][1], nn_table["init_oneG/C"][1])
+    penalties = (firsts == ord("T")).astype(int) + (lasts == ord("A"))
+    delta_h += nn_table["init_5T/A"][0] * penalties
+    delta_s += nn_table["init_5T/A"][1] * penalties
+    counts = np.zeros((2, 256), int)
+    counts[0, np.frombuffer(b"AT", np.uint8)] = 1
+    counts[1, np.frombuffer(b"GC", np.uint8)] = 1
+    AT = counts[0, firsts] + counts[0, lasts]
+    GC = counts[1, firsts] + counts[1, lasts]
+    delta_h += nn_table["init_A/T"][0] * AT + nn_table["init_G/C"][0] * GC
+    delta_s += nn_table["init_A/T"][1] * AT + nn_table["init_G/C"][1] * GC
+
+    # Finally, the 'zipping'
+    positions = np.arange(len(pairs))
+    valid = (positions >= starts[pair_owner] + left_hit[pair_owner]) & (
+        positions < ends[pair_owner] - 1 - right_hit[pair_owner]
+    )
+    missing = valid & (nn[2, pairs] > 0)
+    if missing.any():
+        position = np.flatnonzero(missing)[0]
+        letters = data[position : position + 2].tobytes().decode()
+        neighbors = letters + "/" + str(Seq.Seq(letters).complement())
+        _key_error(neighbors, strict)
+    delta_h += np.bincount(pair_owner, np.where(valid, nn[0, pairs], 0), minlength=n)
+    delta_s += np.bincount(pair_owner, np.where(valid, nn[1, pairs], 0), minlength=n)
+
+    selfcomp = np.broadcast_to(selfcomp, (n,)).astype(bool)
+    k = np.where(
+        selfcomp,
+        np.asarray(dnac1, float) * 1e-9,
+        (np.asarray(dnac1, float) - np.asarray(dnac2, float) / 2.0) * 1e-9,
+    )
+    delta_h += np.where(selfcomp, nn_table["sym"][0], 0)
+    delta_s += np.where(selfcomp, nn_table["sym"][1], 0)
+    R = 1.987  # universal gas constant in Cal/degrees C*Mol
+    if saltcorr:
+        corr = _salt_correction_batch(Na, K, Tris, Mg, dNTPs, saltcorr, lengths, gc)
+    if saltcorr == 5:
+        delta_s += corr
+    melting_temp = (1000 * delta_h) / (delta_s + (R * (np.log(k)))) - 273.15
+    if saltcorr in (1, 2, 3, 4):
+        melting_temp += corr
+    if saltcorr in (6, 7):
+        # Tm = 1/(1/Tm + corr)
+        melting_temp = 1 / (1 / (melting_temp + 273.15) + corr) - 273.15
+    # Chemical correction, as in chem_correction:
+    melting_temp -= DMSOfactor * np.asarray(DMSO, float)
+    fmd = np.asarray(fmd, float)
+    if fmd.any():
+        if fmdmethod == 1:
+            melting_temp -= fmdfactor * fmd
+        elif fmdmethod == 2:
+            melting_temp += (0.453 * gc - 2.88) * fmd
+        else:
+            raise ValueError("'fmdmethod' must be 1 or 2")
+    return melting_temp
+
+
 if __name__ == "__main__":
     from Bio._utils import run_doctest
 
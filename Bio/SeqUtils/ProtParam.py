@@ -47,6 +47,10 @@ Other public methods are:
  - flexibility
  - charge_at_pH
 
+To analyze many protein sequences at once, use the ProteinBatchAnalysis class
+in Bio.SeqUtils.ProtParamBatch, which provides the same methods in vectorized
+form.
+
 """
 
 import functools
@@ -0,0 +1,336 @@
+# Copyright 2026 by the Biopython contributors.
+# All rights reserved.
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Protein analysis for many sequences at once.
+
+The ProteinBatchAnalysis class provides the same methods as
+Bio.SeqUtils.ProtParam.ProteinAnalysis, but calculates each property for a
+collection of protein sequences at the same time. The amino acid composition
+of all sequences is counted once into a matrix, from which the properties
+are then derived using NumPy. The isoelectric point is found for all proteins
+simultaneously, using the same bisection as Bio.SeqUtils.IsoelectricPoint.
+
+>>> from Bio.SeqUtils.ProtParamBatch import ProteinBatchAnalysis
+>>> X = ProteinBatchAnalysis(["INGAR", "PETER", "MAEGEITTFTALTEKFNLPPGNYKKPK"])
+>>> X.lengths
+array([ 5,  5, 27])
+>>> X.molecular_weight().round(2).tolist()
+[529.59, 630.65, 3026.46]
+>>> X.isoelectric_point().round(2).tolist()
+[9.75, 4.53, 8.14]
+>>> X.gravy().round(3).tolist()
+[-0.42, -2.76, -0.726]
+
+Each method returns a NumPy array with one value (or one row of values) per
+sequence, in the same order as the input sequences.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Please install NumPy if you want to use Bio.SeqUtils.ProtParamBatch. "
+        "See http://www.numpy.org/"
+    ) from None
+
+from Bio.Data import IUPACData
+from Bio.SeqUtils import IsoelectricPoint
+from Bio.SeqUtils import ProtParamData
+
+
+def _make_lookup(values, default=np.nan):
+    """Return an array mapping byte values to the values in a dictionary (PRIVATE)."""
+    lookup = np.full(256, default, float)
+    for letter, value in values.items():
+        lookup[ord(letter)] = value
+    return lookup
+
+
+class ProteinBatchAnalysis:
+    """Class containing methods for the analysis of many proteins at once.
+
+    The constructor takes two arguments.
+    The first is an iterable of protein sequences, as strings, Seq objects,
+    or SeqRecord objects.
+
+    The second argument is optional. If set to True, the weight of the amino
+    acids will be calculated using their monoisotopic mass, as in
+    ProtParam.ProteinAnalysis.
+
+    Attributes:
+     - lengths - NumPy array with the length of each sequence.
+     - counts  - NumPy array of shape (number of sequences, 20) with the
+                 number of times each of the standard amino acids (in the
+                 order of IUPACData.protein_letters) appears in each sequence.
+
+    """
+
+    letters = IUPACData.protein_letters
+
+    def __init__(self, sequences, monoisotopic=False):
+        """Initialize the class."""
+        data = []
+        for sequence in sequences:
+            try:
+                sequence = sequence.seq
+            except AttributeError:  # not a SeqRecord object
+                pass
+            data.append(str(sequence).upper())
+        self.monoisotopic = monoisotopic
+        self.lengths = np.array([len(sequence) for sequence in data], np.int64)
+        self._data = np.frombuffer("".join(data).encode("ASCII"), np.uint8)
+        n = len(self.lengths)
+        self._starts = np.zeros(n, np.int64)
+        np.cumsum(self.lengths[:-1], out=self._starts[1:])
+        self._owners = np.repeat(np.arange(n), self.lengths)
+        indices = np.full(256, len(self.letters), np.int64)
+        indices[np.frombuffer(self.letters.encode(), np.uint8)] = np.arange(20)
+        # Count all residues, with non-standard letters in an extra column:
+        counts = np.bincount(
+            self._owners * 21 + indices[self._data], minlength=21 * n
+        ).reshape(n, 21)
+        self.counts = counts[:, :20]
+
+    def __len__(self):
+        """Return the number of sequences."""
+        return len(self.lengths)
+
+    def _column(self, letter):
+        """Return the counts for one amino acid as a NumPy array (PRIVATE)."""
+        return self.counts[:, self.letters.index(letter)]
+
+    def _sum_per_sequence(self, values):
+        """Sum per-residue values for each sequence (PRIVATE)."""
+        return np.bincount(self._owners, values, minlength=len(self))
+
+    def _residue_values(self, values, name):
+        """Map each residue to its value in a dictionary (PRIVATE).
+
+        Raises a KeyError for residues not found in the dictionary, as
+        ProteinAnalysis would.
+        """
+        lookup = _make_lookup(values)
+        residue_values = lookup[self._data]
+        missing = np.isnan(residue_values)
+        if missing.any():
+            letter = chr(self._data[np.flatnonzero(missing)[0]])
+            raise KeyError(f"{letter!r} is not in the {name} table")
+        return residue_values
+
+    def count_amino_acids(self):
+        """Count standard amino acids, return the counts matrix.
+
+        Column i of the matrix contains the number of times the amino acid
+        letters[i] appears in each sequence.
+        """
+        return self.counts
+
+    @property
+    def amino_acids_percent(self):
+        """Get the amino acid content in percentages (range 0-100)."""
+        return self.counts * 100 / self.lengths[:, None]
+
+    def molecular_weight(self):
+        """Calculate the molecular weight of each protein sequence."""
+        if self.monoisotopic:
+            weight_table = IUPACData.monoisotopic_protein_weights
+            water = 18.010565
+        else:
+            weight_table = IUPACData.protein_weights
+            water = 18.0153
+        lookup = _make_lookup(weight_table)
+        weights = lookup[self._data]
+        missing = np.isnan(weights)
+        if missing.any():
+            letter = chr(self._data[np.flatnonzero(missing)[0]])
+            raise ValueError(
+                f"'{letter}' is not a valid unambiguous letter for protein"
+            )
+        return self._sum_per_sequence(weights) - (self.lengths - 1) * water
+
+    def aromaticity(self):
+        """Calculate the aromaticity according to Lobry, 1994.
+
+        This is the relative frequency of Phe+Trp+Tyr.
+        """
+        percent = self.amino_acids_percent
+        return sum(percent[:, self.letters.index(aa)] / 100 for aa in "YWF")
+
+    def instability_index(self):
+        """Calculate the instability index according to Guruprasad et al 1990.
+
+        Any value above 40 means the protein is unstable (has a short half
+        life).
+        """
+        index = ProtParamData.DIWV
+        lookup = np.full((256, 256), np.nan)
+        for this, values in index.items():
+            for next, value in values.items():
+                lookup[ord(this), ord(next)] = value
+        data = self._data
+        dipeptides = lookup[data[:-1], data[1:]]
+        # exclude dipeptides spanning two sequences
+        last = self._starts + self.lengths - 1
+        dipeptides[last[(self.lengths > 0) & (last < len(dipeptides))]] = 0.0
+        missing = np.isnan(dipeptides)
+        if missing.any():
+            position = np.flatnonzero(missing)[0]
+            this, next = chr(data[position]), chr(data[position + 1])
+            raise KeyError(this if this not in index else next)
+        scores = np.bincount(self._owners[:-1], dipeptides, minlength=len(self))
+        return (10.0 / self.lengths) * scores
+
+    def flexibility(self):
+        """Calculate the flexibility according to Vihinen, 1994.
+
+        Returns a list with a NumPy array of flexibility scores for each
+        sequence, as calculated by ProteinAnalysis.flexibility.
+        """
+        values = self._residue_values(ProtParamData.Flex, "flexibility")
+        window_size = 9
+        weights = [0.25, 0.4375, 0.625, 0.8125, 1]
+        n = len(values)
+        scores = np.zeros(max(n - window_size, 0))
+        for j in range(window_size // 2):
+            front = values[j : n - window_size + j]
+            back = values[window_size - j - 1 : n - j - 1]
+            scores += (front + back) * weights[j]
+        middle = window_size // 2 + 1
+        scores += values[middle : middle + n - window_size]
+        scores /= 5.25
+        return [
+            scores[start : start + length - window_size]
+            for start, length in zip(self._starts, self.lengths)
+        ]
+
+    def gravy(self, scale="KyteDoolitle"):
+        """Calculate the GRAVY (Grand Average of Hydropathy) of each sequence.
+
+        The available scales are those in ProtParamData.gravy_scales, as for
+        ProteinAnalysis.gravy.
+        """
+        selected_scale = ProtParamData.gravy_scales.get(scale, -1)
+
+        if selected_scale == -1:
+            raise ValueError(f"scale: {scale} not known")
+
+        values = self._residue_values(selected_scale, scale)
+        return self._sum_per_sequence(values) / self.lengths
+
+    def _charged(self):
+        """Return the pK values and counts of charged groups (PRIVATE).
+
+        Returns two tuples (pKs, counts) for positive and negative groups,
+        each an array of shape (number of sequences, number of groups), in the
+        same order as used by IsoelectricPoint.charge_at_pH.
+        """
+        n = len(self)
+        nonempty = self.lengths > 0
+        first = np.zeros(n, np.uint8)
+        last = np.zeros(n, np.uint8)
+        first[nonempty] = self._data[self._starts[nonempty]]
+        last[nonempty] = self._data[(self._starts + self.lengths - 1)[nonempty]]
+        groups = []
+        for pKs, terminal, terminal_pKs in (
+            (IsoelectricPoint.positive_pKs, "Nterm", IsoelectricPoint.pKnterminal),
+            (IsoelectricPoint.negative_pKs, "Cterm", IsoelectricPoint.pKcterminal),
+        ):
+            pK_array = np.empty((n, len(pKs)))
+            count_array = np.empty((n, len(pKs)))
+            for i, (aa, pK) in enumerate(pKs.items()):
+                if aa == terminal:
+                    residues = first if terminal == "Nterm" else last
+                    pK_array[:, i] = _make_lookup(terminal_pKs, pK)[residues]
+                    count_array[:, i] = 1.0
+                else:
+                    pK_array[:, i] = pK
+                    count_array[:, i] = self._column(aa)
+            groups.append((pK_array, count_array))
+        return groups
+
+    def _charge(self, pH, charged):
+        """Calculate the charge of each protein at the given pH values (PRIVATE)."""
+        (pos_pKs, pos_counts), (neg_pKs, neg_counts) = charged
+        pH = np.asarray(pH, float)
+        if pH.ndim == 1:
+            pH = pH[:, None]
+        positive_charge = 0.0
+        for i in range(pos_pKs.shape[1]):
+            partial_charge = 1.0 / (10 ** (pH - pos_pKs[:, i : i + 1]) + 1.0)
+            positive_charge = (
+                positive_charge + pos_counts[:, i : i + 1] * partial_charge
+            )
+        negative_charge = 0.0
+        for i in range(neg_pKs.shape[1]):
+            partial_charge = 1.0 / (10 ** (neg_pKs[:, i : i + 1] - pH) + 1.0)
+            negative_charge = (
+                negative_charge + neg_counts[:, i : i + 1] * partial_charge
+            )
+        return (positive_charge - negative_charge)[:, 0]
+
+    def charge_at_pH(self, pH):
+        """Calculate the charge of each protein at the given pH.
+
+        The pH may be a scalar, or an array with one pH value per sequence.
+        """
+        pH = np.broadcast_to(np.asarray(pH, float), (len(self),))
+        return self._charge(pH, self._charged())
+
+    def isoelectric_point(self):
+        """Calculate the isoelectric point of each protein.
+
+        The bisection method of IsoelectricPoint.pi is applied to all
+        proteins simultaneously.
+        """
+        charged = self._charged()
+        n = len(self)
+        pH = np.full(n, 7.775)
+        min_ = np.full(n, 4.05)
+        max_ = np.full(n, 12.0)
+        width = 12.0 - 4.05
+        # The interval width is the same for all proteins.
+        while width > 0.0001:
+            charge = self._charge(pH, charged)
+            positive = charge > 0.0
+            min_ = np.where(positive, pH, min_)
+            max_ = np.where(positive, max_, pH)
+            pH = (min_ + max_) / 2
+            width = (max_ - min_).max(initial=0.0)
+        return pH
+
+    def secondary_structure_fraction(self):
+        """Calculate the fraction of helix, turn and sheet for each sequence.
+
+        Returns an array of shape (number of sequences, 3) with the fraction
+        of amino acids tending to be in helix, turn, or sheet, as calculated
+        by ProteinAnalysis.secondary_structure_fraction.
+        """
+        percent = self.amino_acids_percent
+        fractions = np.empty((len(self), 3))
+        for i, residues in enumerate(("EMALK", "NPGSD", "VIYFWLT")):
+            fractions[:, i] = sum(
+                percent[:, self.letters.index(r)] / 100 for r in residues
+            )
+        return fractions
+
+    def molar_extinction_coefficient(self):
+        """Calculate the molar extinction coefficient of each sequence.
+
+        Returns an integer array of shape (number of sequences, 2), with the
+        extinction coefficient assuming reduced cysteines in the first column,
+        and assuming cystines (Cys-Cys bonds) in the second column.
+        """
+        mec_reduced = self._column("W") * 5500 + self._column("Y") * 1490
+        mec_cystines = mec_reduced + (self._column("C") // 2) * 125
+        return np.stack([mec_reduced, mec_cystines], axis=1)
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+
+    run_doctest()
@@ -580,6 +580,9 @@ class CodonAdaptationIndex(dict):
 
     Implements the codon adaptation index (CAI) described by Sharp and
     Li (Nucleic Acids Res. 1987 Feb 11;15(3):1281-95).
+
+    To calculate the CAI and other codon usage indices for many genes at
+    once, use the CodonCounts class in Bio.SeqUtils.CodonBatch.
     """
 
     def __init__(self, sequences, table=standard_dna_table):
@@ -0,0 +1,291 @@
+# Copyright 2026 by the Biopython contributors.
+# All rights reserved.
+#
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Sliding window statistics for nucleotide sequences.
+
+This module calculates the nucleotide composition in windows along a sequence
+using cumulative sums, such that the running time is linear in the length of
+the sequence irrespective of the window size and step size. From the window
+composition, the GC content, GC skew, AT skew, Local Composition Complexity
+(LCC), and the fraction of unknown nucleotides (N) can be derived as NumPy
+arrays, for example to create genome browser tracks.
+
+>>> from Bio.SeqUtils.windows import window_counts
+>>> counts = window_counts("ACGTNNGGGCAATTCCGC", window=6, step=6)
+>>> counts.starts
+array([ 0,  6, 12])
+>>> counts.gc_fraction().round(3).tolist()
+[0.5, 0.667, 0.667]
+>>> counts.gc_skew().tolist()
+[0.0, 0.5, -0.5]
+>>> counts.n_fraction().round(3).tolist()
+[0.333, 0.0, 0.0]
+
+Windows are counted in chunks, taking slices of the sequence for each chunk.
+For sequences whose data are read lazily from disk, such as sequences read
+from a 2bit file with ``Bio.SeqIO``, use ``iterate_window_counts`` to process
+a whole chromosome while keeping only one chunk of sequence data in memory.
+"""
+
+from math import log
+
+try:
+    import numpy as np
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Please install NumPy if you want to use Bio.SeqUtils.windows. "
+        "See http://www.numpy.org/"
+    ) from None
+
+
+# Categories of nucleotides counted in each window:
+_A, _C, _G, _T, _S, _W, _N, _AMBIGUOUS, _OTHER = range(9)
+
+_categories = np.full(256, _OTHER, np.uint8)
+for _letters, _category in (
+    (b"Aa", _A),
+    (b"Cc", _C),
+    (b"Gg", _G),
+    (b"TtUu", _T),
+    (b"Ss", _S),
+    (b"Ww", _W),
+    (b"NnXx", _N),
+    (b"BbDdHhKkMmRrVvYy", _AMBIGUOUS),
+):
+    _categories[np.frombuffer(_letters, np.uint8)] = _category
+del _letters, _category
+
+# Expected G+C contribution of ambiguous nucleotides, as in
+# Bio.SeqUtils._gc_values (the N and X contributions are added separately):
+_gc_weights = np.zeros(256)
+for _letter, _weight in {
+    "M": 1 / 2,
+    "R": 1 / 2,
+    "Y": 1 / 2,
+    "K": 1 / 2,
+    "V": 2 / 3,
+    "B": 2 / 3,
+    "H": 1 / 3,
+    "D": 1 / 3,
+}.items():
+    _gc_weights[ord(_letter)] = _weight
+    _gc_weights[ord(_letter.lower())] = _weight
+del _letter, _weight
+
+
+def _as_bytes_array(seq):
+    """Return the sequence contents as a NumPy array of bytes (PRIVATE)."""
+    if isinstance(seq, str):
+        data = seq.encode("ASCII")
+    else:
+        data = bytes(seq)
+    return np.frombuffer(data, np.uint8)
+
+
+class WindowCounts:
+    """Nucleotide counts in a series of windows along a sequence.
+
+    Attributes:
+     - starts    - NumPy array with the start position of each window;
+     - ends      - NumPy array with the end position of each window;
+     - counts    - NumPy array of shape (number of windows, 9), with the
+                   number of A, C, G, T (or U), S, W, N (or X), other
+                   ambiguous nucleotides (BDHKMRVY), and any other characters,
+                   in that order, in each window;
+     - gc_weight - NumPy array with the expected number of G and C
+                   nucleotides contributed by the ambiguous nucleotides
+                   BDHKMRVY in each window.
+
+    Counts are case-insensitive.
+    """
+
+    def __init__(self, starts, ends, counts, gc_weight):
+        """Initialize the object; use window_counts to create it."""
+        self.starts = starts
+        self.ends = ends
+        self.counts = counts
+        self.gc_weight = gc_weight
+
+    def __len__(self):
+        """Return the number of windows."""
+        return len(self.starts)
+
+    def __repr__(self):
+        """Return a representation of the object for debugging."""
+        return f"<{self.__class__.__name__} object with {len(self)} windows>"
+
+    @property
+    def lengths(self):
+        """Return the length of each window as a NumPy array."""
+        return self.ends - self.starts
+
+    def gc_fraction(self, ambiguous="remove"):
+        """Return the G+C fraction (between 0 and 1) in each window.
+
+        The ambiguous argument is interpreted in the same way as for
+        Bio.SeqUtils.gc_fraction, which calculates the G+C content for a
+        complete sequence. Windows without any nucleotides counted in the
+        length get a G+C fraction of zero.
+        """
+        counts = self.counts
+        gc = counts[:, _C] + counts[:, _G] + counts[:, _S]
+        if ambiguous == "remove":
+            length = gc + counts[:, _A] + counts[:, _T] + counts[:, _W]
+        elif ambiguous == "ignore":
+            length = self.lengths
+        elif ambiguous == "weighted":
+            length = self.lengths
+            gc = gc + 0.5 * counts[:, _N] + self.gc_weight
+        else:
+            raise ValueError(f"ambiguous value '{ambiguous}' not recognized")
+        return _ratio(gc, length)
+
+    def gc_skew(self):
+        """Return the GC skew (G-C)/(G+C) in each window.
+
+        Windows without any G or C get a skew of zero, as in
+        Bio.SeqUtils.GC_skew. Ambiguous nucleotides are not considered.
+        """
+        g = self.counts[:, _G]
+        c = self.counts[:, _C]
+        return _ratio(g.astype(np.int64) - c, g + c)
+
+    def at_skew(self):
+        """Return the AT skew (A-T)/(A+T) in each window.
+
+        Windows without any A or T get a skew of zero. Ambiguous nucleotides
+        are not considered; U is counted as T.
+        """
+        a = self.counts[:, _A]
+        t = self.counts[:, _T]
+        return _ratio(a.astype(np.int64) - t, a + t)
+
+    def n_fraction(self):
+        """Return the fraction of unknown nucleotides (N or X) in each window."""
+        return _ratio(self.counts[:, _N], self.lengths)
+
+    def lcc(self):
+        """Return the Local Composition Complexity (LCC) of each window.
+
+        The LCC is calculated from the A, C, G, and T counts divided by the
+        window length, as in Bio.SeqUtils.lcc.lcc_simp and lcc_mult.
+        """
+        lengths = self.lengths
+        lcc = np.zeros(len(lengths))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for category in (_A, _C, _G, _T):
+                p = self.counts[:, category] / lengths
+                lcc -= np.where(p > 0, p * np.log(p), 0.0)
+        lcc /= log(4)
+        lcc[lengths == 0] = 0.0
+        return lcc
+
+
+def _ratio(numerator, denominator):
+    """Divide two arrays, returning zero where the denominator is zero (PRIVATE)."""
+    result = np.zeros(len(denominator))
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+def _window_positions(length, window, step, partial):
+    """Return the start and end positions of the windows (PRIVATE)."""
+    if window <= 0:
+        raise ValueError("window must be positive")
+    if step is None:
+        step = window
+    elif step <= 0:
+        raise ValueError("step must be positive")
+    if partial:
+        starts = np.arange(0, length, step, dtype=np.int64)
+    else:
+        starts = np.arange(0, length - window + 1, step, dtype=np.int64)
+    ends = np.minimum(starts + window, length)
+    return starts, ends
+
+
+def _count(data, starts, ends):
+    """Count nucleotide categories in windows of a bytes array (PRIVATE).
+
+    Arguments starts and ends are relative to the start of data.
+    """
+    categories = _categories[data]
+    n = len(categories)
+    counts = np.empty((len(starts), _OTHER + 1), np.int64)
+    cumulative = np.zeros(n + 1, np.int64)
+    for category in range(_OTHER + 1):
+        np.cumsum(categories == category, out=cumulative[1:])
+        counts[:, category] = cumulative[ends] - cumulative[starts]
+    weights = np.zeros(n + 1)
+    np.cumsum(_gc_weights[data], out=weights[1:])
+    gc_weight = weights[ends] - weights[starts]
+    return counts, gc_weight
+
+
+def iterate_window_counts(seq, window=100, step=None, partial=True, chunk=1000000):
+    """Iterate over the nucleotide counts in windows along a sequence.
+
+    Arguments:
+     - seq     - a nucleotide sequence (a string, Seq, or MutableSeq object);
+     - window  - the window size;
+     - step    - the distance between the start positions of consecutive
+                 windows. The default value None uses the window size,
+                 resulting in non-overlapping windows;
+     - partial - if True (default), include the windows at the end of the
+                 sequence that are shorter than the window size;
+     - chunk   - the approximate number of nucleotides to process at a time.
+
+    This generator returns a WindowCounts object for each chunk of windows.
+    Only the part of the sequence covered by these windows is extracted from
+    the sequence at a time, which limits memory usage for sequences whose
+    contents are read lazily from disk (e.g. for 2bit files).
+    """
+    starts, ends = _window_positions(len(seq), window, step, partial)
+    step = starts[1] - starts[0] if len(starts) > 1 else window
+    size = max(1, chunk // step)
+    for i in range(0, len(starts), size):
+        chunk_starts = starts[i : i + size]
+        chunk_ends = ends[i : i + size]
+        offset = chunk_starts[0]
+        data = _as_bytes_array(seq[offset : chunk_ends.max()])
+        counts, gc_weight = _count(data, chunk_starts - offset, chunk_ends - offset)
+        yield WindowCounts(chunk_starts, chunk_ends, counts, gc_weight)
+
+
+def window_counts(seq, window=100, step=None, partial=True, chunk=1000000):
+    """Count the nucleotides in windows along a sequence.
+
+    The arguments are as in iterate_window_counts. Returns a single
+    WindowCounts object covering all windows along the sequence.
+
+    >>> from Bio.Seq import Seq
+    >>> from Bio.SeqUtils.windows import window_counts
+    >>> counts = window_counts(Seq("ACGTACGTAAAA"), window=4, step=2, partial=False)
+    >>> counts.starts
+    array([0, 2, 4, 6, 8])
+    >>> counts.lcc().round(3).tolist()
+    [1.0, 1.0, 1.0, 0.75, 0.0]
+    >>> counts.at_skew().round(3).tolist()
+    [0.0, 0.0, 0.0, 0.333, 1.0]
+    """
+    starts, ends = _window_positions(len(seq), window, step, partial)
+    parts = list(iterate_window_counts(seq, window, step, partial, chunk))
+    if parts:
+        counts = np.concatenate([part.counts for part in parts])
+        gc_weight = np.concatenate([part.gc_weight for part in parts])
+    else:
+        counts = np.zeros((0, _OTHER + 1), np.int64)
+        gc_weight = np.zeros(0)
+    return WindowCounts(starts, ends, counts, gc_weight)
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+
+    run_doctest()
@@ -29,6 +29,7 @@ except ImportError:
     ) from None
 
 from Bio.Align import Alignment
+from Bio.Align import ArrayAlignment
 
 
 def create(instances, alphabet="ACGT"):
@@ -384,7 +385,12 @@ class Motif:
         if self.alignment is not None:
             alignment = self.alignment.reverse_complement()
             if T_or_U == "U":
-                alignment.sequences = [s.replace("T", "U") for s in alignment.sequences]
+                if isinstance(alignment, ArrayAlignment):
+                    alignment.data[alignment.data == ord("T")] = ord("U")
+                else:
+                    alignment.sequences = [
+                        s.replace("T", "U") for s in alignment.sequences
+                    ]
             res = Motif(alphabet=alphabet, alignment=alignment)
         else:  # has counts
             counts = {
@@ -99,6 +99,9 @@ if np is None:
             "Bio.phenotype.phen_micro",
             "Bio.phenotype.pm_fitting",
             "Bio.SeqIO.PdbIO",
+            "Bio.SeqUtils.CodonBatch",
+            "Bio.SeqUtils.ProtParamBatch",
+            "Bio.SeqUtils.windows",
             "Bio.SVDSuperimposer",
         ]
     )
@@ -19,6 +19,7 @@ except ImportError:
     ) from None
 
 from Bio import Align
+from Bio import motifs
 from Bio import SeqIO
 from Bio.Seq import reverse_complement
 from Bio.Seq import Seq
@@ -3667,6 +3668,361 @@ rn7.chr2  174256650
         )
 
 
+class TestAlign_gapped_rows(unittest.TestCase):
+    def test_random(self):
+        rng = np.random.default_rng(seed=1)
+        letters = np.frombuffer(b"ACGT", np.uint8)
+        data = letters[rng.integers(0, 4, (8, 1000))]
+        data[rng.random(data.shape) < 0.2] = ord("-")
+        lines = [line.tobytes().decode() for line in data]
+        text = "".join(f">seq{i}\n{line}\n" for i, line in enumerate(lines))
+        alignment = Align.read(StringIO(text), "fasta")
+        self.assertEqual(list(alignment), lines)
+        self.assertEqual(alignment[3], lines[3])
+        self.assertEqual(alignment[-1], lines[-1])
+        columns = [5, 999, 0, -3]
+        self.assertEqual(alignment[2, columns], "".join(lines[2][j] for j in columns))
+        self.assertEqual(list(alignment[:, ::7]), [line[::7] for line in lines])
+        self.assertEqual(alignment.format("fasta"), text)
+        # the same alignment, with plain strings on the reverse strand
+        sequences = [reverse_complement(line.replace("-", "")) for line in lines]
+        coordinates = np.array([[len(sequence)] for sequence in sequences])
+        coordinates = coordinates - alignment.coordinates
+        alignment = Align.Alignment(sequences, coordinates)
+        self.assertEqual(list(alignment), lines)
+        for k, block in enumerate(str(alignment).split("\n\n")):
+            start = 60 * k
+            for i, line in enumerate(block.splitlines()):
+                position = len(sequences[i]) - start + lines[i][:start].count("-")
+                self.assertEqual(int(line[10:19]), position)
+                self.assertTrue(line[20:].startswith(lines[i][start : start + 60]))
+
+    def test_pairwise(self):
+        target = Seq({1000000: "ACGTTGCA" * 12}, length=1000200)
+        query = Seq("ACGTTGCA" * 5 + "AC" + "ACGTTGCA" * 7).reverse_complement()
+        coordinates = np.array(
+            [
+                [1000000, 1000040, 1000042, 1000090, 1000090, 1000096],
+                [98, 58, 58, 10, 8, 2],
+            ]
+        )
+        alignment = Align.Alignment([target, query], coordinates)
+        self.assertEqual(
+            alignment[0],
+            "ACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAAC--GTTGCA",
+        )
+        self.assertEqual(
+            alignment[1],
+            "ACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCA--ACACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTG",
+        )
+        self.assertEqual(
+            str(alignment),
+            """\
+target      1000000 ACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGT
+                  0 ||||||||||||||||||||||||||||||||||||||||--..................
+query            98 ACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTGCA--ACACGTTGCAACGTTGCA
+
+target      1000060 TGCAACGTTGCAACGTTGCAACGTTGCAAC--GTTGCA 1000096
+                 60 ..............................--......      98
+query            40 ACGTTGCAACGTTGCAACGTTGCAACGTTGCAACGTTG       2
+""",
+        )
+
+
+class TestAlignmentCounter(unittest.TestCase):
+    def check_table(self, counter, alignments, scoring=None):
+        table = counter.table
+        self.assertEqual(len(counter), len(alignments))
+        for i, alignment in enumerate(alignments):
+            if scoring is None:
+                counts = alignment.counts()
+            else:
+                counts = alignment.counts(scoring)
+            for key, values in table.items():
+                self.assertAlmostEqual(values[i], getattr(counts, key), msg=key)
+
+    def test_pairwise(self):
+        aligner = Align.PairwiseAligner(
+            mode="local", match_score=2, mismatch_score=-3, gap_score=-2
+        )
+        rng = np.random.default_rng(seed=1)
+        alignments = []
+        for i in range(20):
+            target = "".join(rng.choice(list("ACGT"), 50))
+            query = "".join(rng.choice(list("ACGT"), 40))
+            strand = "-" if i % 2 else "+"
+            alignments.append(aligner.align(target, query, strand=strand)[0])
+        counter = Align.AlignmentCounter(aligner, substitutions=True, chunksize=7)
+        counter.update(alignments[:5])
+        counter.update(iter(alignments[5:]))
+        self.assertEqual(
+            list(counter.table),
+            [
+                "aligned",
+                "identities",
+                "mismatches",
+                "open_left_insertions",
+                "extend_left_insertions",
+                "open_left_deletions",
+                "extend_left_deletions",
+                "open_internal_insertions",
+                "extend_internal_insertions",
+                "open_internal_deletions",
+                "extend_internal_deletions",
+                "open_right_insertions",
+                "extend_right_insertions",
+                "open_right_deletions",
+                "extend_right_deletions",
+                "gap_score",
+                "substitution_score",
+                "score",
+            ],
+        )
+        self.check_table(counter, alignments, aligner)
+        scores = [alignment.score for alignment in alignments]
+        self.assertTrue(np.allclose(counter.table["score"], scores))
+        m = counter.substitutions
+        self.assertEqual(m.alphabet, "ACGT")
+        expected = sum(alignment.substitutions for alignment in alignments)
+        self.assertTrue(np.array_equal(m, expected))
+        counter = Align.AlignmentCounter("N")
+        counter.update(alignments)
+        self.assertEqual(
+            list(counter.table),
+            list(Align.AlignmentCounter._fields[:3])
+            + list(Align.AlignmentCounter._fields[4:]),
+        )
+        self.check_table(counter, alignments, "N")
+        with self.assertRaises(AttributeError):
+            counter.substitutions
+
+    def test_multiple(self):
+        path = os.path.join("Clustalw", "opuntia.aln")
+        alignment = Align.read(path, "clustal")
+        substitution_matrix = Align.substitution_matrices.load("BLASTN")
+        counter = Align.AlignmentCounter(substitution_matrix, substitutions=True)
+        counter.update([alignment, alignment[:3], alignment[2:, 10:200]])
+        alignments = [alignment, alignment[:3], alignment[2:, 10:200]]
+        self.check_table(counter, alignments, substitution_matrix)
+        self.assertIn("positives", counter.table)
+        self.assertIn("substitution_score", counter.table)
+        self.assertNotIn("score", counter.table)
+        m = counter.substitutions
+        expected = alignments[0].substitutions
+        expected += alignments[1].substitutions.select(expected.alphabet)
+        expected += alignments[2].substitutions.select(expected.alphabet)
+        self.assertEqual(m.alphabet, expected.alphabet)
+        self.assertTrue(np.array_equal(m, expected))
+
+    def test_shared_target(self):
+        target = SeqRecord(Seq("AACCGGTTACGTACGATCGA"), id="target")
+        alignments = [
+            Align.Alignment(
+                [target, SeqRecord(Seq("CCGGTAACG"), id="query1")],
+                np.array([[2, 7, 7, 10], [0, 5, 6, 9]]),
+            ),
+            Align.Alignment(
+                [target, SeqRecord(Seq("GTACGTAACC"), id="query2")],
+                np.array([[2, 12], [10, 0]]),
+            ),
+            Align.Alignment(
+                [target, Seq("ACGTTCGA"), "ACGTACGA"],
+                np.array([[8, 12, 15, 19], [0, 4, 4, 8], [8, 4, 4, 0]]),
+            ),
+            Align.Alignment([target, "ACGT"], np.zeros((2, 0), int)),
+            Align.Alignment(
+                [target, Seq("ACGAGCGA")], np.array([[10, 14, 16, 20], [0, 4, 4, 8]])
+            ),
+        ]
+        counter = Align.AlignmentCounter(substitutions=True)
+        counter.update(alignments)
+        self.check_table(counter, alignments)
+        expected = sum(alignment.substitutions for alignment in alignments)
+        self.assertTrue(np.array_equal(counter.substitutions, expected))
+
+    def test_error(self):
+        coordinates = np.array([[0, 4], [0, 4]])
+        good = Align.Alignment(["ACGT", "ACGA"], coordinates)
+        bad = Align.Alignment(["ACGT", "ACG\u0141"], coordinates)
+        counter = Align.AlignmentCounter(substitutions=True)
+        counter.update([good])
+        with self.assertRaises(ValueError):
+            counter.update([good, bad])
+        # the counter is unchanged by the chunk that failed
+        self.assertEqual(len(counter), 1)
+        self.assertTrue(np.array_equal(counter.substitutions, good.substitutions))
+        counter.update([good])
+        self.assertEqual(counter.table["identities"].tolist(), [3, 3])
+        self.assertEqual(counter.substitutions.sum(), 8)
+
+    def test_empty(self):
+        counter = Align.AlignmentCounter()
+        counter.update([])
+        self.assertEqual(len(counter), 0)
+        table = counter.table
+        self.assertEqual(len(table["aligned"]), 0)
+        with self.assertRaises(ValueError):
+            Align.AlignmentCounter(chunksize=0)
+        with self.assertRaises(ValueError):
+            Align.AlignmentCounter(5)
+
+
+class TestArrayAlignment(unittest.TestCase):
+    def test_opuntia(self):
+        path = os.path.join("Clustalw", "opuntia.aln")
+        alignment = Align.read(path, "clustal")
+        array_alignment = Align.ArrayAlignment.from_alignment(alignment)
+        self.assertEqual(array_alignment.shape, alignment.shape)
+        self.assertEqual(len(array_alignment), 7)
+        self.assertEqual(array_alignment.length, 156)
+        self.assertEqual(
+            array_alignment.records[0].id, "gi|6273285|gb|AF191659.1|AF191"
+        )
+        self.assertIsNone(array_alignment.records[0].seq)
+        for i in range(len(alignment)):
+            self.assertEqual(array_alignment[i], alignment[i])
+        for j in (0, 42, 155):
+            self.assertEqual(array_alignment[:, j], alignment[:, j])
+            self.assertEqual(array_alignment[3, j], alignment[3, j])
+        self.assertEqual(array_alignment[2, 10:20], alignment[2, 10:20])
+        frequencies = alignment.frequencies
+        self.assertEqual(sorted(array_alignment.frequencies), sorted(frequencies))
+        for letter, values in array_alignment.frequencies.items():
+            self.assertTrue(np.array_equal(values, frequencies[letter]))
+        self.assertTrue(
+            np.array_equal(
+                array_alignment.gap_fraction, frequencies["-"] / len(alignment)
+            )
+        )
+        consensus = array_alignment.consensus()
+        self.assertEqual(len(consensus), 156)
+        self.assertEqual(consensus[:20], "TATACATTAAAGAAGGGGGA")
+        self.assertEqual(consensus[-10:], "GTGTACCAGA")
+        conservation = array_alignment.conservation
+        self.assertEqual(conservation[0], 1.0)
+        self.assertAlmostEqual(conservation[148], 6 / 7)
+        self.assertTrue(np.array_equal(np.array(array_alignment), np.array(alignment)))
+        converted = array_alignment.to_alignment()
+        self.assertEqual(converted.format("fasta"), alignment.format("fasta"))
+        self.assertTrue(np.array_equal(converted.coordinates, alignment.coordinates))
+        self.assertEqual(converted.sequences[0].id, alignment.sequences[0].id)
+
+    def test_slicing(self):
+        alignment = Align.ArrayAlignment(["ACG-TA", "ACGGTA", "A-GGCA", "TTGG-A"])
+        self.assertEqual(alignment.records, [None, None, None, None])
+        sub_alignment = alignment[1:3, 1:5]
+        self.assertTrue(np.shares_memory(sub_alignment.data, alignment.data))
+        self.assertEqual(sub_alignment.shape, (2, 4))
+        self.assertEqual(sub_alignment[0], "CGGT")
+        self.assertEqual(sub_alignment[:, 0], "C-")
+        sub_alignment = alignment[::2]
+        self.assertTrue(np.shares_memory(sub_alignment.data, alignment.data))
+        self.assertEqual(sub_alignment[1], "A-GGCA")
+        sub_alignment = alignment[[3, 0], :3]
+        self.assertEqual(sub_alignment[0], "TTG")
+        self.assertEqual(sub_alignment[1], "ACG")
+        converted = alignment[:, 3:].to_alignment()
+        self.assertEqual(
+            str(converted),
+            """\
+                  0 -TA 2
+                  0 GTA 3
+                  0 GCA 3
+                  0 G-A 2
+""",
+        )
+        self.assertEqual(
+            converted.sequences, [Seq("TA"), Seq("GTA"), Seq("GCA"), Seq("GA")]
+        )
+        with self.assertRaises(IndexError):
+            alignment[0, 0, 0]
+        converted = alignment[1:3, 2:2].to_alignment()
+        self.assertEqual(converted.shape, (2, 0))
+        self.assertTrue(np.array_equal(converted.coordinates, [[0], [0]]))
+        self.assertEqual(converted.sequences, [Seq(""), Seq("")])
+        converted = Align.ArrayAlignment([]).to_alignment()
+        self.assertEqual(converted.coordinates.shape, (0, 1))
+
+    def test_records(self):
+        records = [
+            SeqRecord(Seq("AC-GT"), id="seq1"),
+            SeqRecord(Seq("ACCGT"), id="seq2", annotations={"weight": 2.0}),
+        ]
+        alignment = Align.ArrayAlignment(records)
+        self.assertEqual(alignment[0], "AC-GT")
+        self.assertEqual(alignment.records[1].id, "seq2")
+        self.assertTrue(
+            np.array_equal(alignment.frequencies["C"], [0.0, 3.0, 2.0, 0.0, 0.0])
+        )
+        self.assertTrue(
+            np.allclose(alignment.gap_fraction, [0.0, 0.0, 1 / 3, 0.0, 0.0])
+        )
+        converted = alignment.to_alignment()
+        self.assertEqual(converted.sequences[0].id, "seq1")
+        self.assertEqual(converted.sequences[0].seq, "ACGT")
+        self.assertEqual(converted.sequences[1].annotations, {"weight": 2.0})
+        data = np.array([list(b"AC-"), list(b"-CA")], np.uint8)
+        alignment = Align.ArrayAlignment(data)
+        self.assertIs(alignment.data, data)
+        with self.assertRaises(ValueError):
+            Align.ArrayAlignment(["ACGT", "ACG"])
+        with self.assertRaises(ValueError):
+            Align.ArrayAlignment(data, records=[None])
+        with self.assertRaises(ValueError):
+            Align.ArrayAlignment(np.zeros((2, 3), int))
+
+    def test_weights(self):
+        alignment = Align.ArrayAlignment(["ACGT", "ACGT", "ACGA", "TGCA", "TGC-"])
+        self.assertIsNone(alignment.weights)
+        weights = alignment.sequence_weights()
+        self.assertAlmostEqual(weights.sum(), 5.0)
+        self.assertAlmostEqual(weights[0], weights[1])
+        self.assertLess(weights[3], weights[4])
+        alignment.weights = weights
+        frequencies = alignment.frequencies
+        self.assertAlmostEqual(frequencies["T"][0], weights[3] + weights[4])
+        self.assertAlmostEqual(frequencies["-"][3], weights[4])
+        self.assertAlmostEqual(alignment.gap_fraction[3], weights[4] / 5)
+        with self.assertRaises(ValueError):
+            alignment.weights = [1.0, 2.0]
+        motif = motifs.Motif("ACGT", alignment)
+        motif.pseudocounts = 0.5
+        self.assertAlmostEqual(motif.counts["A", 0], weights[:3].sum())
+        self.assertAlmostEqual(motif.pwm["A", 0], (weights[:3].sum() + 0.5) / 7.0)
+        self.assertEqual(motif.consensus[3], "A")
+        sub_alignment = alignment[1:, 1:3]
+        self.assertTrue(np.array_equal(sub_alignment.weights, weights[1:]))
+        sub_alignment = alignment[[0, 3], :]
+        self.assertTrue(np.array_equal(sub_alignment.weights, weights[[0, 3]]))
+        sub_motif = motif[1:3]
+        for letter in "ACGT":
+            self.assertTrue(
+                np.allclose(sub_motif.counts[letter], motif.counts[letter][1:3])
+            )
+
+    def test_reverse_complement(self):
+        alignment = Align.ArrayAlignment(["ACGT", "ACGT", "ACGA", "TGCA", "TGC-"])
+        alignment.weights = alignment.sequence_weights()
+        rc_alignment = alignment.reverse_complement()
+        self.assertEqual(
+            [rc_alignment[i] for i in range(5)],
+            ["ACGT", "ACGT", "TCGT", "TGCA", "-GCA"],
+        )
+        self.assertTrue(np.array_equal(rc_alignment.weights, alignment.weights))
+        self.assertEqual(rc_alignment.records, alignment.records)
+        motif = motifs.Motif("ACGT", alignment)
+        rc_motif = motif.reverse_complement()
+        for letter, complement in zip("ACGT", "TGCA"):
+            self.assertTrue(
+                np.allclose(rc_motif.counts[letter], motif.counts[complement][::-1])
+            )
+        alignment = Align.ArrayAlignment(["ACGU", "AGGA"])
+        motif = motifs.Motif("ACGU", alignment)
+        rc_motif = motif.reverse_complement()
+        self.assertEqual(rc_motif.alignment[0], "ACGU")
+        self.assertEqual(rc_motif.alignment[1], "UCCU")
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
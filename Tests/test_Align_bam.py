@@ -0,0 +1,250 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Tests for Align.bam module."""
+
+import os
+import random
+import tempfile
+import unittest
+from io import BytesIO
+
+from Bio import Align
+from Bio import StreamModeError
+from Bio.Align import Alignment
+from Bio.Align import bam
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+try:
+    import numpy as np
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Install numpy if you want to use Bio.Align.bam."
+    ) from None
+
+
+class TestAlign_compare_sam(unittest.TestCase):
+    """Compare the alignments in BAM files to those in the SAM files."""
+
+    def check_alignments(self, bam_alignments, sam_alignments):
+        self.assertEqual(len(bam_alignments.targets), len(sam_alignments.targets))
+        for bam_target, sam_target in zip(
+            bam_alignments.targets, sam_alignments.targets
+        ):
+            self.assertEqual(bam_target.id, sam_target.id)
+            self.assertEqual(len(bam_target), len(sam_target))
+        count = 0
+        for bam_alignment, sam_alignment in zip(bam_alignments, sam_alignments):
+            self.assertEqual(format(bam_alignment, "sam"), format(sam_alignment, "sam"))
+            count += 1
+        return count
+
+    def test_ex1_header(self):
+        sam_alignments = Align.parse("SamBam/ex1_header.sam", "sam")
+        bam_alignments = Align.parse("SamBam/ex1_header.bam", "bam")
+        self.assertEqual(bam_alignments.metadata, sam_alignments.metadata)
+        count = self.check_alignments(bam_alignments, sam_alignments)
+        self.assertEqual(count, 3270)
+
+    def test_ex1_refresh(self):
+        # same alignments as ex1_header.bam, but without the @HD header line
+        sam_alignments = Align.parse("SamBam/ex1_header.sam", "sam")
+        bam_alignments = Align.parse("SamBam/ex1_refresh.bam", "bam")
+        self.assertEqual(bam_alignments.metadata, {})
+        count = self.check_alignments(bam_alignments, sam_alignments)
+        self.assertEqual(count, 3270)
+
+    def test_bam2(self):
+        sam_alignments = Align.parse("SamBam/sam2.sam", "sam")
+        bam_alignments = Align.parse("SamBam/bam2.bam", "bam")
+        self.assertEqual(bam_alignments.metadata, sam_alignments.metadata)
+        count = self.check_alignments(bam_alignments, sam_alignments)
+        self.assertEqual(count, 200)
+
+    def test_stream(self):
+        with open("SamBam/bam2.bam", "rb") as stream:
+            alignments = Align.parse(stream, "bam")
+            self.assertEqual(len(list(alignments)), 200)
+        with open("SamBam/sam2.sam") as stream, self.assertRaises(StreamModeError):
+            Align.parse(stream, "bam")
+
+
+class TestAlign_write(unittest.TestCase):
+    def test_round_trip(self):
+        sam_alignments = list(Align.parse("SamBam/ex1_header.sam", "sam"))
+        stream = BytesIO()
+        alignments = Align.parse("SamBam/ex1_header.sam", "sam")
+        n = Align.write(alignments, stream, "bam")
+        self.assertEqual(n, 3270)
+        stream.seek(0)
+        alignments = Align.parse(stream, "bam")
+        for sam_alignment, bam_alignment in zip(sam_alignments, alignments):
+            self.assertEqual(format(sam_alignment, "sam"), format(bam_alignment, "sam"))
+
+    def test_tags(self):
+        target = SeqRecord(Seq("ACGTACGTACGTACGT"), id="chr1")
+        query = SeqRecord(Seq("CGTACG"), id="read1")
+        alignment = Alignment([target, query], np.array([[1, 7], [0, 6]]))
+        alignment.annotations = {
+            "NM": 0,
+            "XN": -70000,
+            "XF": 1.5,
+            "XZ": "some text",
+            "XH": b"\x1a\xe3\x01",
+            "XB": np.array([1, -2, 300], np.int16),
+            "XC": np.array([1, 2, 3], np.uint8),
+            "XD": np.array([0.5, 2.0], np.float32),
+        }
+        stream = BytesIO()
+        Align.write([alignment], stream, "bam", targets=[target])
+        stream.seek(0)
+        alignments = Align.parse(stream, "bam")
+        alignment = next(alignments)
+        annotations = alignment.annotations
+        self.assertEqual(annotations["NM"], 0)
+        self.assertEqual(annotations["XN"], -70000)
+        self.assertAlmostEqual(annotations["XF"], 1.5)
+        self.assertEqual(annotations["XZ"], "some text")
+        self.assertEqual(annotations["XH"], b"\x1a\xe3\x01")
+        self.assertEqual(annotations["XB"].dtype, np.int16)
+        self.assertEqual(annotations["XB"].tolist(), [1, -2, 300])
+        self.assertEqual(annotations["XC"].dtype, np.uint8)
+        self.assertEqual(annotations["XC"].tolist(), [1, 2, 3])
+        self.assertEqual(annotations["XD"].dtype, np.float32)
+        self.assertEqual(annotations["XD"].tolist(), [0.5, 2.0])
+        self.assertEqual(alignment.sequences[1].id, "read1")
+        self.assertEqual(alignment.sequences[1].seq, "CGTACG")
+        self.assertTrue(
+            np.array_equal(alignment.coordinates, np.array([[1, 7], [0, 6]]))
+        )
+
+    def test_missing_targets(self):
+        target = SeqRecord(Seq("ACGTACGT"), id="chr1")
+        query = SeqRecord(Seq("CGTA"), id="read1")
+        alignment = Alignment([target, query], np.array([[1, 5], [0, 4]]))
+        with self.assertRaises(ValueError):
+            Align.write([alignment], BytesIO(), "bam")
+
+    def test_unsorted(self):
+        alignments = Align.parse("SamBam/ex1_header.sam", "sam")
+        targets = alignments.targets
+        alignments = [
+            alignment for alignment in alignments if alignment.coordinates is not None
+        ]
+        alignments.reverse()
+        alignments = Align.Alignments(alignments)
+        alignments.targets = targets
+        with self.assertRaises(ValueError):
+            Align.write(alignments, BytesIO(), "bam", index=BytesIO())
+
+
+class TestAlign_search(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        alignments = Align.parse("SamBam/ex1_header.sam", "sam")
+        records = []
+        for alignment in alignments:
+            if alignment.coordinates is None:
+                continue
+            records.append(alignment)
+        records.sort(
+            key=lambda alignment: (alignment.target.id, alignment.coordinates[0, 0])
+        )
+        cls.alignments = Align.Alignments(records)
+        cls.alignments.metadata = {"HD": {"VN": "1.3", "SO": "coordinate"}}
+        cls.alignments.targets = Align.parse("SamBam/ex1_header.sam", "sam").targets
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        for filename in os.listdir(cls.directory):
+            os.remove(os.path.join(cls.directory, filename))
+        os.rmdir(cls.directory)
+
+    def check_search(self, alignments):
+        rng = random.Random(17)
+        for target in alignments.targets:
+            expected = [
+                alignment
+                for alignment in self.alignments
+                if alignment.target.id == target.id
+            ]
+            selected = list(alignments.search(target.id))
+            self.assertEqual(len(selected), len(expected))
+        for i in range(50):
+            target = rng.choice(alignments.targets)
+            start = rng.randrange(len(target))
+            end = start + rng.randrange(1, 200)
+            expected = [
+                format(alignment, "sam")
+                for alignment in self.alignments
+                if alignment.target.id == target.id
+                and alignment.coordinates[0, 0] < end
+                and alignment.coordinates[0, -1] > start
+            ]
+            selected = [
+                format(alignment, "sam")
+                for alignment in alignments.search(target.id, start, end)
+            ]
+            self.assertEqual(selected, expected)
+        with self.assertRaises(ValueError):
+            next(alignments.search("chrX"))
+
+    def test_search_bai(self):
+        path = os.path.join(self.directory, "sorted.bam")
+        Align.write(self.alignments, path, "bam", index=path + ".bai")
+        alignments = Align.parse(path, "bam")
+        self.assertEqual(alignments._bam_index, path + ".bai")
+        self.check_search(alignments)
+
+    def test_search_csi(self):
+        path = os.path.join(self.directory, "sorted_csi.bam")
+        Align.write(self.alignments, path, "bam", index=path + ".csi")
+        alignments = Align.parse(path, "bam")
+        self.assertEqual(alignments._bam_index, path + ".csi")
+        self.check_search(alignments)
+
+    def test_search_samtools_index(self):
+        # The index files follow the layout written by samtools (see readme.txt)
+        path = "SamBam/bam1_sorted.bam"
+        with open(path, "rb") as stream:
+            alignments = bam.AlignmentIterator(stream)
+            self.assertIsNone(alignments._bam_index)
+            regions = [(None, None), (136000, 136200), (136186, 137706)]
+            regions += [(137800, 137900), (0, 100000), (138000, 239940)]
+            expected = [
+                [format(a, "sam") for a in alignments.search("1", start, end)]
+                for start, end in regions
+            ]
+        self.assertEqual([len(selected) for selected in expected], [4, 2, 2, 2, 0, 0])
+        for extension, depth in (("bai", 5), ("csi", 2)):
+            alignments = bam.AlignmentIterator(path, index=f"{path}.{extension}")
+            selected = [
+                [format(a, "sam") for a in alignments.search("1", start, end)]
+                for start, end in regions
+            ]
+            self.assertEqual(selected, expected)
+            index = alignments._bam_index
+            self.assertEqual(index.min_shift, 14)
+            self.assertEqual(index.depth, depth)
+            self.assertEqual(index.unplaced, 196)
+            bins, intervals = index.references[0]
+            offset, chunks = bins[index.pseudo_bin]
+            self.assertEqual(chunks[1], (3, 1))  # mapped and unmapped reads
+
+    def test_search_without_index(self):
+        stream = BytesIO()
+        Align.write(self.alignments, stream, "bam")
+        stream.seek(0)
+        alignments = Align.parse(stream, "bam")
+        self.assertIsNone(alignments._bam_index)
+        self.check_search(alignments)
+        self.assertEqual(len(list(alignments.search())), len(self.alignments))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
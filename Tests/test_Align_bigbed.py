@@ -6935,6 +6935,34 @@ AlignmentCounts object with
             alignments = Align.parse(output, "bigbed")
             self.check_alignments(alignments)
 
+    def test_writing_streaming(self):
+        """Test writing bigbed_extended.bb from an iterator, using threads."""
+        byteorder = sys.byteorder  # "little" or "big"
+        path = f"Blat/bigbed_extended.{byteorder}endian.bb"
+        with open(path, "rb") as stream:
+            correct = stream.read()
+        alignments = Align.parse(path, "bigbed")
+        targets = alignments.targets
+        # a generator can be read only once:
+        alignments = (alignment for alignment in alignments)
+        with open("Blat/bedExample2.as") as stream:
+            autosql_data = stream.read()
+        declaration = bigbed.AutoSQLTable.from_string(autosql_data)
+        with tempfile.TemporaryFile() as output:
+            Align.write(
+                alignments,
+                output,
+                "bigbed",
+                bedN=9,
+                declaration=declaration,
+                targets=targets,
+                extraIndex=["name", "geneSymbol"],
+                streaming=True,
+                threads=2,
+            )
+            output.seek(0)
+            self.assertEqual(output.read(), correct)
+
 
 class TestAlign_searching(unittest.TestCase):
     path = "Blat/bigbedtest.bb"
@@ -7483,6 +7511,28 @@ AlignmentCounts object with
             alignments = Align.parse(output, "bigbed")
             self.check_alignments(alignments)
 
+    def test_writing_small_blocks(self):
+        """Test writing bigbedtest.bb with an R tree of several levels."""
+        alignments = Align.parse(self.path, "bigbed")
+        for streaming in (False, True):
+            with tempfile.TemporaryFile() as output:
+                Align.write(
+                    alignments,
+                    output,
+                    "bigbed",
+                    bedN=6,
+                    itemsPerSlot=1,
+                    blockSize=2,
+                    streaming=streaming,
+                    threads=2,
+                )
+                output.seek(0)
+                written_alignments = Align.parse(output, "bigbed")
+                self.check_alignments(written_alignments)
+                selected_alignments = written_alignments.search("chr2", 105, 1000)
+                names = [alignment.query.id for alignment in selected_alignments]
+                self.assertEqual(names, ["name5", "name6", "name7"])
+
     def test_search_chromosome(self):
         alignments = Align.parse(self.path, "bigbed")
         self.assertEqual(
@@ -7571,6 +7621,81 @@ table bed
         self.assertEqual(alignment1.query.id, "name8")
         self.assertRaises(StopIteration, next, alignments1)
 
+    def test_search_all(self):
+        alignments = Align.parse(self.path, "bigbed")
+        selected_alignments = alignments.search()
+        names = [alignment.query.id for alignment in selected_alignments]
+        self.assertEqual(
+            names,
+            ["name1", "name2", "name3", "name4", "name5", "name6", "name7", "name8"],
+        )
+
+    def test_search_many(self):
+        regions = [
+            ("chr2", 105, 1000),
+            ("chr2", 110, 1000),
+            ("chr2", 40, 50),
+            ("chr2", 50, 50),
+            ("chr2", 50, 200),
+            ("chr2", 200, 220),
+            ("chr2", 220, 220),
+            ("chr1", 250, None),
+            ("chr3", None, None),
+        ]
+        expected = [
+            ["name5", "name6", "name7"],
+            ["name6", "name7"],
+            ["name4"],
+            ["name4"],
+            ["name4", "name5"],
+            ["name6", "name7"],
+            ["name7"],
+            ["name3"],
+            ["name8"],
+        ]
+        for cache_size in (0, 1, 256):
+            alignments = Align.parse(self.path, "bigbed")
+            alignments.cache_size = cache_size
+            selected_alignments = alignments.search_many(regions)
+            names = [
+                [alignment.query.id for alignment in region_alignments]
+                for region_alignments in selected_alignments
+            ]
+            self.assertEqual(names, expected)
+            # Searching again should give the same result with cached blocks:
+            for region, region_names in zip(regions, expected):
+                selected_alignments = alignments.search(*region)
+                names = [alignment.query.id for alignment in selected_alignments]
+                self.assertEqual(names, region_names)
+            self.assertLessEqual(len(alignments._cache), cache_size)
+
+    def test_summary(self):
+        alignments = Align.parse(self.path, "bigbed")
+        # single bin covering chr1, calculated from the zoom level:
+        summary = alignments.summary("chr1")
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary["start"][0], 0)
+        self.assertEqual(summary["end"][0], 1000)
+        self.assertEqual(summary["validCount"][0], 190)
+        self.assertAlmostEqual(summary["minVal"][0], 1)
+        self.assertAlmostEqual(summary["maxVal"][0], 2)
+        self.assertAlmostEqual(summary["sumData"][0], 200)
+        self.assertAlmostEqual(summary["sumSquares"][0], 220)
+        # small bins, calculated from the alignments:
+        summary = alignments.summary("chr1", 0, 400, bins=4)
+        self.assertEqual(summary["start"].tolist(), [0, 100, 200, 300])
+        self.assertEqual(summary["end"].tolist(), [100, 200, 300, 400])
+        self.assertEqual(summary["validCount"].tolist(), [90, 0, 100, 0])
+        self.assertEqual(summary["maxVal"][0], 2)
+        self.assertTrue(np.isnan(summary["maxVal"][1]))
+        self.assertEqual(summary["sumData"].tolist(), [100, 0, 100, 0])
+        summary = alignments.summary("chr2")
+        self.assertEqual(summary["validCount"].tolist(), [20])
+        summary = alignments.summary("chr3", bins=2)
+        self.assertEqual(summary["validCount"].tolist(), [0, 0])
+        self.assertRaises(ValueError, alignments.summary, "chr4")
+        self.assertRaises(ValueError, alignments.summary, "chr1", bins=0)
+
 
 class BinaryTestBaseClass(unittest.TestCase):
     def assertBinaryEqual(self, file1, file2):
@@ -10,6 +10,7 @@ from io import StringIO
 import numpy as np
 
 from Bio import Align
+from Bio.Align.maf import MafIndex
 
 
 class TestAlign_declaration(unittest.TestCase):
@@ -12889,6 +12890,24 @@ ornAna1.c  40046122 -------------  40046122
         )
         self.assertRaises(StopIteration, next, selected_alignments)
 
+    def test_spliced(self):
+        alignments = Align.parse("MAF/ucsc_mm9_chr10.bb", "bigmaf")
+        with MafIndex(None, "MAF/ucsc_mm9_chr10.maf", "mm9") as index:
+            for starts, ends in (
+                ([3014644, 3014689], [3014689, 3014742]),
+                ([3009310, 3018000], [3009330, 3020000]),
+            ):
+                for strand in ("+", "-"):
+                    alignment = alignments.get_spliced(
+                        "mm9.chr10", starts, ends, strand
+                    )
+                    expected = index.get_spliced("mm9.chr10", starts, ends, strand)
+                    self.assertEqual(
+                        [record.id for record in alignment.sequences],
+                        [record.id for record in expected.sequences],
+                    )
+                    self.assertEqual(str(alignment), str(expected))
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
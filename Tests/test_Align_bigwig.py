@@ -0,0 +1,247 @@
+# Copyright 2026 by the Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Tests for Align.bigwig module."""
+import tempfile
+import unittest
+from io import BytesIO
+
+try:
+    import numpy as np
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Install numpy if you want to use Bio.Align.bigwig."
+    ) from None
+
+from Bio.Align.bigwig import BigWigReader
+from Bio.Align.bigwig import BigWigWriter
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+
+class TestReader(unittest.TestCase):
+    # signal.bw was created by libBigWig (through pyBigWig) and contains
+    # bedGraph, fixedStep, and varStep sections:
+    # - chr1: the intervals in signal.bedGraph;
+    # - chr2: values 1, 2, 3, 4, 5 at 10, 20, 30, 40, 50 with span 5
+    #         (fixedStep), and values 7, 8, 9 at 200, 300, 310 with span 10
+    #         (varStep);
+    # - chr3: no data.
+
+    path = "Blat/signal.bw"
+
+    def test_targets(self):
+        with BigWigReader(self.path) as reader:
+            self.assertEqual(
+                [target.id for target in reader.targets], ["chr1", "chr2", "chr3"]
+            )
+            self.assertEqual(
+                [len(target) for target in reader.targets], [1000, 800, 500]
+            )
+
+    def test_intervals(self):
+        with BigWigReader(self.path) as reader:
+            intervals = reader.intervals("chr1")
+            self.assertEqual(
+                intervals.tolist(),
+                [(0, 100, 1.0), (100, 150, 2.5), (300, 400, -1.0), (990, 1000, 4.0)],
+            )
+            intervals = reader.intervals("chr2", 22, 205)
+            self.assertEqual(
+                intervals.tolist(),
+                [
+                    (20, 25, 2.0),
+                    (30, 35, 3.0),
+                    (40, 45, 4.0),
+                    (50, 55, 5.0),
+                    (200, 210, 7.0),
+                ],
+            )
+            self.assertEqual(len(reader.intervals("chr3")), 0)
+            self.assertRaises(ValueError, reader.intervals, "chr4")
+            self.assertRaises(ValueError, reader.intervals, None)
+
+    def test_values(self):
+        with BigWigReader(self.path) as reader:
+            values = reader.values("chr1", 95, 105)
+            self.assertEqual(values.dtype, np.float32)
+            self.assertEqual(values.tolist(), [1.0] * 5 + [2.5] * 5)
+            values = reader.values("chr2", 8, 22)
+            self.assertTrue(np.isnan(values[:2]).all())
+            self.assertEqual(values[2:7].tolist(), [1.0] * 5)
+            self.assertTrue(np.isnan(values[7:12]).all())
+            self.assertEqual(values[12:].tolist(), [2.0, 2.0])
+            values = reader.values("chr2", 305)
+            self.assertEqual(values.tolist(), [8.0])
+            values = reader.values("chr1")
+            self.assertEqual(len(values), 1000)
+            self.assertEqual(np.count_nonzero(~np.isnan(values)), 260)
+            self.assertTrue(np.isnan(reader.values("chr3")).all())
+
+    def test_stats(self):
+        # compare to pyBigWig's stats method:
+        with BigWigReader(self.path) as reader:
+            for exact in (False, True):
+                self.assertEqual(
+                    reader.stats("chr1", 0, 1000, bins=4, exact=exact)[
+                        [0, 1, 3]
+                    ].tolist(),
+                    [1.5, -1.0, 4.0],
+                )
+            self.assertTrue(np.isnan(reader.stats("chr1", 0, 1000, bins=4)[2]))
+            self.assertEqual(reader.stats("chr2", 0, 800, "max", bins=2)[0], 9.0)
+            self.assertEqual(
+                reader.stats("chr2", 0, 800, "coverage", bins=2).tolist(),
+                [0.1375, 0.0],
+            )
+            self.assertAlmostEqual(
+                reader.stats("chr2", statistic="std", exact=True)[0], 2.7585191
+            )
+            self.assertEqual(reader.stats("chr2", statistic="min")[0], 1.0)
+            self.assertRaises(ValueError, reader.stats, "chr2", statistic="median")
+
+    def test_summary(self):
+        with BigWigReader(self.path) as reader:
+            summary = reader.summary("chr1")
+            self.assertEqual(summary["start"].tolist(), [0])
+            self.assertEqual(summary["end"].tolist(), [1000])
+            self.assertEqual(summary["validCount"].tolist(), [260])
+            self.assertEqual(summary["minVal"].tolist(), [-1.0])
+            self.assertEqual(summary["maxVal"].tolist(), [4.0])
+            self.assertEqual(summary["sumData"].tolist(), [165.0])
+            self.assertEqual(summary["sumSquares"].tolist(), [672.5])
+            summary = reader.summary("chr3", bins=2)
+            self.assertEqual(summary["validCount"].tolist(), [0, 0])
+            self.assertRaises(ValueError, reader.summary, "chr1", bins=0)
+
+    def test_not_bigwig(self):
+        self.assertRaises(ValueError, BigWigReader, "Blat/bigbedtest.bb")
+
+
+class TestWriter(unittest.TestCase):
+    chromosomes = {"chr1": 1000, "chr2": 800, "chr3": 500}
+
+    def test_bedgraph(self):
+        stream = BytesIO()
+        with BigWigWriter(stream, self.chromosomes) as writer:
+            writer.add_bedgraph("Blat/signal.bedGraph")
+        reader = BigWigReader(stream)
+        with BigWigReader("Blat/signal.bw") as expected:
+            self.assertEqual(
+                reader.intervals("chr1").tolist(), expected.intervals("chr1").tolist()
+            )
+        self.assertEqual(len(reader.intervals("chr2")), 0)
+        summary = reader.summary("chr1", bins=1)
+        self.assertEqual(summary["validCount"].tolist(), [260])
+        self.assertEqual(summary["sumData"].tolist(), [165.0])
+        # a bedGraph file opened in text mode:
+        stream = BytesIO()
+        with open("Blat/signal.bedGraph") as source:
+            with BigWigWriter(stream, self.chromosomes) as writer:
+                writer.add_bedgraph(source)
+        self.assertEqual(
+            BigWigReader(stream).values("chr1").tobytes(),
+            reader.values("chr1").tobytes(),
+        )
+
+    def test_values(self):
+        targets = [SeqRecord(Seq(None, length=1000), id="chr1")]
+        with tempfile.TemporaryFile() as stream:
+            with BigWigWriter(stream, targets, compress=False) as writer:
+                writer.add_values(
+                    "chr1", [1.0, 2.0, np.nan, 3.0], start=10, step=10, span=5
+                )
+                writer.add_values("chr1", np.arange(100), start=200)
+            with BigWigReader(stream) as reader:
+                self.assertEqual(
+                    reader.intervals("chr1", 0, 201).tolist(),
+                    [(10, 15, 1.0), (20, 25, 2.0), (40, 45, 3.0), (200, 201, 0.0)],
+                )
+                self.assertEqual(
+                    reader.values("chr1", 200, 300).tolist(), list(range(100))
+                )
+                self.assertEqual(reader.stats("chr1", 200, 300)[0], 49.5)
+
+    def test_zoom_levels(self):
+        rng = np.random.default_rng(seed=1)
+        chromosomes = {"chr1": 3000000, "chr2": 2000000}
+        starts = np.sort(rng.choice(3000000 // 4, 100000, replace=False)) * 4
+        ends = starts + rng.integers(1, 5, len(starts))
+        values = rng.normal(size=len(starts))
+        data = rng.random(2000000 // 10)
+        data[rng.random(len(data)) < 0.2] = np.nan
+        stream = BytesIO()
+        with BigWigWriter(stream, chromosomes, itemsPerSlot=256) as writer:
+            writer.add_intervals("chr1", starts, ends, values)
+            writer.add_values("chr2", data, step=10)
+        reader = BigWigReader(stream)
+        self.assertGreater(len(reader._zoomList), 1)
+        reductions = [zoomLevel.reductionLevel for zoomLevel in reader._zoomList]
+        self.assertEqual(reductions, sorted(reductions))
+        mask = ~np.isnan(data)
+        for chromosome, validCount, sumData in (
+            (
+                "chr1",
+                (ends - starts).sum(),
+                (values.astype(np.float32) * (ends - starts)).sum(),
+            ),
+            ("chr2", 10 * mask.sum(), 10 * data[mask].astype(np.float32).sum()),
+        ):
+            zoomed = reader.summary(chromosome, bins=100)
+            exact = reader.summary(chromosome, bins=100, exact=True)
+            self.assertEqual(exact["validCount"].sum(), validCount)
+            self.assertAlmostEqual(exact["sumData"].sum(), sumData, places=2)
+            # The zoom levels assign the summary of a region proportionally to
+            # the bins it overlaps.
+            self.assertAlmostEqual(
+                zoomed["validCount"].sum() / validCount, 1.0, places=3
+            )
+            self.assertTrue(
+                np.allclose(zoomed["validCount"], exact["validCount"], rtol=0.05)
+            )
+            self.assertTrue(np.all(zoomed["minVal"] <= exact["minVal"]))
+            self.assertTrue(np.all(zoomed["maxVal"] >= exact["maxVal"]))
+        values = reader.values("chr2", 0, 2000000)
+        self.assertTrue(
+            np.array_equal(values[::10], data.astype(np.float32), equal_nan=True)
+        )
+
+    def test_empty(self):
+        stream = BytesIO()
+        with BigWigWriter(stream, self.chromosomes):
+            pass
+        reader = BigWigReader(stream)
+        self.assertEqual(len(reader.targets), 3)
+        self.assertEqual(len(reader._zoomList), 0)
+        self.assertTrue(np.isnan(reader.values("chr1", 0, 10)).all())
+        self.assertEqual(reader.summary("chr1")["validCount"].tolist(), [0])
+
+    def test_errors(self):
+        writer = BigWigWriter(BytesIO(), self.chromosomes)
+        self.assertRaises(ValueError, writer.add_intervals, "chr4", [0], [10], [1])
+        self.assertRaises(ValueError, writer.add_intervals, "chr1", [0], [0], [1])
+        self.assertRaises(ValueError, writer.add_intervals, "chr1", [990], [1010], [1])
+        self.assertRaises(
+            ValueError, writer.add_intervals, "chr1", [0, 5], [10, 20], [1, 2]
+        )
+        self.assertRaises(
+            ValueError, writer.add_values, "chr1", [1, 2], step=5, span=10
+        )
+        # a rejected call leaves the writer unchanged:
+        self.assertRaises(ValueError, writer.add_intervals, "chr2", [790], [810], [1])
+        writer.add_intervals("chr1", [0], [10], [1])
+        writer.add_intervals("chr2", [100], [200], [1])
+        # overlapping the previous data:
+        self.assertRaises(ValueError, writer.add_values, "chr2", [1, 2], start=150)
+        # chromosomes not in sorted order:
+        self.assertRaises(ValueError, writer.add_intervals, "chr1", [0], [10], [1])
+        writer.add_values("chr2", [1, 2], start=200)
+        writer.close()
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
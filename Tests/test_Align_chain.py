@@ -3,6 +3,7 @@
 # license.  Please see the LICENSE file that should have been included
 # as part of this package.
 """Tests for Align.chain module."""
+
 import unittest
 from io import StringIO
 from tempfile import NamedTemporaryFile
@@ -26,6 +27,8 @@ except ImportError:
         "Install numpy if you want to use Bio.Align.chain."
     ) from None
 
+from Bio.Align.chain import LiftOver  # noqa: E402
+
 
 class TestAlign_dna_rna(unittest.TestCase):
     # The chain file dna_rna.chain was generated from the PSL file using:
@@ -7276,6 +7279,114 @@ query             0 --TTC-GCTAGC-TG--- 11
         self.assertEqual(format(alignment, "chain"), chain4)
 
 
+class TestLiftOver(unittest.TestCase):
+    def setUp(self):
+        source = SeqRecord(Seq(None, length=1000), id="chrA")
+        # chain on the forward strand, with a gap in the source and a gap in
+        # the destination sequence
+        coordinates = np.array(
+            [[100, 200, 210, 300, 300, 400], [0, 100, 100, 190, 200, 300]]
+        )
+        destination = SeqRecord(Seq(None, length=500), id="chrX")
+        chain1 = Alignment([source, destination], coordinates)
+        chain1.score = 1000
+        # chain on the reverse strand
+        coordinates = np.array([[500, 600, 650, 700], [800, 700, 700, 650]])
+        destination = SeqRecord(Seq(None, length=800), id="chrY")
+        chain2 = Alignment([source, destination], coordinates)
+        chain2.score = 500
+        # lower-scoring chain overlapping the first chain
+        coordinates = np.array([[350, 450], [0, 100]])
+        destination = SeqRecord(Seq(None, length=100), id="chrZ")
+        chain3 = Alignment([source, destination], coordinates)
+        chain3.score = 100
+        self.chains = [chain1, chain2, chain3]
+        self.liftover = LiftOver(self.chains)
+
+    def test_map_positions(self):
+        chromosomes, positions, strands = self.liftover.map_positions(
+            ["chrA", "chrA", "chrA", "chrA", "chrA", "chrA", "chrB"],
+            [100, 205, 299, 300, 399, 500, 100],
+        )
+        self.assertEqual(
+            chromosomes.tolist(), ["chrX", "", "chrX", "chrX", "chrX", "chrY", ""]
+        )
+        self.assertEqual(positions.tolist(), [0, -1, 189, 200, 299, 799, -1])
+        self.assertEqual(strands.tolist(), ["+", "", "+", "+", "+", "-", ""])
+        chromosomes, positions, strands = self.liftover.map_positions(
+            "chrA", [420, 449, 450, 699]
+        )
+        self.assertEqual(chromosomes.tolist(), ["chrZ", "chrZ", "", "chrY"])
+        self.assertEqual(positions.tolist(), [70, 99, -1, 650])
+        self.assertEqual(strands.tolist(), ["+", "+", "", "-"])
+
+    def test_map_intervals(self):
+        pieces = self.liftover.map_intervals(
+            "chrA", [150, 600, 380, 800], [350, 660, 390, 900]
+        )
+        self.assertEqual(pieces["index"].tolist(), [0, 0, 0, 1, 2, 2])
+        self.assertEqual(
+            pieces["source_start"].tolist(), [150, 210, 300, 650, 380, 380]
+        )
+        self.assertEqual(pieces["source_end"].tolist(), [200, 300, 350, 660, 390, 390])
+        self.assertEqual(
+            pieces["chromosome"].tolist(),
+            ["chrX", "chrX", "chrX", "chrY", "chrX", "chrZ"],
+        )
+        self.assertEqual(pieces["start"].tolist(), [50, 100, 200, 690, 280, 30])
+        self.assertEqual(pieces["end"].tolist(), [100, 190, 250, 700, 290, 40])
+        self.assertEqual(pieces["strand"].tolist(), ["+", "+", "+", "-", "+", "+"])
+        self.assertEqual(pieces["chain"].tolist(), [0, 0, 0, 1, 0, 2])
+        counts = np.bincount(pieces["index"], minlength=4)
+        self.assertEqual(counts.tolist(), [3, 1, 2, 0])
+        # intervals on a chromosome without chains are unmapped
+        pieces = self.liftover.map_intervals(
+            ["chrB", "chrA", "chrB"], [100, 380, 300], [200, 390, 400]
+        )
+        self.assertEqual(pieces["index"].tolist(), [1, 1])
+        self.assertEqual(pieces["chromosome"].tolist(), ["chrX", "chrZ"])
+        self.assertEqual(pieces["start"].tolist(), [280, 30])
+        pieces = self.liftover.map_intervals(["chrUnknown"], [1], [2])
+        self.assertEqual(len(pieces["index"]), 0)
+        self.assertEqual(len(pieces["chromosome"]), 0)
+
+    def test_lift(self):
+        query = SeqRecord(Seq(None, length=50), id="read")
+        target = self.chains[0].target
+        alignments = [
+            Alignment(
+                [target, query], np.array([[180, 200, 210, 240], [0, 20, 20, 50]])
+            ),
+            Alignment(
+                [target, query], np.array([[580, 600, 650, 680], [0, 20, 20, 50]])
+            ),
+            Alignment([target, query], np.array([[900, 950], [0, 50]])),
+        ]
+        unmapped = []
+        lifted = list(self.liftover.lift(alignments, unmapped))
+        self.assertEqual(len(lifted), 2)
+        self.assertEqual(lifted[0].target.id, "chrX")
+        self.assertEqual(lifted[0].query.id, "read")
+        self.assertTrue(
+            np.array_equal(lifted[0].coordinates, [[80, 100, 130], [0, 20, 50]])
+        )
+        self.assertEqual(lifted[1].target.id, "chrY")
+        self.assertTrue(
+            np.array_equal(lifted[1].coordinates, [[670, 700, 720], [50, 20, 0]])
+        )
+        self.assertEqual(unmapped, [alignments[2]])
+
+    def test_lift_file(self):
+        liftover = LiftOver("Blat/panTro5ToPanTro6.over.chain")
+        self.assertEqual(len(liftover), 1)
+        chain = Align.read("Blat/panTro5ToPanTro6.over.chain", "chain")
+        transcript = Align.read("Blat/est.panTro5.psl", "psl")
+        (lifted,) = liftover.lift([transcript])
+        self.assertTrue(
+            np.array_equal(lifted.coordinates, chain[::-1].map(transcript).coordinates)
+        )
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
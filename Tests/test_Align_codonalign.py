@@ -8381,6 +8381,56 @@ gi|6478867|gb|M37394.2|RATEGFR      AGAGTACCTGCGGGTGGCACCGCCAAGCAGTGAGTTTAGTGGAG
             ds_list.extend(i)
         for ds_cal, ds_corr in zip(ds_list, ds_correct):
             self.assertAlmostEqual(ds_cal, ds_corr, places=4)
+        # The matrix is calculated for all pairs at once for NG86 and LWL85:
+        self.check_dn_ds_matrix(alignment, "NG86")
+        self.check_dn_ds_matrix(alignment, "LWL85")
+        # ML and YN00 can use multiple processes:
+        alignment = alignment[:3]
+        dn1, ds1 = calculate_dn_ds_matrix(alignment, method="ML")
+        dn2, ds2 = calculate_dn_ds_matrix(alignment, method="ML", processes=2)
+        self.assertEqual(dn1.matrix, dn2.matrix)
+        self.assertEqual(ds1.matrix, ds2.matrix)
+        self.assertAlmostEqual(dn1[1, 0], 0.0194, places=4)
+        self.assertAlmostEqual(ds1[1, 0], 0.0217, places=4)
+
+    def get_pairwise_alignment(self, alignment, i, j):
+        sequences = [alignment.sequences[i], alignment.sequences[j]]
+        coordinates = alignment.coordinates[(i, j), :]
+        return Alignment(sequences, coordinates)
+
+    def check_dn_ds_matrix(self, alignment, method, **kwargs):
+        """Compare calculate_dn_ds_matrix to calculate_dn_ds for each pair."""
+        dn, ds = calculate_dn_ds_matrix(alignment, method=method, **kwargs)
+        n = len(alignment.sequences)
+        for i in range(n):
+            for j in range(i):
+                pairwise_alignment = self.get_pairwise_alignment(alignment, i, j)
+                dN, dS = calculate_dn_ds(pairwise_alignment, method=method)
+                self.assertAlmostEqual(dn[i, j], dN, places=10)
+                self.assertAlmostEqual(ds[i, j], dS, places=10)
+
+    def test_dn_ds_matrix(self):
+        lines = [
+            b"ATGGCTAAACCCGGGTTTCTAGAAACACGTTGGCAAGATCTGAAACGCTCA",
+            b"ATGGCCAAACCCGGGTTCCTAGAAACTCGTTGGCAAGACCTGAAACGCTCA",
+            b"ATGGCTAAA---GGATTTCTAGAAACACGTTGGCAGGATCTGAAGCGCTCA",
+            b"ATGGCAAAACCCGGCTTTCTAGAT------TGGCAAGATCTGAAACGATCT",
+        ]
+        sequences, coordinates = Alignment.parse_printed_alignment(lines)
+        records = [
+            SeqRecord(Seq(sequence), id=f"seq{i}")
+            for i, sequence in enumerate(sequences)
+        ]
+        alignment = Alignment(records, coordinates)
+        self.check_dn_ds_matrix(alignment, "NG86")
+        # gaps shared by all sequences, but not aligned to the codons:
+        lines = [line[:4] + b"---" + line[4:] for line in lines]
+        sequences, coordinates = Alignment.parse_printed_alignment(lines)
+        for record, sequence in zip(records, sequences):
+            record.seq = Seq(sequence)
+        alignment = Alignment(records, coordinates)
+        self.check_dn_ds_matrix(alignment, "NG86")
+        self.assertRaises(ValueError, calculate_dn_ds_matrix, alignment, processes=0)
 
 
 class Test_MK(unittest.TestCase):
@@ -0,0 +1,194 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Unit tests for the Bio.Align.index(...) and index_db() functions."""
+
+try:
+    import sqlite3
+except ImportError:
+    # Try to run what tests we can in case sqlite3 was not installed
+    sqlite3 = None
+
+import glob
+import os
+import tempfile
+import unittest
+
+from Bio import Align
+from Bio import bgzf
+
+
+class IndexTestBaseClass(unittest.TestCase):
+    """Compare the alignments in an index to those found by Align.parse."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def concatenate(self, filenames, compress=False):
+        """Concatenate the files into a temporary file, and return its name."""
+        filename = os.path.join(self.tmpdir.name, "alignments")
+        if compress:
+            filename += ".bgz"
+            opener = bgzf.open
+        else:
+            opener = open
+        with opener(filename, "wb") as stream:
+            for name in filenames:
+                with open(name, "rb") as source:
+                    stream.write(source.read())
+        return filename
+
+    def check_index(self, alignments, filenames, fmt, get_id):
+        keys = []
+        for filename in filenames:
+            for alignment in Align.parse(filename, fmt):
+                key = get_id(alignment)
+                keys.append(key)
+                self.assertIn(key, alignments)
+                self.assertEqual(format(alignments[key], fmt), format(alignment, fmt))
+                # check the cached alignment:
+                self.assertEqual(format(alignments[key], fmt), format(alignment, fmt))
+        self.assertEqual(len(alignments), len(keys))
+        self.assertEqual(list(alignments), keys)
+
+
+class TestStockholm(IndexTestBaseClass):
+    filenames = sorted(glob.glob("Stockholm/pfam*.seed.txt"))
+
+    @staticmethod
+    def get_id(alignment):
+        return alignment.annotations["identifier"]
+
+    def test_index(self):
+        filename = self.concatenate(self.filenames)
+        alignments = Align.index(filename, "stockholm")
+        self.assertEqual(
+            repr(alignments),
+            f"Align.index({filename!r}, 'stockholm', key_function=None)",
+        )
+        self.check_index(alignments, self.filenames, "stockholm", self.get_id)
+        raw = alignments.get_raw("7kD_DNA_binding")
+        with open("Stockholm/pfam2.seed.txt", "rb") as stream:
+            self.assertEqual(raw, stream.read())
+        alignments.close()
+
+    def test_bgzf(self):
+        filename = self.concatenate(self.filenames, compress=True)
+        alignments = Align.index(filename, "stockholm")
+        self.check_index(alignments, self.filenames, "stockholm", self.get_id)
+        alignments.close()
+
+    def test_key_function(self):
+        filename = self.concatenate(self.filenames)
+        alignments = Align.index(filename, "stockholm", key_function=str.lower)
+        self.assertIn("7kd_dna_binding", alignments)
+        self.assertNotIn("7kD_DNA_binding", alignments)
+        alignment = alignments["7kd_dna_binding"]
+        self.assertEqual(alignment.annotations["identifier"], "7kD_DNA_binding")
+        alignments.close()
+
+    def test_duplicates(self):
+        filename = self.concatenate(["Stockholm/pfam2.seed.txt"] * 2)
+        with self.assertRaises(ValueError) as cm:
+            Align.index(filename, "stockholm")
+        self.assertEqual(str(cm.exception), "Duplicate key '7kD_DNA_binding'")
+
+    @unittest.skipIf(sqlite3 is None, "sqlite3 is not available")
+    def test_index_db(self):
+        index_filename = os.path.join(self.tmpdir.name, "stockholm.idx")
+        alignments = Align.index_db(index_filename, self.filenames, "stockholm")
+        self.check_index(alignments, self.filenames, "stockholm", self.get_id)
+        alignments.close()
+        alignments._con.close()
+        # Reuse the index, without indexing the files again:
+        alignments = Align.index_db(index_filename)
+        self.check_index(alignments, self.filenames, "stockholm", self.get_id)
+        alignments.close()
+        alignments._con.close()
+
+
+class TestMAF(IndexTestBaseClass):
+    filenames = ("MAF/ucsc_mm9_chr10.maf",)
+
+    @staticmethod
+    def get_id(alignment):
+        start, end = sorted(alignment.coordinates[0, [0, -1]])
+        return f"{alignment.sequences[0].id}:{start}-{end}"
+
+    def test_index(self):
+        alignments = Align.index("MAF/ucsc_mm9_chr10.maf", "maf")
+        self.check_index(alignments, self.filenames, "maf", self.get_id)
+        self.assertEqual(
+            alignments.get_raw("mm9.chr10:3009319-3009481").split(b"\n", 1)[0],
+            b"a score=6441.000000",
+        )
+        alignments.close()
+
+    def test_bgzf(self):
+        filename = self.concatenate(self.filenames, compress=True)
+        alignments = Align.index(filename, "MAF")
+        self.check_index(alignments, self.filenames, "maf", self.get_id)
+        alignments.close()
+
+    @unittest.skipIf(sqlite3 is None, "sqlite3 is not available")
+    def test_index_db(self):
+        alignments = Align.index_db(":memory:", self.filenames[0], "maf")
+        self.check_index(alignments, self.filenames, "maf", self.get_id)
+        alignments.close()
+
+
+class TestPSL(IndexTestBaseClass):
+    filenames = sorted(glob.glob("Blat/psl_*.psl") + glob.glob("Blat/pslx_*.pslx"))
+
+    @staticmethod
+    def get_id(alignment):
+        start, end = sorted(alignment.coordinates[0, [0, -1]])
+        return f"{alignment.query.id}:{alignment.target.id}:{start}-{end}"
+
+    def test_index(self):
+        for filename in self.filenames:
+            with self.subTest(filename=filename):
+                alignments = Align.index(filename, "psl")
+                self.check_index(alignments, [filename], "psl", self.get_id)
+                alignments.close()
+
+    @unittest.skipIf(sqlite3 is None, "sqlite3 is not available")
+    def test_index_db(self):
+        filenames = ["Blat/psl_34_001.psl", "Blat/psl_35_001.psl"]
+        alignments = Align.index_db(":memory:", filenames, "psl")
+        self.check_index(alignments, filenames, "psl", self.get_id)
+        alignments.close()
+
+
+class TestChain(IndexTestBaseClass):
+    filenames = ("Blat/psl_34_001.chain",)
+
+    @staticmethod
+    def get_id(alignment):
+        return alignment.annotations["id"]
+
+    def test_index(self):
+        alignments = Align.index(self.filenames[0], "chain")
+        self.check_index(alignments, self.filenames, "chain", self.get_id)
+        alignments.close()
+
+
+class TestErrors(unittest.TestCase):
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError) as cm:
+            Align.index("Clustalw/opuntia.aln", "clustal")
+        self.assertEqual(
+            str(cm.exception), "Indexing is not supported for the clustal format"
+        )
+
+    def test_handle(self):
+        with open("Blat/psl_34_001.psl", "rb") as stream:
+            self.assertRaises(TypeError, Align.index, stream, "psl")
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -3,11 +3,15 @@
 # license.  Please see the LICENSE file that should have been included
 # as part of this package.
 """Tests for Align.maf module."""
+import os
 import unittest
 from io import StringIO
 from tempfile import NamedTemporaryFile
+from tempfile import TemporaryDirectory
 
 from Bio import Align
+from Bio import bgzf
+from Bio.Align.maf import MafIndex
 
 try:
     import numpy as np
@@ -14133,6 +14137,140 @@ class TestAlign_writing(unittest.TestCase):
                 self.assertEqual(words1, words2)
 
 
+class TestAlign_index(unittest.TestCase):
+    path = "MAF/ucsc_mm9_chr10.maf"
+
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def check_search(self, index):
+        self.assertEqual(len(index), 48)
+        alignments = list(index.search("mm9.chr10", 3014700, 3014800))
+        self.assertEqual(
+            [tuple(alignment.coordinates[0, [0, -1]]) for alignment in alignments],
+            [
+                (3014689, 3014742),
+                (3014742, 3014778),
+                (3014778, 3014795),
+                (3014795, 3014842),
+            ],
+        )
+        self.assertEqual(
+            str(alignments[0][:, :20]),
+            """\
+mm9.chr10   3014689 GGGAGCATAAAACTCTAAAT   3014709
+hg18.chr6 155029160 GGGATCATAAACCATTTAAT 155029140
+panTro2.c 157519211 GGGATCATAAACCATTTAAT 157519191
+calJac1.C      6228 GGGATCATAAGCCATTTAAT      6248
+otoGar1.s    175316 GGAAGCATAAACT-TTTAAT    175297
+loxAfr1.s      9373 GGGAGTATAAACCATTTAGT      9353
+""",
+        )
+        # a single position:
+        alignments = list(index.search("mm9.chr10", 3014742))
+        self.assertEqual(len(alignments), 1)
+        self.assertEqual(alignments[0].coordinates[0, 0], 3014742)
+        # the full chromosome, sorted by position:
+        alignments = list(index.search("mm9.chr10"))
+        self.assertEqual(len(alignments), 48)
+        starts = [alignment.coordinates[0, 0] for alignment in alignments]
+        self.assertEqual(starts, sorted(starts))
+        # all alignments, in file order:
+        alignments = list(index.search())
+        for alignment1, alignment2 in zip(alignments, Align.parse(self.path, "maf")):
+            self.assertEqual(format(alignment1, "maf"), format(alignment2, "maf"))
+        self.assertEqual(len(alignments), 48)
+        self.assertEqual(list(index.search("mm9.chr10", 0, 3009319)), [])
+        self.assertEqual(list(index.search("mm9.chr11", 0, 10000000)), [])
+        self.assertRaises(ValueError, next, index.search("mm9.chr10", end=10))
+        self.assertRaises(ValueError, next, index.search(None, 10, 20))
+
+    def test_index(self):
+        filename = os.path.join(self.tmpdir.name, "mm9.mafindex")
+        # create the index:
+        with MafIndex(filename, self.path, "mm9") as index:
+            self.check_search(index)
+        # load the index:
+        with MafIndex(filename, self.path, "mm9") as index:
+            self.check_search(index)
+        # the index was created for a different reference:
+        self.assertRaises(ValueError, MafIndex, filename, self.path, "hg18")
+        # the index was created for a different file:
+        self.assertRaises(
+            ValueError, MafIndex, filename, "MAF/ucsc_mm9_chr10_bad.maf", "mm9"
+        )
+
+    def test_bgzf(self):
+        filename = os.path.join(self.tmpdir.name, "mm9.maf.bgz")
+        with open(self.path, "rb") as source, bgzf.open(filename, "wb") as stream:
+            stream.write(source.read())
+        with MafIndex(None, filename, "mm9") as index:
+            self.check_search(index)
+
+    def test_missing_reference(self):
+        self.assertRaises(ValueError, MafIndex, None, self.path, "rn4")
+
+    def test_spliced(self):
+        with MafIndex(None, self.path, "mm9") as index:
+            starts = [3014644, 3014689]
+            ends = [3014689, 3014742]
+            alignment = index.get_spliced("mm9.chr10", starts, ends)
+            self.assertEqual(
+                str(alignment),
+                """\
+mm9.chr10         0 CCTGTACC---CTTTGGTGAGAATTTTTGTTTCAGTGTTAAAAGTTTGGGGAGCATAAAA
+hg18.chr6         0 CCTATACCTTTCTTTTATGAGAA-TTTTGTTTTAATCCTAAAC-TTTTGGGATCATAAAC
+panTro2.c         0 CCTATACCTTTCTTTTATGAGAA-TTTTGTTTTAATCCTAAAC-TTTTGGGATCATAAAC
+calJac1.C         0 CCTATACCTTTCTTTCATGAGAA-TTTTGTTTGAATCCTAAAC-TTTTGGGATCATAAGC
+loxAfr1.s         0 ------------TTTGGTTAGAA-TTATGCTTTAATTCAAAAC-TTCCGGGAGTATAAAC
+otoGar1.s         0 ------------------------------------------------GGAAGCATAAAC
+
+mm9.chr10        57 CTCTAAATCTGCTAAATGTCTTGTCCCT-TTGGAAAGAGTTG 98
+hg18.chr6        58 CATTTAATCTGTGAAATATCTAATCTTT-TGGGAAATAGTGG 99
+panTro2.c        58 CATTTAATCTGTGAAATATCTAATCTTT-TGGGAAATAGTGG 99
+calJac1.C        58 CATTTAATCTGTGAAATGTGAAATCTTT-TGGGAAACAGTGG 99
+loxAfr1.s        46 CATTTAGTCTGCGAAATGCCAAATCTTCAGGGGAAAAAGCTG 88
+otoGar1.s        12 T-TTTAATCTATGAAATATCAAATCACT-TGGGCAATAGCTG 52
+""",
+            )
+            # compare to the legacy Bio.AlignIO.MafIO.MafIndex:
+            self.assertEqual(
+                alignment.sequences[0].seq,
+                "CCTGTACCCTTTGGTGAGAATTTTTGTTTCAGTGTTAAAAGTTTGGGGAGCATAAAACTCTAAATCTGCTAAATGTCTTGTCCCTTTGGAAAGAGTTG",
+            )
+            self.assertEqual(
+                alignment.sequences[4].seq,
+                "TTTGGTTAGAATTATGCTTTAATTCAAAACTTCCGGGAGTATAAACCATTTAGTCTGCGAAATGCCAAATCTTCAGGGGAAAAAGCTG",
+            )
+            rc_alignment = index.get_spliced("mm9.chr10", starts, ends, "-")
+            for record, rc_record in zip(alignment.sequences, rc_alignment.sequences):
+                self.assertEqual(record.id, rc_record.id)
+                self.assertEqual(record.seq.reverse_complement(), rc_record.seq)
+            # positions not covered by any alignment block:
+            alignment = index.get_spliced("mm9.chr10", [3009310], [3009330])
+            self.assertEqual(
+                str(alignment),
+                """\
+mm9.chr10         0 NNNNNNNNNTCATAGGTATT 20
+                  0 ---------|||.||.|||| 20
+oryCun1.s         0 ---------TCACAGATATT 11
+""",
+            )
+            alignment = index.get_spliced("mm9.chr10", [100], [110])
+            self.assertEqual(alignment.sequences[0].seq, "NNNNNNNNNN")
+            self.assertEqual(len(alignment.sequences), 1)
+            self.assertRaises(
+                ValueError, index.get_spliced, "mm9.chr10", [3009310], [3009300]
+            )
+            self.assertRaises(ValueError, index.get_spliced, "mm9.chr10", [3009310], [])
+            self.assertRaises(
+                ValueError, index.get_spliced, "mm9.chr10", [3009310], [3009330], "x"
+            )
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -9,6 +9,8 @@ from io import StringIO
 from Bio import Align
 from Bio import SeqIO
 from Bio.Align import Alignment
+from Bio.Align import bam
+from Bio.Align import sam
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 
@@ -9626,6 +9628,125 @@ query             0 --TTC-GCTAGC-TG--- 11
         self.assertEqual(format(alignment, "sam"), line)
 
 
+class TestAlign_blocks(unittest.TestCase):
+    def test_ex1_header(self):
+        path = "SamBam/ex1_header.sam"
+        alignments = Align.parse(path, "sam")
+        blocks = sam.AlignmentIterator(path).blocks(1000)
+        block = next(blocks)
+        self.assertEqual(len(block), 1000)
+        self.assertEqual(block.names, ["chr1", "chr2"])
+        self.assertEqual(block.qname[1], "EAS56_57:6:190:289:82")
+        self.assertEqual(block.flag[:3].tolist(), [69, 137, 99])
+        self.assertEqual(block.rname[:3].tolist(), [0, 0, 0])
+        self.assertEqual(block.pos[:3].tolist(), [99, 99, 102])
+        self.assertEqual(block.end[:3].tolist(), [99, 134, 137])
+        self.assertEqual(block.mapq[:3].tolist(), [0, 73, 99])
+        self.assertEqual(block.cigar[:3], ["*", "35M", "35M"])
+        self.assertEqual(block.cigar_offsets[:4].tolist(), [0, 0, 1, 2])
+        self.assertEqual(bytes(block.cigar_operations[:2]), b"MM")
+        self.assertEqual(block.cigar_lengths[:2].tolist(), [35, 35])
+        self.assertEqual(block.rnext[:3].tolist(), [0, 0, 0])
+        self.assertEqual(block.pnext[:3].tolist(), [99, 99, 262])
+        self.assertEqual(block.tlen[:3].tolist(), [0, 0, 195])
+        self.assertEqual(block.tag("NM")[:3], [None, 0, 0])
+        self.assertEqual(block.tag("MF")[:3], [192, 64, 18])
+        self.assertIsNone(block.coordinates(0))
+        self.assertEqual(block.coordinates(1).tolist(), [[99, 134], [0, 35]])
+        blocks = [block] + list(blocks)
+        self.assertEqual([len(block) for block in blocks], [1000, 1000, 1000, 270])
+        for block in blocks:
+            values = block.tag("H0")
+            for index, alignment in enumerate(block):
+                expected = next(alignments)
+                self.assertEqual(
+                    getattr(alignment.target, "id", None),
+                    getattr(expected.target, "id", None),
+                )
+                self.assertEqual(alignment.query.id, expected.query.id)
+                self.assertEqual(alignment.query.seq, expected.query.seq)
+                self.assertEqual(
+                    alignment.query.letter_annotations,
+                    expected.query.letter_annotations,
+                )
+                self.assertEqual(alignment.flag, expected.flag)
+                self.assertEqual(alignment.annotations, expected.annotations)
+                self.assertEqual(values[index], expected.annotations.get("H0"))
+                if expected.coordinates is None:
+                    self.assertIsNone(alignment.coordinates)
+                    continue
+                self.assertTrue(
+                    np.array_equal(alignment.coordinates, expected.coordinates)
+                )
+                self.assertTrue(
+                    np.array_equal(block.coordinates(index), expected.coordinates)
+                )
+                self.assertEqual(block.end[index], expected.coordinates[0, -1])
+        self.assertRaises(StopIteration, next, alignments)
+
+    def test_cigar(self):
+        lines = """\
+read1\t0\tchr1\t11\t60\t3H2S4M2I3M5D2M\t*\t0\t0\tAAAACCCCGGGGT\t*
+read2\t16\tchr1\t21\t60\t2S3=1X100N4M3S1H\t=\t11\t-20\tACGTACGTACGTA\tIIIIIIIIIIIII
+read3\t4\t*\t0\t0\t*\t*\t0\t0\tACGT\t*\tNM:i:1
+"""
+        blocks = sam.AlignmentIterator(StringIO(lines)).blocks()
+        block = next(blocks)
+        self.assertRaises(StopIteration, next, blocks)
+        self.assertEqual(block.names, ["chr1"])
+        self.assertEqual(block.rname.tolist(), [0, 0, -1])
+        self.assertEqual(block.rnext.tolist(), [-1, 0, -1])
+        self.assertEqual(block.cigar_offsets.tolist(), [0, 7, 14, 14])
+        self.assertEqual(bytes(block.cigar_operations), b"HSMIMDMS=XNMSH")
+        self.assertEqual(
+            block.cigar_lengths.tolist(), [3, 2, 4, 2, 3, 5, 2, 2, 3, 1, 100, 4, 3, 1]
+        )
+        self.assertEqual(block.end.tolist(), [24, 128, -1])
+        self.assertEqual(block.tag("NM"), [None, None, 1])
+        lines = StringIO(lines)
+        for index, expected in enumerate(Align.parse(lines, "sam")):
+            alignment = block[index]
+            if index == 2:
+                self.assertIsNone(block.coordinates(index))
+                self.assertIsNone(alignment.coordinates)
+                continue
+            self.assertTrue(
+                np.array_equal(block.coordinates(index), expected.coordinates)
+            )
+            self.assertTrue(np.array_equal(alignment.coordinates, expected.coordinates))
+            self.assertEqual(alignment.query.seq, expected.query.seq)
+            self.assertEqual(alignment.query.annotations, expected.query.annotations)
+            self.assertEqual(
+                getattr(alignment, "operations", None),
+                getattr(expected, "operations", None),
+            )
+        self.assertEqual(
+            block.coordinates(0).tolist(),
+            [[10, 14, 14, 17, 22, 24], [2, 6, 8, 11, 11, 13]],
+        )
+        self.assertEqual(
+            block.coordinates(1).tolist(),
+            [[20, 23, 24, 124, 128], [11, 8, 7, 7, 3]],
+        )
+        self.assertEqual(block[0].query.annotations, {"hard_clip_left": 3})
+        self.assertEqual(block[1].operations, bytearray(b"=XNM"))
+        self.assertEqual(block[-1].query.id, "read3")
+        self.assertRaises(IndexError, block.__getitem__, 3)
+
+    def test_errors(self):
+        alignments = sam.AlignmentIterator("SamBam/sam1.sam")
+        self.assertRaises(ValueError, next, alignments.blocks(0))
+        line = "read1\t0\tchr1\t11\t60\t4M3\t*\t0\t0\tAAAA\t*\n"
+        blocks = sam.AlignmentIterator(StringIO(line)).blocks()
+        self.assertRaises(ValueError, next, blocks)
+        line = "read1\t0\tchr1\t11\t60\t4M\t*\t0\t0\tAAAA\n"
+        blocks = sam.AlignmentIterator(StringIO(line)).blocks()
+        self.assertRaises(ValueError, next, blocks)
+        # blocks is specific to the SAM parser
+        alignments = bam.AlignmentIterator("SamBam/ex1.bam")
+        self.assertFalse(hasattr(alignments, "blocks"))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
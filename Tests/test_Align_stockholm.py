@@ -7,6 +7,8 @@ import unittest
 from io import StringIO
 
 from Bio import Align
+from Bio.Align import ArrayAlignment
+from Bio.Align import stockholm
 from Bio.Align import substitution_matrices
 
 substitution_matrix = substitution_matrices.load("BLOSUM62")
@@ -7687,6 +7689,91 @@ np.array([['V', 'E', 'R', 'Y', 'S', 'L', 'S', 'P', 'M', 'K', 'D', 'L', 'W',
         self.assertNotIn("nonstandardgf", alignment.annotations.keys())
 
 
+class TestStockholm_large(unittest.TestCase):
+    def test_array(self):
+        for path in ("Stockholm/example.sth", "Stockholm/rfam3.seed.txt"):
+            alignment = next(stockholm.AlignmentIterator(path))
+            array_alignment = next(stockholm.AlignmentIterator(path, array=True))
+            self.assertIsInstance(array_alignment, ArrayAlignment)
+            self.assertEqual(array_alignment.data.dtype, np.uint8)
+            self.assertEqual(array_alignment.shape, alignment.shape)
+            for i in range(len(alignment)):
+                self.assertEqual(array_alignment[i], alignment[i])
+            self.assertEqual(array_alignment.operations, alignment.operations)
+            self.assertEqual(array_alignment.annotations, alignment.annotations)
+            self.assertEqual(
+                array_alignment.column_annotations, alignment.column_annotations
+            )
+            for record, sequence in zip(array_alignment.records, alignment.sequences):
+                self.assertEqual(record.id, sequence.id)
+                self.assertEqual(record.annotations, sequence.annotations)
+                self.assertEqual(record.dbxrefs, sequence.dbxrefs)
+                self.assertEqual(record.letter_annotations, sequence.letter_annotations)
+            self.assertEqual(array_alignment.to_alignment()[0], alignment[0])
+
+    def test_annotations(self):
+        path = "Stockholm/example.sth"
+        alignments = stockholm.AlignmentIterator(path, annotations=["GC"])
+        alignment = next(alignments)
+        self.assertEqual(alignment.annotations, {})
+        self.assertEqual(
+            alignment.column_annotations["consensus secondary structure"],
+            "--HHHHHHHHHHHHHHS.--HHHHHHHHHHHHH",
+        )
+        self.assertEqual(alignment.sequences[1].annotations, {})
+        self.assertEqual(alignment.sequences[1].letter_annotations, {})
+        self.assertEqual(alignment[1], "HENERARGIYERFVVVH-PEVTNWLRWARFEEE")
+        alignments = stockholm.AlignmentIterator(path, annotations=("GS", "GR"))
+        alignment = next(alignments)
+        self.assertEqual(alignment.annotations, {})
+        self.assertFalse(hasattr(alignment, "column_annotations"))
+        self.assertEqual(alignment.sequences[1].annotations, {"accession": "P87312.1"})
+        self.assertEqual(
+            alignment.sequences[1].letter_annotations["secondary structure"],
+            "--HHHHHHHHHHHHHHS--HHHHHHHHHHHHH",
+        )
+        self.assertRaises(
+            ValueError, stockholm.AlignmentIterator, path, annotations=["GX"]
+        )
+
+    def test_rows(self):
+        alignments = stockholm.AlignmentIterator("Stockholm/example.sth")
+        rows = alignments.rows()
+        record = next(rows)
+        self.assertEqual(record.id, "CRN_DROME/191-222")
+        self.assertEqual(record.seq, "KEIDRAREIYERFVYVH-PDVKNWIKFARFEES")
+        self.assertEqual(record.annotations, {"accession": "P17886.2"})
+        # the annotations of the alignment are stored after reading all rows:
+        self.assertIsNone(alignments.annotations)
+        record = next(rows)
+        self.assertEqual(record.id, "CLF1_SCHPO/185-216")
+        self.assertEqual(record.dbxrefs, ["PDB; 3JB9 R; 185-216;"])
+        self.assertEqual(
+            record.letter_annotations["secondary structure"],
+            "--HHHHHHHHHHHHHHS.--HHHHHHHHHHHHH",
+        )
+        record = next(rows)
+        self.assertEqual(record.id, "O16376_CAEEL/201-233")
+        self.assertRaises(StopIteration, next, rows)
+        self.assertEqual(alignments.annotations["accession"], "PF02184.18")
+        self.assertEqual(
+            alignments.column_annotations["consensus sequence"],
+            "KEIDRARuIYERFVaVH.P-VpNWIKaARFEEc",
+        )
+        self.assertEqual(list(alignments.rows()), [])
+        self.assertIsNone(alignments.annotations)
+        # multiple alignments in one file:
+        with open("Stockholm/example.sth") as stream:
+            data = stream.read()
+        stream = StringIO(data + data)
+        alignments = stockholm.AlignmentIterator(stream, annotations=["GF"])
+        self.assertEqual(len(list(alignments.rows())), 3)
+        self.assertEqual(len(list(alignments.rows())), 3)
+        self.assertEqual(alignments.annotations["identifier"], "HAT")
+        self.assertEqual(alignments.column_annotations, {})
+        self.assertEqual(list(alignments.rows()), [])
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
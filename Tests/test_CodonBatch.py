@@ -0,0 +1,129 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Tests for Bio.SeqUtils.CodonBatch."""
+
+import unittest
+
+from Bio import SeqIO
+from Bio.Data.CodonTable import unambiguous_dna_by_id
+from Bio.Seq import Seq
+from Bio.SeqUtils import CodonAdaptationIndex
+
+try:
+    import numpy as np
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Install numpy if you want to use Bio.SeqUtils.CodonBatch."
+    ) from None
+
+from Bio.SeqUtils.CodonBatch import CodonCounts
+from Bio.SeqUtils.CodonBatch import codons
+
+
+class CodonCountsTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        record = SeqIO.read("GenBank/NC_005816.gb", "genbank")
+        records = []
+        for feature in record.features:
+            if feature.type == "CDS" and len(feature.location.parts) == 1:
+                cds = feature.extract(record)
+                cds.id = feature.qualifiers["protein_id"][0]
+                records.append(cds)
+        cls.records = records
+        cls.counts = CodonCounts(records)
+
+    def test_counts(self):
+        counts = self.counts
+        self.assertEqual(len(counts), len(self.records))
+        self.assertEqual(counts.names[0], self.records[0].id)
+        for record, row in zip(self.records, counts.counts):
+            sequence = str(record.seq)
+            expected = [0] * 64
+            for i in range(0, len(sequence), 3):
+                expected[codons.index(sequence[i : i + 3])] += 1
+            self.assertEqual(list(row), expected)
+        counts = CodonCounts(["atgAAA", Seq("ATGaaa"), ""])
+        self.assertEqual(counts.counts.sum(axis=1).tolist(), [2, 2, 0])
+        self.assertEqual(counts.names, [None, None, None])
+
+    def test_illegal_codons(self):
+        with self.assertRaises(ValueError) as cm:
+            CodonCounts(["ATGAAA", "ATGNNNAAA"])
+        self.assertEqual(str(cm.exception), "illegal codon 'NNN'")
+        with self.assertRaises(ValueError) as cm:
+            CodonCounts(["ATGAA"])
+        self.assertEqual(str(cm.exception), "illegal codon 'AA'")
+        record = self.records[0][:10]
+        with self.assertRaises(ValueError) as cm:
+            CodonCounts([record])
+        self.assertEqual(
+            str(cm.exception), f"illegal codon '{record.seq[9:]}' in gene {record.id}"
+        )
+
+    def test_cai(self):
+        index = CodonAdaptationIndex(self.records)
+        trained = self.counts.adaptation_index()
+        self.assertIsInstance(trained, CodonAdaptationIndex)
+        self.assertEqual(str(trained), str(index))
+        values = self.counts.cai(index)
+        for record, value in zip(self.records, values):
+            self.assertAlmostEqual(value, index.calculate(record))
+        subset = [0, 2, 4]
+        trained = self.counts.adaptation_index(subset)
+        index = CodonAdaptationIndex([self.records[i] for i in subset])
+        self.assertEqual(str(trained), str(index))
+
+    def test_fop(self):
+        index = self.counts.adaptation_index()
+        fop = self.counts.fop(index)
+        optimal = [codon for codon, value in index.items() if value == 1.0]
+        self.assertTrue(np.array_equal(fop, self.counts.fop(optimal)))
+        # Count directly for the first gene
+        table = self.counts.table
+        sequence = str(self.records[0].seq)
+        numerator = denominator = 0
+        for i in range(0, len(sequence), 3):
+            codon = sequence[i : i + 3]
+            if codon in ("ATG", "TGG") or codon in table.stop_codons:
+                continue
+            denominator += 1
+            if codon in optimal:
+                numerator += 1
+        self.assertAlmostEqual(fop[0], numerator / denominator)
+
+    def test_rscu(self):
+        rscu = self.counts.rscu()
+        self.assertEqual(rscu.shape, (len(self.records), 64))
+        phe = [codons.index("TTT"), codons.index("TTC")]
+        counts = self.counts.counts[:, phe]
+        expected = counts / counts.mean(axis=1, keepdims=True)
+        self.assertTrue(np.allclose(rscu[:, phe], expected))
+        met = codons.index("ATG")
+        present = self.counts.counts[:, met] > 0
+        self.assertTrue(np.all(rscu[present, met] == 1))
+        self.assertTrue(np.all(np.isnan(rscu[~present, met])))
+
+    def test_enc(self):
+        # All synonymous codons used equally often gives the maximum ENC
+        table = self.counts.table
+        sequence = "".join(table.forward_table) * 10
+        enc = CodonCounts([sequence]).enc()
+        self.assertAlmostEqual(enc[0], 61)
+        # Only one codon used for each amino acid gives the minimum ENC
+        sequence = "".join(table.back_table[aa] for aa in table.protein_alphabet)
+        enc = CodonCounts([sequence * 10]).enc()
+        self.assertAlmostEqual(enc[0], 20)
+        enc = self.counts.enc()
+        self.assertTrue(np.all((enc >= 20) & (enc <= 61)))
+        table = unambiguous_dna_by_id[2]
+        enc = CodonCounts(["".join(table.forward_table) * 10], table).enc()
+        self.assertAlmostEqual(enc[0], len(table.forward_table))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
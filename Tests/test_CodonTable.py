@@ -7,6 +7,7 @@
 
 """Tests for CodonTable module."""
 
+import itertools
 import unittest
 
 from Bio.Data import IUPACData
@@ -16,6 +17,7 @@ from Bio.Data.CodonTable import ambiguous_generic_by_id
 from Bio.Data.CodonTable import ambiguous_generic_by_name
 from Bio.Data.CodonTable import ambiguous_rna_by_id
 from Bio.Data.CodonTable import ambiguous_rna_by_name
+from Bio.Data.CodonTable import AmbiguousForwardTable
 from Bio.Data.CodonTable import generic_by_id
 from Bio.Data.CodonTable import generic_by_name
 from Bio.Data.CodonTable import list_ambiguous_codons
@@ -162,6 +164,54 @@ class AmbiguousCodonsTests(unittest.TestCase):
                 self.assertEqual(amb_nuc.forward_table["TTN"], "X")  # F or L
                 self.assertEqual(amb_nuc.forward_table["UTN"], "X")  # F or L
 
+    def test_all_codons(self):
+        """Check the translation of all ambiguous codons at once."""
+        letters = IUPACData.ambiguous_dna_letters + "UX"
+        for table in (ambiguous_dna_by_id[2], ambiguous_generic_by_id[33]):
+            compiled = table.forward_table
+            # Translate each codon separately, without compiling the table:
+            single = AmbiguousForwardTable(
+                compiled.forward_table,
+                compiled.ambiguous_nucleotide,
+                compiled.ambiguous_protein,
+            )
+            single._compiled = True
+            for c1, c2, c3 in itertools.product(letters, repeat=3):
+                codon = c1 + c2 + c3
+                try:
+                    expected = single[codon]
+                except KeyError:
+                    expected = KeyError
+                except TranslationError:
+                    expected = TranslationError
+                if expected is KeyError or expected is TranslationError:
+                    with self.assertRaises(expected):
+                        compiled[codon]
+                else:
+                    self.assertEqual(compiled[codon], expected, codon)
+
+    def test_compile(self):
+        """Check that only ambiguous coding codons compile the table."""
+        compiled = ambiguous_dna_by_id[1].forward_table
+        table = AmbiguousForwardTable(
+            compiled.forward_table,
+            compiled.ambiguous_nucleotide,
+            compiled.ambiguous_protein,
+        )
+        for codon in ("TAA", "TAR", "TRA"):
+            with self.assertRaises(KeyError):
+                table[codon]
+        self.assertFalse(table._compiled)
+        self.assertEqual(table["ATG"], "M")
+        self.assertFalse(table._compiled)
+        self.assertEqual(table["GCN"], "A")
+        self.assertTrue(table._compiled)
+        size = len(IUPACData.ambiguous_dna_values)
+        self.assertEqual(len(table._dense), size**3)
+        self.assertEqual(table["RAT"], "B")
+        with self.assertRaises(TranslationError):
+            table["TAN"]
+
     def test_stop_codons(self):
         """Test various ambiguous codons as stop codon.
 
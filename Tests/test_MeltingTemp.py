@@ -0,0 +1,109 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Tests for the batch Tm calculation in SeqUtils.MeltingTemp."""
+
+import random
+import unittest
+import warnings
+
+from Bio import BiopythonWarning
+from Bio.Seq import Seq
+from Bio.SeqUtils import MeltingTemp as mt
+
+try:
+    import numpy as np
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Install numpy if you want to use Tm_NN_batch."
+    ) from None
+
+
+class TestTmNNBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(7)
+        seqs = []
+        for i in range(300):
+            length = rng.randint(2, 40)
+            seqs.append("".join(rng.choice("ACGT") for j in range(length)))
+        seqs.extend(["AAAAAAAA", "GCGCGCGC", "TTACGTAA", "ACGTIACGTA"])
+        cls.seqs = seqs
+
+    def compare(self, seqs, **kwargs):
+        tms = mt.Tm_NN_batch(seqs, **kwargs)
+        self.assertIsInstance(tms, np.ndarray)
+        self.assertEqual(tms.shape, (len(seqs),))
+        for seq, tm in zip(seqs, tms):
+            self.assertAlmostEqual(tm, mt.Tm_NN(seq, **kwargs), places=8)
+
+    def test_defaults(self):
+        self.compare(self.seqs)
+        self.compare([Seq(seq) for seq in self.seqs[:10]])
+        self.compare(["cgu ucc aaa gau"])
+        self.assertEqual(len(mt.Tm_NN_batch([])), 0)
+
+    def test_examples(self):
+        tms = mt.Tm_NN_batch(["CGTTCCAAAGATGTGGGCATGAGCTTAC", "ACGTTGCAAG"])
+        self.assertEqual(["%0.2f" % tm for tm in tms], ["60.32", "26.08"])
+        tms = mt.Tm_NN_batch(
+            ["CGTTCCAAAGATGTGGGCATGAGCTTAC"],
+            saltcorr=7,
+            Na=50,
+            Tris=10,
+            Mg=1.5,
+            DMSO=3,
+        )
+        self.assertEqual("%0.2f" % tms[0], "64.56")
+
+    def test_salt_corrections(self):
+        for saltcorr in range(8):
+            self.compare(self.seqs, saltcorr=saltcorr)
+        self.compare(self.seqs, Na=50, Tris=10, Mg=1.5)
+        self.compare(self.seqs, Na=50, Tris=10, Mg=1.5, dNTPs=0.6, saltcorr=7)
+        self.compare(self.seqs, Na=10, Mg=3, saltcorr=7)
+
+    def test_tables(self):
+        for table in (mt.DNA_NN1, mt.DNA_NN2, mt.DNA_NN4, mt.RNA_NN3, mt.R_DNA_NN1):
+            self.compare(self.seqs, nn_table=table)
+        self.compare(self.seqs, selfcomp=True, dnac1=50)
+
+    def test_broadcasting(self):
+        seqs = self.seqs[:5]
+        Na = [10, 20, 50, 100, 200]
+        dnac1 = [25, 50, 100, 200, 400]
+        tms = mt.Tm_NN_batch(seqs, Na=Na, dnac1=dnac1)
+        for seq, na, dnac, tm in zip(seqs, Na, dnac1, tms):
+            self.assertAlmostEqual(tm, mt.Tm_NN(seq, Na=na, dnac1=dnac))
+
+    def test_chem_correction(self):
+        seqs = self.seqs[:20]
+        tms = mt.Tm_NN_batch(seqs, DMSO=3, fmd=1.25, fmdmethod=2)
+        for seq, tm in zip(seqs, tms):
+            gc = 100 * sum(seq.count(x) for x in "CG") / len(seq)
+            expected = mt.chem_correction(
+                mt.Tm_NN(seq), DMSO=3, fmd=1.25, fmdmethod=2, GC=gc
+            )
+            self.assertAlmostEqual(tm, expected)
+        with self.assertRaises(ValueError):
+            mt.Tm_NN_batch(seqs, fmd=5, fmdmethod=3)
+
+    def test_missing_data(self):
+        with self.assertRaises(ValueError) as cm:
+            mt.Tm_NN_batch(["ACGT", "ACGXT"], check=False)
+        self.assertEqual(
+            str(cm.exception), "no thermodynamic data for neighbors 'GX/CX' available"
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", BiopythonWarning)
+            with self.assertRaises(BiopythonWarning):
+                mt.Tm_NN_batch(["ACGXT"], check=False, strict=False)
+        with self.assertRaises(ValueError):
+            mt.Tm_NN_batch(["ACGT", ""])
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
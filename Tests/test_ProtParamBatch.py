@@ -0,0 +1,111 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Tests for Bio.SeqUtils.ProtParamBatch."""
+
+import random
+import unittest
+
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.SeqUtils.ProtParam import ProteinAnalysis
+
+try:
+    import numpy as np
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Install numpy if you want to use Bio.SeqUtils.ProtParamBatch."
+    ) from None
+
+from Bio.SeqUtils.ProtParamBatch import ProteinBatchAnalysis
+
+
+class ProteinBatchAnalysisTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(5)
+        sequences = [
+            "MAEGEITTFTALTEKFNLPPGNYKKPKLLYCSNGGHFLRILPDGTVDGTRDRSDQHIQLQLSAESVGEVY",
+            "INGAR",
+            "peter",
+            "DDDDD",
+            "RRRRR",
+        ]
+        for i in range(200):
+            length = rng.randint(1, 120)
+            sequences.append(
+                "".join(rng.choice("ACDEFGHIKLMNPQRSTVWY") for j in range(length))
+            )
+        cls.sequences = sequences
+        cls.batch = ProteinBatchAnalysis(sequences)
+        cls.analyses = [ProteinAnalysis(sequence) for sequence in sequences]
+
+    def check(self, values, method, *args):
+        self.assertEqual(len(values), len(self.analyses))
+        for analysis, value in zip(self.analyses, values):
+            expected = getattr(analysis, method)(*args)
+            self.assertTrue(np.allclose(value, expected), method)
+
+    def test_counts(self):
+        batch = self.batch
+        self.assertEqual(len(batch), len(self.sequences))
+        self.assertTrue(np.array_equal(batch.lengths, [len(s) for s in self.sequences]))
+        for analysis, counts, percent in zip(
+            self.analyses, batch.count_amino_acids(), batch.amino_acids_percent
+        ):
+            self.assertEqual(list(analysis.count_amino_acids().values()), list(counts))
+            self.assertTrue(
+                np.allclose(list(analysis.amino_acids_percent.values()), percent)
+            )
+
+    def test_input_types(self):
+        text = self.sequences[0]
+        batch = ProteinBatchAnalysis([text, Seq(text), SeqRecord(Seq(text))])
+        weights = batch.molecular_weight()
+        self.assertEqual(weights[0], weights[1])
+        self.assertEqual(weights[0], weights[2])
+        batch = ProteinBatchAnalysis([])
+        self.assertEqual(len(batch.isoelectric_point()), 0)
+        self.assertEqual(len(batch.molecular_weight()), 0)
+
+    def test_properties(self):
+        batch = self.batch
+        self.check(batch.molecular_weight(), "molecular_weight")
+        self.check(batch.aromaticity(), "aromaticity")
+        self.check(batch.instability_index(), "instability_index")
+        self.check(batch.gravy(), "gravy")
+        self.check(batch.gravy("Eisenberg"), "gravy", "Eisenberg")
+        self.check(batch.secondary_structure_fraction(), "secondary_structure_fraction")
+        self.check(batch.molar_extinction_coefficient(), "molar_extinction_coefficient")
+        self.check(batch.charge_at_pH(7.0), "charge_at_pH", 7.0)
+        self.check(batch.flexibility(), "flexibility")
+        with self.assertRaises(ValueError):
+            batch.gravy("Wrong")
+
+    def test_monoisotopic(self):
+        batch = ProteinBatchAnalysis(self.sequences[:10], monoisotopic=True)
+        for sequence, weight in zip(self.sequences, batch.molecular_weight()):
+            analysis = ProteinAnalysis(sequence, monoisotopic=True)
+            self.assertAlmostEqual(weight, analysis.molecular_weight())
+
+    def test_isoelectric_point(self):
+        for analysis, pi in zip(self.analyses, self.batch.isoelectric_point()):
+            self.assertEqual(pi, analysis.isoelectric_point())
+
+    def test_nonstandard_letters(self):
+        batch = ProteinBatchAnalysis(["ACDX", "ACD"])
+        self.assertEqual(list(batch.lengths), [4, 3])
+        self.assertEqual(batch.counts.sum(), 6)
+        with self.assertRaises(ValueError):
+            batch.molecular_weight()
+        with self.assertRaises(KeyError):
+            batch.gravy()
+        with self.assertRaises(KeyError):
+            batch.instability_index()
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
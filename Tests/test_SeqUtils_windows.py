@@ -0,0 +1,120 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Tests for the SeqUtils.windows module."""
+
+import unittest
+
+from Bio import SeqIO
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.SeqUtils import gc_fraction
+from Bio.SeqUtils import GC_skew
+from Bio.SeqUtils.lcc import lcc_mult
+
+try:
+    import numpy as np
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Install numpy if you want to use Bio.SeqUtils.windows."
+    ) from None
+
+from Bio.SeqUtils.windows import iterate_window_counts
+from Bio.SeqUtils.windows import window_counts
+
+
+class TestWindowCounts(unittest.TestCase):
+    sequence = "ACGTTGCAGGNNNNCCGTAGCTAGsgtwcaryNAAGGCTTACGGATTAGCATATGCCGTA"
+
+    def test_positions(self):
+        counts = window_counts(self.sequence, window=10, step=7)
+        self.assertEqual(len(counts), 9)
+        self.assertTrue(np.array_equal(counts.starts, np.arange(0, 59, 7)))
+        self.assertEqual(counts.ends[-1], len(self.sequence))
+        self.assertEqual(counts.lengths[-1], 4)
+        counts = window_counts(self.sequence, window=10, step=7, partial=False)
+        self.assertEqual(len(counts), 8)
+        self.assertTrue(np.all(counts.lengths == 10))
+        counts = window_counts("", window=10)
+        self.assertEqual(len(counts), 0)
+        self.assertEqual(counts.counts.shape, (0, 9))
+        with self.assertRaises(ValueError):
+            window_counts(self.sequence, window=0)
+        with self.assertRaises(ValueError):
+            window_counts(self.sequence, window=10, step=-1)
+
+    def test_gc_fraction(self):
+        for ambiguous in ("remove", "ignore", "weighted"):
+            counts = window_counts(self.sequence, window=9, step=4)
+            values = counts.gc_fraction(ambiguous)
+            for start, end, value in zip(counts.starts, counts.ends, values):
+                expected = gc_fraction(self.sequence[start:end], ambiguous)
+                self.assertAlmostEqual(value, expected)
+        with self.assertRaises(ValueError):
+            counts.gc_fraction("other string")
+
+    def test_gc_skew(self):
+        for seq in (self.sequence, Seq(self.sequence), SeqRecord(Seq(self.sequence))):
+            counts = window_counts(seq, window=11)
+            self.assertTrue(np.allclose(counts.gc_skew(), GC_skew(seq, window=11)))
+
+    def test_at_skew(self):
+        counts = window_counts("AAAT" + "CCGG" + "UUUA", window=4)
+        self.assertTrue(np.allclose(counts.at_skew(), [0.5, 0.0, -0.5]))
+
+    def test_n_fraction(self):
+        counts = window_counts(self.sequence, window=10)
+        self.assertTrue(np.allclose(counts.n_fraction(), [0, 0.4, 0, 0.1, 0, 0]))
+
+    def test_lcc(self):
+        seq = "ACGATAGCTTAGCCGATATATATGCGCGAACCTTGGAAC"
+        counts = window_counts(seq, window=8, step=1, partial=False)
+        self.assertTrue(np.allclose(counts.lcc(), lcc_mult(seq, 8)))
+
+    def test_chunks(self):
+        seq = Seq(self.sequence * 10)
+        counts = window_counts(seq, window=13, step=5)
+        parts = list(iterate_window_counts(seq, window=13, step=5, chunk=40))
+        self.assertEqual(len(parts), 15)
+        self.assertTrue(
+            np.array_equal(counts.counts, np.concatenate([p.counts for p in parts]))
+        )
+        self.assertTrue(
+            np.array_equal(counts.starts, np.concatenate([p.starts for p in parts]))
+        )
+        chunked = window_counts(seq, window=13, step=5, chunk=40)
+        self.assertTrue(np.array_equal(counts.counts, chunked.counts))
+        self.assertTrue(np.allclose(counts.gc_weight, chunked.gc_weight))
+
+    def test_twobit(self):
+        records = SeqIO.parse("TwoBit/sequence.fa", "fasta")
+        expected = {record.id: record.seq for record in records}
+        with open("TwoBit/sequence.littleendian.2bit", "rb") as stream:
+            for record in SeqIO.parse(stream, "twobit"):
+                counts = window_counts(record.seq, window=50, step=20, chunk=100)
+                seq = expected[record.id]
+                self.assertTrue(
+                    np.allclose(
+                        counts.gc_fraction(),
+                        [
+                            gc_fraction(seq[s:e])
+                            for s, e in zip(counts.starts, counts.ends)
+                        ],
+                    )
+                )
+                self.assertTrue(
+                    np.allclose(
+                        counts.n_fraction(),
+                        [
+                            seq[s:e].upper().count("N") / (e - s)
+                            for s, e in zip(counts.starts, counts.ends)
+                        ],
+                    )
+                )
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
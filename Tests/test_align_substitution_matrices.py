@@ -18,6 +18,7 @@ import os
 import pickle
 import unittest
 from collections import Counter
+from io import StringIO
 
 from Bio import SeqIO
 from Bio.Align import substitution_matrices
@@ -2410,6 +2411,17 @@ class TestLoading(unittest.TestCase):
             except Exception:
                 self.fail(f"Failed to load substitution matrix '{name}'")
 
+    def test_loading_copies(self):
+        """Confirm that each call to load returns a separate matrix."""
+        matrix = substitution_matrices.load("BLOSUM62")
+        self.assertEqual(matrix.header[0], "Matrix made by matblas from blosum62.iij")
+        matrix["A", "A"] = 100.0
+        matrix.header.append("modified")
+        matrix = substitution_matrices.load("BLOSUM62")
+        self.assertAlmostEqual(matrix["A", "A"], 4.0)
+        self.assertNotIn("modified", matrix.header)
+        self.assertEqual(matrix.alphabet, "ARNDCQEGHILKMFPSTWYVBZX*")
+
     def test_reading(self):
         """Confirm matrix reading works with filename or handle."""
         matrix_name = "BLOSUM62"
@@ -2433,6 +2445,11 @@ class TestLoading(unittest.TestCase):
         self.assertEqual(len(handle_matrix), 24)
         self.assertEqual(len(handle_matrix[0]), 24)
 
+    def test_reading_row_mismatch(self):
+        """Confirm that rows must be in the same order as the columns."""
+        handle = StringIO("   A  C\nC  1  0\nA  0  1\n")
+        self.assertRaises(ValueError, substitution_matrices.read, handle)
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
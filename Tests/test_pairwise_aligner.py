@@ -7,6 +7,8 @@
 
 import array
 import os
+import pickle
+import random
 import sys
 import unittest
 
@@ -22,6 +24,7 @@ except ImportError:
 from Bio import BiopythonDeprecationWarning
 from Bio import BiopythonWarning
 from Bio import Align
+from Bio.Align import substitution_matrices
 from Bio.Align.substitution_matrices import Array
 from Bio import SeqIO
 from Bio.Seq import reverse_complement
@@ -22235,6 +22238,552 @@ AlignmentCounts object with
         )
 
 
+class TestScoreMany(unittest.TestCase):
+    sequences = [
+        "ACGTTGCA",
+        "ACGTGCA",
+        "TTGCAACG",
+        "ACGGGTTGCAA",
+        "CA",
+        "GGGGACGTTGC",
+    ]
+
+    def check(self, aligner, strand="+"):
+        sequences = self.sequences
+        for threads in (1, 3, None):
+            scores = aligner.score_many(
+                sequences[0], sequences, strand=strand, threads=threads
+            )
+            self.assertEqual(scores.shape, (len(sequences),))
+            for sequence, score in zip(sequences, scores):
+                self.assertAlmostEqual(
+                    score, aligner.score(sequences[0], sequence, strand)
+                )
+            scores = aligner.score_all(sequences, strand=strand, threads=threads)
+            self.assertEqual(scores.shape, (len(sequences), len(sequences)))
+            for seqA, row in zip(sequences, scores):
+                for seqB, score in zip(sequences, row):
+                    self.assertAlmostEqual(score, aligner.score(seqA, seqB, strand))
+            scores = aligner.score_all(
+                sequences[:2], sequences, strand=strand, threads=threads
+            )
+            self.assertEqual(scores.shape, (2, len(sequences)))
+            for seqA, row in zip(sequences, scores):
+                for seqB, score in zip(sequences, row):
+                    self.assertAlmostEqual(score, aligner.score(seqA, seqB, strand))
+
+    def test_global(self):
+        aligner = Align.PairwiseAligner(mismatch_score=-1, gap_score=-1)
+        self.check(aligner)
+        self.check(aligner, strand="-")
+
+    def test_local_affine(self):
+        aligner = Align.PairwiseAligner(
+            mode="local", mismatch_score=-2, open_gap_score=-3, extend_gap_score=-1
+        )
+        self.check(aligner)
+
+    def test_asymmetric(self):
+        aligner = Align.PairwiseAligner(mismatch_score=-1)
+        aligner.insertion_score = -0.5
+        aligner.deletion_score = -2
+        self.assertFalse(aligner._is_symmetric())
+        self.check(aligner)
+
+    def test_substitution_matrix(self):
+        aligner = Align.PairwiseAligner("blastn")
+        self.check(aligner)
+
+    def test_gap_score_function(self):
+        def gap_score(i, n):
+            if i == 3:
+                return -10
+            return -1 - n
+
+        aligner = Align.PairwiseAligner(mismatch_score=-1)
+        aligner.insertion_score = gap_score
+        aligner.deletion_score = gap_score
+        self.assertEqual(
+            aligner.algorithm, "Waterman-Smith-Beyer global alignment algorithm"
+        )
+        self.assertFalse(aligner._is_symmetric())
+        self.check(aligner)
+
+    def test_empty(self):
+        aligner = Align.PairwiseAligner()
+        self.assertEqual(aligner.score_many("ACGT", []).shape, (0,))
+        self.assertEqual(aligner.score_all([]).shape, (0, 0))
+        with self.assertRaises(ValueError):
+            aligner.score_many("ACGT", ["ACGT"], threads=0)
+
+
+class TestBanded(unittest.TestCase):
+    target = "GAACTTGCAGGTCATCCGGATACCAGTTAGCCATTGCAAG"
+    query = "GAACTGCAGGTCATGCGGATACCCAGTTAGCCATTCAAG"
+
+    def check(self, aligner, strand="+"):
+        target = self.target
+        query = self.query
+        score = aligner.score(target, query, strand)
+        aligner.band = 50
+        self.assertAlmostEqual(aligner.score(target, query, strand), score)
+        alignments = aligner.align(target, query, strand)
+        self.assertEqual(len(alignments), 1)
+        self.assertAlmostEqual(alignments.score, score)
+        alignment = alignments[0]
+        self.assertAlmostEqual(alignment.score, score)
+        if strand == "+":
+            self.assertAlmostEqual(alignment.counts(aligner).score, score)
+        for alignment in alignments:
+            # iterating again should give the same alignment
+            self.assertAlmostEqual(alignment.score, score)
+        aligner.band = 0
+        banded_score = aligner.score(target, query, strand)
+        self.assertLessEqual(banded_score, score)
+        alignment = aligner.align(target, query, strand)[0]
+        self.assertAlmostEqual(alignment.score, banded_score)
+        if aligner.mode == "global":
+            aligner.band = "adaptive"
+            self.assertAlmostEqual(aligner.score(target, query, strand), score)
+            alignment = aligner.align(target, query, strand)[0]
+            self.assertAlmostEqual(alignment.score, score)
+        aligner.band = None
+
+    def test_needlemanwunsch(self):
+        aligner = Align.PairwiseAligner(mismatch_score=-1, gap_score=-1)
+        self.assertEqual(aligner.algorithm, "Needleman-Wunsch")
+        self.check(aligner)
+        self.check(aligner, strand="-")
+
+    def test_smithwaterman(self):
+        aligner = Align.PairwiseAligner(mode="local", mismatch_score=-1, gap_score=-1)
+        self.assertEqual(aligner.algorithm, "Smith-Waterman")
+        self.check(aligner)
+        self.check(aligner, strand="-")
+
+    def test_gotoh(self):
+        aligner = Align.PairwiseAligner(
+            mismatch_score=-2, open_gap_score=-3, extend_gap_score=-1
+        )
+        aligner.end_gap_score = 0
+        aligner.open_left_insertion_score = -4
+        self.assertEqual(aligner.algorithm, "Gotoh global alignment algorithm")
+        self.check(aligner)
+        self.check(aligner, strand="-")
+        aligner.mode = "local"
+        self.assertEqual(aligner.algorithm, "Gotoh local alignment algorithm")
+        self.check(aligner)
+
+    def test_substitution_matrix(self):
+        aligner = Align.PairwiseAligner("blastn")
+        self.check(aligner)
+        aligner.mode = "local"
+        self.check(aligner)
+
+    def test_attribute(self):
+        aligner = Align.PairwiseAligner()
+        self.assertIsNone(aligner.band)
+        self.assertNotIn("band", str(aligner))
+        aligner.band = 5
+        self.assertEqual(aligner.band, 5)
+        self.assertIn("  band: 5\n", str(aligner))
+        aligner.band = "adaptive"
+        self.assertEqual(aligner.band, "adaptive")
+        self.assertEqual(pickle.loads(pickle.dumps(aligner)).band, "adaptive")
+        with self.assertRaises(ValueError):
+            aligner.band = -1
+        with self.assertRaises(ValueError):
+            aligner.band = "narrow"
+        with self.assertRaises(TypeError):
+            aligner.band = 2.5
+        aligner.band = None
+        self.assertIsNone(aligner.band)
+
+    def test_restrictions(self):
+        aligner = Align.PairwiseAligner(mode="local")
+        aligner.band = "adaptive"
+        with self.assertRaises(ValueError):
+            aligner.score("ACGT", "ACGT")
+        aligner = Align.PairwiseAligner(mode="fogsaa")
+        aligner.band = 2
+        with self.assertRaises(ValueError):
+            aligner.align("ACGT", "ACGT")
+        aligner = Align.PairwiseAligner()
+        aligner.gap_score = lambda start, length: -length
+        aligner.band = 2
+        with self.assertRaises(ValueError):
+            aligner.score("ACGT", "ACGT")
+
+
+class TestLinearTraceback(unittest.TestCase):
+    target = "GAACTTGCAGGTCATCCGGATACCAGTTAGCCATTGCAAG" * 10
+    query = "GAACTGCAGGTCATGCGGATACCCAGTTAGCCATTCAAG" * 10
+
+    def check(self, aligner, strand="+"):
+        target = self.target
+        query = self.query
+        score = aligner.score(target, query, strand)
+        aligner.traceback = "linear"
+        alignments = aligner.align(target, query, strand)
+        self.assertEqual(len(alignments), 1)
+        self.assertAlmostEqual(alignments.score, score)
+        alignment = alignments[0]
+        self.assertAlmostEqual(alignment.score, score)
+        if strand == "+":
+            self.assertAlmostEqual(alignment.counts(aligner).score, score)
+        coordinates = alignment.coordinates
+        if aligner.mode == "global":
+            self.assertEqual(coordinates[0, 0], 0)
+            self.assertEqual(coordinates[0, -1], len(target))
+        else:
+            # local alignments start and end with aligned letters
+            steps = np.diff(coordinates)
+            self.assertTrue(steps[:, 0].all())
+            self.assertTrue(steps[:, -1].all())
+        aligner.traceback = "full"
+
+    def test_needlemanwunsch(self):
+        aligner = Align.PairwiseAligner(mismatch_score=-1, gap_score=-1)
+        self.check(aligner)
+        self.check(aligner, strand="-")
+
+    def test_smithwaterman(self):
+        aligner = Align.PairwiseAligner(mode="local", mismatch_score=-1, gap_score=-1)
+        self.check(aligner)
+        self.check(aligner, strand="-")
+
+    def test_gotoh(self):
+        aligner = Align.PairwiseAligner(
+            mismatch_score=-2, open_gap_score=-3, extend_gap_score=-1
+        )
+        aligner.end_gap_score = 0
+        aligner.open_left_insertion_score = -4
+        self.check(aligner)
+        self.check(aligner, strand="-")
+        aligner.mode = "local"
+        self.check(aligner)
+
+    def test_substitution_matrix(self):
+        aligner = Align.PairwiseAligner("blastn")
+        self.check(aligner)
+        aligner.mode = "local"
+        self.check(aligner)
+
+    def test_attribute(self):
+        aligner = Align.PairwiseAligner()
+        self.assertEqual(aligner.traceback, "full")
+        self.assertNotIn("traceback", str(aligner))
+        aligner.traceback = "linear"
+        self.assertEqual(aligner.traceback, "linear")
+        self.assertIn("  traceback: linear\n", str(aligner))
+        self.assertEqual(pickle.loads(pickle.dumps(aligner)).traceback, "linear")
+        with self.assertRaises(ValueError):
+            aligner.traceback = "quadratic"
+        aligner.band = 5
+        with self.assertRaises(ValueError):
+            aligner.align("ACGT", "ACGT")
+        aligner.band = None
+        aligner.gap_score = lambda start, length: -length
+        with self.assertRaises(ValueError):
+            aligner.align("ACGT", "ACGT")
+
+
+class TestQueryProfile(unittest.TestCase):
+    query = "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNLSGAEKAVQVKVKALPDAQ"
+    targets = (
+        "MKTAYIAKQRQISFVKSHFSRQ",
+        "GDGTQDNLSGAEKAVQ",
+        "PEPTIDE",
+        "LEERLGLIEVQAPILSRVGDGTQDNLSG",
+        "W",
+        "MKTAYLAKQRQISHFSRQLEERLGLIEVGDGTQDNLSGAEKAVQVKVKALPDAQ",
+    )
+
+    def check(self, aligner):
+        query = self.query
+        profile = aligner.profile(query)
+        for target in self.targets:
+            score = aligner.score(target, query)
+            self.assertAlmostEqual(profile.score(target), score)
+            score, target_end, query_end = profile.locate(target)
+            self.assertAlmostEqual(score, aligner.score(target, query))
+            if score > 0:
+                # the best local alignment ends at the reported positions
+                self.assertAlmostEqual(
+                    aligner.score(target[:target_end], query[:query_end]), score
+                )
+        results = list(profile.search(self.targets, threshold=30))
+        for index, score, target_end, query_end in results:
+            self.assertGreaterEqual(score, 30)
+            self.assertEqual(
+                (score, target_end, query_end), profile.locate(self.targets[index])
+            )
+        indices = [result[0] for result in results]
+        for index, target in enumerate(self.targets):
+            if index not in indices:
+                self.assertLess(aligner.score(target, query), 30)
+
+    def test_blosum62(self):
+        aligner = Align.PairwiseAligner(mode="local")
+        aligner.substitution_matrix = substitution_matrices.load("BLOSUM62")
+        aligner.open_gap_score = -11
+        aligner.extend_gap_score = -1
+        self.assertEqual(aligner.algorithm, "Gotoh local alignment algorithm")
+        self.check(aligner)
+        aligner.gap_score = -4
+        self.assertEqual(aligner.algorithm, "Smith-Waterman")
+        self.check(aligner)
+        aligner.insertion_score = -2
+        self.check(aligner)
+
+    def test_compare(self):
+        aligner = Align.PairwiseAligner(mode="local", mismatch_score=-2)
+        aligner.open_gap_score = -3
+        aligner.extend_gap_score = -1
+        self.check(aligner)
+        aligner.wildcard = "X"
+        self.check(aligner)
+        profile = aligner.profile(self.query)
+        self.assertAlmostEqual(profile.score("MKXAYIAK"), 7)
+
+    def test_fallback(self):
+        # scores that are not integers are calculated by the scalar code
+        aligner = Align.PairwiseAligner(mode="local")
+        aligner.substitution_matrix = substitution_matrices.load("BLOSUM62") * 0.5
+        aligner.open_gap_score = -5.5
+        aligner.extend_gap_score = -0.5
+        self.check(aligner)
+
+    def test_objects(self):
+        aligner = Align.PairwiseAligner(mode="local", mismatch_score=-1, gap_score=-1)
+        query = ["alpha", "beta", "gamma", "beta"]
+        profile = aligner.profile(query)
+        target = ["delta", "beta", "gamma", "epsilon"]
+        self.assertEqual(profile.locate(target), (2.0, 3, 3))
+
+    def test_restrictions(self):
+        aligner = Align.PairwiseAligner()
+        with self.assertRaises(ValueError):
+            aligner.profile("ACGT")
+        aligner.mode = "local"
+        aligner.gap_score = lambda start, length: -length
+        with self.assertRaises(ValueError):
+            aligner.profile("ACGT")
+
+
+class TestSeedAligner(unittest.TestCase):
+    @staticmethod
+    def random_sequence(generator, length):
+        return "".join(generator.choice("ACGT") for i in range(length))
+
+    def mutate(self, generator, sequence):
+        letters = []
+        for letter in sequence:
+            value = generator.random()
+            if value < 0.04:
+                letters.append(generator.choice("ACGT"))
+            elif value < 0.045:
+                pass
+            elif value < 0.05:
+                letters.append(letter + generator.choice("ACGT"))
+            else:
+                letters.append(letter)
+        return "".join(letters)
+
+    def test_scores(self):
+        generator = random.Random(7)
+        seed_aligner = Align.SeedAligner(seed=11, threshold=20)
+        aligner = seed_aligner.aligner
+        for trial in range(50):
+            core = self.random_sequence(generator, generator.randint(50, 300))
+            target = (
+                self.random_sequence(generator, generator.randint(0, 100))
+                + core
+                + self.random_sequence(generator, generator.randint(0, 100))
+            )
+            query = (
+                self.random_sequence(generator, generator.randint(0, 100))
+                + self.mutate(generator, core)
+                + self.random_sequence(generator, generator.randint(0, 100))
+            )
+            for strand in "+-":
+                if strand == "-":
+                    query = reverse_complement(query)
+                alignments = seed_aligner.align(target, query, strand)
+                alignment = alignments[0]
+                self.assertIs(alignment.sequences[0], target)
+                self.assertIs(alignment.sequences[1], query)
+                self.assertAlmostEqual(
+                    alignment.score, aligner.score(target, query, strand)
+                )
+                scores = [alignment.score for alignment in alignments]
+                self.assertEqual(scores, sorted(scores, reverse=True))
+                self.assertGreaterEqual(min(scores), 20)
+
+    def test_covered(self):
+        # The gapped alignment spans several thousand target positions and
+        # two diagonals; all other seed hits are covered by it.
+        generator = random.Random(3)
+        target = self.random_sequence(generator, 6000)
+        insertion = self.random_sequence(generator, 20)
+        query = target[:3000] + insertion + target[3000:]
+        seed_aligner = Align.SeedAligner(seed=11, gapped_xdrop=100)
+        alignments = seed_aligner.align(target, query)
+        self.assertEqual(len(alignments), 1)
+        alignment = alignments[0]
+        self.assertAlmostEqual(alignment.score, 11955)
+        self.assertTrue(
+            np.array_equal(
+                alignment.coordinates,
+                np.array([[0, 3000, 3000, 6000], [0, 3000, 3020, 6020]]),
+            )
+        )
+
+    def test_example(self):
+        target = "GGCACTGAACTAGCATCGAGTCTTACGGATCAGCTAGCCTAGGACTTACGTTAGCAGT"
+        query = "TTTTCAGCATCGAGTCTTACGGATCGCTAGCCTAGGACTTACGTTTTT"
+        seed_aligner = Align.SeedAligner(seed="11011011", threshold=30)
+        alignments = seed_aligner.align(target, query)
+        self.assertEqual(len(alignments), 1)
+        alignment = alignments[0]
+        self.assertAlmostEqual(alignment.score, 73)
+        self.assertTrue(
+            np.array_equal(
+                alignment.coordinates, np.array([[11, 31, 32, 52], [5, 25, 25, 45]])
+            )
+        )
+        self.assertEqual(
+            format(alignment, "psl"),
+            "40\t0\t0\t0\t0\t0\t1\t1\t+\tquery\t48\t5\t45\ttarget\t58\t11\t52\t2\t20,20,\t5,25,\t11,32,\n",
+        )
+        alignments = seed_aligner.align(target, reverse_complement(query), "-")
+        alignment = alignments[0]
+        self.assertAlmostEqual(alignment.score, 73)
+        self.assertTrue(
+            np.array_equal(
+                alignment.coordinates, np.array([[11, 31, 32, 52], [43, 23, 23, 3]])
+            )
+        )
+
+    def test_protein(self):
+        aligner = Align.PairwiseAligner(mode="local")
+        aligner.substitution_matrix = substitution_matrices.load("BLOSUM62")
+        aligner.open_gap_score = -11
+        aligner.extend_gap_score = -1
+        seed_aligner = Align.SeedAligner(aligner, seed=3, xdrop=15, threshold=30)
+        query = "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNLSGAEKAVQVKVKALPDAQ"
+        target = "PPPPP" + query[10:50].replace("L", "I") + "GGGGG"
+        alignments = seed_aligner.align(target, query)
+        self.assertEqual(len(alignments), 1)
+        self.assertAlmostEqual(alignments[0].score, aligner.score(target, query))
+
+    def test_xdrop_extend(self):
+        generator = random.Random(11)
+        aligner = Align.PairwiseAligner(
+            match_score=2, mismatch_score=-3, open_gap_score=-5, extend_gap_score=-2
+        )
+        for trial in range(50):
+            seqA = self.random_sequence(generator, generator.randint(1, 10))
+            seqB = self.random_sequence(generator, generator.randint(1, 10))
+            sA = np.frombuffer(seqA.encode(), np.uint8).astype(np.int32)
+            sB = np.frombuffer(seqB.encode(), np.uint8).astype(np.int32)
+            score, path, truncated = aligner._xdrop_extend(sA, sB, 1000)
+            # without pruning, the extension finds the best alignment of any
+            # prefixes of the two sequences
+            best = 0
+            for i in range(1, len(seqA) + 1):
+                for j in range(1, len(seqB) + 1):
+                    best = max(best, aligner.score(seqA[:i], seqB[:j]))
+            self.assertAlmostEqual(score, best)
+            self.assertEqual((path[0][0], path[1][0]), (0, 0))
+            if score > 0:
+                endA = path[0][-1]
+                endB = path[1][-1]
+                self.assertAlmostEqual(aligner.score(seqA[:endA], seqB[:endB]), score)
+            self.assertTrue(truncated)
+        sA = np.frombuffer(b"ACGTACGTTTTTTTTTTTTTTT", np.uint8).astype(np.int32)
+        sB = np.frombuffer(b"ACGTACGTAAAAAAAAAAAAAA", np.uint8).astype(np.int32)
+        score, path, truncated = aligner._xdrop_extend(sA, sB, 10)
+        self.assertAlmostEqual(score, 16)
+        self.assertEqual(path, ((0, 8), (0, 8)))
+        self.assertFalse(truncated)
+        with self.assertRaises(ValueError):
+            aligner._xdrop_extend(sA, sB, -1)
+
+    def test_chain(self):
+        generator = random.Random(5)
+        blocks = [self.random_sequence(generator, n) for n in (60, 50, 40)]
+        target = (
+            self.random_sequence(generator, 20)
+            + blocks[0]
+            + self.random_sequence(generator, 300)
+            + blocks[1]
+            + self.random_sequence(generator, 250)
+            + blocks[2]
+        )
+        query = (
+            self.random_sequence(generator, 5)
+            + blocks[0]
+            + self.random_sequence(generator, 400)
+            + blocks[1]
+            + self.random_sequence(generator, 150)
+            + blocks[2]
+        )
+        seed_aligner = Align.SeedAligner(seed=11, threshold=20)
+        alignments = seed_aligner.align(target, query)
+        self.assertEqual(len(alignments), 3)
+        # with the affine gap scores of the aligner, the gaps between the
+        # alignments are too long to chain them
+        chains = seed_aligner.chain(alignments)
+        self.assertEqual(len(chains), 3)
+
+        def gap_score(target_gaps, query_gaps):
+            return -10 - np.log2(1 + target_gaps + query_gaps)
+
+        chains = seed_aligner.chain(alignments, gap_score)
+        self.assertEqual(len(chains), 1)
+        chain = chains[0]
+        alignments = sorted(
+            alignments, key=lambda alignment: alignment.coordinates[0, 0]
+        )
+        score = alignments[0].score
+        for i in range(1, len(alignments)):
+            end = alignments[i - 1].coordinates[:, -1]
+            gaps = alignments[i].coordinates[:, 0] - end
+            score += alignments[i].score + gap_score(*gaps)
+        self.assertAlmostEqual(chain.score, score)
+        self.assertEqual(
+            chain.aligned.tolist(),
+            np.concatenate([alignment.aligned for alignment in alignments], 1).tolist(),
+        )
+        alignments = seed_aligner.align(target, reverse_complement(query), "-")
+        chains = seed_aligner.chain(alignments, gap_score)
+        self.assertEqual(len(chains), 1)
+        self.assertAlmostEqual(chains[0].score, score)
+
+    def test_repeats(self):
+        target = "ACGT" * 50
+        seed_aligner = Align.SeedAligner(seed=8)
+        self.assertGreater(len(seed_aligner.align(target, "ACGT" * 10)), 0)
+        seed_aligner.max_occurrences = 10
+        self.assertEqual(len(seed_aligner.align(target, "ACGT" * 10)), 0)
+
+    def test_arguments(self):
+        seed_aligner = Align.SeedAligner()
+        self.assertEqual(seed_aligner.seed, "1" * 16)
+        seed_aligner.seed = "1101"
+        self.assertEqual(seed_aligner.seed, "1101")
+        for seed in (0, "0110", "11a1", ""):
+            with self.assertRaises(ValueError):
+                seed_aligner.seed = seed
+        with self.assertRaises(TypeError):
+            seed_aligner.seed = 2.5
+        with self.assertRaises(ValueError):
+            Align.SeedAligner(Align.PairwiseAligner())
+        with self.assertRaises(ValueError):
+            seed_aligner.align("ACGT", "ACGT", "*")
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
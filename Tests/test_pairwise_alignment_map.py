@@ -846,6 +846,22 @@ class TestZeroGaps(unittest.TestCase):
         )
         # fmt: on
 
+    def test_no_overlap(self):
+        coordinates = np.array([[0, 10], [0, 10]])
+        sequences = [
+            SeqRecord(Seq(None, 20), id="genome"),
+            SeqRecord(Seq(None, 20), id="mRNA"),
+        ]
+        alignment1 = Alignment(sequences, coordinates)
+        sequences = [
+            SeqRecord(Seq(None, 20), id="mRNA"),
+            SeqRecord(Seq(None, 5), id="tag"),
+        ]
+        for coordinates in ([[12, 17], [0, 5]], [[12, 17], [5, 0]]):
+            alignment2 = Alignment(sequences, np.array(coordinates))
+            alignment = alignment1.map(alignment2)
+            self.assertEqual(alignment.coordinates.shape, (2, 0))
+
 
 class TestLiftOver(unittest.TestCase):
     def test_chimp(self):